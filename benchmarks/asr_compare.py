@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Порівняння рушіїв розпізнавання мовлення (точність і затримка)
+
+Кожен WAV корпусу подається у рушій фрагментами по AUDIO_CHUNK_FRAMES,
+як з мікрофона. Час моделюється як у реальному потоці: фрагмент i
+надходить у момент (i + 1) * тривалість_фрагмента, обробка починається
+не раніше його надходження і не раніше завершення попереднього. Так
+обчислюються:
+
+- wer - частка помилок на рівні слів (заміни + вставки + пропуски)
+- final_latency_ms - від кінця аудіо до фінального тексту
+- first_partial_ms - від початку аудіо до першої часткової гіпотези
+- final_lead_ms - наскільки раніше кінця аудіо часткова гіпотеза вже
+  збігалася з фінальним текстом (запас для попередньої обробки команди)
+- rtf - час обробки відносно тривалості аудіо
+
+Корпус - директорія з WAV (моно, PCM16) і транскриптами поруч
+(запис.wav + запис.txt).
+
+Використання:
+    python -m benchmarks.asr_compare --corpus path/to/corpus
+    python -m benchmarks.asr_compare --corpus path/to/corpus --backends vosk --language uk-UA
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+import wave
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from config import Config
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "asr_compare.json"
+
+def normalize_words(text):
+    """Слова для порівняння: нижній регістр, без пунктуації"""
+    return re.sub(r"[^\w\s']", " ", (text or "").lower()).split()
+
+def word_errors(reference, hypothesis):
+    """
+    Відстань редагування на рівні слів
+
+    Returns:
+        tuple: (кількість помилок, кількість слів еталону)
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1], len(ref)
+
+def word_error_rate(reference, hypothesis):
+    errors, words = word_errors(reference, hypothesis)
+    return errors / max(1, words)
+
+def load_corpus(directory):
+    """Пари (WAV, транскрипт)"""
+    corpus = []
+    for wav_path in sorted(Path(directory).glob("*.wav")):
+        transcript_path = wav_path.with_suffix(".txt")
+        if not transcript_path.exists():
+            logging.warning(f"Немає транскрипту для {wav_path.name}")
+            continue
+        corpus.append((wav_path, transcript_path.read_text(encoding="utf-8").strip()))
+    return corpus
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path.name}: потрібен WAV моно, PCM16")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+def transcribe(backend, pcm, sample_rate, language, chunk_frames):
+    """
+    Потокове розпізнавання одного запису з моделюванням реального часу
+
+    Returns:
+        dict: Текст і часові позначки (секунди від початку аудіо)
+    """
+    partials = []  # (момент появи, гіпотеза); момент відомий після обробки фрагмента
+    stream = backend.start_stream(sample_rate, language, on_partial=lambda text: partials.append((None, text)))
+
+    chunk_bytes = chunk_frames * 2
+    chunk_seconds = chunk_frames / sample_rate
+    processing = 0.0
+    now = 0.0
+    for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+        arrival = min((index + 1) * chunk_seconds, len(pcm) / 2 / sample_rate)
+        started = time.perf_counter()
+        stream.feed(pcm[offset:offset + chunk_bytes])
+        elapsed = time.perf_counter() - started
+        processing += elapsed
+        now = max(now, arrival) + elapsed
+        if partials and partials[-1][0] is None:
+            partials[-1] = (now, partials[-1][1])
+
+    started = time.perf_counter()
+    text = stream.finish()
+    elapsed = time.perf_counter() - started
+    processing += elapsed
+    duration = len(pcm) / 2 / sample_rate
+    final_time = max(now, duration) + elapsed
+
+    # Найраніший момент, з якого гіпотеза вже не змінювалась і дорівнює фінальному тексту
+    final_words = normalize_words(text)
+    settled = final_time
+    for moment, partial in reversed(partials):
+        if normalize_words(partial) != final_words:
+            break
+        settled = moment
+
+    return {
+        "text": text or "",
+        "duration": duration,
+        "processing": processing,
+        "final_latency": final_time - duration,
+        "first_partial": partials[0][0] if partials else None,
+        "final_lead": max(0.0, duration - settled) if final_words else 0.0
+    }
+
+def evaluate_backend(backend, corpus, language, chunk_frames):
+    files = []
+    errors = words = failures = 0
+    for wav_path, reference in corpus:
+        pcm, sample_rate = read_wav(wav_path)
+        try:
+            result = transcribe(backend, pcm, sample_rate, language, chunk_frames)
+        except Exception as e:
+            logging.error(f"{backend.name}: {wav_path.name}: {e}")
+            failures += 1
+            continue
+        file_errors, file_words = word_errors(reference, result["text"])
+        errors += file_errors
+        words += file_words
+        files.append({"file": wav_path.name, "reference": reference, "errors": file_errors, **result})
+
+    def mean(key):
+        values = [item[key] for item in files if item[key] is not None]
+        return 1000 * sum(values) / len(values) if values else None
+
+    audio_seconds = sum(item["duration"] for item in files)
+    return {
+        "backend": backend.name,
+        "streaming": backend.streaming,
+        "files": len(files),
+        "failures": failures,
+        "wer": errors / max(1, words),
+        "final_latency_ms": mean("final_latency"),
+        "first_partial_ms": mean("first_partial"),
+        "final_lead_ms": mean("final_lead"),
+        "rtf": sum(item["processing"] for item in files) / audio_seconds if audio_seconds else None,
+        "details": files
+    }
+
+def create_backend(name):
+    from voice.asr import GoogleASR, VoskASR
+
+    backend = {"google": GoogleASR, "vosk": VoskASR}[name]()
+    if not backend.available:
+        return None
+    backend.warmup()
+    return backend
+
+def print_report(results):
+    def fmt(value, pattern="{:.0f}"):
+        return "-" if value is None else pattern.format(value)
+
+    print(f"{'рушій':<8} {'WER':>7} {'кінець→текст, мс':>17} {'1-ша гіпотеза, мс':>18} {'запас, мс':>10} {'RTF':>6}")
+    for result in results:
+        print(f"{result['backend']:<8} {result['wer']:>7.1%} {fmt(result['final_latency_ms']):>17} "
+              f"{fmt(result['first_partial_ms']):>18} {fmt(result['final_lead_ms']):>10} "
+              f"{fmt(result['rtf'], '{:.2f}'):>6}")
+        if result["failures"]:
+            print(f"  помилок: {result['failures']}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Порівняння рушіїв розпізнавання мовлення")
+    parser.add_argument("--corpus", type=Path, required=True, help="директорія з *.wav та *.txt")
+    parser.add_argument("--backends", default="google,vosk", help="рушії через кому")
+    parser.add_argument("--language", default=Config.SPEECH_LANGUAGE)
+    parser.add_argument("--chunk-frames", type=int, default=Config.AUDIO_CHUNK_FRAMES)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit(f"Корпус порожній: {args.corpus}")
+
+    results = []
+    for name in [name.strip() for name in args.backends.split(",") if name.strip()]:
+        backend = create_backend(name)
+        if backend is None:
+            print(f"Рушій {name} недоступний - пропущено")
+            continue
+        results.append(evaluate_backend(backend, corpus, args.language, args.chunk_frames))
+
+    print(f"Записів: {len(corpus)}, мова: {args.language}")
+    print_report(results)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"language": args.language, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
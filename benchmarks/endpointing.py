@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк визначення кінця фрази (endpointing)
+
+Кожен запис подається через AudioStream як потік мікрофона; фраза
+виділяється двома способами:
+
+- baseline - sr.Recognizer.listen (енергетичний поріг, pause_threshold
+  0.8 с, phrase_time_limit 3 с - попередня поведінка слухача)
+- vad - voice.vad.Endpointer (VAD по кадрах, адаптивна тиша після мовлення)
+
+Для кожного способу вимірюється:
+
+- latency - від кінця мовлення до моменту, коли фраза віддана на
+  розпізнавання (секунди аудіо, прочитаного після кінця мовлення)
+- truncated - частка фраз, обрізаних до кінця мовлення
+- missed - частка записів, де мовлення не знайдено
+- cpu_percent - CPU (% одного ядра) на секунду аудіо
+
+Фікстури - директорія з WAV (16 кГц, моно, PCM16, коротші за
+AUDIO_BUFFER_SECONDS) і розміткою поруч
+(запис.json: {"speech_start": с, "speech_end": с}); без розмітки межі
+мовлення визначаються за енергією всього запису. Без --fixtures
+генерується синтетичний набір команд різної довжини з паузами між словами.
+
+Використання:
+    python -m benchmarks.endpointing
+    python -m benchmarks.endpointing --fixtures path/to/recordings --check
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from benchmarks.stubs import synthesize_word, write_wav
+from config import Config
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "endpointing.json"
+RATE = 16000
+CALIBRATION_SECONDS = 0.3
+
+WORDS = [
+    "відкрий", "браузер", "погода", "завтра", "у", "києві", "увімкни", "музику",
+    "розкажи", "про", "марс", "знайди", "рецепт", "борщу", "напиши", "лист",
+    "скільки", "часу", "стоп", "дякую", "запам'ятай", "нову", "команду"
+]
+
+def generate_fixtures(directory, count, noise_level, seed=0):
+    """Синтетичні команди з 1-9 слів, паузами між словами і тишею після"""
+    rng = np.random.default_rng(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    for i in range(count):
+        speaker = {
+            "f0": rng.uniform(90, 220),
+            "rate": rng.uniform(0.85, 1.2),
+            "formant_shift": rng.uniform(0.92, 1.08),
+            "gain": rng.uniform(0.3, 1.0)
+        }
+        words = rng.choice(WORDS, size=int(rng.integers(1, 10)))
+        parts = [np.zeros(int(rng.uniform(0.5, 0.9) * RATE))]
+        start = len(parts[0]) / RATE
+        for index, word in enumerate(words):
+            if index:
+                parts.append(np.zeros(int(rng.uniform(0.05, 0.35) * RATE)))
+            parts.append(synthesize_word(str(word), seed=1000 * i + index, snr_db=80, pad=0.0, **speaker))
+        end = sum(len(part) for part in parts) / RATE
+        parts.append(np.zeros(int(2.5 * RATE)))
+
+        signal = np.concatenate(parts).astype(np.float64)
+        signal += rng.standard_normal(len(signal)) * noise_level
+        write_wav(directory / f"command_{i:03d}.wav", np.clip(signal, -32768, 32767))
+        with open(directory / f"command_{i:03d}.json", "w", encoding="utf-8") as f:
+            json.dump({"speech_start": start, "speech_end": end, "words": len(words)}, f)
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as wav:
+        if wav.getframerate() != RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path.name}: потрібен WAV 16 кГц, моно, PCM16")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+def label_speech(samples, frame_seconds=0.03, margin_db=12.0):
+    """Межі мовлення за енергією всього запису (для записів без розмітки)"""
+    frame = int(frame_seconds * RATE)
+    frames = samples[:len(samples) // frame * frame].astype(np.float64).reshape(-1, frame)
+    energy = 10 * np.log10((frames ** 2).mean(axis=1) + 1e-9)
+    voiced = np.flatnonzero(energy > np.percentile(energy, 10) + margin_db)
+    if not len(voiced):
+        return None
+    return {"speech_start": voiced[0] * frame_seconds, "speech_end": (voiced[-1] + 1) * frame_seconds}
+
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(Path(directory).glob("*.wav")):
+        samples = read_wav(path)
+        label_path = path.with_suffix(".json")
+        if label_path.exists():
+            label = json.loads(label_path.read_text(encoding="utf-8"))
+        else:
+            label = label_speech(samples)
+        if label is None:
+            logging.warning(f"{path.name}: мовлення не знайдено, пропущено")
+            continue
+        fixtures.append((path.name, samples, label))
+    return fixtures
+
+def stream_over(samples):
+    """
+    AudioStream, що читає семпли замість мікрофона (без затримок)
+
+    Returns:
+        tuple: (потік, курсор з початку запису)
+    """
+    from voice.audio_stream import AudioStream
+
+    chunks = iter(samples[i:i + Config.AUDIO_CHUNK_FRAMES].tobytes()
+                  for i in range(0, len(samples), Config.AUDIO_CHUNK_FRAMES))
+    stream = AudioStream(reader=lambda frames: next(chunks, b""))
+    # Курсор до запуску: захоплення без затримок може випередити споживача
+    cursor = stream.cursor()
+    stream.start()
+    return stream, cursor
+
+def baseline_listen(samples):
+    """Попередній спосіб: sr.Recognizer з енергетичним порогом"""
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = True
+    recognizer.pause_threshold = 0.8
+
+    calibration, cursor = stream_over(samples[:int(CALIBRATION_SECONDS * RATE)])
+    with calibration.source(cursor=cursor) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_SECONDS)
+    calibration.stop()
+
+    stream, cursor = stream_over(samples)
+    with stream.source(cursor=cursor) as source:
+        recognizer.listen(source, timeout=Config.SPEECH_TIMEOUT, phrase_time_limit=Config.SPEECH_PHRASE_TIMEOUT)
+    stream.stop()
+    return cursor.position
+
+def vad_listen(samples):
+    """Новий спосіб: VAD і адаптивна тиша після мовлення"""
+    from voice.vad import Endpointer
+
+    endpointer = Endpointer(sample_rate=RATE)
+    endpointer.calibrate(samples[:int(CALIBRATION_SECONDS * RATE)].tobytes())
+
+    stream, cursor = stream_over(samples)
+    endpointer.listen(cursor, timeout=Config.SPEECH_TIMEOUT)
+    stream.stop()
+    return cursor.position
+
+def evaluate(method, fixtures):
+    latencies = []
+    truncated = []
+    missed = []
+    cpu = 0.0
+    audio_seconds = 0.0
+
+    for name, samples, label in fixtures:
+        started = time.process_time()
+        try:
+            position = method(samples)
+        except sr.WaitTimeoutError:
+            missed.append(name)
+            continue
+        finally:
+            cpu += time.process_time() - started
+
+        emitted = position / RATE
+        audio_seconds += emitted
+        if emitted < label["speech_end"]:
+            truncated.append(name)
+        else:
+            latencies.append(emitted - label["speech_end"])
+
+    values = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        "latency_p50_ms": 1000 * float(np.percentile(values, 50)),
+        "latency_p95_ms": 1000 * float(np.percentile(values, 95)),
+        "latency_max_ms": 1000 * float(values.max()),
+        "truncated_rate": len(truncated) / max(1, len(fixtures)),
+        "missed_rate": len(missed) / max(1, len(fixtures)),
+        "cpu_percent": 100 * cpu / max(audio_seconds, 1e-9),
+        "truncated": truncated,
+        "missed": missed
+    }
+
+def run_benchmark(fixtures):
+    from voice.vad import create_vad
+
+    return {
+        "parameters": {
+            "fixtures": len(fixtures),
+            "vad": create_vad(RATE).name,
+            "min_trailing_silence": Config.VAD_MIN_TRAILING_SILENCE,
+            "max_trailing_silence": Config.VAD_MAX_TRAILING_SILENCE
+        },
+        "baseline": evaluate(baseline_listen, fixtures),
+        "vad": evaluate(vad_listen, fixtures)
+    }
+
+def print_report(report):
+    print(f"Записів: {report['parameters']['fixtures']}, VAD: {report['parameters']['vad']}")
+    print(f"{'спосіб':<10}{'p50, мс':>9}{'p95, мс':>9}{'max, мс':>9}{'обрізано':>10}{'пропущено':>11}{'CPU':>8}")
+    for method in ("baseline", "vad"):
+        result = report[method]
+        print(f"{method:<10}{result['latency_p50_ms']:>9.0f}{result['latency_p95_ms']:>9.0f}"
+              f"{result['latency_max_ms']:>9.0f}{result['truncated_rate']:>10.1%}"
+              f"{result['missed_rate']:>11.1%}{result['cpu_percent']:>7.2f}%")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк визначення кінця фрази")
+    parser.add_argument("--fixtures", type=Path, default=None, help="директорія з WAV та JSON розміткою")
+    parser.add_argument("--count", type=int, default=40, help="кількість синтетичних записів")
+    parser.add_argument("--noise-level", type=float, default=60.0, help="СКВ фонового шуму (PCM16)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--check", action="store_true", help="код 1 при перевищенні лімітів")
+    parser.add_argument("--max-latency-p95", type=float, default=800.0, help="мс")
+    parser.add_argument("--max-truncated", type=float, default=0.05)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="jarvis_endpointing_") as tmp:
+        directory = args.fixtures
+        if directory is None:
+            directory = Path(tmp)
+            generate_fixtures(directory, args.count, args.noise_level, args.seed)
+        fixtures = load_fixtures(directory)
+    if not fixtures:
+        raise SystemExit("Немає записів для бенчмарку")
+
+    report = run_benchmark(fixtures)
+    print_report(report)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+
+    if args.check:
+        vad = report["vad"]
+        failures = []
+        if vad["latency_p95_ms"] > args.max_latency_p95:
+            failures.append(f"p95 {vad['latency_p95_ms']:.0f} мс > {args.max_latency_p95:.0f} мс")
+        if vad["truncated_rate"] > args.max_truncated:
+            failures.append(f"обрізано {vad['truncated_rate']:.1%} > {args.max_truncated:.1%}")
+        if vad["missed_rate"] > 0:
+            failures.append(f"пропущено {vad['missed_rate']:.1%}")
+        if failures:
+            print("ПЕРЕВИЩЕНО ЛІМІТИ: " + "; ".join(failures))
+            return 1
+        print("Ліміти дотримано")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк конвеєра наповнення бази знань
+
+Синтетичний PDF додається до порожньої векторної бази двома способами:
+
+- sequential - як колишній PDFProcessor.process_pdf_file: увесь текст,
+  потім аналіз LLM, потім частини і векторизація;
+- pipeline - IngestPipeline: етапи одночасно, аналіз LLM паралельно з
+  векторизацією.
+
+LLM - локальний OpenAI-сумісний стенд (benchmarks/stubs.py) з затримкою
+відповіді. Якщо модель векторизації недоступна, використовується
+HashingEncoder з штучною затримкою --embed-delay на частину (порядок
+вартості MiniLM на CPU). У звіті - час обох способів і пропускна здатність
+кожного етапу конвеєра.
+
+Використання:
+    python -m benchmarks.ingest_pipeline --pages 200 --llm-latency 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from benchmarks.pdf_extraction import build_pdf
+from benchmarks.pdf_throughput import ANALYSIS_REPLY
+from benchmarks.stubs import FakeOpenAIServer, HashingEncoder
+from config import Config
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "ingest_pipeline.json"
+
+class DelayedEncoder:
+    """Енкодер з фіксованою вартістю на текст"""
+
+    def __init__(self, encoder, delay):
+        self.encoder = encoder
+        self.delay = delay
+
+    def encode(self, texts, **kwargs):
+        time.sleep(self.delay * len(texts))
+        return self.encoder.encode(texts, **kwargs)
+
+def prepare_store(vector_kb, workdir, embed_delay):
+    """Порожня векторна база в тимчасовій папці"""
+    workdir.mkdir(parents=True, exist_ok=True)
+    vector_kb.vector_db_path = workdir / "vectors.index"
+    vector_kb.metadata_path = workdir / "metadata.json"
+    if vector_kb.model is None or isinstance(vector_kb.model, DelayedEncoder):
+        if vector_kb.model is None:
+            logging.warning("Модель векторизації недоступна, використовую HashingEncoder")
+        vector_kb.model = DelayedEncoder(HashingEncoder(), embed_delay)
+    vector_kb._create_new_index()
+
+def iter_page_chunks(pages):
+    """Частини документа по сторінках: (номер сторінки, частина)"""
+    from memory.chunker import iter_chunks
+
+    for page, text in enumerate(pages):
+        for chunk in iter_chunks(text):
+            yield page, chunk
+
+async def run_sequential(vector_kb, extractor, analyze, path):
+    """Колишній порядок: текст -> аналіз -> частини -> векторизація"""
+    pages = list(extractor.iter_pages(path))
+    analysis = await analyze("".join(pages), path, None)
+    chunks = list(iter_page_chunks(pages))
+    vector_kb.add_documents(
+        [chunk for _, chunk in chunks],
+        [{"source": "pdf", "filename": path.name, "chunk_id": index, "page": page}
+         for index, (page, _) in enumerate(chunks)]
+    )
+    return {"chunks": len(chunks), "analysis": analysis is not None}
+
+async def run_benchmark(args, path, workdir):
+    from memory.ingest_manifest import IngestManifest, file_hash
+    from memory.vector_knowledge import vector_kb
+    from plugins.gpt_integration import GPTIntegration
+    from plugins.ingest_pipeline import IngestPipeline
+    from plugins.llm_client import LLMClient
+    from plugins.llm_policy import ResilientLLMTransport
+    from plugins.llm_providers import LLMRouter, OpenAIProvider
+    from plugins.pdf_extractor import PDFExtractor
+
+    # Rate limiter транспорту не повинен обмежувати стенд
+    Config.LLM_RATE_LIMIT_RPS = 1000.0
+    Config.LLM_RATE_LIMIT_BURST = 1000
+    Config.PDF_ANALYSIS_CHECKPOINT_DIR = workdir / "checkpoints"
+
+    extractor = PDFExtractor()
+    results = {}
+    async with FakeOpenAIServer(latency=args.llm_latency, token_delay=0.0, reply=ANALYSIS_REPLY) as server:
+        transport = ResilientLLMTransport(LLMClient(api_key="benchmark", base_url=f"{server.url}/v1"))
+        integration = GPTIntegration()
+        integration.router = LLMRouter(remote=OpenAIProvider(transport))
+        analyze = integration.analyze_pdf_content
+
+        try:
+            prepare_store(vector_kb, workdir / "sequential", args.embed_delay)
+            started = time.perf_counter()
+            outcome = await run_sequential(vector_kb, extractor, analyze, path)
+            results["sequential"] = {"elapsed": time.perf_counter() - started, **outcome}
+
+            prepare_store(vector_kb, workdir / "pipeline", args.embed_delay)
+            pipeline = IngestPipeline(vector_kb, IngestManifest(workdir / "manifest.json"), extractor, analyze)
+            started = time.perf_counter()
+            outcome = await pipeline.run(path, file_hash(path))
+            results["pipeline"] = {
+                "elapsed": time.perf_counter() - started,
+                "chunks": outcome["chunks"],
+                "analysis": outcome["analysis"] is not None,
+                "report": outcome["report"]
+            }
+        finally:
+            await transport.aclose()
+            extractor.close()
+
+    results["speedup"] = results["sequential"]["elapsed"] / results["pipeline"]["elapsed"]
+    return {
+        "parameters": {
+            "pages": args.pages,
+            "lines_per_page": args.lines,
+            "llm_latency": args.llm_latency,
+            "embed_delay": args.embed_delay,
+            "queue_size": Config.INGEST_QUEUE_SIZE,
+            "embed_batch": Config.INGEST_EMBED_BATCH,
+            "index_commit": Config.INGEST_INDEX_COMMIT,
+            "llm_requests": server.request_count
+        },
+        "results": results
+    }
+
+def print_report(report):
+    from plugins.ingest_pipeline import IngestPipeline
+
+    results = report["results"]
+    print(f"Сторінок: {report['parameters']['pages']}, частин: {results['pipeline']['chunks']}, "
+          f"запитів до LLM: {report['parameters']['llm_requests']}")
+    print(f"sequential: {results['sequential']['elapsed']:.2f} с")
+    print(f"pipeline:   {results['pipeline']['elapsed']:.2f} с ({results['speedup']:.1f}x)")
+    print(f"{'етап':<10}{'елементів':>11}{'робота, с':>11}{'за с':>9}{'очікування, с':>15}{'блокування, с':>15}")
+    for name, stats in results["pipeline"]["report"]["stages"].items():
+        print(
+            f"{name:<10}{stats['items']:>11}{stats['busy']:>11.2f}{stats['per_second']:>9.1f}"
+            f"{stats['waiting']:>15.2f}{stats['blocked']:>15.2f}"
+        )
+    print(IngestPipeline.format_report(results["pipeline"]["report"]))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк конвеєра наповнення бази знань")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=40, help="рядків тексту на сторінці")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="затримка відповіді LLM, с")
+    parser.add_argument("--embed-delay", type=float, default=0.004, help="вартість векторизації частини без моделі, с")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="jarvis_ingest_") as tmp:
+        workdir = Path(tmp)
+        path = workdir / "document.pdf"
+        build_pdf(path, args.pages, args.lines)
+        report = asyncio.run(run_benchmark(args, path, workdir))
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
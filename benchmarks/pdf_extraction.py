@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк витягування тексту PDF пулом процесів
+
+Генерує синтетичний документ (за замовчуванням 1000 сторінок тексту) і
+порівнює послідовне читання, як у колишньому PDFProcessor._extract_text
+(text += page.get_text()), з PDFExtractor для різної кількості процесів:
+
+- cold - перший документ, разом із запуском процесів пулу
+- warm - повторний документ на вже запущеному пулі
+- pages_per_second і прискорення відносно послідовного читання (warm)
+
+Прискорення обмежене кількістю ядер машини (cpu_count у звіті).
+
+Використання:
+    python -m benchmarks.pdf_extraction --pages 1000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import fitz
+
+from plugins.pdf_extractor import PDFExtractor
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "pdf_extraction.json"
+
+LINE = "Section {page}.{line}: the assistant indexes documents, answers questions and keeps notes."
+
+def build_pdf(path, pages, lines):
+    """Синтетичний документ: кожна сторінка - lines рядків тексту"""
+    doc = fitz.open()
+    for page in range(pages):
+        text = "\n".join(LINE.format(page=page, line=line) for line in range(lines))
+        doc.new_page().insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=7)
+    doc.save(str(path))
+    doc.close()
+
+def read_serial(path):
+    """Колишнє читання: одна сторінка за одною, склеюванням рядків"""
+    text_content = ""
+    doc = fitz.open(str(path))
+    for page_num in range(len(doc)):
+        text_content += doc.load_page(page_num).get_text()
+    doc.close()
+    return text_content
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def run_benchmark(args, path):
+    reference, serial = timed(read_serial, path)
+    results = [{"mode": "serial", "workers": 1, "cold": serial, "warm": serial}]
+
+    for workers in args.workers:
+        extractor = PDFExtractor(workers=workers)
+        try:
+            text, cold = timed(extractor.extract_text, path)
+            assert text == reference, "текст відрізняється від послідовного читання"
+            _, warm = timed(extractor.extract_text, path)
+        finally:
+            extractor.close()
+        results.append({"mode": "pool", "workers": workers, "cold": cold, "warm": warm})
+
+    for result in results:
+        result["pages_per_second"] = args.pages / result["warm"]
+        result["speedup"] = serial / result["warm"]
+
+    return {
+        "parameters": {
+            "pages": args.pages,
+            "lines_per_page": args.lines,
+            "pages_per_shard": PDFExtractor().config.PDF_EXTRACT_PAGES_PER_SHARD,
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+
+def print_report(report):
+    print(f"Ядер: {report['parameters']['cpu_count']}, сторінок: {report['parameters']['pages']}")
+    print(f"{'режим':<8}{'процесів':>10}{'cold, с':>10}{'warm, с':>10}{'стор./с':>10}{'прискорення':>13}")
+    for result in report["results"]:
+        print(
+            f"{result['mode']:<8}{result['workers']:>10}{result['cold']:>10.2f}{result['warm']:>10.2f}"
+            f"{result['pages_per_second']:>10.0f}{result['speedup']:>12.1f}x"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк витягування тексту PDF")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=60, help="рядків тексту на сторінці")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="jarvis_pdf_extract_") as tmp:
+        path = Path(tmp) / "document.pdf"
+        build_pdf(path, args.pages, args.lines)
+        report = run_benchmark(args, path)
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк пропускної здатності map-reduce аналізу PDF
+
+Аналізує синтетичний документ через справжній PDFAnalyzer та LLM транспорт
+з локальним стендом OpenAI API, що імітує затримку моделі, для кількох
+рівнів паралельності і вимірює:
+
+- elapsed - повний час аналізу документа (map + reduce)
+- chunks_per_second - пропускна здатність етапу map
+- max_in_flight - фактична кількість одночасних запитів до стенду
+
+Використання:
+    python -m benchmarks.pdf_throughput --chunks 40 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from benchmarks.stubs import FakeOpenAIServer
+from config import Config
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "pdf_throughput.json"
+
+ANALYSIS_REPLY = json.dumps({
+    "summary": "Частина описує налаштування асистента.",
+    "key_points": ["Асистент працює локально", "Знання зберігаються у векторній базі"],
+    "topics": ["асистент", "база знань"],
+    "actionable_items": ["Налаштувати ключі API"]
+}, ensure_ascii=False)
+
+def build_document(chunks, chunk_tokens):
+    """Синтетичний документ приблизно на задану кількість частин"""
+    from memory.tokenizer import count_tokens
+
+    sentence = "Розділ {0}: асистент JARVIS обробляє документи, відповідає на питання та зберігає знання."
+    per_chunk = max(1, chunk_tokens // count_tokens(sentence.format(0)))
+    return " ".join(sentence.format(i // per_chunk) for i in range(chunks * per_chunk))
+
+async def run_case(args, text, concurrency, workdir):
+    """Аналіз документа з заданою паралельністю"""
+    from plugins.gpt_integration import GPTIntegration
+    from plugins.llm_client import LLMClient
+    from plugins.llm_policy import ResilientLLMTransport
+    from plugins.llm_providers import LLMRouter, OpenAIProvider
+
+    Config.PDF_ANALYSIS_CONCURRENCY = concurrency
+    Config.PDF_ANALYSIS_CHECKPOINT_DIR = workdir / f"checkpoints_{concurrency}"
+
+    async with FakeOpenAIServer(latency=args.llm_latency, token_delay=args.token_delay, reply=ANALYSIS_REPLY) as server:
+        transport = ResilientLLMTransport(LLMClient(api_key="benchmark", base_url=f"{server.url}/v1"))
+        integration = GPTIntegration()
+        integration.router = LLMRouter(remote=OpenAIProvider(transport))
+
+        stages = {}
+
+        def on_progress(stage, done, total):
+            stages.setdefault(stage, time.perf_counter())
+
+        started = time.perf_counter()
+        analysis = await integration.analyze_pdf_content(text, progress=on_progress)
+        elapsed = time.perf_counter() - started
+        await transport.aclose()
+
+    map_elapsed = stages.get("reduce", started + elapsed) - started
+    return {
+        "concurrency": concurrency,
+        "chunks": analysis["chunks_total"] if analysis else 0,
+        "chunks_analyzed": analysis["chunks_analyzed"] if analysis else 0,
+        "requests": server.request_count,
+        "max_in_flight": server.max_in_flight,
+        "elapsed": elapsed,
+        "map_elapsed": map_elapsed,
+        "chunks_per_second": (analysis["chunks_analyzed"] / map_elapsed) if analysis and map_elapsed else 0.0
+    }
+
+async def run_benchmark(args):
+    # Rate limiter транспорту не повинен обмежувати стенд
+    Config.LLM_RATE_LIMIT_RPS = 1000.0
+    Config.LLM_RATE_LIMIT_BURST = 1000
+    Config.PDF_ANALYSIS_CHUNK_TOKENS = args.chunk_tokens
+
+    text = build_document(args.chunks, args.chunk_tokens)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="jarvis_pdf_bench_") as tmp:
+        for concurrency in args.concurrency:
+            results.append(await run_case(args, text, concurrency, Path(tmp)))
+
+    return {
+        "parameters": {
+            "chunks": args.chunks,
+            "chunk_tokens": args.chunk_tokens,
+            "llm_latency": args.llm_latency,
+            "token_delay": args.token_delay
+        },
+        "results": results
+    }
+
+def print_report(report):
+    baseline = report["results"][0]
+    print(f"{'паралельність':<14}{'частин':>8}{'запитів':>9}{'одночасно':>11}{'час, с':>9}{'частин/с':>10}{'прискорення':>13}")
+    for result in report["results"]:
+        speedup = baseline["elapsed"] / result["elapsed"] if result["elapsed"] else 0.0
+        print(
+            f"{result['concurrency']:<14}{result['chunks_analyzed']:>8}{result['requests']:>9}"
+            f"{result['max_in_flight']:>11}{result['elapsed']:>9.2f}{result['chunks_per_second']:>10.2f}{speedup:>12.1f}x"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк пропускної здатності аналізу PDF")
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--chunk-tokens", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="затримка стенду до першого токена")
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
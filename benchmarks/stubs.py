@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Детерміновані локальні стенди для бенчмарків JARVIS
+
+- FakeOpenAIServer - локальний HTTP сервер з OpenAI-сумісним API
+  (налаштовувана затримка та потокова видача токенів)
+- FaultInjectingOpenAIServer - той самий API з помилками 5xx/429,
+  сплесками затримки та обривами з'єднання
+- FakeWeatherServer - локальний замінник OpenWeatherMap
+- WavAudioSource - джерело "мовлення" з WAV файлів замість мікрофона
+- synthesize_word - формантний синтез слів для тестів активаційного слова
+- NullTTSEngine - беззвучний рушій, сумісний з pyttsx3
+- HashingEncoder - детермінований енкодер замість SentenceTransformer
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+import wave
+import zlib
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from aiohttp import web
+
+DEFAULT_REPLY = (
+    "Векторна база знань зберігає тексти у вигляді числових векторів. "
+    "Це дозволяє шукати документи за змістом, а не за точним збігом слів. "
+    "JARVIS використовує її, щоб додавати релевантний контекст до запитів. "
+    "Якщо потрібно, я можу розповісти детальніше."
+)
+
+class _StubServer:
+    """Базовий локальний aiohttp сервер на випадковому порту"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.runner = None
+        self.request_count = 0
+
+    async def start(self):
+        """Запуск сервера, повертає базову адресу"""
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        return self.url
+
+    async def stop(self):
+        """Зупинка сервера"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+class FakeOpenAIServer(_StubServer):
+    """
+    Замінник OpenAI Chat Completions API
+
+    Args:
+        latency (float): Затримка до першого токена (секунди)
+        token_delay (float): Затримка між токенами (секунди)
+        reply (str): Текст відповіді
+    """
+
+    def __init__(self, latency=0.2, token_delay=0.01, reply=DEFAULT_REPLY, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply = reply
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app.router.add_post("/v1/chat/completions", self._handle_chat)
+
+    def _tokens(self):
+        """Розбиття відповіді на "токени" (слова з пробілами)"""
+        words = self.reply.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    async def _handle_chat(self, request):
+        self.request_count += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, request):
+        payload = await request.json()
+        model = payload.get("model", "gpt-3.5-turbo")
+        tokens = self._tokens()
+
+        await asyncio.sleep(self.latency)
+
+        if payload.get("stream"):
+            return await self._stream_response(request, model, tokens)
+
+        await asyncio.sleep(self.token_delay * len(tokens))
+        return web.json_response({
+            "id": f"chatcmpl-stub-{self.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": sum(len(str(m.get("content", "")).split()) for m in payload.get("messages", [])),
+                "completion_tokens": len(tokens),
+                "total_tokens": len(tokens)
+            }
+        })
+
+    async def _stream_response(self, request, model, tokens):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        for i, token in enumerate(tokens):
+            chunk = {
+                "id": f"chatcmpl-stub-{self.request_count}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            if i < len(tokens) - 1:
+                await asyncio.sleep(self.token_delay)
+
+        final = {
+            "id": f"chatcmpl-stub-{self.request_count}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        }
+        await response.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+class FaultInjectingOpenAIServer(FakeOpenAIServer):
+    """
+    OpenAI-сумісний стенд з інжекцією збоїв
+
+    Args:
+        faults (list): Збої для послідовних запитів: None (норма), HTTP статус
+            (429 - з Retry-After), ("slow", секунди) або "reset" (обрив з'єднання)
+        fault_rate (float): Частка запитів з 503 після вичерпання faults
+        retry_after (str): Значення заголовка Retry-After для 429
+        seed (int): Зерно генератора випадкових збоїв
+    """
+
+    def __init__(self, faults=None, fault_rate=0.0, retry_after="0.1", seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.faults = deque(faults or [])
+        self.fault_rate = fault_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.fault_count = 0
+
+    def _next_fault(self):
+        if self.faults:
+            return self.faults.popleft()
+        return 503 if self.random.random() < self.fault_rate else None
+
+    async def _handle_chat(self, request):
+        fault = self._next_fault()
+        if fault is None:
+            return await super()._handle_chat(request)
+
+        self.fault_count += 1
+        if isinstance(fault, tuple) and fault[0] == "slow":
+            await asyncio.sleep(fault[1])
+            return await super()._handle_chat(request)
+
+        self.request_count += 1
+        if fault == "reset":
+            request.transport.close()
+            return web.Response(status=500)
+
+        headers = {"Retry-After": self.retry_after} if fault == 429 else {}
+        return web.json_response(
+            {"error": {"message": f"Injected fault {fault}", "type": "stub_fault"}},
+            status=fault,
+            headers=headers
+        )
+
+class FakeWeatherServer(_StubServer):
+    """Замінник OpenWeatherMap API з фіксованою відповіддю"""
+
+    def __init__(self, latency=0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.app.router.add_get("/data/2.5/weather", self._handle_weather)
+
+    @property
+    def weather_url(self):
+        return f"{self.url}/data/2.5/weather"
+
+    async def _handle_weather(self, request):
+        self.request_count += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({
+            "name": request.query.get("q", "Kyiv"),
+            "sys": {"country": "UA"},
+            "main": {"temp": 18.4, "feels_like": 17.6, "humidity": 62},
+            "weather": [{"description": "хмарно з проясненнями"}]
+        })
+
+def synthesize_utterance_wav(path, duration=1.0, sample_rate=16000, seed=0):
+    """
+    Генерація детермінованого "мовного" WAV файлу
+
+    Гармонічний сигнал з амплітудною модуляцією складів та тихим шумом
+    по краях - достатньо для перевірки захоплення та сегментації аудіо.
+    """
+    rng = random.Random(seed)
+    base_freq = 110 + rng.random() * 90
+    total = int(duration * sample_rate)
+    pad = int(0.1 * sample_rate)
+
+    frames = bytearray()
+    for n in range(total):
+        t = n / sample_rate
+        noise = (rng.random() - 0.5) * 200
+        if pad <= n < total - pad:
+            syllable = 0.5 * (1 - math.cos(2 * math.pi * 4 * t))
+            voice = sum(math.sin(2 * math.pi * base_freq * k * t) / k for k in range(1, 5))
+            sample = 9000 * syllable * voice / 2 + noise
+        else:
+            sample = noise
+        frames += int(max(-32768, min(32767, sample))).to_bytes(2, "little", signed=True)
+
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return Path(path)
+
+# Формантні параметри фонем: голосні/сонорні - (F1, F2, гучність),
+# шумові - (нижня, верхня частота смуги шуму, гучність, дзвінкість)
+VOWELS = {
+    "а": (750, 1250, 1.0), "о": (500, 900, 1.0), "у": (320, 750, 0.9),
+    "е": (500, 1800, 1.0), "и": (400, 1900, 0.9), "і": (300, 2300, 0.9),
+    "р": (450, 1300, 0.6), "л": (350, 1000, 0.6), "м": (280, 900, 0.45),
+    "н": (280, 1500, 0.45), "в": (300, 1000, 0.4), "й": (280, 2200, 0.5)
+}
+NOISES = {
+    "с": (4000, 7000, 0.35, 0.0), "ш": (1800, 3500, 0.4, 0.0), "ж": (1800, 3500, 0.3, 0.5),
+    "х": (1000, 2500, 0.25, 0.0), "ф": (1500, 5000, 0.2, 0.0), "з": (4000, 7000, 0.25, 0.5),
+    "ч": (2000, 4000, 0.4, 0.0)
+}
+STOPS = {"п": (500, 1500), "б": (500, 1500), "т": (3000, 5000), "д": (3000, 5000), "к": (1500, 3000), "г": (1500, 3000)}
+PHONEME_SECONDS = {"vowel": 0.13, "sonorant": 0.06, "noise": 0.10, "stop": 0.06}
+
+def _band_noise(rng, count, low, high, sample_rate):
+    """Шум у смузі частот (через FFT)"""
+    spectrum = np.fft.rfft(rng.standard_normal(count))
+    freqs = np.fft.rfftfreq(count, 1 / sample_rate)
+    spectrum[(freqs < low) | (freqs > high)] = 0
+    noise = np.fft.irfft(spectrum, count)
+    return noise / (np.abs(noise).max() + 1e-9)
+
+def synthesize_word(phonemes, sample_rate=16000, seed=0, f0=130.0, rate=1.0,
+                    formant_shift=1.0, snr_db=30.0, gain=1.0, pad=0.2):
+    """
+    Формантний синтез слова з фонем (синтетичний замінник записаного мовлення)
+
+    Args:
+        phonemes (str): Фонеми, напр. "джарвіс"
+        f0 (float): Основний тон (Гц)
+        rate (float): Темп (1.0 - звичайний, >1 - швидше)
+        formant_shift (float): Масштаб формант (різні "мовці")
+        snr_db (float): Відношення сигнал/шум фонового шуму
+
+    Returns:
+        np.ndarray: PCM16 семпли
+    """
+    rng = np.random.default_rng(seed)
+    harmonics_cache = {}
+    parts = []
+
+    for phoneme in phonemes:
+        if phoneme in VOWELS:
+            kind = "vowel" if VOWELS[phoneme][2] >= 0.9 else "sonorant"
+        elif phoneme in NOISES:
+            kind = "noise"
+        elif phoneme in STOPS:
+            kind = "stop"
+        else:
+            continue
+
+        duration = PHONEME_SECONDS[kind] / rate * rng.uniform(0.9, 1.1)
+        count = int(duration * sample_rate)
+        t = np.arange(count) / sample_rate
+        pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+
+        if kind in ("vowel", "sonorant"):
+            f1, f2, loudness = VOWELS[phoneme]
+            f1, f2 = f1 * formant_shift, f2 * formant_shift
+            signal = np.zeros(count)
+            for k in range(1, int(4000 / f0)):
+                frequency = k * f0
+                weight = harmonics_cache.setdefault(
+                    (phoneme, k),
+                    1 / (1 + ((frequency - f1) / 80) ** 2) + 0.6 / (1 + ((frequency - f2) / 120) ** 2)
+                )
+                signal += weight * np.sin(k * phase)
+            if phoneme == "р":
+                signal *= 0.6 + 0.4 * np.sin(2 * np.pi * 25 * t)
+            signal = loudness * signal / (np.abs(signal).max() + 1e-9)
+        elif kind == "noise":
+            low, high, loudness, voicing = NOISES[phoneme]
+            signal = loudness * _band_noise(rng, count, low * formant_shift, high * formant_shift, sample_rate)
+            if voicing:
+                signal += voicing * 0.3 * np.sin(phase)
+        else:
+            low, high = STOPS[phoneme]
+            signal = np.zeros(count)
+            burst = int(0.015 * sample_rate)
+            signal[-burst:] = 0.4 * _band_noise(rng, burst, low, high, sample_rate)
+
+        # Плавні переходи між фонемами
+        ramp = min(int(0.01 * sample_rate), count // 2)
+        if ramp:
+            envelope = np.ones(count)
+            envelope[:ramp] = np.linspace(0.3, 1, ramp)
+            envelope[-ramp:] = np.linspace(1, 0.3, ramp)
+            signal *= envelope
+        parts.append(signal)
+
+    padding = np.zeros(int(pad * sample_rate))
+    word = np.concatenate([padding, *parts, padding]) * 12000 * gain
+    noise_level = 12000 * gain * 0.5 * 10 ** (-snr_db / 20)
+    word += noise_level * rng.standard_normal(len(word))
+    return np.clip(word, -32768, 32767).astype(np.int16)
+
+def write_wav(path, samples, sample_rate=16000):
+    """Збереження PCM16 семплів у WAV"""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return Path(path)
+
+class WavAudioSource:
+    """
+    Замінник VoiceListener, що "відтворює" WAV файли замість мікрофона
+
+    Кожен виклик listen()/listen_for_activation() читає наступний WAV зі
+    сценарію в реальному часі (з коефіцієнтом realtime) і повертає його
+    транскрипт. Позначки часу зберігаються в self.events. Як потоковий
+    рушій розпізнавання, listen() віддає часткові гіпотези (по словах
+    транскрипту) в on_partial, поки "звучить" запис.
+
+    Args:
+        script (list): Список (шлях до WAV, транскрипт) або (шлях, транскрипт,
+            вид репліки); вид потрапляє в events замість виду виклику
+            (напр. активаційна фраза, сказана у вікні уточнення)
+        realtime (float): 1.0 - реальний час, 0 - миттєво
+    """
+
+    def __init__(self, script, realtime=1.0, idle_delay=0.05):
+        self.script = list(script)
+        self.realtime = realtime
+        self.idle_delay = idle_delay
+        self.events = []
+
+    @property
+    def exhausted(self):
+        return not self.script
+
+    async def _play_next(self, kind, on_partial=None):
+        if not self.script:
+            await asyncio.sleep(self.idle_delay)
+            return None
+
+        call_time = time.perf_counter()
+        wav_path, transcript, *clip_kind = self.script.pop(0)
+        with wave.open(str(wav_path), "rb") as wav:
+            frames = wav.readframes(wav.getnframes())
+            duration = wav.getnframes() / wav.getframerate()
+
+        words = transcript.split() if on_partial else []
+        if words:
+            for count in range(1, len(words) + 1):
+                await asyncio.sleep(duration * self.realtime / len(words))
+                on_partial(" ".join(words[:count]))
+        else:
+            await asyncio.sleep(duration * self.realtime)
+        self.events.append({
+            "kind": clip_kind[0] if clip_kind else kind,
+            "call_time": call_time,
+            "audio_end": time.perf_counter(),
+            "audio_bytes": len(frames),
+            "text": transcript
+        })
+        return transcript
+
+    async def listen_for_activation(self):
+        return await self._play_next("activation")
+
+    async def listen(self, timeout=None, on_partial=None):
+        return await self._play_next("command", on_partial)
+
+class NullTTSEngine:
+    """
+    Беззвучний рушій з інтерфейсом pyttsx3
+
+    Як і pyttsx3, викликає started-utterance, started-word та
+    finished-utterance, а stop() зі зворотного виклику обриває фразу.
+
+    Args:
+        seconds_per_char (float): Імітація тривалості озвучування
+    """
+
+    def __init__(self, seconds_per_char=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.properties = {"voices": [], "rate": 150, "volume": 1.0, "voice": None}
+        self.callbacks = {}
+        self.pending = []
+        self.pending_files = []
+        self.spoken = []
+        self.saved = []
+        self._stopped = False
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+
+    def _fire(self, topic, *args):
+        for callback in self.callbacks.get(topic, []):
+            callback(*args)
+
+    def say(self, text):
+        self.pending.append(text)
+
+    def save_to_file(self, text, filename):
+        self.pending_files.append((text, filename))
+
+    def stop(self):
+        self._stopped = True
+
+    def runAndWait(self):
+        self._stopped = False
+        while self.pending_files:
+            # Тиша тривалістю фрази замість синтезу
+            text, filename = self.pending_files.pop(0)
+            write_wav(filename, np.zeros(int(16000 * max(0.05, len(text) * self.seconds_per_char))))
+            self.saved.append(text)
+        while self.pending and not self._stopped:
+            text = self.pending.pop(0)
+            started = time.perf_counter()
+            self._fire("started-utterance", None)
+            location = 0
+            for word in text.split(" "):
+                self._fire("started-word", None, location, len(word))
+                if self._stopped:
+                    break
+                if self.seconds_per_char:
+                    time.sleep((len(word) + 1) * self.seconds_per_char)
+                location += len(word) + 1
+            self.spoken.append({"text": text, "start": started, "end": time.perf_counter(),
+                                "completed": not self._stopped})
+            self._fire("finished-utterance", None, not self._stopped)
+        self.pending.clear()
+
+class HashingEncoder:
+    """
+    Детермінований енкодер з інтерфейсом SentenceTransformer.encode
+
+    Слова та символьні триграми хешуються у вектор фіксованої розмірності.
+    """
+
+    def __init__(self, dimension=384):
+        self.dimension = dimension
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = text.lower().split()
+            features = words + [w[i:i + 3] for w in words for i in range(max(1, len(w) - 2))]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dimension] += 1.0 if (h >> 16) & 1 else -1.0
+        return vectors
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Наскрізний бенчмарк затримки ходу JARVIS
+
+Запускає справжній JarvisAssistant (FSM, плагіни, векторну базу) з
+детермінованими локальними стендами замість зовнішніх сервісів і вимірює:
+
+- wake_to_command - від кінця активаційної фрази до початку прослуховування команди
+- time_to_first_audio - від кінця команди до початку озвучування відповіді (головна метрика)
+- command_to_response_end - від кінця команди до завершення озвучування відповіді
+- response_end_to_listen - від кінця відповіді до прослуховування наступної
+  репліки (мертвий час між ходами)
+- turn_cycle - від кінця команди до готовності слухати наступну репліку
+
+для кількох розмірів бази знань. Результати записуються у JSON; з --check
+бенчмарк завершується з кодом 1, якщо перевищено поріг регресії відносно
+збереженого базового рівня.
+
+Використання:
+    python -m benchmarks.turn_latency --kb-sizes 0 200 2000 --turns 6
+    python -m benchmarks.turn_latency --check
+    python -m benchmarks.turn_latency --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from benchmarks.stubs import (
+    FakeOpenAIServer, FakeWeatherServer, WavAudioSource,
+    NullTTSEngine, HashingEncoder, synthesize_utterance_wav
+)
+from config import Config
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "turn_latency.json"
+
+WAKE_PHRASE = "привіт джарвіс"
+COMMANDS = [
+    "що таке векторна база знань",
+    "розкажи про python",
+    "яка погода",
+    "як зекономити час на роботі"
+]
+
+def summarize(samples):
+    """Статистика розподілу затримок (секунди)"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pct(50),
+        "p95": pct(95),
+        "max": ordered[-1],
+        "samples": samples
+    }
+
+def isolate_storage(workdir):
+    """Перенаправлення бази даних та файлів знань у тимчасову директорію"""
+    Config.MEMORY_DIR = workdir / "memory"
+    Config.KNOWLEDGE_BASE_DIR = Config.MEMORY_DIR / "knowledge_base"
+    Config.LOGS_DIR = workdir / "logs"
+    Config.DATABASE_PATH = Config.MEMORY_DIR / "memory.db"
+    Config.ensure_directories()
+
+def populate_knowledge_base(vector_kb, size):
+    """Заповнення векторної бази синтетичними документами одним пакетом"""
+    vector_kb.vector_db_path = Config.KNOWLEDGE_BASE_DIR / "vectors.index"
+    vector_kb.metadata_path = Config.KNOWLEDGE_BASE_DIR / "metadata.json"
+    if vector_kb.model is None:
+        logging.warning("Модель векторизації недоступна, використовую HashingEncoder")
+        vector_kb.model = HashingEncoder()
+    vector_kb._create_new_index()
+
+    if size:
+        topics = ["python", "векторна база", "погода", "JARVIS", "telegram", "PDF", "асистент"]
+        texts = [
+            f"Документ {i}: нотатки про {topics[i % len(topics)]}, розділ {i // len(topics)}. "
+            f"Тут описано деталі та приклади використання теми {topics[(i * 3) % len(topics)]}."
+            for i in range(size)
+        ]
+        vector_kb.add_documents(texts, [{"source": "benchmark", "chunk_id": i} for i in range(size)])
+
+def build_script(workdir, turns):
+    """Сценарій WAV реплік: активаційна фраза + команда на кожен хід"""
+    audio_dir = workdir / "audio"
+    audio_dir.mkdir(exist_ok=True)
+    wake_wav = synthesize_utterance_wav(audio_dir / "wake.wav", duration=0.8, seed=1)
+
+    script = []
+    for turn in range(turns):
+        index = turn % len(COMMANDS)
+        command_wav = audio_dir / f"command_{index}.wav"
+        if not command_wav.exists():
+            synthesize_utterance_wav(command_wav, duration=1.2 + 0.2 * index, seed=10 + index)
+        script.append((wake_wav, WAKE_PHRASE, "activation"))
+        script.append((command_wav, COMMANDS[index], "command"))
+    return script
+
+def collect_turns(source, engine):
+    """Зіставлення подій джерела аудіо та озвучених фраз у ходи"""
+    wake_to_command = []
+    time_to_first_audio = []
+    command_to_response_end = []
+    response_end_to_listen = []
+    turn_cycle = []
+    events = source.events
+
+    for i, event in enumerate(events):
+        if event["kind"] != "command":
+            continue
+        if i > 0 and events[i - 1]["kind"] == "activation":
+            wake_to_command.append(event["call_time"] - events[i - 1]["audio_end"])
+
+        next_call = events[i + 1]["call_time"] if i + 1 < len(events) else float("inf")
+        spoken = [u for u in engine.spoken if event["audio_end"] <= u["start"] < next_call]
+        if spoken:
+            time_to_first_audio.append(spoken[0]["start"] - event["audio_end"])
+            command_to_response_end.append(spoken[-1]["end"] - event["audio_end"])
+            if next_call != float("inf"):
+                response_end_to_listen.append(next_call - spoken[-1]["end"])
+                turn_cycle.append(next_call - event["audio_end"])
+
+    return {
+        "wake_to_command": wake_to_command,
+        "time_to_first_audio": time_to_first_audio,
+        "command_to_response_end": command_to_response_end,
+        "response_end_to_listen": response_end_to_listen,
+        "turn_cycle": turn_cycle
+    }
+
+def cancel_assistant_tasks():
+    """Скасування фонових задач асистента (напр. auto_deactivate) між прогонами"""
+    cancelled = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        if getattr(coro, "__qualname__", "").startswith("JarvisAssistant."):
+            task.cancel()
+            cancelled.append(task)
+    return cancelled
+
+async def run_kb_size(jarvis_module, kb_size, args, workdir):
+    """Прогін усіх ходів для одного розміру бази знань"""
+    from voice.speaker import VoiceSpeaker
+
+    populate_knowledge_base(jarvis_module.vector_kb, kb_size)
+
+    source = WavAudioSource(build_script(workdir, args.turns), realtime=args.realtime)
+    engine = NullTTSEngine(seconds_per_char=args.tts_seconds_per_char)
+    jarvis = jarvis_module.JarvisAssistant(listener=source, speaker=VoiceSpeaker(engine=engine))
+    jarvis.is_active = True
+    jarvis.state = jarvis_module.JarvisState.LISTENING
+
+    loop_task = asyncio.create_task(jarvis.main_loop())
+    deadline = time.perf_counter() + args.timeout
+    expected = args.turns
+    try:
+        while time.perf_counter() < deadline:
+            answered = collect_turns(source, engine)["time_to_first_audio"]
+            responded = jarvis.state == jarvis_module.JarvisState.LISTENING
+            if source.exhausted and len(answered) >= expected and responded:
+                break
+            await asyncio.sleep(0.05)
+        else:
+            logging.warning(f"Таймаут бенчмарку для бази розміру {kb_size}")
+    finally:
+        jarvis.is_active = False
+        loop_task.cancel()
+        await asyncio.gather(loop_task, *cancel_assistant_tasks(), return_exceptions=True)
+
+    samples = collect_turns(source, engine)
+    return {name: summarize(values) for name, values in samples.items()}
+
+async def run_benchmark(args):
+    """Запуск стендів та бенчмарку для всіх розмірів бази"""
+    workdir = Path(tempfile.mkdtemp(prefix="jarvis-bench-"))
+    isolate_storage(workdir)
+
+    openai_stub = FakeOpenAIServer(latency=args.llm_latency, token_delay=args.token_delay)
+    weather_stub = FakeWeatherServer(latency=args.weather_latency)
+    await openai_stub.start()
+    await weather_stub.start()
+
+    Config.OPENAI_API_KEY = "benchmark-key"
+    Config.OPENAI_API_BASE = f"{openai_stub.url}/v1"
+    Config.WEATHER_API_KEY = "benchmark-key"
+    Config.WEATHER_API_URL = weather_stub.weather_url
+    # Команди сценарію повторюються - вимірюємо шлях через LLM, а не кеш відповідей
+    Config.RESPONSE_CACHE_ENABLED = False
+
+    import main as jarvis_module
+    from plugins import weather
+    from plugins.gpt_integration import gpt_integration
+
+    # Модулі могли бути імпортовані раніше - оновлюємо адреси явно
+    gpt_integration.config = Config()
+    gpt_integration._setup_client()
+    weather.weather_plugin.api_key = Config.WEATHER_API_KEY
+    weather.weather_plugin.base_url = Config.WEATHER_API_URL
+
+    results = {}
+    try:
+        for kb_size in args.kb_sizes:
+            print(f"База знань: {kb_size} документів...")
+            results[f"kb_{kb_size}"] = await run_kb_size(jarvis_module, kb_size, args, workdir)
+    finally:
+        await openai_stub.stop()
+        await weather_stub.stop()
+
+    return {
+        "benchmark": "turn_latency",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "parameters": {
+            "kb_sizes": args.kb_sizes,
+            "turns": args.turns,
+            "realtime": args.realtime,
+            "llm_latency": args.llm_latency,
+            "token_delay": args.token_delay,
+            "weather_latency": args.weather_latency,
+            "tts_seconds_per_char": args.tts_seconds_per_char
+        },
+        "results": results
+    }
+
+def compare_with_baseline(report, baseline, threshold, min_delta):
+    """
+    Порівняння з базовим рівнем
+
+    Регресія - p50 або p95 більше за базовий рівень на threshold (частка)
+    і водночас більше ніж на min_delta секунд.
+    """
+    regressions = []
+    for group, metrics in baseline.get("results", {}).items():
+        current_metrics = report["results"].get(group)
+        if not current_metrics:
+            continue
+        for metric, base in metrics.items():
+            current = current_metrics.get(metric, {})
+            for stat in ("p50", "p95"):
+                if stat not in base or stat not in current:
+                    continue
+                limit = base[stat] * (1 + threshold)
+                if current[stat] > limit and current[stat] - base[stat] > min_delta:
+                    regressions.append(
+                        f"{group}.{metric}.{stat}: {current[stat]:.3f}s > {base[stat]:.3f}s (+{threshold:.0%})"
+                    )
+    return regressions
+
+def print_report(report):
+    """Короткий табличний вивід результатів"""
+    print(f"{'група':<12}{'метрика':<26}{'n':>4}{'p50, мс':>10}{'p95, мс':>10}{'max, мс':>10}")
+    for group, metrics in report["results"].items():
+        for metric, stats in metrics.items():
+            if not stats.get("count"):
+                print(f"{group:<12}{metric:<26}{0:>4}")
+                continue
+            print(
+                f"{group:<12}{metric:<26}{stats['count']:>4}"
+                f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}"
+            )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк затримки ходу JARVIS")
+    parser.add_argument("--kb-sizes", type=int, nargs="+", default=[0, 200, 2000])
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--realtime", type=float, default=1.0, help="коефіцієнт швидкості відтворення WAV")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--weather-latency", type=float, default=0.05)
+    parser.add_argument("--tts-seconds-per-char", type=float, default=0.005, help="імітація тривалості озвучування")
+    parser.add_argument("--timeout", type=float, default=120.0, help="ліміт часу на один розмір бази")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустиме відносне погіршення")
+    parser.add_argument("--min-delta", type=float, default=0.02, help="мінімальне абсолютне погіршення (с)")
+    parser.add_argument("--check", action="store_true", help="порівняти з базовим рівнем")
+    parser.add_argument("--update-baseline", action="store_true", help="зберегти результат як базовий рівень")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Налаштовуємо логування до імпорту main.py, щоб не писати в jarvis.log
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Базовий рівень оновлено: {args.baseline}")
+        return 0
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"Базовий рівень не знайдено: {args.baseline}")
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != report["parameters"]:
+            print("УВАГА: параметри бенчмарку відрізняються від базового рівня")
+        regressions = compare_with_baseline(report, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print("РЕГРЕСІЯ ЗАТРИМКИ:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("Регресій не виявлено")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
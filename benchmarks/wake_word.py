@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк локального детектора активаційного слова
+
+Прогоняє WAV фікстури через потоковий WakeWordDetector так само, як
+потік мікрофона (фрагменти по AUDIO_CHUNK_FRAMES з фоновим шумом до і
+після), і вимірює:
+
+- false_reject_rate - частка записів слова без спрацювання
+- false_accept_rate - частка записів інших слів/шумів зі спрацюванням
+- idle_cpu_percent - CPU (% одного ядра) на прослуховування фонового шуму
+- speech_cpu_percent - CPU на безперервне стороннє мовлення (перевірки DTW)
+
+Фікстури - директорія з піддиректоріями enroll/ (шаблони), positives/ та
+negatives/ (WAV, 16 кГц, моно, PCM16). Без --fixtures генерується
+детермінований синтетичний набір (формантний синтез, різні "мовці",
+темп та шум).
+
+Використання:
+    python -m benchmarks.wake_word
+    python -m benchmarks.wake_word --fixtures path/to/recordings --check
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from benchmarks.stubs import synthesize_word, write_wav
+from config import Config
+
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "wake_word.json"
+RATE = 16000
+
+NEGATIVE_WORDS = [
+    "привіт", "погода", "джерело", "марс", "вірус", "дякую", "відкрий", "старт",
+    "джаз", "чарівник", "гарвард", "варвар", "сервіс", "арфа", "парус"
+]
+
+def generate_fixtures(directory, positives, seed=0):
+    """Синтетичні фікстури: шаблони, записи слова та інших слів"""
+    rng = np.random.default_rng(seed)
+
+    def speaker():
+        return {
+            "f0": rng.uniform(90, 220),
+            "rate": rng.uniform(0.85, 1.2),
+            "formant_shift": rng.uniform(0.92, 1.08),
+            "snr_db": rng.uniform(12, 30)
+        }
+
+    for name in ("enroll", "positives", "negatives"):
+        (directory / name).mkdir(parents=True, exist_ok=True)
+
+    for i, (f0, shift) in enumerate([(120, 1.0), (180, 1.08), (150, 0.95)]):
+        write_wav(directory / "enroll" / f"jarvis_{i}.wav",
+                  synthesize_word("джарвіс", seed=100 + i, f0=f0, formant_shift=shift))
+
+    for i in range(positives):
+        write_wav(directory / "positives" / f"jarvis_{i}.wav", synthesize_word("джарвіс", seed=i, **speaker()))
+
+    for i in range(positives):
+        word = NEGATIVE_WORDS[i % len(NEGATIVE_WORDS)]
+        write_wav(directory / "negatives" / f"{word}_{i}.wav", synthesize_word(word, seed=200 + i, **speaker()))
+
+    # Неголосові звуки: сплески шуму та тони
+    for i in range(5):
+        burst = np.concatenate([
+            np.zeros(RATE // 5),
+            rng.standard_normal(RATE // 3) * rng.uniform(2000, 8000),
+            np.zeros(RATE // 5)
+        ])
+        write_wav(directory / "negatives" / f"noise_burst_{i}.wav", np.clip(burst, -32768, 32767))
+        t = np.arange(RATE // 2) / RATE
+        write_wav(directory / "negatives" / f"tone_{i}.wav", 6000 * np.sin(2 * np.pi * (300 + 200 * i) * t))
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as wav:
+        if wav.getframerate() != RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path.name}: потрібен WAV 16 кГц, моно, PCM16")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+def ambient(seconds, level, rng):
+    """Фоновий шум приміщення"""
+    return np.clip(rng.standard_normal(int(seconds * RATE)) * level, -32768, 32767).astype(np.int16)
+
+def feed(detector, samples):
+    """Потокова обробка фрагментами як з мікрофона; кількість спрацювань"""
+    chunk = Config.AUDIO_CHUNK_FRAMES
+    data = np.asarray(samples, dtype=np.int16)
+    hits = 0
+    for start in range(0, len(data), chunk):
+        if detector.process(data[start:start + chunk].tobytes()) is not None:
+            hits += 1
+    return hits
+
+def evaluate(detector, paths, rng, noise_level):
+    """Спрацювання на кожному записі (окремий потік з шумом до і після)"""
+    results = {}
+    for path in paths:
+        detector.reset()
+        detector.noise_floor = None
+        stream = np.concatenate([ambient(1.0, noise_level, rng), read_wav(path), ambient(0.5, noise_level, rng)])
+        results[path.name] = feed(detector, stream)
+    return results
+
+def measure_cpu(detector, samples):
+    """CPU (% одного ядра) на обробку аудіо відносно його тривалості"""
+    detector.reset()
+    detector.noise_floor = None
+    started = time.process_time()
+    hits = feed(detector, samples)
+    cpu = time.process_time() - started
+    return 100 * cpu / (len(samples) / RATE), hits
+
+def run_benchmark(args, fixtures):
+    from voice.wake_word import WakeWordDetector
+
+    rng = np.random.default_rng(args.seed)
+    detector = WakeWordDetector(templates_dir=fixtures / "enroll", sample_rate=RATE)
+    if not detector.enrolled:
+        raise SystemExit(f"Немає шаблонів у {fixtures / 'enroll'}")
+
+    positives = evaluate(detector, sorted((fixtures / "positives").glob("*.wav")), rng, args.noise_level)
+    negatives = evaluate(detector, sorted((fixtures / "negatives").glob("*.wav")), rng, args.noise_level)
+
+    idle_cpu, idle_hits = measure_cpu(detector, ambient(args.idle_seconds, args.noise_level, rng))
+
+    # Безперервне стороннє мовлення - найгірший випадок для CPU
+    babble = np.concatenate([read_wav(path) for path in sorted((fixtures / "negatives").glob("*.wav"))])
+    checks_before = detector.stats['dtw_checks']
+    speech_cpu, speech_hits = measure_cpu(detector, babble)
+
+    false_rejects = sorted(name for name, hits in positives.items() if hits == 0)
+    false_accepts = sorted(name for name, hits in negatives.items() if hits > 0)
+
+    return {
+        "parameters": {
+            "threshold": Config.WAKE_WORD_THRESHOLD,
+            "templates": len(detector.templates),
+            "idle_seconds": args.idle_seconds,
+            "noise_level": args.noise_level,
+            "synthetic": args.fixtures is None
+        },
+        "positives": len(positives),
+        "negatives": len(negatives),
+        "false_reject_rate": len(false_rejects) / max(1, len(positives)),
+        "false_accept_rate": len(false_accepts) / max(1, len(negatives)),
+        "false_rejects": false_rejects,
+        "false_accepts": false_accepts,
+        "idle_false_accepts": idle_hits,
+        "idle_cpu_percent": idle_cpu,
+        "speech_cpu_percent": speech_cpu,
+        "speech_false_accepts": speech_hits,
+        "speech_dtw_checks": detector.stats['dtw_checks'] - checks_before
+    }
+
+def print_report(report):
+    print(f"Шаблонів: {report['parameters']['templates']}, поріг: {report['parameters']['threshold']}")
+    print(f"Хибні відмови (FRR):     {report['false_reject_rate']:.1%} з {report['positives']}")
+    print(f"Хибні спрацювання (FAR): {report['false_accept_rate']:.1%} з {report['negatives']}")
+    print(f"Спрацювання на фоновому шумі: {report['idle_false_accepts']} за {report['parameters']['idle_seconds']} с")
+    print(f"CPU в очікуванні (шум):  {report['idle_cpu_percent']:.2f}% ядра")
+    print(f"CPU на сторонньому мовленні: {report['speech_cpu_percent']:.2f}% ядра")
+    for name in report["false_rejects"]:
+        print(f"  пропущено: {name}")
+    for name in report["false_accepts"]:
+        print(f"  хибне спрацювання: {name}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк детектора активаційного слова")
+    parser.add_argument("--fixtures", type=Path, default=None, help="директорія з enroll/, positives/, negatives/")
+    parser.add_argument("--positives", type=int, default=40, help="кількість синтетичних записів кожного класу")
+    parser.add_argument("--idle-seconds", type=float, default=60.0)
+    parser.add_argument("--noise-level", type=float, default=60.0, help="СКВ фонового шуму (PCM16)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--check", action="store_true", help="код 1 при перевищенні лімітів")
+    parser.add_argument("--max-false-reject", type=float, default=0.1)
+    parser.add_argument("--max-false-accept", type=float, default=0.05)
+    parser.add_argument("--max-idle-cpu", type=float, default=5.0)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="jarvis_wake_word_") as tmp:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = Path(tmp)
+            generate_fixtures(fixtures, args.positives, args.seed)
+        report = run_benchmark(args, fixtures)
+
+    print_report(report)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {args.output}")
+
+    if args.check:
+        failures = []
+        if report["false_reject_rate"] > args.max_false_reject:
+            failures.append(f"FRR {report['false_reject_rate']:.1%} > {args.max_false_reject:.1%}")
+        if report["false_accept_rate"] > args.max_false_accept:
+            failures.append(f"FAR {report['false_accept_rate']:.1%} > {args.max_false_accept:.1%}")
+        if report["idle_cpu_percent"] > args.max_idle_cpu:
+            failures.append(f"CPU {report['idle_cpu_percent']:.2f}% > {args.max_idle_cpu}%")
+        if failures:
+            print("ПЕРЕВИЩЕНО ЛІМІТИ: " + "; ".join(failures))
+            return 1
+        print("Ліміти дотримано")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
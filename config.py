@@ -27,10 +27,27 @@ class Config:
     VOICE_RATE = 150
     VOICE_VOLUME = 0.8
     
+    # Переривання озвучування (barge-in) і уточнюючі команди
+    TTS_BARGE_IN = True  # мовлення користувача під час відповіді перериває її
+    TTS_BARGE_IN_MIN_SPEECH = 0.3  # секунд безперервного мовлення для переривання
+    TTS_STOP_WORDS = ["стоп", "stop", "тихо", "досить", "замовкни"]
+    TTS_ECHO_MARGIN_DB = 8.0  # під час озвучування мовлення має бути гучнішим за луну динаміків
+    TTS_ECHO_WINDOW_SECONDS = 2.0  # вікно оцінки рівня луни
+    TTS_ECHO_WARMUP_SECONDS = 0.3  # початок відтворення - лише вимірювання луни
+    TTS_ECHO_TAIL_SECONDS = 0.15  # відлуння після кінця озвучування не слухається
+    FOLLOWUP_TIMEOUT = 4.0  # очікування уточнюючої команди після відповіді (без активації)
+    
+    # Кеш озвучених фраз (WAV, відтворення без синтезу)
+    TTS_CACHE_ENABLED = True
+    TTS_CACHE_DIR = MEMORY_DIR / "tts_cache"
+    TTS_CACHE_MAX_MB = 50  # динамічні фрази витісняються за LRU
+    TTS_CACHE_MIN_REPEATS = 2  # відповідь кешується після стількох повторів
+    TTS_CACHE_MAX_TEXT_CHARS = 200  # довші відповіді не кешуються
+    
     # Розпізнавання мовлення
     SPEECH_LANGUAGE = "uk-UA"
     SPEECH_TIMEOUT = 5
-    SPEECH_PHRASE_TIMEOUT = 3
+    SPEECH_PHRASE_TIMEOUT = 3  # найдовша активаційна фраза (команди - VAD_MAX_UTTERANCE_SECONDS)
     
     # Налаштування мікрофона
     MICROPHONE_INDEX = None  # None = використовувати за замовчуванням
@@ -38,10 +55,71 @@ class Config:
     MICROPHONE_DYNAMIC_THRESHOLD = True
     MICROPHONE_PAUSE_THRESHOLD = 0.8
     
+    # Потік аудіо (мікрофон відкривається один раз, кільцевий буфер)
+    AUDIO_SAMPLE_RATE = 16000
+    AUDIO_CHUNK_FRAMES = 1024
+    AUDIO_BUFFER_SECONDS = 30
+    AUDIO_PREROLL_SECONDS = 0.3  # аудіо до початку прослуховування команди
+    AUDIO_READ_TIMEOUT = 2.0  # очікування даних від потоку захоплення
+    
+    # Профілі калібрування мікрофона (рівень і спектр шуму пристрою, уточнюються у фоні)
+    CALIBRATION_PROFILES_FILE = MEMORY_DIR / "calibration_profiles.json"
+    CALIBRATION_INITIAL_SECONDS = 2.0  # перше вікно, якщо профілю пристрою немає
+    CALIBRATION_REFRESH_SECONDS = 5.0  # вікно фонового уточнення
+    CALIBRATION_MIN_FRAMES = 20
+    CALIBRATION_BANDS = 16
+    CALIBRATION_QUIET_MARGIN_DB = 6.0  # кадри без мовлення: до 10-го перцентиля енергії + запас
+    CALIBRATION_SMOOTHING = 0.2  # вага нового вікна при уточненні
+    CALIBRATION_DRIFT_DB = 6.0  # відхилення рівня або спектра, що вважається дрейфом
+    CALIBRATION_DRIFT_WINDOWS = 3  # вікон дрейфу поспіль для перекалібрування
+    CALIBRATION_SAVE_INTERVAL = 60.0
+    CALIBRATION_ENERGY_RATIO = 1.5  # поріг енергії sr.Recognizer відносно RMS шуму
+    
+    # Виявлення мовлення і кінця фрази (VAD): auto (webrtcvad, якщо встановлено), webrtc або energy
+    VAD_BACKEND = "auto"
+    VAD_AGGRESSIVENESS = 2  # WebRTC: 0 - м'який, 3 - найсуворіший
+    VAD_FRAME_MS = 30
+    VAD_ENERGY_THRESHOLD_DB = 9.0  # енергетичний VAD: перевищення рівня шуму для початку мовлення
+    VAD_ENERGY_HOLD_DB = 4.0  # ... для продовження мовлення (гістерезис)
+    VAD_MIN_ENERGY_DB = 30.0  # тихіші кадри ніколи не вважаються мовленням
+    VAD_START_FRAMES = 4  # кадрів мовлення для початку фрази
+    VAD_PADDING_SECONDS = 0.2  # аудіо до початку і після кінця мовлення у фразі
+    VAD_MIN_TRAILING_SILENCE = 0.4  # тиша для завершення короткої команди
+    VAD_MAX_TRAILING_SILENCE = 0.55  # тиша для завершення довгої фрази
+    VAD_ADAPT_SECONDS = 1.5  # тривалість мовлення, за якої поріг тиші досягає максимуму
+    VAD_PAUSE_MARGIN = 1.3  # поріг тиші не менший за найдовшу паузу у фразі з цим запасом
+    VAD_MAX_UTTERANCE_SECONDS = 15.0
+    
+    # Локальне виявлення активаційного слова (шаблони: python -m voice.wake_word)
+    WAKE_WORD_ENABLED = True
+    WAKE_WORD = "джарвіс"
+    WAKE_WORD_TEMPLATES_DIR = MEMORY_DIR / "wake_word"
+    WAKE_WORD_ENROLL_SAMPLES = 3
+    WAKE_WORD_THRESHOLD = 2.4  # відстань DTW (CMVN MFCC), менше - суворіше
+    WAKE_WORD_MIN_SNR_DB = 10.0  # тихіші вікна не перевіряються
+    WAKE_WORD_CHECK_INTERVAL = 0.05  # секунди між перевірками вікна
+    WAKE_WORD_REFRACTORY = 1.0  # секунди без повторних спрацювань
+    WAKE_WORD_VERIFY = True  # підтвердження хмарним розпізнаванням після спрацювання
+    WAKE_WORD_VERIFY_SECONDS = 2.0  # аудіо до спрацювання для підтвердження
+    
+    # Розпізнавання мовлення: google (хмара), vosk (локально, потоково) або auto
+    ASR_BACKEND = os.getenv("JARVIS_ASR_BACKEND", "auto")
+    VOSK_MODEL_PATHS = {
+        "uk-UA": BASE_DIR / "models" / "vosk-model-small-uk-v3-small",
+        "en-US": BASE_DIR / "models" / "vosk-model-small-en-us-0.15"
+    }
+    ASR_PREFETCH_MIN_WORDS = 2  # слів у частковій гіпотезі для попереднього пошуку контексту
+    ASR_LANGUAGES = [SPEECH_LANGUAGE, "en-US"]  # розпізнаються паралельно, за пріоритетом
+    ASR_LANGUAGE_ACCEPT_CONFIDENCE = 0.8  # результат приймається, не чекаючи інших мов
+    
     # API ключі
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
     
+    # Адреси API (можна перевизначити для локальних стендів)
+    OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://api.openweathermap.org/data/2.5/weather")
+    
     # Налаштування погоди
     DEFAULT_CITY = "Київ"
     WEATHER_UNITS = "metric"
@@ -83,6 +161,63 @@ class Config:
     GPT_MODEL = "gpt-3.5-turbo"
     MAX_TOKENS = 1000
 
+    # HTTP клієнт LLM (пул з'єднань та таймаути, секунди)
+    LLM_REQUEST_TIMEOUT = 30
+    LLM_CONNECT_TIMEOUT = 5
+    LLM_MAX_CONNECTIONS = 10
+    LLM_KEEPALIVE_EXPIRY = 60
+
+    # Політика надійності LLM (rate limit, повтори, circuit breaker, хеджування)
+    LLM_RATE_LIMIT_RPS = 3.0
+    LLM_RATE_LIMIT_BURST = 5
+    LLM_MAX_RETRIES = 2
+    LLM_RETRY_BASE_DELAY = 0.5  # секунди, подвоюється з кожною спробою
+    LLM_RETRY_MAX_DELAY = 8.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+    LLM_CIRCUIT_RESET_TIMEOUT = 30.0
+    LLM_HEDGE_ENABLED = False  # дублюючий запит, якщо перший довший за p95
+    LLM_HEDGE_MIN_SAMPLES = 20
+    LLM_HEDGE_MIN_DELAY = 0.5
+    LLM_LATENCY_WINDOW = 100
+    LLM_FALLBACK_CONTEXT_TOKENS = 120  # фрагмент бази знань у відповіді без GPT
+
+    # Провайдери LLM: auto (маршрутизація), openai або local
+    LLM_BACKEND = os.getenv("JARVIS_LLM_BACKEND", "auto")
+    LLM_BATCH_CONCURRENCY = 4
+    LLM_LONG_FORM_KEYWORDS = [
+        "детально", "докладно", "поясни", "напиши", "порівняй", "проаналізуй",
+        "склади", "план", "explain", "write", "compare"
+    ]
+
+    # Локальна модель (llama.cpp, квантована GGUF)
+    LOCAL_LLM_MODEL_PATH = Path(os.getenv(
+        "JARVIS_LOCAL_MODEL", str(BASE_DIR / "models" / "qwen2.5-1.5b-instruct-q4_k_m.gguf")
+    ))
+    LOCAL_LLM_CONTEXT = 2048
+    LOCAL_LLM_THREADS = None  # None = усі ядра
+    LOCAL_LLM_MAX_TOKENS = 256
+    LOCAL_LLM_INTENTS = ["general"]  # типи запитів, які може обслуговувати локальна модель
+    LOCAL_LLM_MAX_QUESTION_TOKENS = 40
+
+    # Аналіз PDF (map-reduce по всіх частинах документа)
+    PDF_ANALYSIS_CHUNK_TOKENS = 1500
+    PDF_ANALYSIS_CONCURRENCY = 4  # одночасних запитів до LLM
+    PDF_ANALYSIS_REDUCE_FANOUT = 6  # аналізів частин на одне зведення
+    PDF_ANALYSIS_MAP_MAX_TOKENS = 500
+    PDF_ANALYSIS_REDUCE_MAX_TOKENS = 1000
+    PDF_ANALYSIS_MAX_ITEMS = 15  # елементів у кожному списку підсумку
+    PDF_ANALYSIS_CHECKPOINT_DIR = MEMORY_DIR / "pdf_checkpoints"
+
+    # Читання тексту PDF пулом процесів (діапазони сторінок паралельно)
+    PDF_EXTRACT_WORKERS = None  # None - за кількістю ядер
+    PDF_EXTRACT_PAGES_PER_SHARD = 25
+    PDF_EXTRACT_PARALLEL_MIN_PAGES = 50  # коротші документи - в одному процесі
+
+    # Конвеєр наповнення бази знань (витягування -> частини -> ембединги -> індекс, аналіз паралельно)
+    INGEST_QUEUE_SIZE = 32  # елементів між етапами (зворотний тиск)
+    INGEST_EMBED_BATCH = 32  # частин на одну векторизацію
+    INGEST_INDEX_COMMIT = 256  # векторів на один запис індексу на диск
+
     # Персоналізація
     USER_NAME = "Олександре"
     ASSISTANT_PERSONALITY = "helpful_professional"
@@ -96,12 +231,62 @@ class Config:
     VECTOR_DB_ENABLED = True
     VECTOR_SEARCH_TOP_K = 5
     VECTOR_CONTEXT_MAX_LENGTH = 1000
+    INGEST_MANIFEST_FILE = KNOWLEDGE_BASE_DIR / "ingest_manifest.json"  # що вже додано (інкрементальне оновлення)
+    KB_CHUNK_TOKENS = 128  # частина документа (вікно моделі ембедингів - ~128 токенів)
+    KB_CHUNK_OVERLAP_TOKENS = 16  # спільні речення сусідніх частин абзацу
+
+    # Спостереження за папкою бази знань (PDF додаються автоматично, коли асистент вільний)
+    KB_WATCH_ENABLED = True
+    KB_WATCH_DEBOUNCE_SECONDS = 2.0   # файл не змінювався стільки - запис завершено
+    KB_WATCH_POLL_SECONDS = 2.0       # перегляд папки без inotify
+    KB_WATCH_QUEUE_SIZE = 50
+    KB_WATCH_IDLE_CHECK_SECONDS = 1.0
+
+    # Збирання контексту для GPT (бюджети в токенах)
+    CONTEXT_TOKEN_BUDGETS = {"gpt-3.5-turbo": 1200, "gpt-4": 2500, "gpt-4o": 2500, "default": 800}
+    CONTEXT_CANDIDATES = 8  # скільки фрагментів брати з векторного пошуку
+    CONTEXT_MIN_SCORE = 0.2  # мінімальна косинусна подібність фрагмента
+    CONTEXT_MMR_LAMBDA = 0.5  # 1.0 - лише релевантність, 0.0 - лише різноманітність
+    CONTEXT_MIN_CHUNK_TOKENS = 50  # менші залишки бюджету не заповнюються
+    CONTEXT_MIN_OVERLAP_WORDS = 5
+    CONTEXT_MAX_OVERLAP_WORDS = 200
+
+    # Розмовна пам'ять (останні репліки дослівно + підсумок старіших)
+    CONVERSATION_ENABLED = True
+    CONVERSATION_KEEP_TURNS = 4
+    CONVERSATION_TOKEN_BUDGET = 600  # підсумок + репліки в промпті
+    CONVERSATION_SUMMARY_TOKENS = 200
+    CONVERSATION_IDLE_TIMEOUT = 600  # секунди; після паузи в промпт іде лише підсумок
+
+    # Семантичний кеш відповідей GPT
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_TTL = 3600  # секунди
+    RESPONSE_CACHE_INTENT_TTL = {"general": 3600, "knowledge": 600}
+    RESPONSE_CACHE_MAX_ENTRIES = 500
+    RESPONSE_CACHE_STALE_MAX_ENTRIES = 200  # прострочені відповіді для fallback
+    RESPONSE_CACHE_SIMILARITY = 0.92  # косинусна подібність питань
+    RESPONSE_CACHE_DISABLED_INTENTS = ["weather", "search", "screen"]
+    RESPONSE_CACHE_TIME_SENSITIVE = [
+        "сьогодні", "зараз", "завтра", "вчора", "новини", "курс", "погода",
+        "котра година", "який час", "яке число", "today", "now", "tomorrow",
+        "yesterday", "news", "latest"
+    ]
 
     # Telegram бот
     TELEGRAM_BOT_ENABLED = True
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
     TELEGRAM_AUTHORIZED_USERS = os.getenv("TELEGRAM_AUTHORIZED_USERS", "").split(",")
 
+    # Пули потоків підсистем (utils/executors.py)
+    EXECUTOR_WORKERS = {
+        "audio": 3,   # прослуховування, активація і очікування переривання одночасно
+        "llm": 1,     # локальна модель не потокобезпечна
+        "cpu": max(2, min(8, os.cpu_count() or 2)),
+        "db": 1       # записи в SQLite і векторну базу - по черзі
+    }
+    EXECUTOR_QUEUE_WARNING = 8       # завдань у черзі - пул насичений
+    EXECUTOR_WARNING_INTERVAL = 30   # секунд між попередженнями одного пулу
+
     # Статистика та логування
     DETAILED_LOGGING = True
     STATISTICS_ENABLED = True
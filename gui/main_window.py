@@ -21,6 +21,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 from memory.learner import JarvisLearner
 from memory.vector_knowledge import vector_kb
+from plugins.kb_watcher import kb_watcher
 
 class JarvisGUI:
     def __init__(self):
@@ -28,6 +29,7 @@ class JarvisGUI:
         self.learner = JarvisLearner()
         self.jarvis_instance = None
         self.message_queue = queue.Queue()
+        self.streaming_response = False
         
         # Створення головного вікна
         self.root = tk.Tk()
@@ -41,6 +43,10 @@ class JarvisGUI:
         # Створення інтерфейсу
         self.create_widgets()
         
+        # PDF з папки бази знань додаються у фоні
+        if self.config.KB_WATCH_ENABLED:
+            kb_watcher.start()
+        
         # Запуск обробки повідомлень
         self.process_messages()
         
@@ -324,7 +330,8 @@ class JarvisGUI:
             ("Успішних команд:", "successful_commands"),
             ("Помилок:", "failed_commands"),
             ("Кастомних команд:", "custom_commands"),
-            ("Документів у базі:", "knowledge_documents")
+            ("Документів у базі:", "knowledge_documents"),
+            ("Черга бази знань:", "kb_queue")
         ]
         
         for i, (label_text, key) in enumerate(stats_items):
@@ -500,6 +507,21 @@ class JarvisGUI:
         elif sender == "error":
             self.chat_display.insert(tk.END, f"[{timestamp}] ❌ Помилка: ", "error")
             self.chat_display.insert(tk.END, f"{message}\n\n")
+        elif sender == "jarvis_stream":
+            # Потокова відповідь: речення дописуються до поточного повідомлення
+            if not self.streaming_response:
+                self.streaming_response = True
+                self.chat_display.insert(tk.END, f"[{timestamp}] 🤖 JARVIS: ", "jarvis")
+                self.chat_display.insert(tk.END, message)
+            else:
+                self.chat_display.insert(tk.END, f" {message}")
+        elif sender == "jarvis_stream_end":
+            if self.streaming_response:
+                self.streaming_response = False
+                self.chat_display.insert(tk.END, "\n\n")
+            else:
+                self.chat_display.insert(tk.END, f"[{timestamp}] 🤖 JARVIS: ", "jarvis")
+                self.chat_display.insert(tk.END, f"{message}\n\n")
         
         self.chat_display.configure(state='disabled')
         self.chat_display.see(tk.END)
@@ -535,9 +557,13 @@ class JarvisGUI:
     def process_jarvis_command(self, message):
         """Обробка команди через JARVIS"""
         try:
-            # Тут буде виклик JARVIS
-            response = f"Обробляю команду: {message}"
-            self.message_queue.put(("jarvis", response))
+            async def on_sentence(sentence):
+                self.message_queue.put(("jarvis_stream", sentence))
+            
+            response = asyncio.run(
+                self.jarvis_instance.execute_command(message, on_sentence=on_sentence, session_id="gui")
+            )
+            self.message_queue.put(("jarvis_stream_end", response))
         except Exception as e:
             self.message_queue.put(("error", str(e)))
     
@@ -606,8 +632,22 @@ class JarvisGUI:
     def process_pdf(self, file_path):
         """Обробка PDF файлу"""
         try:
-            # Тут буде обробка PDF через learner
-            self.message_queue.put(("system", f"PDF {Path(file_path).name} успішно оброблений"))
+            from plugins.pdf_processor import process_pdf
+            
+            def on_progress(stage, done, total):
+                # Не частіше ніж кожні 10% частин документа
+                step = max(1, total // 10)
+                if stage == "map" and done and (done == total or done % step == 0):
+                    self.message_queue.put(("system", f"Аналіз PDF: {done}/{total} частин"))
+                elif stage == "reduce" and done == 0:
+                    self.message_queue.put(("system", f"Зведення аналізу: {total} груп"))
+            
+            result = asyncio.run(process_pdf(file_path, progress=on_progress))
+            if not result.get("success"):
+                self.message_queue.put(("error", f"Помилка обробки PDF: {result.get('error')}"))
+                return
+            
+            self.message_queue.put(("system", f"PDF {Path(file_path).name} успішно оброблений. {result['summary']}"))
         except Exception as e:
             self.message_queue.put(("error", f"Помилка обробки PDF: {str(e)}"))
     
@@ -709,6 +749,7 @@ class JarvisGUI:
             self.stats_labels['total_interactions'].configure(text=str(stats.get('total_interactions', 0)))
             self.stats_labels['custom_commands'].configure(text=str(stats.get('custom_commands', 0)))
             self.stats_labels['knowledge_documents'].configure(text=str(vector_stats.get('total_documents', 0)))
+            self.stats_labels['kb_queue'].configure(text=kb_watcher.status_text())
             
         except Exception as e:
             print(f"Помилка оновлення статистики: {e}")
@@ -11,6 +11,7 @@ import asyncio
 import threading
 import time
 import logging
+import re
 import sys
 import os
 from enum import Enum
@@ -19,10 +20,18 @@ from pathlib import Path
 # Імпорти модулів JARVIS
 from voice.listener import VoiceListener
 from voice.speaker import VoiceSpeaker
+from voice.tts_worker import PRIORITY_LOW, PRIORITY_URGENT
+from voice.sentence_segmenter import SentenceSegmenter
 from memory.learner import JarvisLearner
 from memory.vector_knowledge import vector_kb
+from memory.response_cache import response_cache
+from memory.conversation import conversation_manager
+from utils.single_flight import single_flight
+from utils.executors import executors
 from plugins import weather, open_apps, search_web, shutdown, visual_assistant
-from plugins.gpt_integration import gpt_integration, ask_gpt
+from plugins.gpt_integration import gpt_integration, ask_gpt, ask_gpt_stream
+from plugins.kb_watcher import kb_watcher
+from plugins.llm_policy import llm_transport, DegradedResponse
 from config import Config
 
 # Налаштування логування
@@ -51,14 +60,21 @@ class SecurityLevel(Enum):
     DANGEROUS = "dangerous"
 
 class JarvisAssistant:
-    def __init__(self, gui_mode=False):
+    # Фіксовані фрази (кешуються у WAV і відтворюються без синтезу)
+    STARTUP_GREETING = "Вітаю, Олександре! JARVIS версії 2.0 готовий до роботи!"
+    CONFIRMATION_PROMPT = "Це небезпечна команда. Скажіть 'підтверджую' для виконання або 'скасувати' для відміни."
+    STANDBY_NOTICE = "Переходжу в режим очікування."
+    FAREWELL = "До побачення, Олександре! JARVIS завершує роботу."
+    
+    def __init__(self, gui_mode=False, listener=None, speaker=None):
         self.config = Config()
         self.gui_mode = gui_mode
         
-        # Ініціалізація компонентів
-        self.listener = VoiceListener()
-        self.speaker = VoiceSpeaker()
+        # Ініціалізація компонентів (можна передати власні, напр. для бенчмарків)
+        self.listener = listener or VoiceListener()
+        self.speaker = speaker or VoiceSpeaker()
         self.learner = JarvisLearner()
+        conversation_manager.learner = self.learner
         
         # Стан системи
         self.state = JarvisState.INACTIVE
@@ -68,13 +84,21 @@ class JarvisAssistant:
         self.start_time = time.time()
         self.current_command = ""
         self.current_response = ""
+        self.speech_stream = None
+        self._prefetch = None  # (нормалізований текст гіпотези, future контексту)
+        self._prefetch_pending = None
+        self._barged_in = False  # попередню відповідь перервав користувач
+        self._follow_up = False  # наступна команда - уточнення без активації
         
         # Статистика
         self.stats = {
             'total_interactions': 0,
             'successful_commands': 0,
             'failed_commands': 0,
-            'learning_sessions': 0
+            'learning_sessions': 0,
+            'prefetch_started': 0,
+            'prefetch_hits': 0,
+            'barge_ins': 0
         }
         
         # Плагіни
@@ -100,6 +124,14 @@ class JarvisAssistant:
             ]
         }
         
+        # Команди, що обробляються без GPT (див. _dispatch_command)
+        self.direct_command_keywords = [
+            'напиши на екрані', 'говори голосом', 'стоп', 'вихід', 'завершити', 'stop', 'exit',
+            'відкрий', 'запусти', 'закрий', 'погода', 'пошукай', 'знайди', 'вимкни',
+            'перезавантаж', 'що на екрані', 'що бачиш', 'включи музику', 'аналізуй код',
+            'навчися', "запам'ятай", 'онови себе'
+        ]
+        
         logging.info("JARVIS Assistant ініціалізовано")
     
     async def initialize(self):
@@ -117,6 +149,13 @@ class JarvisAssistant:
             vector_stats = vector_kb.get_statistics()
             print(f"Векторна база: {vector_stats['total_documents']} документів")
             
+            # PDF з папки бази знань додаються у фоні, коли асистент вільний
+            if self.config.KB_WATCH_ENABLED:
+                kb_watcher.start(is_idle=self.is_idle)
+            
+            # Прогрів LLM (з'єднання з API, завантаження локальної моделі) у фоні
+            self._warmup_task = asyncio.create_task(gpt_integration.warmup())
+            
             # Запуск Telegram бота
             if api_status['telegram']:
                 await self._start_telegram_bot()
@@ -124,6 +163,11 @@ class JarvisAssistant:
             # Калібрування голосу
             if not self.gui_mode:
                 print("Калібрування мікрофона...")
+                # Фіксовані фрази рендеряться у фоні потоком озвучування
+                self.speaker.prerender([
+                    self.STARTUP_GREETING, self.CONFIRMATION_PROMPT, self.STANDBY_NOTICE, self.FAREWELL,
+                    *self.config.GREETING_RESPONSES
+                ])
             
             print("Ініціалізація завершена")
             return True
@@ -166,7 +210,7 @@ class JarvisAssistant:
         self.state = JarvisState.LISTENING
         
         if not self.gui_mode:
-            await self.speaker.speak("Вітаю, Олександре! JARVIS версії 2.0 готовий до роботи!")
+            await self.speaker.speak(self.STARTUP_GREETING)
         
         print("Очікую активаційну фразу 'Привіт, Джарвіс'...")
         
@@ -206,8 +250,29 @@ class JarvisAssistant:
             if text and self.is_activation_phrase(text):
                 await self.activate()
         else:
-            # Активний режим - прослуховування команд
-            text = await self.listener.listen()
+            # Активний режим - прослуховування команд; часткові гіпотези
+            # запускають пошук контексту ще до кінця фрази
+            self._prefetch = None
+            self._prefetch_pending = None
+            follow_up, self._follow_up = self._follow_up, False
+            text = await self.listener.listen(
+                timeout=self.config.FOLLOWUP_TIMEOUT if follow_up else None,
+                on_partial=self.prefetch_command
+            )
+            barged_in, self._barged_in = self._barged_in, False
+            if text and barged_in and self.is_stop_phrase(text):
+                # "Стоп" після переривання лише зупиняє мовлення, а не завершує роботу
+                self.is_listening = False
+                return
+            if follow_up and not text:
+                # Уточнення не надійшло - очікування наступної активації
+                self.is_listening = False
+                if not self.gui_mode:
+                    print("Очікую наступну активацію...")
+                return
+            if follow_up and self._normalize_command(text) in self.config.ACTIVATION_PHRASES:
+                await self.activate()
+                return
             if text:
                 self.current_command = text
                 self.state = JarvisState.PROCESSING
@@ -224,12 +289,18 @@ class JarvisAssistant:
                     self.state = JarvisState.RESPONDING
                     return
             
-            # Логування команди
-            self.learner.log_interaction(self.current_command, "command")
+            # Логування команди (запис у пулі БД, не затримує обробку)
+            executors.submit("db", self.learner.log_interaction, self.current_command, "command")
             self.stats['total_interactions'] += 1
             
+            # Потокове озвучування: перші речення звучать, поки GPT генерує решту
+            on_sentence = None
+            if not (self.show_on_screen or self.gui_mode):
+                self.speech_stream = self.speaker.start_stream()
+                on_sentence = self.speech_stream.feed
+            
             # Обробка команди
-            self.current_response = await self.execute_command(self.current_command)
+            self.current_response = await self.execute_command(self.current_command, on_sentence=on_sentence)
             
             if self.current_response:
                 self.stats['successful_commands'] += 1
@@ -241,39 +312,91 @@ class JarvisAssistant:
             
         except Exception as e:
             logging.error(f"Помилка обробки команди: {e}")
-            self.current_response = f"Помилка обробки: {str(e)}"
+            self.current_response = DegradedResponse(f"Помилка обробки: {str(e)}")
             self.stats['failed_commands'] += 1
             self.state = JarvisState.RESPONDING
     
     async def _handle_responding_state(self):
         """Обробка стану відповіді"""
         try:
-            # Логування відповіді
-            self.learner.log_interaction(self.current_response, "response")
-            
-            # Додавання до векторної бази
-            vector_kb.add_interaction(self.current_command, self.current_response)
+            # Логування відповіді і додавання до векторної бази - у фоні,
+            # у пулі БД (відповіді без GPT не індексуються)
+            executors.submit("db", self.learner.log_interaction, self.current_response, "response")
+            if not isinstance(self.current_response, DegradedResponse):
+                executors.submit("db", vector_kb.add_interaction, self.current_command, self.current_response)
             
             # Відповідь користувачу
+            speech_stream, self.speech_stream = self.speech_stream, None
             if self.show_on_screen or self.gui_mode:
+                if speech_stream:
+                    await speech_stream.finish()
                 print(f"JARVIS: {self.current_response}")
             else:
-                await self.speaker.speak(self.current_response)
+                await self.speak_with_barge_in(self._respond(speech_stream))
             
-            # Повернення до прослуховування
+            # Повернення до прослуховування без паузи: уточнююча команда
+            # слухається одразу (з моменту, коли користувач перебив, або з
+            # кінця відповіді), а без неї - очікування активації
             self.state = JarvisState.LISTENING
-            
-            # Автоматичне відключення після команди
+            if self._barged_in:
+                self.is_listening = True
             if self.is_listening:
-                await asyncio.sleep(2)
-                self.is_listening = False
-                if not self.gui_mode:
-                    print("Очікую наступну активацію...")
+                self._follow_up = True
             
         except Exception as e:
             logging.error(f"Помилка відповіді: {e}")
             self.state = JarvisState.ERROR
     
+    async def _respond(self, speech_stream):
+        """Озвучування відповіді (потокової або повної)"""
+        if speech_stream:
+            await speech_stream.finish()
+        if not (speech_stream and speech_stream.has_output):
+            await self.speaker.speak(self.current_response)
+    
+    async def speak_with_barge_in(self, speaking):
+        """
+        Озвучування з перериванням: якщо користувач заговорив, мовлення
+        зупиняється, а черга фраз відкидається
+        
+        Returns:
+            bool: True, якщо відповідь перервано
+        """
+        self._barged_in = False
+        wait_for_speech = getattr(self.listener, "wait_for_speech", None)
+        arm_follow_up = getattr(self.listener, "arm_follow_up", None)
+        if not (self.config.TTS_BARGE_IN and wait_for_speech):
+            await speaking
+            if arm_follow_up:
+                arm_follow_up()
+            return False
+        
+        # Мікрофон і VAD активні під час озвучування; луна динаміків відсіюється
+        stop = threading.Event()
+        speaking = asyncio.ensure_future(speaking)
+        monitor = asyncio.ensure_future(wait_for_speech(stop, lambda: self.speaker.is_speaking))
+        heard = False
+        try:
+            done, _ = await asyncio.wait({speaking, monitor}, return_when=asyncio.FIRST_COMPLETED)
+            heard = monitor in done and monitor.result()
+            if heard and self.speaker.interrupt():
+                self._barged_in = True
+                self.stats['barge_ins'] += 1
+                logging.info("Користувач перебив відповідь")
+            await speaking
+        finally:
+            stop.set()
+            await asyncio.gather(monitor, return_exceptions=True)
+        
+        # Без переривання наступна команда слухається з кінця відповіді
+        if not heard and arm_follow_up:
+            arm_follow_up()
+        return self._barged_in
+    
+    def is_stop_phrase(self, text):
+        """Фраза, що лише зупиняє мовлення (Config.TTS_STOP_WORDS)"""
+        return self._normalize_command(text) in self.config.TTS_STOP_WORDS
+    
     async def _handle_learning_state(self):
         """Обробка стану навчання"""
         try:
@@ -307,7 +430,7 @@ class JarvisAssistant:
         if self.gui_mode:
             return False
         
-        await self.speaker.speak("Це небезпечна команда. Скажіть 'підтверджую' для виконання або 'скасувати' для відміни.")
+        await self.speaker.speak(self.CONFIRMATION_PROMPT, priority=PRIORITY_URGENT)
         
         confirmation = await self.listener.listen(timeout=10)
         if confirmation:
@@ -315,6 +438,76 @@ class JarvisAssistant:
         
         return False
     
+    def classify_intent(self, text):
+        """
+        Попередній намір команди
+        
+        Returns:
+            str: command (обробляється без GPT), knowledge або general
+        """
+        text_lower = text.lower()
+        if any(keyword in text_lower for keyword in self.direct_command_keywords):
+            return "command"
+        if "що ти знаєш про" in text_lower or "розкажи про" in text_lower:
+            return "knowledge"
+        return "general"
+    
+    @staticmethod
+    def _normalize_command(text):
+        """Текст для порівняння гіпотез (регістр, пунктуація, пробіли)"""
+        return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+    
+    def prefetch_command(self, partial):
+        """
+        Обробка часткової гіпотези розпізнавання
+        
+        Поки користувач договорює фразу, визначається намір і для запитів до
+        GPT у фоні шукається контекст у базі знань. Якщо фінальний текст
+        збігся з останньою гіпотезою, обробник бере готовий контекст.
+        """
+        text = self._normalize_command(partial)
+        if text in self.config.TTS_STOP_WORDS and self.speaker.is_speaking:
+            self.speaker.interrupt()
+            return
+        if len(text.split()) < self.config.ASR_PREFETCH_MIN_WORDS:
+            return
+        if self.classify_intent(text) == "command":
+            return
+        
+        # Один пошук за раз: новіша гіпотеза чекає завершення попереднього
+        if self._prefetch and not self._prefetch[1].done():
+            if text != self._prefetch[0]:
+                self._prefetch_pending = text
+            return
+        if self._prefetch and self._prefetch[0] == text:
+            return
+        
+        self._prefetch_pending = None
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executors.get("cpu"), vector_kb.find_relevant_context, text)
+        future.add_done_callback(self._prefetch_next)
+        self._prefetch = (text, future)
+        self.stats['prefetch_started'] += 1
+    
+    def _prefetch_next(self, future):
+        """Запуск пошуку для гіпотези, що надійшла під час попереднього"""
+        if self._prefetch and self._prefetch[1] is future and self._prefetch_pending:
+            self.prefetch_command(self._prefetch_pending)
+    
+    async def find_context(self, text):
+        """Контекст з бази знань (готовий, якщо його знайдено за частковою гіпотезою)"""
+        prefetch = self._prefetch
+        if prefetch and prefetch[0] == self._normalize_command(text):
+            self._prefetch = None
+            try:
+                context = await prefetch[1]
+                self.stats['prefetch_hits'] += 1
+                return context
+            except Exception as e:
+                logging.error(f"Помилка попереднього пошуку контексту: {e}")
+        
+        return await executors.run("cpu", vector_kb.find_relevant_context, text)
+    
     def is_activation_phrase(self, text):
         """Перевірка активаційної фрази"""
         text_lower = text.lower()
@@ -338,10 +531,31 @@ class JarvisAssistant:
         if self.is_listening:
             self.is_listening = False
             if not self.gui_mode:
-                await self.speaker.speak("Переходжу в режим очікування.")
+                await self.speaker.speak(self.STANDBY_NOTICE, priority=PRIORITY_LOW)
     
-    async def execute_command(self, text):
-        """Виконання команди з розширеною логікою"""
+    async def execute_command(self, text, on_sentence=None, session_id="voice"):
+        """
+        Виконання команди з розширеною логікою
+        
+        Args:
+            text (str): Текст команди
+            on_sentence: Async-функція, що отримує речення відповіді GPT
+                по мірі генерації (голос, GUI, Telegram)
+            session_id (str): Сесія розмовної пам'яті (voice, gui, telegram:<id>)
+            
+        Returns:
+            str: Повна відповідь
+        """
+        session = conversation_manager.get(session_id)
+        response = await self._dispatch_command(text, on_sentence, session)
+        
+        if response and not isinstance(response, DegradedResponse):
+            await session.add_turn(text, response)
+        
+        return response
+    
+    async def _dispatch_command(self, text, on_sentence, session):
+        """Вибір обробника команди"""
         text_lower = text.lower()
         
         # Команди керування режимами
@@ -359,7 +573,7 @@ class JarvisAssistant:
             return "Завершую роботу. До побачення!"
         
         # Перевірка кастомних команд
-        custom_response = self.learner.get_custom_command(text)
+        custom_response = await executors.run("db", self.learner.get_custom_command, text)
         if custom_response:
             return custom_response
         
@@ -402,10 +616,10 @@ class JarvisAssistant:
         
         # Команди роботи з знаннями
         if "що ти знаєш про" in text_lower or "розкажи про" in text_lower:
-            return await self.handle_knowledge_query(text)
+            return await self.handle_knowledge_query(text, on_sentence, session)
         
         # Загальні запитання через GPT
-        return await self.handle_general_question(text)
+        return await self.handle_general_question(text, on_sentence, session)
     
     async def handle_learning_command(self, text):
         """Обробка команд навчання"""
@@ -419,9 +633,9 @@ class JarvisAssistant:
             new_command = await self.listener.listen(timeout=10)
             
             if new_command:
-                success = self.learner.learn_custom_command(new_command)
+                success = await executors.run("db", self.learner.learn_custom_command, new_command)
                 if success:
-                    vector_kb.add_document(new_command, {"type": "custom_command"})
+                    await executors.run("db", vector_kb.add_document, new_command, {"type": "custom_command"})
                     return "Команду вивчено та додано до бази знань!"
                 else:
                     return "Не вдалося вивчити команду."
@@ -441,7 +655,7 @@ class JarvisAssistant:
         
         try:
             # Оновлення бази знань
-            if self.learner.update_knowledge_base():
+            if await executors.run("db", self.learner.update_knowledge_base):
                 updates.append("база знань")
         except Exception as e:
             logging.error(f"Помилка оновлення знань: {e}")
@@ -451,39 +665,71 @@ class JarvisAssistant:
         else:
             return "Всі компоненти актуальні."
     
-    async def handle_knowledge_query(self, text):
+    async def handle_knowledge_query(self, text, on_sentence=None, session=None):
         """Обробка запитів про знання"""
         try:
-            # Пошук в векторній базі
-            results = vector_kb.search(text, top_k=3)
+            # Пошук в векторній базі (контекст у бюджеті токенів моделі)
+            context = await self.find_context(text)
             
-            if results:
-                context = "\n".join([result['text'] for result in results[:2]])
-                return await ask_gpt(text, context)
-            else:
-                return await ask_gpt(text)
+            if on_sentence:
+                return await self.stream_gpt_answer(text, context, on_sentence, intent="knowledge", session=session)
+            return await ask_gpt(text, context, intent="knowledge", session=session)
                 
         except Exception as e:
             logging.error(f"Помилка обробки запиту знань: {e}")
             return "Не можу знайти інформацію про це."
     
-    async def handle_general_question(self, text):
+    async def handle_general_question(self, text, on_sentence=None, session=None):
         """Обробка загальних запитань"""
         try:
-            context = vector_kb.find_relevant_context(text)
-            response = await ask_gpt(text, context)
+            context = await self.find_context(text)
+            if on_sentence:
+                return await self.stream_gpt_answer(text, context, on_sentence, session=session)
+            response = await ask_gpt(text, context, session=session)
             return response
         except Exception as e:
             logging.error(f"Помилка GPT запиту: {e}")
             return "Не можу обробити це питання зараз."
     
+    async def stream_gpt_answer(self, text, context, on_sentence, intent="general", session=None):
+        """
+        Потокова відповідь GPT, розбита на речення
+        
+        Кожне завершене речення одразу передається в on_sentence,
+        повний текст повертається після завершення генерації.
+        """
+        segmenter = SentenceSegmenter()
+        parts = []
+        
+        async for delta in ask_gpt_stream(text, context, intent, session):
+            parts.append(delta)
+            for sentence in segmenter.feed(delta):
+                await on_sentence(sentence)
+        
+        for sentence in segmenter.flush():
+            await on_sentence(sentence)
+        
+        response = "".join(parts).strip()
+        if any(isinstance(part, DegradedResponse) for part in parts):
+            return DegradedResponse(response)
+        return response
+    
     async def handle_pdf_learning(self):
         """Навчання з PDF"""
         if not self.gui_mode:
             await self.speaker.speak("Перетягніть PDF файл в папку knowledge_base або назвіть шлях до файлу.")
         
+        if self.config.KB_WATCH_ENABLED:
+            return f"PDF з папки knowledge_base додаються автоматично. Черга: {kb_watcher.status_text()}."
         return "PDF навчання доступне через GUI або файлову систему."
     
+    def is_idle(self):
+        """Асистент чекає активації і нічого не озвучує (фонові задачі не заважають)"""
+        return (
+            self.is_active and self.state == JarvisState.LISTENING
+            and not self.is_listening and not self.speaker.is_speaking
+        )
+    
     def get_statistics(self):
         """Отримання статистики"""
         uptime = time.time() - self.start_time
@@ -494,7 +740,16 @@ class JarvisAssistant:
             'uptime_formatted': self.format_uptime(uptime),
             'state': self.state.value,
             'is_active': self.is_active,
-            'is_listening': self.is_listening
+            'is_listening': self.is_listening,
+            'time_to_first_audio': getattr(self.speaker, 'last_time_to_first_audio', None),
+            'tts': self.speaker.get_statistics(),
+            'response_cache': response_cache.get_statistics(),
+            'single_flight': single_flight.get_statistics(),
+            'llm_transport': llm_transport.get_statistics(),
+            'llm_router': gpt_integration.router.get_statistics(),
+            'conversation': conversation_manager.get_statistics(),
+            'executors': executors.get_statistics(),
+            'kb_watcher': kb_watcher.get_statistics()
         }
     
     def format_uptime(self, seconds):
@@ -518,7 +773,33 @@ class JarvisAssistant:
             logging.error(f"Помилка збереження статистики: {e}")
         
         if not self.gui_mode:
-            await self.speaker.speak("До побачення, Олександре! JARVIS завершує роботу.")
+            # Недоговорена відповідь не затримує прощання
+            self.speaker.interrupt()
+            await self.speaker.speak(self.FAREWELL, priority=PRIORITY_URGENT)
+        self.speaker.close()
+        
+        kb_watcher.stop()
+        
+        # Завершення фонового підсумовування розмов
+        try:
+            await executors.run("db", conversation_manager.wait_idle, 10)
+            conversation_manager.close()
+        except Exception as e:
+            logging.error(f"Помилка завершення розмовної пам'яті: {e}")
+        
+        # Зупинка потоку мікрофона
+        close_listener = getattr(self.listener, "close", None)
+        if close_listener:
+            close_listener()
+        
+        # Закриття пулу з'єднань LLM
+        try:
+            await llm_transport.aclose()
+        except Exception as e:
+            logging.error(f"Помилка закриття LLM клієнта: {e}")
+        
+        # Завершення пулів підсистем (записи в БД дописуються)
+        executors.shutdown(wait=True)
         
         logging.info("JARVIS завершив роботу")
 
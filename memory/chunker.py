@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розбиття тексту на частини для бази знань JARVIS
+
+Спільний розбивач для векторної бази, обробки і аналізу PDF. Текст
+надходить потоком (рядок або ітератор сторінок), частини видаються
+генератором, тож у пам'яті одночасно лише незавершене речення і поточна
+частина - незалежно від розміру документа.
+
+- межі частин збігаються з межами речень; якщо абзац закінчується не
+  раніше половини ліміту, частина закінчується на ньому;
+- розмір частини - у токенах (memory/tokenizer.py), не в словах;
+- сусідні частини в межах абзацу мають спільні речення (перекриття до
+  overlap_tokens), щоб думка на межі не губилась для пошуку;
+- речення довше за ліміт ділиться по словах.
+"""
+
+import re
+from config import Config
+from memory.tokenizer import count_tokens, SENTENCE_BOUNDARY
+
+PARAGRAPH_BOUNDARY = re.compile(r"\n[ \t\r\f\v]*\n")
+# Межа речення в незавершеному тексті: лише якщо після неї вже є наступне слово
+OPEN_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+(?=\S)")
+MIN_BUFFER_CHARS = 4096
+
+def _normalize(text):
+    return " ".join(text.split())
+
+def _paragraph(text):
+    """Речення завершеного абзацу: (текст, кінець абзацу)"""
+    sentences = [s for s in (_normalize(s) for s in SENTENCE_BOUNDARY.split(text)) if s]
+    for index, sentence in enumerate(sentences):
+        yield sentence, index == len(sentences) - 1
+
+def _segments(stream, limit):
+    """
+    Речення з потоку тексту
+
+    Args:
+        stream: Рядок або ітератор фрагментів тексту (сторінок)
+        limit (int): Найбільша довжина незавершеного речення в символах -
+            довший текст без розділових знаків ріжеться по пробілу
+
+    Yields:
+        tuple: (речення, чи закінчує воно абзац)
+    """
+    if isinstance(stream, str):
+        stream = (stream,)
+
+    buffer = ""
+    for piece in stream:
+        buffer += piece
+        *paragraphs, buffer = PARAGRAPH_BOUNDARY.split(buffer)
+        for paragraph in paragraphs:
+            yield from _paragraph(paragraph)
+
+        *sentences, buffer = OPEN_SENTENCE_BOUNDARY.split(buffer)
+        for sentence in sentences:
+            sentence = _normalize(sentence)
+            if sentence:
+                yield sentence, False
+
+        while len(buffer) > limit:
+            cut = max(buffer.rfind(space, 0, limit) for space in " \n\t")
+            cut = cut if cut > 0 else limit
+            head, buffer = _normalize(buffer[:cut]), buffer[cut:]
+            if head:
+                yield head, False
+
+    yield from _paragraph(buffer)
+
+def _units(stream, max_tokens, model):
+    """Речення з кількістю токенів; задовгі діляться по словах"""
+    for text, paragraph_end in _segments(stream, max(MIN_BUFFER_CHARS, max_tokens * 8)):
+        tokens = count_tokens(text, model)
+        if tokens <= max_tokens:
+            yield text, tokens, paragraph_end
+            continue
+
+        # Таблиці, списки без крапок - ділимо по словах
+        words, used = [], 0
+        for word in text.split():
+            word_tokens = count_tokens(word, model)
+            if words and used + word_tokens > max_tokens:
+                yield " ".join(words), used, False
+                words, used = [], 0
+            words.append(word)
+            used += word_tokens
+        yield " ".join(words), used, paragraph_end
+
+def _join(units):
+    parts = []
+    for index, (text, _, _) in enumerate(units):
+        if index:
+            parts.append("\n\n" if units[index - 1][2] else " ")
+        parts.append(text)
+    return "".join(parts)
+
+def _paragraph_cut(units, max_tokens):
+    """Кінець останнього абзацу в частині, якщо він не раніше половини ліміту"""
+    cut, used = None, 0
+    for index, (_, tokens, paragraph_end) in enumerate(units[:-1]):
+        used += tokens
+        if paragraph_end and used >= max_tokens // 2:
+            cut = index + 1
+    return cut
+
+def _tail(units, budget):
+    """Останні речення частини в межах budget токенів (перекриття)"""
+    tail, used = [], 0
+    for unit in reversed(units):
+        if used + unit[1] > budget:
+            break
+        tail.insert(0, unit)
+        used += unit[1]
+    return tail
+
+def iter_chunks(stream, max_tokens=None, overlap_tokens=None, model=None):
+    """
+    Частини тексту в межах ліміту токенів
+
+    Args:
+        stream: Рядок або ітератор фрагментів тексту (напр. сторінок PDF)
+        max_tokens (int): Ліміт частини (за замовчуванням Config.KB_CHUNK_TOKENS)
+        overlap_tokens (int): Перекриття сусідніх частин
+            (за замовчуванням Config.KB_CHUNK_OVERLAP_TOKENS, не більше половини ліміту)
+        model (str): Модель для підрахунку токенів
+
+    Yields:
+        str: Частини в порядку документа
+    """
+    max_tokens = max_tokens or Config.KB_CHUNK_TOKENS
+    if overlap_tokens is None:
+        overlap_tokens = Config.KB_CHUNK_OVERLAP_TOKENS
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    current, used = [], 0
+    for unit in _units(stream, max_tokens, model):
+        tokens = unit[1]
+        if current and used + tokens > max_tokens:
+            cut = _paragraph_cut(current, max_tokens)
+            if cut:
+                yield _join(current[:cut])
+                current = current[cut:]
+                used = sum(u[1] for u in current)
+
+        if current and used + tokens > max_tokens:
+            yield _join(current)
+            # Новий абзац починається з нуля, всередині абзацу - з перекриттям
+            current = [] if current[-1][2] else _tail(current, min(overlap_tokens, max_tokens - tokens))
+            used = sum(u[1] for u in current)
+
+        current.append(unit)
+        used += tokens
+
+    if current:
+        yield _join(current)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Збирання контексту для GPT з результатів векторного пошуку
+
+Видалення дублікатів і перекриттів між фрагментами (PDF частини
+перекриваються на 100 слів), диверсифікація через MMR та пакування
+в бюджет токенів для моделі.
+"""
+
+import logging
+import numpy as np
+from config import Config
+from memory.tokenizer import count_tokens, truncate_to_tokens
+
+class ContextPacker:
+    def __init__(self):
+        self.config = Config()
+
+    def budget_for(self, model=None):
+        """Бюджет токенів контексту для моделі"""
+        budgets = self.config.CONTEXT_TOKEN_BUDGETS
+        return budgets.get(model or self.config.GPT_MODEL, budgets["default"])
+
+    def pack(self, query_vector, candidates, max_tokens=None, model=None):
+        """
+        Пакування фрагментів у контекст
+
+        Args:
+            query_vector (np.ndarray): Нормалізований вектор запиту
+            candidates (list): Результати пошуку з полями text, score та vector
+            max_tokens (int): Бюджет токенів (за замовчуванням - для моделі)
+            model (str): Модель, для якої рахуються токени
+
+        Returns:
+            str: Контекст для промпту
+        """
+        budget = max_tokens or self.budget_for(model)
+        candidates = [
+            c for c in candidates
+            if c['text'].strip() and c['score'] >= self.config.CONTEXT_MIN_SCORE
+        ]
+
+        parts = []
+        used_tokens = 0
+
+        for candidate in self._mmr_order(query_vector, candidates):
+            text = self._remove_overlap(candidate['text'], parts)
+            if not text:
+                continue
+
+            tokens = count_tokens(text, model)
+            if used_tokens + tokens > budget:
+                remaining = budget - used_tokens
+                if remaining >= self.config.CONTEXT_MIN_CHUNK_TOKENS:
+                    parts.append(truncate_to_tokens(text, remaining, model))
+                    used_tokens += count_tokens(parts[-1], model)
+                break
+
+            parts.append(text)
+            used_tokens += tokens
+
+        logging.debug(f"Контекст: {len(parts)} з {len(candidates)} фрагментів, {used_tokens}/{budget} токенів")
+        return "\n\n".join(part for part in parts if part)
+
+    def _mmr_order(self, query_vector, candidates):
+        """Порядок фрагментів за Maximal Marginal Relevance"""
+        if len(candidates) < 2 or any(c.get('vector') is None for c in candidates):
+            return sorted(candidates, key=lambda c: c['score'], reverse=True)
+
+        vectors = np.vstack([c['vector'] for c in candidates]).astype(np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        relevance = vectors @ (query / max(np.linalg.norm(query), 1e-12))
+        similarity = vectors @ vectors.T
+
+        lambda_ = self.config.CONTEXT_MMR_LAMBDA
+        selected = []
+        remaining = list(range(len(candidates)))
+
+        while remaining:
+            if selected:
+                redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+            else:
+                redundancy = np.zeros(len(remaining))
+            scores = lambda_ * relevance[remaining] - (1 - lambda_) * redundancy
+            best = remaining[int(np.argmax(scores))]
+            selected.append(best)
+            remaining.remove(best)
+
+        return [candidates[i] for i in selected]
+
+    def _remove_overlap(self, text, parts):
+        """
+        Видалення тексту, що вже є в контексті
+
+        Повні дублікати відкидаються, а спільні слова на стику
+        з сусіднім фрагментом (перекриття частин PDF) обрізаються.
+        """
+        words = text.split()
+        max_overlap = self.config.CONTEXT_MAX_OVERLAP_WORDS
+
+        for part in parts:
+            if text in part:
+                return ""
+
+            part_words = part.split()
+            limit = min(len(words), len(part_words), max_overlap)
+
+            # Кінець вже доданого фрагмента = початок нового
+            for size in range(limit, self.config.CONTEXT_MIN_OVERLAP_WORDS - 1, -1):
+                if part_words[-size:] == words[:size]:
+                    words = words[size:]
+                    break
+            else:
+                # Кінець нового фрагмента = початок вже доданого
+                for size in range(limit, self.config.CONTEXT_MIN_OVERLAP_WORDS - 1, -1):
+                    if words[-size:] == part_words[:size]:
+                        words = words[:-size]
+                        break
+
+            if not words:
+                return ""
+
+        return " ".join(words) if len(words) != len(text.split()) else text
+
+# Глобальний екземпляр
+context_packer = ContextPacker()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розмовна пам'ять JARVIS
+
+Для кожної сесії (голос, GUI, користувач Telegram) останні репліки
+зберігаються дослівно, а старіші згортаються в підсумок. Підсумок
+оновлюється у фоновому потоці, поза критичним шляхом відповіді, тому
+розмір промпту лишається в межах бюджету токенів на довгих розмовах.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from config import Config
+from memory.tokenizer import count_tokens, truncate_to_tokens
+from utils.executors import executors
+
+SUMMARY_PROMPT = """Ти ведеш стислий підсумок розмови користувача з асистентом JARVIS.
+Онови підсумок з урахуванням нових реплік: факти про користувача, теми,
+домовленості та відкриті питання. Не більше {words} слів. Відповідай українською."""
+
+class ConversationSession:
+    """
+    Буфер розмови однієї сесії
+
+    Args:
+        session_id (str): Ідентифікатор сесії
+        manager (ConversationManager): Менеджер (збереження та підсумовування)
+    """
+
+    def __init__(self, session_id, manager):
+        self.session_id = session_id
+        self.manager = manager
+        self.config = manager.config
+        self.summary = ""
+        self.turns = []
+        self.summarizing = False
+        self._lock = threading.Lock()
+
+    def load(self, data):
+        """Відновлення стану зі збереженої розмови"""
+        with self._lock:
+            self.summary = data.get('summary', "")
+            self.turns = list(data.get('turns', []))
+
+    async def add_turn(self, user_input, jarvis_response):
+        """Додавання репліки; за потреби - фонове згортання старих реплік"""
+        turn = {
+            'id': None,
+            'user_input': user_input,
+            'jarvis_response': jarvis_response,
+            'created_at': time.time()
+        }
+        with self._lock:
+            self.turns.append(turn)
+
+        # Запис у SQLite - у пулі db, не в event loop відповіді
+        turn['id'] = await executors.run(
+            "db", self.manager.learner.append_conversation_turn,
+            self.session_id, user_input, jarvis_response, turn['created_at']
+        )
+
+        if self._turns_to_fold():
+            self.manager.schedule_summary(self)
+
+    def has_recent_turns(self):
+        """Чи є репліки в межах активної розмови (відповідь залежить від історії)"""
+        with self._lock:
+            return bool(self.turns) and (
+                time.time() - self.turns[-1]['created_at'] < self.config.CONVERSATION_IDLE_TIMEOUT
+            )
+
+    def prompt_history(self):
+        """
+        Історія для промпту в межах бюджету токенів
+
+        Returns:
+            dict: summary (str) та messages (репліки у форматі OpenAI)
+        """
+        with self._lock:
+            summary = self.summary
+            turns = list(self.turns)
+
+        if turns and time.time() - turns[-1]['created_at'] >= self.config.CONVERSATION_IDLE_TIMEOUT:
+            # Розмова давно завершилася - лише підсумок
+            turns = []
+
+        budget = self.config.CONVERSATION_TOKEN_BUDGET - count_tokens(summary)
+        selected = []
+        # Найновіші репліки мають пріоритет; ще не згорнуті старіші відкидаються
+        for turn in reversed(turns[-self.config.CONVERSATION_KEEP_TURNS:]):
+            cost = count_tokens(turn['user_input']) + count_tokens(turn['jarvis_response'])
+            if cost > budget:
+                break
+            budget -= cost
+            selected.insert(0, turn)
+
+        messages = []
+        for turn in selected:
+            messages.append({"role": "user", "content": turn['user_input']})
+            messages.append({"role": "assistant", "content": turn['jarvis_response']})
+
+        return {'summary': summary, 'messages': messages}
+
+    def _turns_to_fold(self):
+        """Репліки, що мають перейти в підсумок"""
+        with self._lock:
+            keep = self.config.CONVERSATION_KEEP_TURNS
+            return self.turns[:-keep] if len(self.turns) > keep else []
+
+    async def fold(self):
+        """Згортання старих реплік у підсумок (виконується у фоновому потоці)"""
+        while True:
+            folded = self._turns_to_fold()
+            if not folded:
+                return
+
+            with self._lock:
+                previous = self.summary
+
+            summary = await self.manager.summarize(previous, folded)
+
+            with self._lock:
+                self.summary = summary
+                # Репліки лише додаються в кінець, а видаляє їх тільки fold - згорнуті
+                # репліки є початком списку (id може бути None, якщо запис не вдався)
+                self.turns = self.turns[len(folded):]
+
+            await executors.run(
+                "db", self.manager.learner.save_conversation_summary,
+                self.session_id, summary, [turn['id'] for turn in folded]
+            )
+            logging.info(f"Розмову {self.session_id}: згорнуто {len(folded)} реплік у підсумок")
+
+class ConversationManager:
+    """
+    Сесії розмов та фоновий потік підсумовування
+
+    Args:
+        learner (JarvisLearner): Сховище розмов (за замовчуванням - новий JarvisLearner)
+        summarizer: Async-функція (попередній підсумок, репліки) -> новий підсумок;
+            за замовчуванням - GPT з локальним fallback
+    """
+
+    def __init__(self, learner=None, summarizer=None):
+        self.config = Config()
+        self._learner = learner
+        self._summarizer = summarizer
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pending = set()
+
+    @property
+    def learner(self):
+        if self._learner is None:
+            from memory.learner import JarvisLearner
+            self._learner = JarvisLearner()
+        return self._learner
+
+    @learner.setter
+    def learner(self, learner):
+        with self._lock:
+            self._learner = learner
+            # Сесії завантажуються заново з нового сховища
+            self.sessions = {}
+
+    def get(self, session_id):
+        """Сесія розмови (завантажується зі сховища при першому зверненні)"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = ConversationSession(session_id, self)
+                session.load(self.learner.load_conversation(session_id))
+                self.sessions[session_id] = session
+            return session
+
+    def _ensure_loop(self):
+        """Фоновий event loop для підсумовування"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="conversation-summary", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def schedule_summary(self, session):
+        """Запуск згортання реплік сесії, якщо воно ще не виконується"""
+        with self._lock:
+            if session.summarizing:
+                return
+            session.summarizing = True
+
+        async def run():
+            try:
+                await session.fold()
+            except Exception as e:
+                logging.error(f"Помилка підсумовування розмови {session.session_id}: {e}")
+            finally:
+                session.summarizing = False
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._ensure_loop())
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    def wait_idle(self, timeout=None):
+        """Очікування завершення фонових підсумовувань"""
+        for future in list(self._pending):
+            future.result(timeout)
+
+    async def summarize(self, previous, turns):
+        """Новий підсумок у межах CONVERSATION_SUMMARY_TOKENS"""
+        budget = self.config.CONVERSATION_SUMMARY_TOKENS
+        summary = None
+
+        try:
+            if self._summarizer:
+                summary = await self._summarizer(previous, turns)
+            else:
+                summary = await self._summarize_with_gpt(previous, turns, budget)
+        except Exception as e:
+            logging.error(f"GPT підсумок розмови недоступний: {e}")
+
+        if not summary:
+            summary = self._extractive_summary(previous, turns, budget)
+
+        return truncate_to_tokens(summary.strip(), budget)
+
+    async def _summarize_with_gpt(self, previous, turns, budget):
+        from plugins.llm_policy import llm_transport
+        if not llm_transport.available:
+            return None
+
+        dialog = "\n".join(
+            f"Користувач: {turn['user_input']}\nJARVIS: {turn['jarvis_response']}" for turn in turns
+        )
+        messages = [
+            {"role": "system", "content": SUMMARY_PROMPT.format(words=budget // 2)},
+            {"role": "user", "content": f"Попередній підсумок:\n{previous or '-'}\n\nНові репліки:\n{dialog}"}
+        ]
+        return await llm_transport.chat(messages, max_tokens=budget, temperature=0.3)
+
+    @staticmethod
+    def _extractive_summary(previous, turns, budget):
+        """Підсумок без GPT: останні питання користувача, що вміщуються в бюджет"""
+        lines = [line for line in previous.split("\n") if line.strip()]
+        lines += [f"- {truncate_to_tokens(turn['user_input'], 40)}" for turn in turns]
+
+        kept = []
+        used = 0
+        for line in reversed(lines):
+            cost = count_tokens(line) + 1
+            if used + cost > budget:
+                break
+            kept.insert(0, line)
+            used += cost
+        return "\n".join(kept)
+
+    def get_statistics(self):
+        """Статистика розмовної пам'яті"""
+        with self._lock:
+            sessions = list(self.sessions.values())
+        return {
+            'sessions': len(sessions),
+            'buffered_turns': sum(len(s.turns) for s in sessions),
+            'summarizing': sum(1 for s in sessions if s.summarizing)
+        }
+
+    def close(self):
+        """Зупинка фонового потоку"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop:
+            loop.call_soon_threadsafe(loop.stop)
+
+# Глобальний екземпляр
+conversation_manager = ConversationManager()
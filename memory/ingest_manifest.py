@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Маніфест інкрементального наповнення бази знань для JARVIS
+
+Для кожного доданого файлу зберігаються розмір, час зміни, хеш вмісту,
+хеші частин тексту та ідентифікатори їх векторів у VectorKnowledgeBase.
+Повторна обробка файлу:
+
+- розмір і час зміни ті самі (або збігся хеш вмісту) - файл пропускається;
+- файл змінено - векторизуються лише нові частини, вектори частин, яких
+  більше немає, видаляються, решта лишається як є;
+- файл видалено - видаляються всі його вектори (prune_missing).
+
+Файл обробляють кілька джерел (спостерігач папки у своєму потоці, Telegram,
+GUI) у різних event loop, тому обробка одного файлу серіалізується
+блокуванням locked(path), а запис маніфесту перевіряється вже під ним.
+"""
+
+import os
+import json
+import asyncio
+import contextlib
+import time
+import hashlib
+import logging
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from config import Config
+
+def file_hash(path):
+    """SHA-256 вмісту файлу (читання блоками)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_hash(text):
+    """Хеш частини тексту (без урахування пробілів на межах)"""
+    return hashlib.sha1(text.strip().encode('utf-8')).hexdigest()
+
+class ChunkMatcher:
+    """
+    Зіставлення частин файлу з маніфестом по одній (у порядку документа)
+
+    Args:
+        recorded (list): [{'hash', 'vector_id'}, ...] з маніфесту
+    """
+
+    def __init__(self, recorded=()):
+        self.available = defaultdict(deque)
+        for chunk in recorded:
+            self.available[chunk['hash']].append(chunk['vector_id'])
+
+    def match(self, chunk_hash):
+        """vector_id наявної частини з таким хешем або None (векторизувати)"""
+        ids = self.available.get(chunk_hash)
+        return ids.popleft() if ids else None
+
+    def removed(self):
+        """vector_id частин, яким не знайшлося пари - їх більше немає у файлі"""
+        return [vector_id for ids in self.available.values() for vector_id in ids]
+
+class IngestManifest:
+    """
+    Записи доданих файлів (JSON)
+
+    Args:
+        path (Path): Файл маніфесту (за замовчуванням Config.INGEST_MANIFEST_FILE)
+    """
+
+    # Період перевірки зайнятого блокування файлу, с
+    LOCK_POLL_INTERVAL = 0.05
+
+    def __init__(self, path=None):
+        self.path = Path(path or Config.INGEST_MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self._file_locks = {}  # шлях -> threading.Lock обробки файлу
+        self.files = self._load()  # шлях -> {'size', 'mtime', 'sha256', 'chunks', 'analysis_ids', 'ingested_at'}
+
+    @staticmethod
+    def key(path):
+        return str(Path(path).resolve())
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except Exception as e:
+            logging.error(f"Помилка читання маніфесту бази знань: {e}")
+            return {}
+
+    def save(self):
+        """Атомарне збереження маніфесту"""
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'files': self.files}, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logging.error(f"Помилка збереження маніфесту бази знань: {e}")
+
+    def get(self, path):
+        return self.files.get(self.key(path))
+
+    @contextlib.asynccontextmanager
+    async def locked(self, path):
+        """
+        Виключна обробка файлу
+
+        Блокування спільне для всіх потоків і event loop (asyncio.Lock
+        прив'язаний до одного loop). Очікування не блокує event loop.
+        """
+        with self._lock:
+            lock = self._file_locks.setdefault(self.key(path), threading.Lock())
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def check(self, path):
+        """
+        Чи змінився файл з часу останнього додавання
+
+        Хеш вмісту рахується лише тоді, коли розмір або час зміни
+        відрізняються від записаних.
+
+        Returns:
+            tuple: (True, якщо файл не змінився; SHA-256 вмісту або None,
+                якщо його не довелося рахувати)
+        """
+        stat = os.stat(path)
+        entry = self.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return True, entry['sha256']
+
+        content_hash = file_hash(path)
+        if entry and entry['sha256'] == content_hash:
+            # Лише оновлено час зміни (напр. копіювання) - вміст той самий
+            with self._lock:
+                entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+            self.save()
+            return True, content_hash
+        return False, content_hash
+
+    def record(self, path, content_hash, chunks, analysis_ids=()):
+        """
+        Запис доданого файлу
+
+        Args:
+            chunks (list): [{'hash', 'vector_id'}, ...] у порядку документа
+            analysis_ids (list): Вектори аналізу GPT для цього файлу
+        """
+        stat = os.stat(path)
+        with self._lock:
+            self.files[self.key(path)] = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'sha256': content_hash,
+                'chunks': chunks,
+                'analysis_ids': list(analysis_ids),
+                'ingested_at': time.time()
+            }
+        self.save()
+
+    def remove(self, path):
+        """
+        Видалення запису файлу
+
+        Returns:
+            dict: Видалений запис або None
+        """
+        with self._lock:
+            entry = self.files.pop(self.key(path), None)
+        if entry is not None:
+            self.save()
+        return entry
+
+    def missing(self):
+        """Записи файлів, яких більше немає на диску"""
+        return [path for path in list(self.files) if not Path(path).exists()]
+
+    @staticmethod
+    def vector_ids(entry):
+        """Усі вектори запису (частини і аналіз)"""
+        return [chunk['vector_id'] for chunk in entry['chunks']] + list(entry.get('analysis_ids', []))
+
+    def get_statistics(self):
+        with self._lock:
+            return {
+                'files': len(self.files),
+                'chunks': sum(len(entry['chunks']) for entry in self.files.values())
+            }
+
+# Глобальний екземпляр
+ingest_manifest = IngestManifest()
@@ -10,6 +10,7 @@ import datetime
 import logging
 from pathlib import Path
 from config import Config
+from utils.executors import executors
 
 class JarvisLearner:
     def __init__(self):
@@ -65,6 +66,30 @@ class JarvisLearner:
                     )
                 ''')
                 
+                # Таблиці розмовної пам'яті (підсумок та останні репліки сесії)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS conversation_sessions (
+                        session_id TEXT PRIMARY KEY,
+                        summary TEXT DEFAULT '',
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS conversation_turns (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        session_id TEXT,
+                        user_input TEXT,
+                        jarvis_response TEXT,
+                        created_at REAL
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_conversation_turns_session
+                    ON conversation_turns (session_id, id)
+                ''')
+                
                 conn.commit()
                 logging.info("База даних ініціалізована")
                 
@@ -274,6 +299,89 @@ class JarvisLearner:
             logging.error(f"Помилка отримання історії: {e}")
             return []
     
+    def load_conversation(self, session_id):
+        """
+        Завантаження розмовної пам'яті сесії
+        
+        Args:
+            session_id (str): Ідентифікатор сесії (voice, gui, telegram:<id>)
+            
+        Returns:
+            dict: Підсумок та ще не згорнуті в нього репліки
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    'SELECT summary FROM conversation_sessions WHERE session_id = ?',
+                    (session_id,)
+                )
+                row = cursor.fetchone()
+                
+                cursor.execute('''
+                    SELECT id, user_input, jarvis_response, created_at
+                    FROM conversation_turns
+                    WHERE session_id = ?
+                    ORDER BY id
+                ''', (session_id,))
+                
+                return {
+                    'summary': row[0] if row else "",
+                    'turns': [{
+                        'id': r[0],
+                        'user_input': r[1],
+                        'jarvis_response': r[2],
+                        'created_at': r[3]
+                    } for r in cursor.fetchall()]
+                }
+                
+        except Exception as e:
+            logging.error(f"Помилка завантаження розмови {session_id}: {e}")
+            return {'summary': "", 'turns': []}
+    
+    def append_conversation_turn(self, session_id, user_input, jarvis_response, created_at):
+        """Збереження репліки розмови; повертає її id"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO conversation_turns
+                    (session_id, user_input, jarvis_response, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (session_id, user_input, jarvis_response, created_at))
+                conn.commit()
+                return cursor.lastrowid
+                
+        except Exception as e:
+            logging.error(f"Помилка збереження репліки розмови: {e}")
+            return None
+    
+    def save_conversation_summary(self, session_id, summary, folded_turn_ids):
+        """
+        Збереження нового підсумку та видалення згорнутих у нього реплік
+        (в одній транзакції)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO conversation_sessions (session_id, summary, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(session_id) DO UPDATE SET
+                        summary = excluded.summary,
+                        updated_at = excluded.updated_at
+                ''', (session_id, summary))
+                cursor.executemany(
+                    'DELETE FROM conversation_turns WHERE id = ?',
+                    [(turn_id,) for turn_id in folded_turn_ids if turn_id is not None]
+                )
+                conn.commit()
+                return True
+                
+        except Exception as e:
+            logging.error(f"Помилка збереження підсумку розмови: {e}")
+            return False
+    
     def save_note(self, note_text):
         """
         Збереження нотатки
@@ -329,56 +437,39 @@ class JarvisLearner:
             logging.error(f"Помилка оновлення з GitHub: {e}")
             return False
     
-    async def learn_from_pdf(self, pdf_path):
-        """Навчання з PDF файлу через GPT"""
+    async def learn_from_pdf(self, pdf_path, progress=None):
+        """
+        Навчання з PDF файлу через GPT
+        
+        Args:
+            pdf_path: Шлях до PDF файлу
+            progress: Callback (stage, done, total) прогресу аналізу
+        """
         try:
-            import PyPDF2
-            import openai
+            from plugins.pdf_extractor import pdf_extractor
             
-            # Читання PDF
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
+            # Читання PDF пулом процесів (очікування - у пулі обчислень)
+            text = await executors.run("cpu", pdf_extractor.extract_text, pdf_path)
             
             if not text.strip():
                 return False
             
-            # Обробка через GPT (якщо є API ключ)
-            if self.config.OPENAI_API_KEY:
-                openai.api_key = self.config.OPENAI_API_KEY
-                
-                response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "Витягни ключові знання з цього тексту та структуруй їх у JSON форматі з темами та описами."},
-                        {"role": "user", "content": text[:4000]}  # Обмеження токенів
-                    ]
-                )
-                
-                knowledge_json = response.choices[0].message.content
-                
-                # Збереження знань
-                import json
-                try:
-                    knowledge_data = json.loads(knowledge_json)
-                    self.knowledge_data['pdf_learnings'] = self.knowledge_data.get('pdf_learnings', [])
-                    self.knowledge_data['pdf_learnings'].append({
-                        'source': pdf_path,
-                        'learned_at': datetime.datetime.now().isoformat(),
-                        'knowledge': knowledge_data
-                    })
-                    self._save_knowledge_base()
-                    return True
-                except json.JSONDecodeError:
-                    # Fallback - зберігаємо як текст
-                    self.add_knowledge("PDF_Content", text[:1000], pdf_path)
-                    return True
+            # Аналіз усіх частин документа через GPT (map-reduce)
+            from plugins.gpt_integration import analyze_pdf_with_gpt
+            knowledge_data = await analyze_pdf_with_gpt(text, pdf_path, progress)
+            
+            if knowledge_data:
+                self.knowledge_data['pdf_learnings'] = self.knowledge_data.get('pdf_learnings', [])
+                self.knowledge_data['pdf_learnings'].append({
+                    'source': str(pdf_path),
+                    'learned_at': datetime.datetime.now().isoformat(),
+                    'knowledge': knowledge_data
+                })
+                await executors.run("db", self._save_knowledge_base)
             else:
                 # Без GPT - просто зберігаємо текст
-                self.add_knowledge("PDF_Content", text[:1000], pdf_path)
-                return True
+                await executors.run("db", self.add_knowledge, "PDF_Content", text[:1000], str(pdf_path))
+            return True
                 
         except Exception as e:
             logging.error(f"Помилка навчання з PDF: {e}")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Семантичний кеш відповідей GPT для JARVIS
+
+Спочатку точний збіг за нормалізованим текстом питання, потім пошук
+найближчого сусіда серед ембеддингів закешованих питань (енкодер
+векторної бази знань) з порогом подібності.
+"""
+
+import re
+import time
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from config import Config
+from utils.executors import executors
+
+class ResponseCache:
+    """
+    Кеш відповідей з TTL, витісненням LRU та метриками влучань
+
+    Args:
+        encoder: Об'єкт з методом encode(list[str]) (інтерфейс SentenceTransformer);
+            за замовчуванням - модель vector_kb
+    """
+
+    def __init__(self, encoder=None):
+        self.config = Config()
+        self._encoder = encoder
+        self._entries = OrderedDict()
+        # Прострочені відповіді - резерв на випадок недоступності LLM
+        self._stale = OrderedDict()
+        self._matrix = None
+        self._matrix_keys = []
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+
+    @property
+    def encoder(self):
+        """Енкодер питань (ліниво береться з векторної бази знань)"""
+        if self._encoder is None:
+            try:
+                from memory.vector_knowledge import vector_kb
+                self._encoder = vector_kb.model
+            except Exception as e:
+                logging.error(f"Енкодер для кешу відповідей недоступний: {e}")
+        return self._encoder
+
+    @staticmethod
+    def normalize(text):
+        """Нормалізація питання для точного збігу"""
+        text = re.sub(r"[^\w\s]", " ", text.lower())
+        return " ".join(text.split())
+
+    def is_cacheable(self, question, intent="general"):
+        """Чи можна кешувати відповідь на це питання"""
+        if not self.config.RESPONSE_CACHE_ENABLED:
+            return False
+        if intent in self.config.RESPONSE_CACHE_DISABLED_INTENTS:
+            return False
+
+        # Питання, відповідь на які залежить від поточного часу
+        normalized = self.normalize(question)
+        words = set(normalized.split())
+        return not any(
+            (keyword in normalized) if " " in keyword else (keyword in words)
+            for keyword in self.config.RESPONSE_CACHE_TIME_SENSITIVE
+        )
+
+    def get(self, question, intent="general"):
+        """
+        Пошук відповіді в кеші
+
+        Args:
+            question (str): Питання користувача
+            intent (str): Тип запиту (general, knowledge, ...)
+
+        Returns:
+            str: Закешована відповідь або None
+        """
+        found, answer = self._get_exact(question, intent)
+        if found:
+            return answer
+        return self._get_semantic(question, intent, self._encode(question))
+
+    async def lookup(self, question, intent="general"):
+        """get() для event loop: ембеддинг питання рахується в пулі cpu"""
+        found, answer = self._get_exact(question, intent)
+        if found:
+            return answer
+        vector = await executors.run("cpu", self._encode, question)
+        return self._get_semantic(question, intent, vector)
+
+    def _get_exact(self, question, intent):
+        """
+        Точний збіг (без ембеддингу)
+
+        Returns:
+            tuple: (пошук завершено, відповідь або None)
+        """
+        if not self.is_cacheable(question, intent):
+            self.stats['bypassed'] += 1
+            return True, None
+
+        key = (intent, self.normalize(question))
+
+        with self._lock:
+            self._drop_expired()
+
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.stats['exact_hits'] += 1
+                return True, entry['answer']
+        return False, None
+
+    def _get_semantic(self, question, intent, vector):
+        """Найближче закешоване питання за ембеддингом"""
+        with self._lock:
+            match = self._nearest(vector, intent) if vector is not None else None
+            if match:
+                self._entries.move_to_end(match)
+                self.stats['semantic_hits'] += 1
+                logging.info(f"Семантичне влучання кешу: '{question}' ~ '{self._entries[match]['question']}'")
+                return self._entries[match]['answer']
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, question, answer, intent="general"):
+        """Збереження відповіді в кеші"""
+        if not answer or not self.is_cacheable(question, intent):
+            return False
+        self._put(question, answer, intent, self._encode(question))
+        return True
+
+    async def store(self, question, answer, intent="general"):
+        """put() для event loop: ембеддинг питання рахується в пулі cpu"""
+        if not answer or not self.is_cacheable(question, intent):
+            return False
+        vector = await executors.run("cpu", self._encode, question)
+        self._put(question, answer, intent, vector)
+        return True
+
+    def _put(self, question, answer, intent, vector):
+        key = (intent, self.normalize(question))
+        ttl = self.config.RESPONSE_CACHE_INTENT_TTL.get(intent, self.config.RESPONSE_CACHE_TTL)
+
+        with self._lock:
+            self._stale.pop(key, None)
+            self._entries[key] = {
+                'question': question,
+                'answer': answer,
+                'intent': intent,
+                'expires_at': time.monotonic() + ttl,
+                'vector': vector
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.config.RESPONSE_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+            self._matrix = None
+
+    def get_stale(self, question, intent="general"):
+        """
+        Відповідь для fallback при недоступності LLM (у т.ч. прострочена)
+
+        Returns:
+            str: Остання відома відповідь на це питання або None
+        """
+        key = (intent, self.normalize(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                return entry['answer']
+            return self._stale.get(key)
+
+    def invalidate(self, intent=None):
+        """Очищення кешу (повністю або для одного типу запитів)"""
+        with self._lock:
+            if intent is None:
+                self._entries.clear()
+                self._stale.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == intent]:
+                    del self._entries[key]
+                for key in [k for k in self._stale if k[0] == intent]:
+                    del self._stale[key]
+            self._matrix = None
+
+    def _encode(self, question):
+        """Нормалізований ембеддинг питання"""
+        encoder = self.encoder
+        if encoder is None:
+            return None
+
+        try:
+            vector = np.asarray(encoder.encode([question]), dtype=np.float32)[0]
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm > 0 else None
+        except Exception as e:
+            logging.error(f"Помилка векторизації питання для кешу: {e}")
+            return None
+
+    def _nearest(self, vector, intent):
+        """Ключ найближчого закешованого питання того ж типу (вище порогу)"""
+        if self._matrix is None:
+            self._matrix_keys = [k for k, e in self._entries.items() if e['vector'] is not None]
+            self._matrix = (
+                np.vstack([self._entries[k]['vector'] for k in self._matrix_keys])
+                if self._matrix_keys else np.empty((0, len(vector)), dtype=np.float32)
+            )
+
+        if not self._matrix_keys:
+            return None
+
+        scores = self._matrix @ vector
+        for index in np.argsort(-scores):
+            if scores[index] < self.config.RESPONSE_CACHE_SIMILARITY:
+                break
+            key = self._matrix_keys[index]
+            if key[0] == intent:
+                return key
+
+        return None
+
+    def _drop_expired(self):
+        """Видалення записів з простроченим TTL"""
+        now = time.monotonic()
+        expired = [k for k, e in self._entries.items() if e['expires_at'] <= now]
+        for key in expired:
+            self._stale[key] = self._entries.pop(key)['answer']
+            self._stale.move_to_end(key)
+        while len(self._stale) > self.config.RESPONSE_CACHE_STALE_MAX_ENTRIES:
+            self._stale.popitem(last=False)
+        if expired:
+            self.stats['expired'] += len(expired)
+            self._matrix = None
+
+    def get_statistics(self):
+        """Статистика кешу"""
+        hits = self.stats['exact_hits'] + self.stats['semantic_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+# Глобальний екземпляр
+response_cache = ResponseCache()
+
+def get_cached_response(question, intent="general"):
+    """Закешована відповідь на питання (або None)"""
+    return response_cache.get(question, intent)
+
+def cache_response(question, answer, intent="general"):
+    """Збереження відповіді на питання"""
+    return response_cache.put(question, answer, intent)
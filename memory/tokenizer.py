@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальний підрахунок токенів для промптів JARVIS
+
+Використовує tiktoken (якщо встановлено), інакше - наближену оцінку
+за словами: латиниця ~4 символи на токен, кирилиця ~2.5.
+"""
+
+import re
+import math
+import logging
+from functools import lru_cache
+from config import Config
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+@lru_cache(maxsize=8)
+def _get_encoding(model):
+    """Кодування tiktoken для моделі (None, якщо недоступне)"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logging.error(f"Помилка завантаження tiktoken: {e}")
+        return None
+
+def _estimate_tokens(text):
+    """Наближена кількість токенів без tiktoken"""
+    total = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        chars_per_token = 4.0 if piece.isascii() else 2.5
+        total += max(1, math.ceil(len(piece) / chars_per_token))
+    return total
+
+def count_tokens(text, model=None):
+    """
+    Кількість токенів у тексті
+
+    Args:
+        text (str): Текст
+        model (str): Модель (за замовчуванням Config.GPT_MODEL)
+
+    Returns:
+        int: Кількість токенів
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model or Config.GPT_MODEL)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return _estimate_tokens(text)
+
+def truncate_to_tokens(text, max_tokens, model=None):
+    """
+    Обрізання тексту до ліміту токенів по межі речення (або слова)
+
+    Returns:
+        str: Текст, що вміщується в ліміт
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    result = ""
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        candidate = f"{result} {sentence}".strip()
+        if count_tokens(candidate, model) > max_tokens:
+            break
+        result = candidate
+
+    if result:
+        return result
+
+    # Перше речення задовге - обрізаємо по словах
+    for word in text.split():
+        candidate = f"{result} {word}".strip()
+        if count_tokens(candidate, model) > max_tokens:
+            break
+        result = candidate
+
+    return result
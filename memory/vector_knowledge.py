@@ -2,16 +2,28 @@
 # -*- coding: utf-8 -*-
 """
 Векторна база знань для JARVIS
+
+Кожен документ має сталий ідентифікатор (ids), який не змінюється після
+видалення інших документів - на нього посилається маніфест наповнення
+(memory/ingest_manifest.py).
+
+Запис виконується в пулі db, пошук - у пулі cpu та в event loop, тому
+індекс і паралельні йому списки змінюються та читаються під одним
+блокуванням: пошук не бачить індекс, зсунутий remove_ids, зі старими
+списками. Векторизація запиту виконується поза блокуванням.
 """
 
 import numpy as np
 import json
 import logging
+import threading
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
 import faiss
 from typing import List, Dict, Any
 from config import Config
+from memory.context_packer import context_packer
+from memory.chunker import iter_chunks
 
 class VectorKnowledgeBase:
     def __init__(self):
@@ -20,6 +32,9 @@ class VectorKnowledgeBase:
         self.index = None
         self.documents = []
         self.metadata = []
+        self.ids = []  # сталі ідентифікатори документів (паралельно documents)
+        self.next_id = 0
+        self._lock = threading.RLock()  # індекс + documents/metadata/ids
         
         self.vector_db_path = self.config.KNOWLEDGE_BASE_DIR / "vectors.index"
         self.metadata_path = self.config.KNOWLEDGE_BASE_DIR / "metadata.json"
@@ -57,6 +72,9 @@ class VectorKnowledgeBase:
                     data = json.load(f)
                     self.documents = data.get('documents', [])
                     self.metadata = data.get('metadata', [])
+                    # Старий формат без ідентифікаторів - нумерація за позицією
+                    self.ids = data.get('ids') or list(range(len(self.documents)))
+                    self.next_id = data.get('next_id', max(self.ids, default=-1) + 1)
                 
                 logging.info(f"Завантажено {len(self.documents)} документів з векторної бази")
             else:
@@ -72,9 +90,12 @@ class VectorKnowledgeBase:
             if self.model:
                 # Розмірність векторів для обраної моделі
                 dimension = 384  # для MiniLM моделей
-                self.index = faiss.IndexFlatIP(dimension)  # Inner Product для косинусної подібності
-                self.documents = []
-                self.metadata = []
+                with self._lock:
+                    self.index = faiss.IndexFlatIP(dimension)  # Inner Product для косинусної подібності
+                    self.documents = []
+                    self.metadata = []
+                    self.ids = []
+                    self.next_id = 0
                 logging.info("Створено новий векторний індекс")
         except Exception as e:
             logging.error(f"Помилка створення індексу: {e}")
@@ -87,33 +108,111 @@ class VectorKnowledgeBase:
             text (str): Текст документа
             metadata (dict): Метадані документа
         """
+        if self.add_documents([text], [metadata or {}]):
+            logging.info(f"Додано документ до векторної бази: {text[:50]}...")
+            return True
+        return False
+    
+    def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]] = None) -> List[int]:
+        """
+        Додавання кількох документів однією векторизацією та одним записом на диск
+        
+        Returns:
+            List[int]: Ідентифікатори доданих документів ([] у разі помилки)
+        """
+        if not texts:
+            return []
+        vectors = self.embed(texts)
+        if vectors is None:
+            return []
+        return self.add_embeddings(texts, vectors, metadatas)
+    
+    def embed(self, texts: List[str]):
+        """
+        Векторизація текстів без запису в індекс
+        
+        Returns:
+            np.ndarray: Нормалізовані вектори (float32) або None у разі помилки
+        """
         try:
-            if not self.model or not self.index:
-                logging.error("Модель або індекс не ініціалізовані")
-                return False
-            
-            # Векторизація тексту
-            vector = self.model.encode([text])
+            if not self.model:
+                logging.error("Модель векторизації не ініціалізована")
+                return None
             
             # Нормалізація для косинусної подібності
-            faiss.normalize_L2(vector)
+            vectors = np.asarray(self.model.encode(list(texts)), dtype=np.float32)
+            faiss.normalize_L2(vectors)
+            return vectors
             
-            # Додавання до індексу
-            self.index.add(vector)
+        except Exception as e:
+            logging.error(f"Помилка векторизації: {e}")
+            return None
+    
+    def add_embeddings(self, texts: List[str], vectors, metadatas: List[Dict[str, Any]] = None) -> List[int]:
+        """
+        Запис готових векторів в індекс та на диск
+        
+        Args:
+            texts (list): Тексти документів
+            vectors (np.ndarray): Результат embed(texts)
+            metadatas (list): Метадані документів
             
-            # Збереження тексту та метаданих
-            self.documents.append(text)
-            self.metadata.append(metadata or {})
+        Returns:
+            List[int]: Ідентифікатори доданих документів ([] у разі помилки)
+        """
+        try:
+            if not texts:
+                return []
             
-            # Збереження на диск
-            self._save_to_disk()
+            with self._lock:
+                if not self.index:
+                    logging.error("Модель або індекс не ініціалізовані")
+                    return []
+                
+                self.index.add(vectors)
+                
+                ids = list(range(self.next_id, self.next_id + len(texts)))
+                self.next_id += len(texts)
+                self.documents.extend(texts)
+                self.metadata.extend(metadatas or [{} for _ in texts])
+                self.ids.extend(ids)
+                
+                self._save_to_disk()
+            return ids
             
-            logging.info(f"Додано документ до векторної бази: {text[:50]}...")
-            return True
+        except Exception as e:
+            logging.error(f"Помилка додавання документів: {e}")
+            return []
+    
+    def remove_documents(self, ids) -> int:
+        """
+        Видалення документів за ідентифікаторами
+        
+        Returns:
+            int: Кількість видалених документів
+        """
+        try:
+            ids = set(ids)
+            with self._lock:
+                positions = [position for position, doc_id in enumerate(self.ids) if doc_id in ids]
+                if not positions or not self.index:
+                    return 0
+                
+                # IndexFlat ущільнюється після видалення - позиції списків зсуваються так само
+                self.index.remove_ids(np.array(positions, dtype=np.int64))
+                removed = set(positions)
+                keep = [position for position in range(len(self.ids)) if position not in removed]
+                self.documents = [self.documents[position] for position in keep]
+                self.metadata = [self.metadata[position] for position in keep]
+                self.ids = [self.ids[position] for position in keep]
+                
+                self._save_to_disk()
+            logging.info(f"Видалено {len(positions)} документів з векторної бази")
+            return len(positions)
             
         except Exception as e:
-            logging.error(f"Помилка додавання документа: {e}")
-            return False
+            logging.error(f"Помилка видалення документів: {e}")
+            return 0
     
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -135,17 +234,21 @@ class VectorKnowledgeBase:
             faiss.normalize_L2(query_vector)
             
             # Пошук
-            scores, indices = self.index.search(query_vector, min(top_k, len(self.documents)))
-            
             results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.documents):
-                    results.append({
-                        'text': self.documents[idx],
-                        'metadata': self.metadata[idx],
-                        'score': float(score),
-                        'index': int(idx)
-                    })
+            with self._lock:
+                if not self.documents:
+                    return []
+                scores, indices = self.index.search(query_vector, min(top_k, len(self.documents)))
+                
+                for score, idx in zip(scores[0], indices[0]):
+                    if 0 <= idx < len(self.documents):
+                        results.append({
+                            'text': self.documents[idx],
+                            'metadata': self.metadata[idx],
+                            'score': float(score),
+                            'index': int(idx),
+                            'id': self.ids[idx]
+                        })
             
             return results
             
@@ -157,16 +260,14 @@ class VectorKnowledgeBase:
         """Додавання знань з PDF"""
         try:
             # Розбиття на частини для кращого пошуку
-            chunks = self._split_text(pdf_content, chunk_size=500)
+            chunks = list(iter_chunks(pdf_content))
             
-            for i, chunk in enumerate(chunks):
-                metadata = {
-                    'source': 'pdf',
-                    'filename': filename,
-                    'chunk_id': i,
-                    'type': 'pdf_content'
-                }
-                self.add_document(chunk, metadata)
+            metadatas = [
+                {'source': 'pdf', 'filename': filename, 'chunk_id': i, 'type': 'pdf_content'}
+                for i in range(len(chunks))
+            ]
+            if len(self.add_documents(chunks, metadatas)) != len(chunks):
+                return False
             
             logging.info(f"Додано {len(chunks)} частин з PDF: {filename}")
             return True
@@ -192,64 +293,65 @@ class VectorKnowledgeBase:
             logging.error(f"Помилка додавання взаємодії: {e}")
             return False
     
-    def _split_text(self, text: str, chunk_size: int = 500) -> List[str]:
-        """Розбиття тексту на частини"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                chunks.append(chunk)
-        
-        return chunks
-    
     def _save_to_disk(self):
-        """Збереження індексу та метаданих на диск"""
+        """Збереження індексу та метаданих на диск (узгоджений знімок під блокуванням)"""
         try:
-            if self.index:
-                faiss.write_index(self.index, str(self.vector_db_path))
-            
-            metadata_data = {
-                'documents': self.documents,
-                'metadata': self.metadata
-            }
-            
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata_data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                if self.index:
+                    faiss.write_index(self.index, str(self.vector_db_path))
+                
+                metadata_data = {
+                    'documents': self.documents,
+                    'metadata': self.metadata,
+                    'ids': self.ids,
+                    'next_id': self.next_id
+                }
+                
+                with open(self.metadata_path, 'w', encoding='utf-8') as f:
+                    json.dump(metadata_data, f, ensure_ascii=False, indent=2)
                 
         except Exception as e:
             logging.error(f"Помилка збереження на диск: {e}")
     
     def get_statistics(self):
         """Статистика векторної бази"""
-        return {
-            'total_documents': len(self.documents),
-            'index_size': self.index.ntotal if self.index else 0,
-            'model_loaded': self.model is not None
-        }
+        with self._lock:
+            return {
+                'total_documents': len(self.documents),
+                'index_size': self.index.ntotal if self.index else 0,
+                'model_loaded': self.model is not None
+            }
     
-    def find_relevant_context(self, query: str, max_context_length: int = 1000) -> str:
-        """Знаходження релевантного контексту для GPT"""
+    def find_relevant_context(self, query: str, max_tokens: int = None, model: str = None) -> str:
+        """
+        Знаходження релевантного контексту для GPT
+
+        Кандидати з векторного пошуку очищуються від перекриттів,
+        впорядковуються через MMR та пакуються в бюджет токенів моделі.
+        """
         try:
-            results = self.search(query, top_k=3)
+            if not self.model or not self.index or len(self.documents) == 0:
+                return ""
             
-            context_parts = []
-            current_length = 0
+            query_vector = self.model.encode([query])
+            faiss.normalize_L2(query_vector)
             
-            for result in results:
-                text = result['text']
-                if current_length + len(text) <= max_context_length:
-                    context_parts.append(text)
-                    current_length += len(text)
-                else:
-                    # Додаємо частину тексту, що поміщається
-                    remaining_space = max_context_length - current_length
-                    if remaining_space > 100:  # Мінімальний розмір частини
-                        context_parts.append(text[:remaining_space])
-                    break
+            candidates = []
+            with self._lock:
+                if not self.documents:
+                    return ""
+                top_k = min(self.config.CONTEXT_CANDIDATES, len(self.documents))
+                scores, indices = self.index.search(query_vector, top_k)
+                
+                for score, idx in zip(scores[0], indices[0]):
+                    if 0 <= idx < len(self.documents):
+                        candidates.append({
+                            'text': self.documents[idx],
+                            'score': float(score),
+                            'vector': self.index.reconstruct(int(idx))
+                        })
             
-            return "\n\n".join(context_parts)
+            return context_packer.pack(query_vector[0], candidates, max_tokens=max_tokens, model=model)
             
         except Exception as e:
             logging.error(f"Помилка пошуку контексту: {e}")
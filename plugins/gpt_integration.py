@@ -4,31 +4,65 @@
 Інтеграція з OpenAI GPT для JARVIS
 """
 
-import openai
 import asyncio
 import logging
-import json
+from plugins.llm_policy import llm_transport, DegradedResponse, CircuitOpenError
+from plugins.llm_providers import LLMRouter, OpenAIProvider, LocalLlamaProvider
+from plugins.pdf_analyzer import PDFAnalyzer
+from memory.response_cache import response_cache
+from memory.tokenizer import truncate_to_tokens
+from utils.single_flight import single_flight
 from config import Config
 
+# Службові відповіді при недоступності GPT (не кешуються)
+UNAVAILABLE_MESSAGE = "OpenAI API недоступний. Перевірте налаштування."
+CIRCUIT_OPEN_MESSAGE = "GPT тимчасово недоступний. Спробуйте трохи пізніше."
+ERROR_PREFIX = "Помилка при обробці запиту"
+FALLBACK_ANSWER = "Вибачте, не можу обробити це питання зараз."
+CONTEXT_FALLBACK_PREFIX = "Зараз не можу зв'язатися з GPT. Ось що є в базі знань:"
+
 class GPTIntegration:
     def __init__(self):
         self.config = Config()
-        self.client = None
+        self.router = LLMRouter(local=LocalLlamaProvider())
+        self.pdf_analyzer = PDFAnalyzer(self)
         self._setup_client()
         
+    @property
+    def available(self):
+        """Чи є хоча б один доступний провайдер LLM"""
+        return bool(self.router.select())
+    
+    @property
+    def client(self):
+        """OpenAI-сумісний клієнт віддаленого провайдера (None, якщо не налаштовано)"""
+        return self.router.remote.client if self.router.remote else None
+    
+    @client.setter
+    def client(self, client):
+        self.router.remote = OpenAIProvider(client) if client else None
+        
     def _setup_client(self):
         """Налаштування OpenAI клієнта"""
         try:
-            if self.config.OPENAI_API_KEY:
-                openai.api_key = self.config.OPENAI_API_KEY
-                self.client = openai
+            self.client = None
+            llm_transport.configure()
+            if llm_transport.available:
+                self.client = llm_transport
                 logging.info("OpenAI клієнт налаштовано успішно")
             else:
                 logging.warning("OpenAI API ключ не знайдено")
+            
+            if self.router.local.available:
+                logging.info(f"Локальна модель доступна: {self.router.local.model_path.name}")
         except Exception as e:
             logging.error(f"Помилка налаштування OpenAI: {e}")
     
-    async def chat_completion(self, messages, model="gpt-3.5-turbo", max_tokens=1000):
+    async def warmup(self):
+        """Прогрів провайдерів LLM при запуску (з'єднання, завантаження моделі)"""
+        await self.router.warmup()
+    
+    async def chat_completion(self, messages, model="gpt-3.5-turbo", max_tokens=1000, intent=None, question=""):
         """
         Отримання відповіді від GPT
         
@@ -36,89 +70,177 @@ class GPTIntegration:
             messages (list): Список повідомлень для GPT
             model (str): Модель GPT
             max_tokens (int): Максимальна кількість токенів
+            intent (str): Тип запиту для вибору провайдера
+            question (str): Питання користувача (коротке - на локальну модель)
             
         Returns:
-            str: Відповідь від GPT
+            str: Відповідь від GPT (DegradedResponse, якщо GPT недоступний)
         """
-        try:
-            if not self.client:
-                return "OpenAI API недоступний. Перевірте налаштування."
-            
-            response = await asyncio.to_thread(
-                self.client.ChatCompletion.create,
-                model=model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            logging.error(f"Помилка GPT запиту: {e}")
-            return f"Помилка при обробці запиту: {str(e)}"
+        providers = self.router.select(intent, question)
+        if not providers:
+            return DegradedResponse(UNAVAILABLE_MESSAGE)
+        
+        error = None
+        for provider in providers:
+            try:
+                response = await provider.chat(
+                    messages,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=0.7
+                )
+                self.router.record(provider)
+                return response.strip()
+                
+            except CircuitOpenError as e:
+                error = e
+            except Exception as e:
+                logging.error(f"Помилка GPT запиту ({provider.name}): {e}")
+                error = e
+        
+        if isinstance(error, CircuitOpenError):
+            return DegradedResponse(CIRCUIT_OPEN_MESSAGE)
+        return DegradedResponse(f"{ERROR_PREFIX}: {str(error)}")
     
-    async def analyze_pdf_content(self, pdf_text):
-        """Аналіз PDF контенту через GPT"""
-        try:
-            messages = [
-                {
-                    "role": "system", 
-                    "content": """Ти - асистент JARVIS. Проаналізуй наданий текст з PDF та витягни ключові знання.
-                    Структуруй відповідь у JSON форматі з полями:
-                    - summary: короткий опис документа
-                    - key_points: список ключових моментів
-                    - topics: список тем
-                    - actionable_items: що можна зробити на основі цієї інформації
-                    
-                    Відповідай українською мовою."""
-                },
-                {
-                    "role": "user",
-                    "content": f"Проаналізуй цей текст з PDF:\n\n{pdf_text[:4000]}"
-                }
-            ]
-            
-            response = await self.chat_completion(messages, max_tokens=1500)
+    async def stream_chat_completion(self, messages, model="gpt-3.5-turbo", max_tokens=1000, intent=None, question=""):
+        """
+        Потокове отримання відповіді від GPT
+        
+        Args:
+            messages (list): Список повідомлень для GPT
+            model (str): Модель GPT
+            max_tokens (int): Максимальна кількість токенів
+            intent (str): Тип запиту для вибору провайдера
+            question (str): Питання користувача
             
-            # Спроба парсингу JSON
+        Yields:
+            str: Фрагменти відповіді по мірі генерації; при помилці -
+                DegradedResponse (порожній, якщо частину відповіді вже віддано)
+        """
+        providers = self.router.select(intent, question)
+        if not providers:
+            yield DegradedResponse(UNAVAILABLE_MESSAGE)
+            return
+        
+        error = None
+        for provider in providers:
+            received = False
             try:
-                knowledge_data = json.loads(response)
-                return knowledge_data
-            except json.JSONDecodeError:
-                # Якщо не JSON, повертаємо як текст
-                return {
-                    "summary": "Аналіз PDF документа",
-                    "content": response,
-                    "source": "gpt_analysis"
-                }
+                async for delta in provider.stream_chat(
+                    messages,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=0.7
+                ):
+                    received = True
+                    yield delta
+                self.router.record(provider)
+                return
                 
+            except CircuitOpenError as e:
+                error = e
+            except Exception as e:
+                logging.error(f"Помилка потокового GPT запиту ({provider.name}): {e}")
+                error = e
+                if received:
+                    # Частину відповіді вже озвучено - інший провайдер не підхопить
+                    yield DegradedResponse("")
+                    return
+        
+        if isinstance(error, CircuitOpenError):
+            yield DegradedResponse(CIRCUIT_OPEN_MESSAGE)
+        else:
+            yield DegradedResponse(f"{ERROR_PREFIX}: {str(error)}")
+    
+    async def batch_chat_completion(self, batch, model="gpt-3.5-turbo", max_tokens=1000, intent="analysis"):
+        """
+        Відповіді на пакет незалежних запитів одним провайдером
+        
+        Args:
+            batch (list): Список наборів повідомлень
+            
+        Returns:
+            list: Відповіді (DegradedResponse для невдалих) у тому ж порядку
+        """
+        providers = self.router.select(intent)
+        if not providers:
+            return [DegradedResponse(UNAVAILABLE_MESSAGE) for _ in batch]
+        
+        provider = providers[0]
+        results = await provider.chat_batch(batch, model=model, max_tokens=max_tokens, temperature=0.7)
+        self.router.record(provider)
+        
+        return [
+            DegradedResponse(f"{ERROR_PREFIX}: {result}") if isinstance(result, Exception) else result.strip()
+            for result in results
+        ]
+    
+    async def analyze_pdf_content(self, pdf_text, source=None, progress=None):
+        """
+        Аналіз PDF контенту через GPT (усі частини документа, map-reduce)
+        
+        Args:
+            pdf_text (str): Текст документа
+            source: Шлях до файлу (для продовження після збою)
+            progress: Callback (stage, done, total)
+            
+        Returns:
+            dict: summary, key_points, topics, actionable_items або None
+        """
+        try:
+            return await self.pdf_analyzer.analyze(pdf_text, source=source, progress=progress)
         except Exception as e:
             logging.error(f"Помилка аналізу PDF: {e}")
             return None
     
-    async def answer_question(self, question, context=""):
-        """Відповідь на загальні питання"""
-        try:
-            system_prompt = f"""Ти - JARVIS, персональний AI асистент Олександра Азенка.
+    def _build_answer_messages(self, question, context="", history=None):
+        """
+        Повідомлення для відповіді на загальне питання
+        
+        Args:
+            history (dict): Розмовна пам'ять сесії (summary та messages)
+        """
+        history = history or {}
+        summary = history.get('summary')
+        
+        system_prompt = f"""Ти - JARVIS, персональний AI асистент Олександра Азенка.
             Ти розумна, ввічлива та корисна. Відповідаєш українською мовою.
             Твоя особистість: професійна, але дружня, як у фільмі "Залізна людина".
             
             Контекст (якщо є): {context}
             
             Відповідай коротко та по суті, але дружньо."""
-            
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": question}
-            ]
-            
-            response = await self.chat_completion(messages)
+        
+        if summary:
+            system_prompt += f"\n\nПідсумок попередньої розмови: {summary}"
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            *history.get('messages', []),
+            {"role": "user", "content": question}
+        ]
+    
+    async def answer_question(self, question, context="", history=None, intent="general"):
+        """Відповідь на загальні питання"""
+        try:
+            messages = self._build_answer_messages(question, context, history)
+            response = await self.chat_completion(messages, intent=intent, question=question)
             return response
             
         except Exception as e:
             logging.error(f"Помилка відповіді на питання: {e}")
-            return "Вибачте, не можу обробити це питання зараз."
+            return DegradedResponse(FALLBACK_ANSWER)
+    
+    async def answer_question_stream(self, question, context="", history=None, intent="general"):
+        """Потокова відповідь на загальні питання (фрагментами)"""
+        try:
+            messages = self._build_answer_messages(question, context, history)
+            async for delta in self.stream_chat_completion(messages, intent=intent, question=question):
+                yield delta
+                
+        except Exception as e:
+            logging.error(f"Помилка потокової відповіді на питання: {e}")
+            yield DegradedResponse(FALLBACK_ANSWER)
     
     async def generate_code_suggestions(self, code_snippet, language="python"):
         """Генерація підказок для коду"""
@@ -179,13 +301,132 @@ class GPTIntegration:
 # Глобальний екземпляр
 gpt_integration = GPTIntegration()
 
-async def ask_gpt(question, context=""):
-    """Функція для використання в main.py"""
-    return await gpt_integration.answer_question(question, context)
+def is_service_response(text):
+    """Чи є відповідь службовою (помилка або fallback без LLM)"""
+    return isinstance(text, DegradedResponse) or not text.strip()
+
+def fallback_answer(question, context, intent, degraded):
+    """
+    Відповідь без LLM: остання відома відповідь з кешу або фрагмент бази знань
+
+    Args:
+        degraded (DegradedResponse): Повідомлення про помилку GPT
+    """
+    if degraded == UNAVAILABLE_MESSAGE:
+        return degraded
+
+    cached = response_cache.get_stale(question, intent)
+    if cached:
+        logging.info("GPT недоступний - відповідь з кешу")
+        return DegradedResponse(cached)
+
+    if context:
+        excerpt = truncate_to_tokens(context, Config.LLM_FALLBACK_CONTEXT_TOKENS)
+        if excerpt:
+            return DegradedResponse(f"{CONTEXT_FALLBACK_PREFIX} {excerpt}")
+
+    return degraded
+
+def _flight_key(question, context, intent, session):
+    """Ключ об'єднання однакових паралельних питань"""
+    return ("gpt", intent, response_cache.normalize(question), context, session.session_id if session else None)
+
+def _conversation(session):
+    """
+    Історія сесії для промпту та сесія для ключа запиту
+
+    Відповідь у межах активної розмови залежить від попередніх реплік,
+    тому таке питання не береться з кешу і не об'єднується з іншими сесіями.
+    """
+    if session is None or not Config.CONVERSATION_ENABLED:
+        return None, None
+    history = session.prompt_history()
+    return history, (session if session.has_recent_turns() else None)
+
+async def ask_gpt(question, context="", intent="general", session=None):
+    """
+    Функція для використання в main.py
+
+    Args:
+        question (str): Питання користувача
+        context (str): Контекст з бази знань
+        intent (str): Тип запиту для семантичного кешу відповідей
+        session (ConversationSession): Розмовна пам'ять сесії
+    """
+    history, active_session = _conversation(session)
+
+    cached = None if active_session else await response_cache.lookup(question, intent)
+    if cached:
+        return cached
+
+    async def request():
+        response = await gpt_integration.answer_question(question, context, history, intent)
+        if is_service_response(response):
+            return fallback_answer(question, context, intent, response)
+        if not active_session:
+            await response_cache.store(question, response, intent)
+        return response
+
+    # Однакові питання з кількох джерел одночасно - один запит до API
+    return await single_flight.do(_flight_key(question, context, intent, active_session), request)
+
+async def ask_gpt_stream(question, context="", intent="general", session=None):
+    """
+    Потокова відповідь GPT (фрагменти тексту по мірі генерації)
+
+    Якщо таке ж питання вже генерується, відповідь віддається одним
+    фрагментом після завершення спільного запиту.
+    """
+    history, active_session = _conversation(session)
+
+    cached = None if active_session else await response_cache.lookup(question, intent)
+    if cached:
+        yield cached
+        return
+
+    deltas = asyncio.Queue()
+    led = False
+
+    async def request():
+        nonlocal led
+        led = True
+        parts = []
+        degraded = False
+        async for delta in gpt_integration.answer_question_stream(question, context, history, intent):
+            if isinstance(delta, DegradedResponse):
+                degraded = True
+                if not parts:
+                    delta = fallback_answer(question, context, intent, delta)
+            parts.append(delta)
+            deltas.put_nowait(delta)
+
+        response = "".join(parts).strip()
+        if degraded or not response:
+            return DegradedResponse(response)
+        if not active_session:
+            await response_cache.store(question, response, intent)
+        return response
+
+    flight = asyncio.ensure_future(single_flight.do(_flight_key(question, context, intent, active_session), request))
+    try:
+        while not flight.done() or not deltas.empty():
+            getter = asyncio.ensure_future(deltas.get())
+            await asyncio.wait({getter, flight}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+
+        response = flight.result()
+        if not led:
+            yield response
+    finally:
+        if not flight.done():
+            flight.cancel()
 
-async def analyze_pdf_with_gpt(pdf_text):
+async def analyze_pdf_with_gpt(pdf_text, source=None, progress=None):
     """Аналіз PDF через GPT"""
-    return await gpt_integration.analyze_pdf_content(pdf_text)
+    return await gpt_integration.analyze_pdf_content(pdf_text, source, progress)
 
 async def get_code_suggestions(code, language="python"):
     """Отримання підказок для коду"""
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Конвеєр наповнення бази знань для JARVIS
+
+PDF проходить етапи, що працюють одночасно і з'єднані обмеженими чергами
+(INGEST_QUEUE_SIZE):
+
+    extract -> chunk -> embed -> index
+        \\-> analyze
+
+- extract - сторінки з PDFExtractor по одній;
+- chunk - частини сторінки (memory/chunker.py) і зіставлення з маніфестом:
+  далі йдуть лише нові частини;
+- embed - векторизація пакетами по INGEST_EMBED_BATCH частин;
+- index - запис в індекс і на диск групами по INGEST_INDEX_COMMIT векторів;
+- analyze - аналіз LLM. Аналізу потрібен увесь документ, а сторінки для
+  chunk надходять зі швидкістю векторизації, тому analyze читає текст
+  окремо (extract_text, ~мс на сторінку) і працює, поки векторизуються
+  частини.
+
+Повна черга зупиняє попередній етап (зворотний тиск), тож у пам'яті лише
+кілька черг елементів. Для кожного етапу рахується час роботи, очікування
+вхідних даних і блокування на повній черзі - звіт показує вузьке місце.
+"""
+
+import time
+import asyncio
+import logging
+from pathlib import Path
+import numpy as np
+from config import Config
+from memory.chunker import iter_chunks
+from memory.ingest_manifest import ChunkMatcher, chunk_hash
+from utils.executors import executors
+
+STAGES = ("extract", "chunk", "embed", "index", "analyze")
+
+_END = object()
+
+def _page_chunks(text):
+    """Частини сторінки з хешами"""
+    return [(chunk, chunk_hash(chunk)) for chunk in iter_chunks(text)]
+
+def _analysis_documents(analysis, filename):
+    """Тексти і метадані аналізу для векторної бази"""
+    metadata = {"source": "pdf_gpt_analysis", "filename": filename, "type": "analysis"}
+    if isinstance(analysis, dict):
+        sections = [(key, value) for key, value in analysis.items() if isinstance(value, str) and value.strip()]
+        return [f"{key}: {value}" for key, value in sections], [{**metadata, "section": key} for key, _ in sections]
+    return [str(analysis)], [metadata]
+
+class IngestRun:
+    """Одна обробка файлу: черги, стан частин і лічильники етапів"""
+
+    def __init__(self, pipeline, path, progress=None):
+        self.pipeline = pipeline
+        self.config = pipeline.config
+        self.path = Path(path)
+        self.progress = progress
+
+        size = self.config.INGEST_QUEUE_SIZE
+        self.pages = asyncio.Queue(size)       # extract -> chunk
+        self.new_chunks = asyncio.Queue(size)  # chunk -> embed
+        self.vectors = asyncio.Queue(size)     # embed -> index (пакети)
+
+        entry = pipeline.manifest.get(self.path)
+        self.matcher = ChunkMatcher(entry['chunks'] if entry else [])
+        self.previous_analysis = list(entry.get('analysis_ids', [])) if entry else []
+        self.records = []    # {'hash', 'vector_id'} у порядку документа
+        self.added_ids = []
+        self.commits = []    # записи в індекс (future пулу db) - для відкату при помилці
+        self.analysis = None
+        self.text_length = 0
+        self.word_count = 0
+        self.page_count = 0
+        self.stages = {
+            name: {'items': 0, 'busy': 0.0, 'waiting': 0.0, 'blocked': 0.0}
+            for name in STAGES
+        }
+        self.stages['index']['commits'] = 0
+
+    # --- облік часу ---
+
+    async def _get(self, queue, stage):
+        started = time.perf_counter()
+        item = await queue.get()
+        self.stages[stage]['waiting'] += time.perf_counter() - started
+        return item
+
+    async def _put(self, queue, item, stage):
+        started = time.perf_counter()
+        await queue.put(item)
+        self.stages[stage]['blocked'] += time.perf_counter() - started
+
+    async def _work(self, stage, pool, func, *args):
+        started = time.perf_counter()
+        try:
+            return await executors.run(pool, func, *args)
+        finally:
+            self.stages[stage]['busy'] += time.perf_counter() - started
+
+    # --- етапи ---
+
+    async def extract(self):
+        pages = self.pipeline.extractor.iter_pages(self.path)
+        try:
+            while True:
+                text = await self._work("extract", "cpu", next, pages, _END)
+                if text is _END:
+                    break
+                self.stages['extract']['items'] += 1
+                self.text_length += len(text)
+                self.word_count += len(text.split())
+                await self._put(self.pages, text, "extract")
+        finally:
+            try:
+                pages.close()
+            except ValueError:
+                pass  # генератор ще виконується в потоці пулу - його закриє збирач сміття
+        await self._put(self.pages, _END, "extract")
+
+    async def chunk(self):
+        while (text := await self._get(self.pages, "chunk")) is not _END:
+            for chunk, h in await self._work("chunk", "cpu", _page_chunks, text):
+                vector_id = self.matcher.match(h)
+                self.records.append({'hash': h, 'vector_id': vector_id})
+                self.stages['chunk']['items'] += 1
+                if vector_id is None:
+                    await self._put(self.new_chunks, (len(self.records) - 1, self.page_count, chunk), "chunk")
+            self.page_count += 1
+        await self._put(self.new_chunks, _END, "chunk")
+
+    async def embed(self):
+        batch, done = [], False
+        while not done:
+            item = await self._get(self.new_chunks, "embed")
+            if item is _END:
+                done = True
+            else:
+                batch.append(item)
+            if batch and (done or len(batch) >= self.config.INGEST_EMBED_BATCH):
+                vectors = await self._work("embed", "cpu", self.pipeline.store.embed, [text for _, _, text in batch])
+                if vectors is None:
+                    raise RuntimeError("не вдалося векторизувати частини документа")
+                self.stages['embed']['items'] += len(batch)
+                await self._put(self.vectors, (batch, vectors), "embed")
+                batch = []
+        await self._put(self.vectors, _END, "embed")
+
+    async def index(self):
+        pending, vectors, done = [], [], False
+        while not done:
+            item = await self._get(self.vectors, "index")
+            if item is _END:
+                done = True
+            else:
+                pending.extend(item[0])
+                vectors.append(item[1])
+            if pending and (done or len(pending) >= self.config.INGEST_INDEX_COMMIT):
+                await self._commit(pending, np.vstack(vectors))
+                pending, vectors = [], []
+
+    async def _commit(self, pending, vectors):
+        """Запис групи векторів в індекс (один запис на диск)"""
+        filename = self.path.name
+        metadatas = [
+            {
+                "source": "pdf",
+                "filename": filename,
+                "chunk_id": index,
+                "page": page,
+                "file_path": str(self.path)
+            }
+            for index, page, _ in pending
+        ]
+        started = time.perf_counter()
+        future = asyncio.wrap_future(executors.submit(
+            "db", self.pipeline.store.add_embeddings, [text for _, _, text in pending], vectors, metadatas
+        ))
+        self.commits.append(future)
+        try:
+            # Скасування етапу не зупиняє запис у потоці пулу - future лишається для відкату
+            ids = await asyncio.shield(future)
+        finally:
+            self.stages['index']['busy'] += time.perf_counter() - started
+        if len(ids) != len(pending):
+            raise RuntimeError("не вдалося записати частини документа в індекс")
+        self.added_ids.extend(ids)
+        for (index, _, _), vector_id in zip(pending, ids):
+            self.records[index]['vector_id'] = vector_id
+        self.stages['index']['items'] += len(ids)
+        self.stages['index']['commits'] += 1
+
+    async def analyze(self):
+        if self.pipeline.analyze is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            text = await executors.run("cpu", self.pipeline.extractor.extract_text, self.path)
+            if not text.strip():
+                return
+            self.analysis = await self.pipeline.analyze(text, self.path, self.progress)
+        finally:
+            self.stages['analyze']['busy'] += time.perf_counter() - started
+        self.stages['analyze']['items'] += 1
+
+    def report(self, elapsed):
+        stages = {
+            name: {**stats, 'per_second': stats['items'] / stats['busy'] if stats['busy'] else 0.0}
+            for name, stats in self.stages.items()
+        }
+        return {
+            'elapsed': elapsed,
+            'stages': stages,
+            'bottleneck': max(stages, key=lambda name: stages[name]['busy'])
+        }
+
+class IngestPipeline:
+    """
+    Конвеєр обробки одного PDF
+
+    Args:
+        store: Векторна база (embed / add_embeddings / add_documents / remove_documents)
+        manifest (IngestManifest): Маніфест наповнення
+        extractor: Об'єкт з iter_pages(path) - генератор тексту сторінок - і
+            extract_text(path) (PDFExtractor)
+        analyze: async (text, source, progress) -> аналіз або None; None - без аналізу
+    """
+
+    def __init__(self, store, manifest, extractor, analyze=None):
+        self.config = Config()
+        self.store = store
+        self.manifest = manifest
+        self.extractor = extractor
+        self.analyze = analyze
+
+        self.stats = {
+            'documents': 0,
+            'failed': 0,
+            'chunks_embedded': 0,
+            'commits': 0
+        }
+        self.last_report = None
+
+    async def run(self, path, content_hash, progress=None):
+        """
+        Обробка файлу і запис у маніфест
+
+        Args:
+            path (Path): PDF файл
+            content_hash (str): SHA-256 вмісту (IngestManifest.check)
+            progress: Callback (stage, done, total) прогресу аналізу
+
+        Returns:
+            dict: text_length, words, pages, chunks, added, kept, removed, analysis, report
+        """
+        run = IngestRun(self, path, progress)
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(getattr(run, stage)()) for stage in STAGES]
+        try:
+            await asyncio.gather(*tasks)
+            if not run.records:
+                raise ValueError("Не вдалося витягти текст з PDF")
+            result = await self._finish(run, content_hash)
+        except BaseException:
+            self.stats['failed'] += 1
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._rollback(run)
+            raise
+
+        report = run.report(time.perf_counter() - started)
+        self.last_report = report
+        self.stats['documents'] += 1
+        self.stats['chunks_embedded'] += run.stages['embed']['items']
+        self.stats['commits'] += run.stages['index']['commits']
+        logging.info(f"Конвеєр {run.path.name}: {self.format_report(report)}")
+        return {**result, 'report': report}
+
+    async def _rollback(self, run):
+        """Видалення векторів, записаних до помилки (без запису в маніфесті вони нікому не належать)"""
+        added = []
+        for future in run.commits:
+            try:
+                added.extend(await future)
+            except Exception:
+                pass
+        if added:
+            await executors.run("db", self.store.remove_documents, added)
+
+    async def _finish(self, run, content_hash):
+        """Видалення застарілих векторів, аналіз і запис у маніфест"""
+        removed = run.matcher.removed()
+        if removed:
+            await executors.run("db", self.store.remove_documents, removed)
+
+        analysis_ids = []
+        if run.analysis:
+            texts, metadatas = _analysis_documents(run.analysis, run.path.name)
+            analysis_ids = await executors.run("db", self.store.add_documents, texts, metadatas)
+        # Аналіз замінює попередній аналіз цього файлу
+        if run.previous_analysis:
+            await executors.run("db", self.store.remove_documents, run.previous_analysis)
+
+        await executors.run("db", self.manifest.record, run.path, content_hash, run.records, analysis_ids)
+        added = len(run.added_ids)
+        return {
+            'text_length': run.text_length,
+            'words': run.word_count,
+            'pages': run.page_count,
+            'chunks': len(run.records),
+            'added': added,
+            'kept': len(run.records) - added,
+            'removed': len(removed),
+            'analysis': run.analysis
+        }
+
+    @staticmethod
+    def format_report(report):
+        """Пропускна здатність етапів одним рядком"""
+        parts = [
+            f"{name} {stats['items']} за {stats['busy']:.2f} с ({stats['per_second']:.1f}/с)"
+            for name, stats in report['stages'].items()
+        ]
+        return f"{report['elapsed']:.2f} с; " + ", ".join(parts) + f"; вузьке місце - {report['bottleneck']}"
+
+    def get_statistics(self):
+        return {**self.stats, 'last_report': self.last_report}
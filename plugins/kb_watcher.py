@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Спостереження за папкою бази знань для JARVIS
+
+PDF файли, покладені в KNOWLEDGE_BASE_DIR, додаються до бази знань без
+окремої команди. Потік спостереження отримує події inotify (Linux, пакет
+inotify_simple) або, без нього, періодично переглядає папку. Файл стає в
+чергу, лише коли його розмір і час зміни не змінюються
+KB_WATCH_DEBOUNCE_SECONDS - тобто копіювання завершено. Черга обмежена
+(KB_WATCH_QUEUE_SIZE); файли, що не вмістилися, чекають наступної
+перевірки. Окремий потік обробляє чергу по одному файлу і лише тоді, коли
+асистент нічого не робить (is_idle), тож обробка не конкурує з відповіддю
+користувачу. Видалені файли прибираються з векторної бази.
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from config import Config
+
+try:
+    from inotify_simple import INotify, flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+class KnowledgeBaseWatcher:
+    """
+    Фонове додавання PDF з папки бази знань
+
+    Args:
+        directory (Path): Папка (за замовчуванням Config.KNOWLEDGE_BASE_DIR)
+        processor: Об'єкт з async process_pdf_file(path) і forget_pdf(path)
+            (за замовчуванням plugins.pdf_processor.pdf_processor)
+        use_inotify (bool): Використовувати inotify, якщо доступний
+    """
+
+    def __init__(self, directory=None, processor=None, use_inotify=True):
+        self.config = Config()
+        self.directory = Path(directory or self.config.KNOWLEDGE_BASE_DIR)
+        self._processor = processor
+        self.use_inotify = use_inotify and INOTIFY_AVAILABLE
+        self.is_idle = lambda: True  # асистент вільний - можна обробляти чергу
+        self.queue = queue.Queue(maxsize=self.config.KB_WATCH_QUEUE_SIZE)
+        self._pending = {}   # шлях -> (розмір, час зміни, момент останньої зміни)
+        self._queued = set()
+        self._known = {}     # шлях -> (розмір, час зміни) за останнім переглядом
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.current = None  # файл, що обробляється
+
+        self.stats = {
+            'events': 0,
+            'queued': 0,
+            'deferred': 0,
+            'processed': 0,
+            'skipped': 0,
+            'removed': 0,
+            'failed': 0
+        }
+        self.last_result = None
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            from plugins.pdf_processor import pdf_processor
+            self._processor = pdf_processor
+        return self._processor
+
+    def start(self, is_idle=None):
+        """
+        Запуск спостереження і обробки черги
+
+        Args:
+            is_idle: Функція без аргументів - чи вільний асистент
+        """
+        if self._threads:
+            return
+        if is_idle:
+            self.is_idle = is_idle
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._watch, name="kb-watcher", daemon=True),
+            threading.Thread(target=self._ingest, name="kb-ingest", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logging.info(f"Спостереження за {self.directory} ({'inotify' if self.use_inotify else 'опитування'})")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+        self._threads = []
+
+    # --- спостереження ---
+
+    def _watch(self):
+        # Початковий перегляд: нові й змінені за час простою файли, прибирання видалених
+        self.scan()
+        self._put(("prune", None))
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = INotify()
+                inotify.add_watch(
+                    str(self.directory),
+                    flags.CLOSE_WRITE | flags.MOVED_TO | flags.MODIFY | flags.CREATE | flags.DELETE | flags.MOVED_FROM
+                )
+            except Exception as e:
+                logging.error(f"inotify недоступний, переходжу на опитування: {e}")
+                inotify = None
+
+        poll = self.config.KB_WATCH_POLL_SECONDS
+        while not self._stop.is_set():
+            try:
+                if inotify is not None:
+                    for event in inotify.read(timeout=int(poll * 1000)):
+                        self._on_event(event.name, bool(event.mask & (flags.DELETE | flags.MOVED_FROM)))
+                else:
+                    self._stop.wait(poll)
+                    self.scan()
+                self.flush()
+            except Exception as e:
+                logging.error(f"Помилка спостереження за базою знань: {e}")
+                self._stop.wait(poll)
+
+        if inotify is not None:
+            inotify.close()
+
+    def _on_event(self, name, deleted):
+        path = self.directory / name
+        if path.suffix.lower() != ".pdf":
+            return
+        self.stats['events'] += 1
+        if deleted:
+            self._pending.pop(path, None)
+            self._known.pop(path, None)
+            self._put(("forget", path))
+        else:
+            self._touch(path)
+
+    def scan(self):
+        """Перегляд папки: нові, змінені і видалені PDF"""
+        current = {}
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # видалено під час перегляду
+            current[path] = (stat.st_size, stat.st_mtime)
+
+        for path, signature in current.items():
+            if self._known.get(path) != signature:
+                self.stats['events'] += 1
+                self._touch(path)
+        for path in set(self._known) - set(current):
+            self.stats['events'] += 1
+            self._pending.pop(path, None)
+            self._put(("forget", path))
+        self._known = current
+
+    def _touch(self, path):
+        """Файл змінився - відлік стабільності починається знову"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        self._pending[path] = (stat.st_size, stat.st_mtime, time.monotonic())
+
+    def flush(self):
+        """Передача в чергу файлів, що не змінювались KB_WATCH_DEBOUNCE_SECONDS"""
+        now = time.monotonic()
+        for path, (size, mtime, since) in list(self._pending.items()):
+            try:
+                stat = path.stat()
+            except OSError:
+                self._pending.pop(path, None)
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                # Файл ще записується
+                self._pending[path] = (stat.st_size, stat.st_mtime, now)
+                continue
+            if now - since < self.config.KB_WATCH_DEBOUNCE_SECONDS:
+                continue
+            if self._put(("ingest", path)):
+                del self._pending[path]
+                self._known[path] = (size, mtime)
+
+    def _put(self, item):
+        with self._lock:
+            if item in self._queued:
+                return True
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                # Черга повна - файл лишається очікувати наступної перевірки
+                self.stats['deferred'] += 1
+                return False
+            self._queued.add(item)
+            self.stats['queued'] += 1
+            return True
+
+    # --- обробка ---
+
+    def _ingest(self):
+        idle_check = self.config.KB_WATCH_IDLE_CHECK_SECONDS
+        while not self._stop.is_set():
+            if not self.is_idle():
+                self._stop.wait(idle_check)
+                continue
+            try:
+                item = self.queue.get(timeout=idle_check)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._queued.discard(item)
+            self.process(item)
+
+    def process(self, item):
+        """Обробка одного елемента черги (у власному event loop потоку)"""
+        action, path = item
+        self.current = path.name if path else None
+        try:
+            if action == "ingest":
+                result = asyncio.run(self.processor.process_pdf_file(str(path)))
+                if not result.get("success"):
+                    self.stats['failed'] += 1
+                    logging.error(f"Не вдалося додати {path.name}: {result.get('error')}")
+                elif result.get("skipped"):
+                    self.stats['skipped'] += 1
+                else:
+                    self.stats['processed'] += 1
+                    logging.info(f"Додано до бази знань: {path.name}")
+            elif action == "forget":
+                asyncio.run(self.processor.forget_pdf(path))
+                self.stats['removed'] += 1
+                result = {"success": True, "filename": path.name, "removed": True}
+            else:
+                asyncio.run(self.processor.prune_missing_pdfs())
+                result = {"success": True}
+            self.last_result = result
+        except Exception as e:
+            self.stats['failed'] += 1
+            logging.error(f"Помилка обробки {path}: {e}")
+        finally:
+            self.current = None
+
+    def status_text(self):
+        """Короткий опис стану черги (GUI, Telegram)"""
+        if self.current:
+            state = f"обробляється {self.current}"
+        elif self.queue.qsize():
+            state = "очікує" if not self.is_idle() else "в роботі"
+        else:
+            state = "порожня"
+        return (
+            f"{state}; у черзі {self.queue.qsize()}, очікують запису {len(self._pending)}, "
+            f"додано {self.stats['processed']}, без змін {self.stats['skipped']}, помилок {self.stats['failed']}"
+        )
+
+    def get_statistics(self):
+        return {
+            **self.stats,
+            'mode': 'inotify' if self.use_inotify else 'polling',
+            'queue_depth': self.queue.qsize(),
+            'pending': len(self._pending),
+            'current': self.current
+        }
+
+# Глобальний екземпляр
+kb_watcher = KnowledgeBaseWatcher()
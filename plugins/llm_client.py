@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Асинхронний HTTP клієнт LLM з OpenAI-сумісним протоколом
+
+Спільний для plugins/gpt_integration.py та memory/learner.py:
+постійний keep-alive пул з'єднань, HTTP/2 (якщо встановлено h2),
+таймаути на кожен запит і скасування через asyncio.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+import httpx
+from config import Config
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class LLMError(Exception):
+    """Помилка запиту до LLM"""
+
+class LLMTimeoutError(LLMError):
+    """Перевищено таймаут запиту до LLM"""
+
+class LLMHTTPError(LLMError):
+    """LLM сервер повернув помилковий HTTP статус"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.headers = dict(headers or {})
+
+class LLMClient:
+    def __init__(self, api_key=None, base_url=None):
+        self.config = Config()
+        # httpx.AsyncClient прив'язаний до event loop, тому пул - окремий для кожного
+        # (головний цикл, потік Telegram бота, виклики з GUI)
+        self._clients = weakref.WeakKeyDictionary()
+        # Останні заголовки x-ratelimit-* від API (квота спільна для всіх запитів)
+        self.rate_limit_headers = {}
+        self.configure(api_key, base_url)
+
+    def configure(self, api_key=None, base_url=None):
+        """Перечитування ключа та адреси API (з Config, якщо не передано)"""
+        self.api_key = api_key or self.config.OPENAI_API_KEY
+        self.base_url = (base_url or self.config.OPENAI_API_BASE).rstrip("/")
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def available(self):
+        """Чи налаштовано доступ до API"""
+        return bool(self.api_key)
+
+    def _get_client(self):
+        """Пул з'єднань для поточного event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(
+                    self.config.LLM_REQUEST_TIMEOUT,
+                    connect=self.config.LLM_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.config.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=self.config.LLM_KEEPALIVE_EXPIRY
+                )
+            )
+            self._clients[loop] = client
+            logging.info(f"Створено пул з'єднань LLM ({'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'})")
+
+        return client
+
+    def _payload(self, messages, model, max_tokens, temperature, stream):
+        return {
+            "model": model or self.config.GPT_MODEL,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream
+        }
+
+    def _remember_rate_limits(self, headers):
+        limits = {k.lower(): v for k, v in headers.items() if k.lower().startswith("x-ratelimit-")}
+        if limits:
+            self.rate_limit_headers = limits
+
+    @staticmethod
+    def _request_timeout(timeout):
+        return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+
+    async def chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        """
+        Запит chat completion
+
+        Args:
+            messages (list): Повідомлення у форматі OpenAI
+            model (str): Модель (за замовчуванням Config.GPT_MODEL)
+            max_tokens (int): Максимальна кількість токенів
+            temperature (float): Температура генерації
+            timeout (float): Таймаут цього запиту (секунди)
+
+        Returns:
+            str: Текст відповіді
+        """
+        payload = self._payload(messages, model, max_tokens, temperature, stream=False)
+
+        try:
+            response = await self._get_client().post(
+                "/chat/completions", json=payload, timeout=self._request_timeout(timeout)
+            )
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(f"Таймаут запиту до LLM: {e}") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Помилка з'єднання з LLM: {e}") from e
+
+        self._remember_rate_limits(response.headers)
+        if response.status_code >= 400:
+            raise LLMHTTPError(response.status_code, response.text[:500], response.headers)
+
+        try:
+            data = response.json()
+            return data["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Некоректна відповідь LLM: {e}") from e
+
+    async def stream_chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        """
+        Потоковий запит chat completion (Server-Sent Events)
+
+        Yields:
+            str: Фрагменти тексту відповіді
+        """
+        payload = self._payload(messages, model, max_tokens, temperature, stream=True)
+
+        try:
+            async with self._get_client().stream(
+                "POST", "/chat/completions", json=payload, timeout=self._request_timeout(timeout)
+            ) as response:
+                self._remember_rate_limits(response.headers)
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    raise LLMHTTPError(response.status_code, body[:500], response.headers)
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        continue
+
+                    choices = chunk.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+
+        except httpx.TimeoutException as e:
+            raise LLMTimeoutError(f"Таймаут потокового запиту до LLM: {e}") from e
+        except httpx.HTTPError as e:
+            raise LLMError(f"Помилка з'єднання з LLM: {e}") from e
+
+    async def warmup(self):
+        """Встановлення з'єднання з API заздалегідь (DNS, TCP, TLS)"""
+        try:
+            await self._get_client().get("/models", timeout=self.config.LLM_CONNECT_TIMEOUT)
+        except httpx.HTTPError as e:
+            logging.warning(f"Прогрів з'єднання LLM не вдався: {e}")
+
+    async def aclose(self):
+        """Закриття пулу з'єднань поточного event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+# Глобальний екземпляр
+llm_client = LLMClient()
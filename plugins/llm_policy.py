@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Політика надійного транспорту LLM для JARVIS
+
+Адаптивний rate limiter (token bucket з урахуванням 429 та заголовків
+x-ratelimit-*), повтори з експоненційною затримкою та jitter, circuit
+breaker та хеджовані запити після затримки p95.
+"""
+
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from config import Config
+from plugins.llm_client import llm_client, LLMError, LLMHTTPError
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+class DegradedResponse(str):
+    """
+    Відповідь, отримана без LLM (помилка, кеш або локальний fallback)
+
+    Такі відповіді озвучуються, але не кешуються і не додаються до бази знань.
+    """
+
+class CircuitOpenError(LLMError):
+    """Circuit breaker відкритий - запити до LLM тимчасово не виконуються"""
+
+def parse_duration(value):
+    """
+    Тривалість із заголовків rate limit ("1.5", "20ms", "6m0s")
+
+    Returns:
+        float: Секунди або None
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+class TokenBucket:
+    """
+    Token bucket з адаптивною швидкістю (AIMD)
+
+    Після 429 швидкість зменшується вдвічі та бакет призупиняється на
+    Retry-After; кожна успішна відповідь поступово повертає швидкість.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Резервування токена; повертає час очікування (секунди)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    async def acquire(self):
+        """Очікування дозволу на запит"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Призупинення запитів (Retry-After або скидання ліміту)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def on_rate_limited(self, retry_after=None):
+        """Реакція на 429: зменшення швидкості та пауза"""
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+        if retry_after:
+            self.pause(retry_after)
+
+    def on_success(self, headers=None):
+        """Відновлення швидкості та врахування x-ratelimit-* заголовків"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if headers.get("x-ratelimit-remaining-requests") == "0":
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self.pause(reset)
+
+class CircuitBreaker:
+    """
+    Circuit breaker: після серії невдач запити відхиляються одразу
+
+    Стани: closed (звичайна робота), open (відмова без запиту),
+    half_open (одна пробна спроба після reset_timeout).
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Чи можна виконати запит"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                logging.info("Circuit breaker LLM: пробний запит")
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logging.info("Circuit breaker LLM закрито")
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logging.warning(f"Circuit breaker LLM відкрито після {self.failures} невдач")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """
+        Запит перервано без результату (скасування, barge-in)
+
+        Пробна спроба нічого не показала - breaker знову відкритий, наступна
+        спроба після reset_timeout. У стані closed нічого не змінюється.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                logging.info("Circuit breaker LLM: пробний запит перервано")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Ковзне вікно тривалостей успішних запитів"""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ResilientLLMTransport:
+    """
+    LLM клієнт з політикою надійності (той самий інтерфейс, що LLMClient)
+
+    Args:
+        client: Базовий LLMClient
+    """
+
+    def __init__(self, client=None):
+        self.config = Config()
+        self.client = client or llm_client
+        self.bucket = TokenBucket(self.config.LLM_RATE_LIMIT_RPS, self.config.LLM_RATE_LIMIT_BURST)
+        self.breaker = CircuitBreaker(
+            self.config.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            self.config.LLM_CIRCUIT_RESET_TIMEOUT
+        )
+        self.latency = LatencyTracker(self.config.LLM_LATENCY_WINDOW)
+        self.hedging_enabled = self.config.LLM_HEDGE_ENABLED
+
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+            'circuit_rejections': 0,
+            'failures': 0
+        }
+
+    def configure(self, api_key=None, base_url=None):
+        """Перечитування налаштувань базового клієнта"""
+        self.client.configure(api_key, base_url)
+
+    @property
+    def available(self):
+        return self.client.available
+
+    async def warmup(self):
+        await self.client.warmup()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _is_retryable(self, error):
+        """Чи варто повторювати запит після цієї помилки"""
+        if isinstance(error, LLMHTTPError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, LLMError) and not isinstance(error, CircuitOpenError)
+
+    def _counts_as_failure(self, error):
+        """Чи свідчить помилка про проблему провайдера (для circuit breaker)"""
+        if isinstance(error, LLMHTTPError):
+            return error.status >= 500 or error.status == 408
+        return True
+
+    def _backoff(self, attempt, error):
+        """Затримка перед повтором: full jitter або Retry-After"""
+        delay = random.uniform(0, min(
+            self.config.LLM_RETRY_MAX_DELAY,
+            self.config.LLM_RETRY_BASE_DELAY * (2 ** attempt)
+        ))
+        if isinstance(error, LLMHTTPError) and error.status == 429:
+            headers = {k.lower(): v for k, v in error.headers.items()}
+            retry_after = parse_duration(headers.get("retry-after"))
+            if retry_after is not None:
+                delay = min(retry_after, self.config.LLM_RETRY_MAX_DELAY)
+        return delay
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            self.stats['circuit_rejections'] += 1
+            raise CircuitOpenError("LLM тимчасово недоступний (circuit breaker відкрито)")
+
+    def _record_error(self, error):
+        """Облік помилки в rate limiter та circuit breaker"""
+        if isinstance(error, LLMHTTPError) and error.status == 429:
+            self.stats['rate_limited'] += 1
+            headers = {k.lower(): v for k, v in error.headers.items()}
+            self.bucket.on_rate_limited(parse_duration(headers.get("retry-after")))
+        if self._counts_as_failure(error):
+            self.breaker.record_failure()
+        else:
+            # Провайдер відповідає (429, 4xx) - це не збій для circuit breaker
+            self.breaker.record_success()
+
+    async def _attempt(self, messages, kwargs):
+        """Одна спроба запиту з rate limit та обліком тривалості"""
+        await self.bucket.acquire()
+        started = time.monotonic()
+        response = await self.client.chat(messages, **kwargs)
+        self.latency.record(time.monotonic() - started)
+        return response
+
+    async def _hedged_attempt(self, messages, kwargs):
+        """Спроба з дублюючим запитом, якщо перший довший за p95"""
+        delay = self.latency.percentile(0.95)
+        if not self.hedging_enabled or delay is None or len(self.latency.samples) < self.config.LLM_HEDGE_MIN_SAMPLES:
+            return await self._attempt(messages, kwargs)
+
+        primary = asyncio.ensure_future(self._attempt(messages, kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=max(delay, self.config.LLM_HEDGE_MIN_DELAY))
+        if done:
+            return primary.result()
+
+        self.stats['hedged'] += 1
+        hedge = asyncio.ensure_future(self._attempt(messages, kwargs))
+        pending = {primary, hedge}
+        error = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def chat(self, messages, **kwargs):
+        """
+        Запит chat completion з повторами, rate limit та circuit breaker
+
+        Raises:
+            CircuitOpenError: Якщо circuit breaker відкритий
+            LLMError: Якщо всі спроби невдалі
+        """
+        self._check_circuit()
+        self.stats['requests'] += 1
+
+        for attempt in range(self.config.LLM_MAX_RETRIES + 1):
+            try:
+                response = await self._hedged_attempt(messages, kwargs)
+                self.bucket.on_success(self.client.rate_limit_headers)
+                self.breaker.record_success()
+                return response
+            except LLMError as e:
+                self._record_error(e)
+                if attempt >= self.config.LLM_MAX_RETRIES or not self._is_retryable(e):
+                    self.stats['failures'] += 1
+                    raise
+                self._check_circuit()
+                self.stats['retries'] += 1
+                delay = self._backoff(attempt, e)
+                logging.warning(f"Повтор запиту до LLM через {delay:.2f} с: {e}")
+                await asyncio.sleep(delay)
+            except Exception:
+                # Помилка, не обгорнута клієнтом (мережа, розбір відповіді) - теж невдача
+                self.breaker.record_failure()
+                self.stats['failures'] += 1
+                raise
+            except BaseException:
+                # Скасування: результат невідомий, пробний запит не має лишитись "у польоті"
+                self.breaker.abandon()
+                raise
+
+    async def stream_chat(self, messages, **kwargs):
+        """
+        Потоковий запит з тією ж політикою
+
+        Повтор можливий лише до першого отриманого фрагмента.
+        """
+        self._check_circuit()
+        self.stats['requests'] += 1
+
+        for attempt in range(self.config.LLM_MAX_RETRIES + 1):
+            received = False
+            try:
+                await self.bucket.acquire()
+                async for delta in self.client.stream_chat(messages, **kwargs):
+                    received = True
+                    yield delta
+                self.bucket.on_success(self.client.rate_limit_headers)
+                self.breaker.record_success()
+                return
+            except LLMError as e:
+                self._record_error(e)
+                if received or attempt >= self.config.LLM_MAX_RETRIES or not self._is_retryable(e):
+                    self.stats['failures'] += 1
+                    raise
+                self._check_circuit()
+                self.stats['retries'] += 1
+                delay = self._backoff(attempt, e)
+                logging.warning(f"Повтор потокового запиту до LLM через {delay:.2f} с: {e}")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.breaker.record_failure()
+                self.stats['failures'] += 1
+                raise
+            except BaseException:
+                # Скасування або закриття генератора: якщо фрагменти вже йшли - провайдер працює
+                if received:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.abandon()
+                raise
+
+    def get_statistics(self):
+        """Статистика транспорту"""
+        return {
+            **self.stats,
+            'circuit_state': self.breaker.state,
+            'rate_limit_rps': round(self.bucket.rate, 2),
+            'latency_p95': self.latency.percentile(0.95)
+        }
+
+# Глобальний екземпляр
+llm_transport = ResilientLLMTransport()
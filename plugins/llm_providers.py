@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Провайдери LLM для JARVIS та маршрутизація між ними
+
+- OpenAIProvider - OpenAI-сумісний HTTP API (через ResilientLLMTransport)
+- LocalLlamaProvider - локальна квантована модель на CPU (llama.cpp, GGUF)
+- LLMRouter - короткі прості питання на локальну модель, розгорнуті
+  відповіді - на віддалену; друга модель - запасний варіант
+"""
+
+import os
+import abc
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from config import Config
+from plugins.llm_client import LLMError
+from memory.tokenizer import count_tokens
+from utils.executors import executors
+
+try:
+    from llama_cpp import Llama
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+class LLMProvider(abc.ABC):
+    """Базовий інтерфейс провайдера LLM"""
+
+    name = "base"
+
+    @property
+    @abc.abstractmethod
+    def available(self):
+        """Чи може провайдер відповідати (ключ, модель, бібліотека)"""
+
+    @abc.abstractmethod
+    async def chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        """Повна відповідь на повідомлення у форматі OpenAI"""
+
+    @abc.abstractmethod
+    async def stream_chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        """
+        Відповідь фрагментами по мірі генерації
+
+        Підкласи реалізують метод як async-генератор, що видає фрагменти
+        тексту (str) по мірі генерації.
+        """
+
+    async def chat_batch(self, batch, **kwargs):
+        """
+        Відповіді на кілька незалежних запитів
+
+        Args:
+            batch (list): Список наборів повідомлень
+
+        Returns:
+            list: Відповіді (або LLMError для невдалих запитів) у тому ж порядку
+        """
+        semaphore = asyncio.Semaphore(Config.LLM_BATCH_CONCURRENCY)
+
+        async def run(messages):
+            async with semaphore:
+                try:
+                    return await self.chat(messages, **kwargs)
+                except LLMError as e:
+                    return e
+
+        return await asyncio.gather(*(run(messages) for messages in batch))
+
+    async def warmup(self):
+        """Підготовка до першого запиту (з'єднання, завантаження моделі)"""
+
+    async def aclose(self):
+        """Звільнення ресурсів"""
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI-сумісний HTTP провайдер
+
+    Args:
+        client: ResilientLLMTransport або LLMClient
+    """
+
+    name = "openai"
+
+    def __init__(self, client):
+        self.client = client
+
+    @property
+    def available(self):
+        return bool(self.client) and self.client.available
+
+    async def chat(self, messages, **kwargs):
+        return await self.client.chat(messages, **kwargs)
+
+    async def stream_chat(self, messages, **kwargs):
+        async for delta in self.client.stream_chat(messages, **kwargs):
+            yield delta
+
+    async def warmup(self):
+        """Відкриття keep-alive з'єднання з API заздалегідь"""
+        warmup = getattr(self.client, "warmup", None)
+        if warmup:
+            await warmup()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+class LocalLlamaProvider(LLMProvider):
+    """
+    Локальна модель через llama.cpp (llama-cpp-python)
+
+    Модель не потокобезпечна, тому всі виклики виконуються в пулі llm з
+    одним потоком (utils/executors.py); пакет запитів обробляється там же
+    послідовно.
+
+    Args:
+        model: Готовий об'єкт з методом create_chat_completion (для тестів)
+        model_path (Path): GGUF файл моделі (за замовчуванням Config.LOCAL_LLM_MODEL_PATH)
+    """
+
+    name = "local"
+
+    def __init__(self, model=None, model_path=None):
+        self.config = Config()
+        self.model = model
+        self.model_path = Path(model_path or self.config.LOCAL_LLM_MODEL_PATH)
+        self._load_lock = threading.Lock()
+
+    @property
+    def available(self):
+        if self.model is not None:
+            return True
+        return LLAMA_CPP_AVAILABLE and self.model_path.exists()
+
+    def _load_model(self):
+        """Завантаження GGUF моделі (у робочому потоці)"""
+        with self._load_lock:
+            if self.model is None:
+                logging.info(f"Завантаження локальної моделі: {self.model_path.name}")
+                self.model = Llama(
+                    model_path=str(self.model_path),
+                    n_ctx=self.config.LOCAL_LLM_CONTEXT,
+                    n_threads=self.config.LOCAL_LLM_THREADS or os.cpu_count(),
+                    verbose=False
+                )
+            return self.model
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executors.get("llm"), function, *args)
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Помилка локальної моделі: {e}") from e
+
+    def _complete(self, messages, max_tokens, temperature):
+        response = self._load_model().create_chat_completion(
+            messages=messages,
+            max_tokens=min(max_tokens, self.config.LOCAL_LLM_MAX_TOKENS),
+            temperature=temperature
+        )
+        return response["choices"][0]["message"]["content"] or ""
+
+    async def chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        if not self.available:
+            raise LLMError("Локальна модель недоступна")
+        return await self._run(self._complete, messages, max_tokens, temperature)
+
+    async def stream_chat(self, messages, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        if not self.available:
+            raise LLMError("Локальна модель недоступна")
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stopped.set()  # event loop вже закрито
+
+        def produce():
+            try:
+                chunks = self._load_model().create_chat_completion(
+                    messages=messages,
+                    max_tokens=min(max_tokens, self.config.LOCAL_LLM_MAX_TOKENS),
+                    temperature=temperature,
+                    stream=True
+                )
+                for chunk in chunks:
+                    if stopped.is_set():
+                        break
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        put(delta)
+            except Exception as e:
+                put(LLMError(f"Помилка локальної моделі: {e}"))
+            finally:
+                put(done)
+
+        loop.run_in_executor(executors.get("llm"), produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Скасування або помилка споживача зупиняє генерацію
+            stopped.set()
+
+    async def chat_batch(self, batch, model=None, max_tokens=1000, temperature=0.7, timeout=None):
+        """Пакет запитів одним викликом робочого потоку"""
+        def complete_all():
+            results = []
+            for messages in batch:
+                try:
+                    results.append(self._complete(messages, max_tokens, temperature))
+                except Exception as e:
+                    results.append(LLMError(f"Помилка локальної моделі: {e}"))
+            return results
+
+        if not self.available:
+            return [LLMError("Локальна модель недоступна") for _ in batch]
+        return await self._run(complete_all)
+
+    async def warmup(self):
+        """Завантаження моделі та пробна генерація одного токена"""
+        if not self.available:
+            return
+        await self._run(self._complete, [{"role": "user", "content": "Привіт"}], 1, 0.0)
+        logging.info("Локальна модель готова")
+
+class LLMRouter:
+    """
+    Вибір провайдера для запиту
+
+    Args:
+        remote (LLMProvider): Віддалений провайдер
+        local (LLMProvider): Локальний провайдер
+    """
+
+    def __init__(self, remote=None, local=None):
+        self.config = Config()
+        self.remote = remote
+        self.local = local
+        self.stats = {}
+
+    def is_simple(self, intent, question):
+        """Коротке просте питання, з яким впорається локальна модель"""
+        if intent not in self.config.LOCAL_LLM_INTENTS or not question:
+            return False
+        if count_tokens(question) > self.config.LOCAL_LLM_MAX_QUESTION_TOKENS:
+            return False
+        question_lower = question.lower()
+        return not any(keyword in question_lower for keyword in self.config.LLM_LONG_FORM_KEYWORDS)
+
+    def select(self, intent=None, question=""):
+        """
+        Провайдери в порядку спроб (другий - запасний)
+
+        Returns:
+            list: Доступні провайдери
+        """
+        backend = self.config.LLM_BACKEND
+        if backend == "local":
+            order = [self.local]
+        elif backend == "openai":
+            order = [self.remote]
+        elif self.is_simple(intent, question):
+            order = [self.local, self.remote]
+        else:
+            order = [self.remote, self.local]
+
+        return [provider for provider in order if provider and provider.available]
+
+    def record(self, provider):
+        """Облік обраного провайдера"""
+        self.stats[provider.name] = self.stats.get(provider.name, 0) + 1
+
+    async def warmup(self):
+        """Прогрів усіх доступних провайдерів"""
+        providers = [p for p in (self.remote, self.local) if p and p.available]
+        results = await asyncio.gather(*(p.warmup() for p in providers), return_exceptions=True)
+        for provider, result in zip(providers, results):
+            if isinstance(result, Exception):
+                logging.error(f"Помилка прогріву провайдера {provider.name}: {result}")
+
+    def get_statistics(self):
+        return {
+            'backend': self.config.LLM_BACKEND,
+            'remote_available': bool(self.remote and self.remote.available),
+            'local_available': bool(self.local and self.local.available),
+            'requests': dict(self.stats)
+        }
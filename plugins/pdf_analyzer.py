@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Аналіз PDF документів за схемою map-reduce
+
+Документ розбивається на частини в межах бюджету токенів; знання з
+частин витягуються паралельно (з обмеженням кількості одночасних
+запитів), а потім ієрархічно зводяться в структуру summary / key_points /
+topics / actionable_items. Результати частин зберігаються в контрольній
+точці, тому після збою аналіз продовжується з місця зупинки.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import inspect
+import hashlib
+import logging
+from pathlib import Path
+from config import Config
+from plugins.llm_policy import DegradedResponse
+from memory.chunker import iter_chunks
+
+LIST_FIELDS = ("key_points", "topics", "actionable_items")
+
+MAP_PROMPT = """Ти - асистент JARVIS. Проаналізуй частину {index} з {total} документа та витягни ключові знання.
+Структуруй відповідь у JSON форматі з полями:
+- summary: короткий опис цієї частини (2-3 речення)
+- key_points: список ключових моментів
+- topics: список тем
+- actionable_items: що можна зробити на основі цієї інформації
+
+Відповідай лише JSON, українською мовою."""
+
+REDUCE_PROMPT = """Ти - асистент JARVIS. Об'єднай аналізи частин одного документа в єдиний аналіз.
+Прибери повтори, збережи найважливіше. Відповідь - JSON з полями summary
+(опис усього документа), key_points, topics, actionable_items (не більше {limit} елементів у кожному списку).
+
+Відповідай лише JSON, українською мовою."""
+
+def parse_analysis(response):
+    """
+    Аналіз частини з відповіді моделі
+
+    Returns:
+        dict: Поля summary та списки key_points, topics, actionable_items
+    """
+    data = None
+    match = re.search(r"\{.*\}", response, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            data = None
+
+    if not isinstance(data, dict):
+        # Відповідь не в JSON - зберігаємо як опис
+        return {"summary": response.strip(), **{field: [] for field in LIST_FIELDS}}
+
+    analysis = {"summary": str(data.get("summary") or "").strip()}
+    for field in LIST_FIELDS:
+        value = data.get(field) or []
+        if isinstance(value, str):
+            value = [value]
+        analysis[field] = [str(item).strip() for item in value if str(item).strip()]
+    return analysis
+
+class PDFAnalyzer:
+    """
+    Map-reduce аналіз тексту документа
+
+    Args:
+        llm: Об'єкт з async chat_completion(messages, max_tokens, intent) та
+            властивістю available (GPTIntegration)
+    """
+
+    def __init__(self, llm):
+        self.config = Config()
+        self.llm = llm
+
+        self.stats = {
+            'documents': 0,
+            'chunks_analyzed': 0,
+            'chunks_resumed': 0,
+            'chunks_failed': 0,
+            'reduce_calls': 0
+        }
+
+    def split_chunks(self, text):
+        """Частини тексту в межах PDF_ANALYSIS_CHUNK_TOKENS (по межах речень, без перекриття)"""
+        return list(iter_chunks(text, self.config.PDF_ANALYSIS_CHUNK_TOKENS, overlap_tokens=0))
+
+    def _checkpoint_path(self, chunks):
+        digest = hashlib.sha256("\x00".join(chunks).encode("utf-8")).hexdigest()[:24]
+        return Path(self.config.PDF_ANALYSIS_CHECKPOINT_DIR) / f"{digest}.json"
+
+    def _load_checkpoint(self, path, total):
+        """Результати частин, проаналізованих до збою"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('total') != total:
+                return {}
+            return {int(index): analysis for index, analysis in data.get('results', {}).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.error(f"Помилка читання контрольної точки аналізу PDF: {e}")
+            return {}
+
+    def _save_checkpoint(self, path, source, total, results):
+        """Атомарне збереження результатів частин"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'source': str(source) if source else None,
+                    'total': total,
+                    'updated_at': time.time(),
+                    'results': {str(index): analysis for index, analysis in results.items()}
+                }, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.error(f"Помилка збереження контрольної точки аналізу PDF: {e}")
+
+    async def _report(self, progress, stage, done, total):
+        if progress is None:
+            return
+        try:
+            result = progress(stage, done, total)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logging.error(f"Помилка повідомлення про прогрес аналізу PDF: {e}")
+
+    async def _map_chunk(self, semaphore, index, total, chunk):
+        """Аналіз однієї частини (None, якщо модель недоступна)"""
+        messages = [
+            {"role": "system", "content": MAP_PROMPT.format(index=index + 1, total=total)},
+            {"role": "user", "content": chunk}
+        ]
+        async with semaphore:
+            response = await self.llm.chat_completion(
+                messages, max_tokens=self.config.PDF_ANALYSIS_MAP_MAX_TOKENS, intent="analysis"
+            )
+        if isinstance(response, DegradedResponse):
+            return None
+        return parse_analysis(response)
+
+    def _merge_locally(self, analyses):
+        """Зведення без моделі: опис частин та списки без повторів"""
+        limit = self.config.PDF_ANALYSIS_MAX_ITEMS
+        merged = {"summary": " ".join(a["summary"] for a in analyses if a["summary"])}
+        for field in LIST_FIELDS:
+            seen = {}
+            for analysis in analyses:
+                for item in analysis[field]:
+                    seen.setdefault(item.lower(), item)
+            merged[field] = list(seen.values())[:limit]
+        return merged
+
+    async def _reduce_group(self, semaphore, analyses):
+        """Зведення групи аналізів моделлю (або локально при помилці)"""
+        if len(analyses) == 1:
+            return analyses[0]
+
+        messages = [
+            {"role": "system", "content": REDUCE_PROMPT.format(limit=self.config.PDF_ANALYSIS_MAX_ITEMS)},
+            {"role": "user", "content": json.dumps(analyses, ensure_ascii=False)}
+        ]
+        async with semaphore:
+            self.stats['reduce_calls'] += 1
+            response = await self.llm.chat_completion(
+                messages, max_tokens=self.config.PDF_ANALYSIS_REDUCE_MAX_TOKENS, intent="analysis"
+            )
+        if isinstance(response, DegradedResponse):
+            return self._merge_locally(analyses)
+
+        merged = parse_analysis(response)
+        if not merged["summary"]:
+            return self._merge_locally(analyses)
+        return merged
+
+    async def analyze(self, text, source=None, progress=None):
+        """
+        Аналіз усього документа
+
+        Args:
+            text (str): Текст документа
+            source: Шлях або назва документа (для контрольної точки)
+            progress: Callback (stage, done, total), може бути async;
+                stage - "map" або "reduce"
+
+        Returns:
+            dict: summary, key_points, topics, actionable_items, chunks_analyzed,
+                chunks_total; None, якщо жодну частину не проаналізовано
+        """
+        if not self.llm.available:
+            return None
+
+        chunks = self.split_chunks(text)
+        if not chunks:
+            return None
+
+        total = len(chunks)
+        checkpoint = self._checkpoint_path(chunks)
+        results = self._load_checkpoint(checkpoint, total)
+        if results:
+            self.stats['chunks_resumed'] += len(results)
+            logging.info(f"Аналіз PDF продовжено з контрольної точки: {len(results)}/{total} частин")
+
+        semaphore = asyncio.Semaphore(self.config.PDF_ANALYSIS_CONCURRENCY)
+        await self._report(progress, "map", len(results), total)
+
+        async def run(index):
+            analysis = await self._map_chunk(semaphore, index, total, chunks[index])
+            if analysis is None:
+                self.stats['chunks_failed'] += 1
+                return
+            results[index] = analysis
+            self.stats['chunks_analyzed'] += 1
+            self._save_checkpoint(checkpoint, source, total, results)
+            await self._report(progress, "map", len(results), total)
+
+        await asyncio.gather(*(run(index) for index in range(total) if index not in results))
+
+        if not results:
+            logging.error("Аналіз PDF: жодну частину не проаналізовано")
+            return None
+
+        # Ієрархічне зведення групами по PDF_ANALYSIS_REDUCE_FANOUT
+        level = [results[index] for index in sorted(results)]
+        fanout = max(2, self.config.PDF_ANALYSIS_REDUCE_FANOUT)
+        while len(level) > 1:
+            groups = [level[i:i + fanout] for i in range(0, len(level), fanout)]
+            await self._report(progress, "reduce", 0, len(groups))
+            level = await asyncio.gather(*(self._reduce_group(semaphore, group) for group in groups))
+            await self._report(progress, "reduce", len(groups), len(groups))
+
+        analysis = dict(level[0])
+        analysis['chunks_analyzed'] = len(results)
+        analysis['chunks_total'] = total
+        self.stats['documents'] += 1
+
+        if len(results) == total:
+            checkpoint.unlink(missing_ok=True)
+        else:
+            logging.warning(f"Аналіз PDF неповний: {len(results)}/{total} частин (буде продовжено при повторі)")
+
+        return analysis
+
+    def get_statistics(self):
+        """Статистика аналізу документів"""
+        return dict(self.stats)
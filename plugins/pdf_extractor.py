@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Паралельне витягування тексту PDF для JARVIS
+
+Сторінки документа діляться на діапазони (PDF_EXTRACT_PAGES_PER_SHARD), які
+обробляють процеси пулу: кожен сам відкриває файл PyMuPDF і повертає
+тексти своїх сторінок, тож документ не передається між процесами. Якщо
+PyMuPDF не впорався з діапазоном, цей діапазон читається PyPDF2. Сторінки
+повертаються генератором у порядку документа, щойно готовий черговий
+діапазон. Короткі документи читаються в поточному процесі - запуск пулу
+для них довший за саме читання.
+"""
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from config import Config
+
+import PyPDF2
+import fitz  # PyMuPDF
+
+def page_count(file_path):
+    """Кількість сторінок (PyMuPDF, запасний варіант - PyPDF2)"""
+    try:
+        with fitz.open(str(file_path)) as doc:
+            return doc.page_count
+    except Exception as e:
+        logging.warning(f"PyMuPDF не відкрив {Path(file_path).name}: {e}, спробую PyPDF2")
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+def extract_range(file_path, start, stop):
+    """
+    Тексти сторінок [start, stop) (виконується в процесі пулу)
+
+    Returns:
+        tuple: (список текстів сторінок, рушій: pymupdf або pypdf2)
+    """
+    try:
+        with fitz.open(str(file_path)) as doc:
+            return [doc.load_page(number).get_text() for number in range(start, stop)], "pymupdf"
+    except Exception as e:
+        logging.warning(f"PyMuPDF помилка (сторінки {start}-{stop - 1}): {e}, спробую PyPDF2")
+
+    with open(file_path, 'rb') as file:
+        pages = PyPDF2.PdfReader(file).pages
+        return [pages[number].extract_text() or "" for number in range(start, stop)], "pypdf2"
+
+class PDFExtractor:
+    """
+    Пул процесів для читання сторінок PDF
+
+    Args:
+        workers (int): Кількість процесів (за замовчуванням Config.PDF_EXTRACT_WORKERS
+            або кількість ядер)
+    """
+
+    def __init__(self, workers=None):
+        self.config = Config()
+        self.workers = workers or self.config.PDF_EXTRACT_WORKERS or os.cpu_count() or 1
+        self._pool = None
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'documents': 0,
+            'pages': 0,
+            'shards': 0,
+            'fallback_shards': 0,
+            'failed_shards': 0,
+            'last_pages_per_second': None
+        }
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: процес асистента має робочі потоки (аудіо, озвучування),
+                # fork їх копіював би у стані посеред роботи
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shards(self, pages):
+        """Діапазони сторінок [(start, stop), ...] у порядку документа"""
+        size = self.config.PDF_EXTRACT_PAGES_PER_SHARD
+        return [(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+    def iter_pages(self, file_path):
+        """
+        Тексти сторінок у порядку документа
+
+        Діапазони обробляються паралельно; генератор віддає сторінки
+        чергового діапазону, щойно той готовий. Якщо генератор закрито
+        раніше, решта діапазонів скасовується.
+
+        Yields:
+            str: Текст сторінки ("" для сторінок, які не вдалося прочитати)
+        """
+        file_path = str(file_path)
+        started = time.perf_counter()
+        pages = page_count(file_path)
+        shards = self.shards(pages)
+        self.stats['documents'] += 1
+        self.stats['shards'] += len(shards)
+
+        if self.workers <= 1 or pages < self.config.PDF_EXTRACT_PARALLEL_MIN_PAGES:
+            results = (self._run_local(file_path, start, stop) for start, stop in shards)
+            futures = []
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(extract_range, file_path, start, stop) for start, stop in shards]
+            results = (self._collect(future, file_path, start, stop) for future, (start, stop) in zip(futures, shards))
+
+        try:
+            for texts in results:
+                self.stats['pages'] += len(texts)
+                yield from texts
+        finally:
+            for future in futures:
+                future.cancel()
+
+        elapsed = time.perf_counter() - started
+        if pages and elapsed > 0:
+            self.stats['last_pages_per_second'] = round(pages / elapsed, 1)
+
+    def extract_text(self, file_path):
+        """Увесь текст документа (без квадратичного склеювання рядків)"""
+        return "".join(self.iter_pages(file_path))
+
+    def _run_local(self, file_path, start, stop):
+        try:
+            texts, engine = extract_range(file_path, start, stop)
+        except Exception as e:
+            return self._failed(start, stop, e)
+        if engine != "pymupdf":
+            self.stats['fallback_shards'] += 1
+        return texts
+
+    def _collect(self, future, file_path, start, stop):
+        try:
+            texts, engine = future.result()
+        except BrokenProcessPool as e:
+            # Процес пулу аварійно завершився - пул створюється заново,
+            # цей діапазон читається тут
+            logging.error(f"Пул читання PDF зламано: {e}")
+            with self._lock:
+                self._pool = None
+            return self._run_local(file_path, start, stop)
+        except Exception as e:
+            return self._failed(start, stop, e)
+        if engine != "pymupdf":
+            self.stats['fallback_shards'] += 1
+        return texts
+
+    def _failed(self, start, stop, error):
+        self.stats['failed_shards'] += 1
+        logging.error(f"Не вдалося прочитати сторінки {start}-{stop - 1}: {error}")
+        return [""] * (stop - start)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def get_statistics(self):
+        return {**self.stats, 'workers': self.workers}
+
+# Глобальний екземпляр
+pdf_extractor = PDFExtractor()
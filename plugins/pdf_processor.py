@@ -8,23 +8,31 @@ import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any
-import PyPDF2
-import fitz  # PyMuPDF для кращої обробки
 from memory.vector_knowledge import vector_kb
+from memory.ingest_manifest import ingest_manifest
 from plugins.gpt_integration import analyze_pdf_with_gpt
+from plugins.pdf_extractor import pdf_extractor
+from plugins.ingest_pipeline import IngestPipeline
+from utils.executors import executors
 from config import Config
 
 class PDFProcessor:
     def __init__(self):
         self.config = Config()
         self.supported_formats = ['.pdf']
+        self.pipeline = IngestPipeline(vector_kb, ingest_manifest, pdf_extractor, analyze_pdf_with_gpt)
         
-    async def process_pdf_file(self, file_path: str) -> Dict[str, Any]:
+    async def process_pdf_file(self, file_path: str, progress=None) -> Dict[str, Any]:
         """
         Повна обробка PDF файлу
         
+        Обробка інкрементальна (memory/ingest_manifest.py): незмінений файл
+        пропускається, у зміненому векторизуються лише нові частини, а
+        вектори частин, яких більше немає, видаляються.
+        
         Args:
             file_path (str): Шлях до PDF файлу
+            progress: Callback (stage, done, total) прогресу аналізу GPT
             
         Returns:
             Dict: Результат обробки
@@ -38,115 +46,78 @@ class PDFProcessor:
             if file_path.suffix.lower() not in self.supported_formats:
                 return {"success": False, "error": "Непідтримуваний формат файлу"}
             
-            # Витягування тексту
-            text_content = await self._extract_text(file_path)
-            
-            if not text_content.strip():
-                return {"success": False, "error": "Не вдалося витягти текст з PDF"}
-            
-            # Аналіз через GPT
-            gpt_analysis = None
-            if self.config.OPENAI_API_KEY:
-                gpt_analysis = await analyze_pdf_with_gpt(text_content)
-            
-            # Розбиття на частини для векторної бази
-            chunks = self._split_into_chunks(text_content)
-            
-            # Додавання до векторної бази
-            added_chunks = 0
-            for i, chunk in enumerate(chunks):
-                metadata = {
-                    "source": "pdf",
-                    "filename": file_path.name,
-                    "chunk_id": i,
-                    "total_chunks": len(chunks),
-                    "file_path": str(file_path)
-                }
-                
-                if vector_kb.add_document(chunk, metadata):
-                    added_chunks += 1
-            
-            # Збереження аналізу GPT
-            if gpt_analysis:
-                gpt_metadata = {
-                    "source": "pdf_gpt_analysis",
-                    "filename": file_path.name,
-                    "type": "analysis"
-                }
-                
-                if isinstance(gpt_analysis, dict):
-                    for key, value in gpt_analysis.items():
-                        if isinstance(value, str) and value.strip():
-                            vector_kb.add_document(f"{key}: {value}", {**gpt_metadata, "section": key})
-                else:
-                    vector_kb.add_document(str(gpt_analysis), gpt_metadata)
+            # Спостерігач папки, Telegram і GUI можуть передати той самий файл
+            # одночасно: обробка по одній, стан маніфесту - вже під блокуванням
+            async with ingest_manifest.locked(file_path):
+                # Файл уже в базі знань і не змінився - нічого не робимо
+                unchanged, content_hash = await executors.run("cpu", ingest_manifest.check, file_path)
+                entry = ingest_manifest.get(file_path)
+                if entry and not set(ingest_manifest.vector_ids(entry)) <= set(vector_kb.ids):
+                    # Векторну базу створено заново - запис маніфесту більше не дійсний
+                    ingest_manifest.remove(file_path)
+                    unchanged = False
+                if unchanged:
+                    logging.info(f"PDF не змінився, пропускаю: {file_path.name}")
+                    return {
+                        "success": True,
+                        "skipped": True,
+                        "filename": file_path.name,
+                        "chunks_added": 0,
+                        "chunks_removed": 0,
+                        "total_chunks": len(entry['chunks']),
+                        "summary": "Файл не змінився, вже є в базі знань."
+                    }
+            
+                # Витягування, частини, векторизація, запис в індекс і аналіз LLM -
+                # одночасно, етапами конвеєра (plugins/ingest_pipeline.py)
+                result = await self.pipeline.run(file_path, content_hash, progress)
+                logging.info(
+                    f"PDF {file_path.name}: додано {result['added']}, без змін {result['kept']}, "
+                    f"видалено {result['removed']} частин"
+                )
             
             return {
                 "success": True,
                 "filename": file_path.name,
-                "text_length": len(text_content),
-                "chunks_added": added_chunks,
-                "total_chunks": len(chunks),
-                "gpt_analysis": gpt_analysis is not None,
-                "summary": self._create_summary(text_content, gpt_analysis)
+                "text_length": result['text_length'],
+                "chunks_added": result['added'],
+                "chunks_removed": result['removed'],
+                "total_chunks": result['chunks'],
+                "gpt_analysis": result['analysis'] is not None,
+                "summary": self._create_summary(result['words'], result['analysis']),
+                "pipeline": result['report']
             }
             
         except Exception as e:
             logging.error(f"Помилка обробки PDF: {e}")
             return {"success": False, "error": str(e)}
     
-    async def _extract_text(self, file_path: Path) -> str:
-        """Витягування тексту з PDF"""
-        text_content = ""
-        
-        try:
-            # Спроба з PyMuPDF (кращий для складних PDF)
-            doc = fitz.open(str(file_path))
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text_content += page.get_text()
-            doc.close()
-            
-        except Exception as e:
-            logging.warning(f"PyMuPDF помилка: {e}, спробую PyPDF2")
-            
-            try:
-                # Fallback до PyPDF2
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text_content += page.extract_text()
-                        
-            except Exception as e2:
-                logging.error(f"PyPDF2 помилка: {e2}")
-                raise e2
+    async def forget_pdf(self, file_path) -> int:
+        """
+        Видалення всіх векторів файлу з бази знань
         
-        return text_content
+        Returns:
+            int: Кількість видалених документів
+        """
+        async with ingest_manifest.locked(file_path):
+            entry = ingest_manifest.remove(file_path)
+            if entry is None:
+                return 0
+            return await executors.run("db", vector_kb.remove_documents, ingest_manifest.vector_ids(entry))
     
-    def _split_into_chunks(self, text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
-        """Розбиття тексту на частини з перекриттям"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk_words = words[i:i + chunk_size]
-            chunk = ' '.join(chunk_words)
-            
-            if chunk.strip():
-                chunks.append(chunk)
-            
-            # Якщо це останній чанк, зупиняємося
-            if i + chunk_size >= len(words):
-                break
-        
-        return chunks
+    async def prune_missing_pdfs(self) -> int:
+        """Видалення з бази знань файлів, яких більше немає на диску"""
+        removed = 0
+        for path in ingest_manifest.missing():
+            removed += await self.forget_pdf(path)
+            logging.info(f"PDF видалено з диска, вектори прибрано: {Path(path).name}")
+        return removed
     
-    def _create_summary(self, text: str, gpt_analysis: Any) -> str:
+    def _create_summary(self, word_count: int, gpt_analysis: Any) -> str:
         """Створення короткого резюме"""
         summary_parts = []
         
         # Базова інформація
-        word_count = len(text.split())
         summary_parts.append(f"Кількість слів: {word_count}")
         
         # Інформація з GPT аналізу
@@ -165,7 +136,7 @@ class PDFProcessor:
         """Пошук в завантажених PDF файлах"""
         try:
             # Пошук в векторній базі з фільтром по PDF
-            all_results = vector_kb.search(query, top_k=limit * 2)
+            all_results = await executors.run("cpu", vector_kb.search, query, limit * 2)
             
             # Фільтрація тільки PDF результатів
             pdf_results = []
@@ -207,7 +178,8 @@ class PDFProcessor:
             return {
                 'total_pdf_files': len(pdf_files),
                 'total_pdf_chunks': pdf_chunks,
-                'pdf_files': list(pdf_files)
+                'pdf_files': list(pdf_files),
+                'pipeline': self.pipeline.get_statistics()
             }
             
         except Exception as e:
@@ -217,9 +189,9 @@ class PDFProcessor:
 # Глобальний екземпляр
 pdf_processor = PDFProcessor()
 
-async def process_pdf(file_path: str):
+async def process_pdf(file_path: str, progress=None):
     """Функція для використання в main.py"""
-    return await pdf_processor.process_pdf_file(file_path)
+    return await pdf_processor.process_pdf_file(file_path, progress)
 
 async def search_pdfs(query: str, limit: int = 5):
     """Пошук в PDF файлах"""
@@ -10,6 +10,7 @@ import logging
 import subprocess
 import urllib.parse
 from bs4 import BeautifulSoup
+from utils.single_flight import single_flight
 
 class WebSearchPlugin:
     def __init__(self):
@@ -87,7 +88,11 @@ class WebSearchPlugin:
         return command_text.strip()
     
     async def _get_search_results(self, url):
-        """Отримання результатів пошуку (спрощена версія)"""
+        """Отримання результатів пошуку (однакові паралельні запити об'єднуються)"""
+        return await single_flight.do(("search", url), lambda: self._fetch_search_results(url))
+    
+    async def _fetch_search_results(self, url):
+        """Завантаження та розбір сторінки результатів (спрощена версія)"""
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, headers=self.headers) as response:
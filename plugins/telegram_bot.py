@@ -7,6 +7,7 @@ Telegram бот для віддаленого керування JARVIS
 import asyncio
 import logging
 import os
+import time
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler, ContextTypes
 import subprocess
@@ -20,6 +21,8 @@ class JarvisTelegramBot:
         self.authorized_users = authorized_users or []
         self.app = None
         self.jarvis_instance = None
+        # Мінімальний інтервал між редагуваннями потокової відповіді (ліміти Telegram)
+        self.stream_edit_interval = 1.0
         
     def set_jarvis_instance(self, jarvis):
         """Встановлення посилання на основний JARVIS"""
@@ -63,8 +66,7 @@ class JarvisTelegramBot:
             return
         
         if query.data == "status":
-            status = "🟢 Активний" if self.jarvis_instance and self.jarvis_instance.is_active else "🔴 Неактивний"
-            await query.edit_message_text(f"📊 Статус JARVIS: {status}")
+            await query.edit_message_text(self.get_status_text())
             
         elif query.data == "system_info":
             info = await self.get_system_info()
@@ -104,18 +106,72 @@ class JarvisTelegramBot:
         # Виконання команди через JARVIS
         if self.jarvis_instance:
             try:
-                await update.message.reply_text("🔄 Виконую команду...")
+                status_message = await update.message.reply_text("🔄 Виконую команду...")
                 
-                # Симуляція виконання команди
-                response = await self.jarvis_instance.execute_command(message_text)
+                # Потокова відповідь: повідомлення доповнюється по реченнях
+                streamed = []
+                last_edit = 0.0
                 
-                await update.message.reply_text(f"🤖 JARVIS: {response}")
+                async def on_sentence(sentence):
+                    nonlocal last_edit
+                    streamed.append(sentence)
+                    now = time.monotonic()
+                    if now - last_edit >= self.stream_edit_interval:
+                        last_edit = now
+                        await status_message.edit_text(f"🤖 JARVIS: {' '.join(streamed)} ✍️")
+                
+                response = await self.jarvis_instance.execute_command(
+                    message_text, on_sentence=on_sentence, session_id=f"telegram:{user_id}"
+                )
+                
+                await status_message.edit_text(f"🤖 JARVIS: {response}")
                 
             except Exception as e:
                 await update.message.reply_text(f"❌ Помилка виконання: {str(e)}")
         else:
             await update.message.reply_text("❌ JARVIS недоступний.")
     
+    async def handle_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обробка надісланих PDF файлів з повідомленнями про прогрес"""
+        user_id = update.effective_user.id
+        if not self.is_authorized(user_id):
+            await update.message.reply_text("❌ Доступ заборонено.")
+            return
+        
+        document = update.message.document
+        try:
+            from config import Config
+            from plugins.pdf_processor import process_pdf
+            
+            status_message = await update.message.reply_text(f"📄 Завантажую {document.file_name}...")
+            
+            file_path = Config.KNOWLEDGE_BASE_DIR / os.path.basename(document.file_name)
+            telegram_file = await document.get_file()
+            await telegram_file.download_to_drive(str(file_path))
+            
+            last_edit = 0.0
+            
+            async def on_progress(stage, done, total):
+                nonlocal last_edit
+                now = time.monotonic()
+                if now - last_edit < self.stream_edit_interval and done < total:
+                    return
+                last_edit = now
+                if stage == "map":
+                    await status_message.edit_text(f"📄 Аналіз {document.file_name}: {done}/{total} частин")
+                else:
+                    await status_message.edit_text(f"📄 Зведення аналізу {document.file_name}...")
+            
+            result = await process_pdf(str(file_path), progress=on_progress)
+            
+            if result.get("success"):
+                await status_message.edit_text(f"✅ {document.file_name} оброблено. {result['summary']}")
+            else:
+                await status_message.edit_text(f"❌ Помилка обробки PDF: {result.get('error')}")
+                
+        except Exception as e:
+            await update.message.reply_text(f"❌ Помилка обробки PDF: {str(e)}")
+    
     async def screenshot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Команда /screenshot"""
         user_id = update.effective_user.id
@@ -176,6 +232,22 @@ class JarvisTelegramBot:
         except Exception as e:
             return f"Помилка отримання інформації: {str(e)}"
     
+    def get_status_text(self):
+        """Стан JARVIS і черги бази знань"""
+        from plugins.kb_watcher import kb_watcher
+        
+        status = "🟢 Активний" if self.jarvis_instance and self.jarvis_instance.is_active else "🔴 Неактивний"
+        return f"📊 Статус JARVIS: {status}\n📚 Черга бази знань: {kb_watcher.status_text()}"
+    
+    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Команда /status"""
+        user_id = update.effective_user.id
+        if not self.is_authorized(user_id):
+            await update.message.reply_text("❌ Доступ заборонено.")
+            return
+        
+        await update.message.reply_text(self.get_status_text())
+    
     async def weather_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Команда /weather"""
         user_id = update.effective_user.id
@@ -220,10 +292,12 @@ class JarvisTelegramBot:
         """Налаштування обробників команд"""
         self.app.add_handler(CommandHandler("start", self.start_command))
         self.app.add_handler(CommandHandler("screenshot", self.screenshot_command))
+        self.app.add_handler(CommandHandler("status", self.status_command))
         self.app.add_handler(CommandHandler("weather", self.weather_command))
         self.app.add_handler(CommandHandler("apps", self.apps_command))
         self.app.add_handler(CallbackQueryHandler(self.button_callback))
         self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        self.app.add_handler(MessageHandler(filters.Document.PDF, self.handle_document))
     
     async def start_bot(self):
         """Запуск бота"""
@@ -12,6 +12,7 @@ from PIL import Image, ImageGrab
 import pytesseract
 import cv2
 import numpy as np
+from utils.executors import executors
 
 class VisualAssistant:
     def __init__(self):
@@ -64,8 +65,8 @@ class VisualAssistant:
     async def _extract_text(self, image):
         """Витягування тексту з зображення"""
         try:
-            # Конвертація в формат для OCR
-            text = pytesseract.image_to_string(image, lang='ukr+eng')
+            # OCR у пулі обчислень - не блокує event loop
+            text = await executors.run("cpu", pytesseract.image_to_string, image, 'ukr+eng')
             
             # Очищення тексту
             cleaned_text = ' '.join(text.split())
@@ -207,7 +208,7 @@ class VisualAssistant:
         """Спеціальний аналіз коду на екрані"""
         try:
             screenshot = ImageGrab.grab()
-            text = pytesseract.image_to_string(screenshot, lang='eng')
+            text = await executors.run("cpu", pytesseract.image_to_string, screenshot, 'eng')
             
             # Пошук ключових слів програмування
             code_keywords = [
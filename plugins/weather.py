@@ -8,12 +8,13 @@ import aiohttp
 import asyncio
 import logging
 from config import Config
+from utils.single_flight import single_flight
 
 class WeatherPlugin:
     def __init__(self):
         self.config = Config()
         self.api_key = self.config.WEATHER_API_KEY
-        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.base_url = self.config.WEATHER_API_URL
         
     async def get_weather(self, city=None):
         """
@@ -30,6 +31,11 @@ class WeatherPlugin:
         
         city = city or self.config.DEFAULT_CITY
         
+        # Одночасні запити погоди для того ж міста - один HTTP запит
+        return await single_flight.do(("weather", city.lower()), lambda: self._fetch_weather(city))
+    
+    async def _fetch_weather(self, city):
+        """HTTP запит поточної погоди для міста"""
         try:
             params = {
                 'q': city,
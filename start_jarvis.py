@@ -12,8 +12,8 @@ from pathlib import Path
 
 def check_python_version():
     """Перевірка версії Python"""
-    if sys.version_info < (3, 8):
-        print("ПОМИЛКА: Потрібен Python 3.8 або новіший")
+    if sys.version_info < (3, 9):
+        print("ПОМИЛКА: Потрібен Python 3.9 або новіший")
         print(f"Поточна версія: {sys.version}")
         return False
     
@@ -31,7 +31,7 @@ def check_dependencies():
         'PIL',
         'psutil',
         'numpy',
-        'openai'
+        'httpx'
     ]
     
     missing_packages = []
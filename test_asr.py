@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування рушіїв розпізнавання мовлення та потокових гіпотез
+"""
+
+import time
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+from benchmarks.asr_compare import transcribe, word_error_rate
+from config import Config
+from voice.asr import ASRBackend, GoogleASR, MultiLanguageRecognizer, RecognitionStream, create_asr_backend
+from voice.audio_stream import AudioStream
+
+RATE = 16000
+
+class CountingStream(RecognitionStream):
+    """Гіпотеза - по слову на кожну секунду мовлення (фрагменти з енергією)"""
+
+    def __init__(self, on_partial=None):
+        super().__init__(on_partial)
+        self.voiced = 0
+
+    def accept(self, pcm):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if samples.size and np.abs(samples).mean() > 1000:
+            self.voiced += samples.size
+        return " ".join(["слово"] * round(self.voiced / RATE))
+
+    def finish(self):
+        return self.accept(b"") or None
+
+class CountingASR(ASRBackend):
+    name = "counting"
+    streaming = True
+
+    @property
+    def available(self):
+        return True
+
+    def recognize_scored(self, pcm, sample_rate, language):
+        stream = self.start_stream(sample_rate, language)
+        stream.feed(pcm)
+        return stream.finish(), 1.0
+
+    def start_stream(self, sample_rate, language, on_partial=None):
+        return CountingStream(on_partial)
+
+class DelayedASR(ASRBackend):
+    """Локальний замінник хмарного рушія: відповідь мовою через заданий час"""
+
+    name = "delayed"
+
+    def __init__(self, replies):
+        super().__init__()
+        self.replies = replies  # мова -> (затримка, текст, впевненість) або виняток
+        self.started = []
+
+    @property
+    def available(self):
+        return True
+
+    def recognize_scored(self, pcm, sample_rate, language):
+        self.started.append(language)
+        reply = self.replies[language]
+        if isinstance(reply, Exception):
+            time.sleep(0.05)
+            raise reply
+        delay, text, confidence = reply
+        time.sleep(delay)
+        return text, confidence
+
+def _timed(recognizer):
+    started = time.monotonic()
+    result = recognizer.recognize(b"\0\0" * RATE, RATE)
+    return result, time.monotonic() - started
+
+def _signal():
+    t = np.arange(2 * RATE) / RATE
+    tone = (8000 * np.sin(2 * np.pi * 300 * t)).astype(np.int16)
+    silence = np.zeros(RATE // 2, dtype=np.int16)
+    return np.concatenate([silence, tone, silence, silence])
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    assert word_error_rate("Яка сьогодні погода?", "яка сьогодні погода") == 0
+    assert word_error_rate("відкрий браузер будь ласка", "відкрий браузер ласка") == 0.25
+
+def test_vosk_without_model_falls_back_to_google(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "VOSK_MODEL_PATHS", {"uk-UA": tmp_path / "missing"})
+    assert isinstance(create_asr_backend("vosk"), GoogleASR)
+    assert isinstance(create_asr_backend("auto"), GoogleASR)
+
+def test_backend_must_implement_recognition():
+    """Рушій лише з потоковим режимом не створюється без recognize_scored"""
+    class StreamOnly(ASRBackend):
+        available = True
+
+        def start_stream(self, sample_rate, language, on_partial=None):
+            return CountingStream(on_partial)
+
+    with pytest.raises(TypeError):
+        StreamOnly()
+    assert CountingASR().recognize(np.full(RATE, 4000, dtype=np.int16).tobytes(), RATE, "uk-UA") == "слово"
+
+def test_partials_arrive_while_phrase_is_recorded():
+    """Гіпотези надходять через tap джерела ще до повернення listen"""
+    signal = _signal()
+    offset = {"value": 0}
+
+    def reader(frames):
+        time.sleep(frames / RATE / 8)
+        chunk = signal[offset["value"]:offset["value"] + frames]
+        offset["value"] += frames
+        return chunk.tobytes()
+
+    stream = AudioStream(reader=reader)
+    stream.start()
+    partials = []
+    phrase = CountingASR().start_stream(RATE, "uk-UA", on_partial=lambda text: partials.append((time.monotonic(), text)))
+
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 300
+    recognizer.dynamic_energy_threshold = False
+    recognizer.pause_threshold = 0.3
+    recognizer.non_speaking_duration = 0.1
+    with stream.source(tap=phrase.feed) as source:
+        recognizer.listen(source, timeout=2, phrase_time_limit=4)
+    listen_returned = time.monotonic()
+    stream.stop()
+
+    assert [text for _, text in partials] == ["слово", "слово слово"]
+    assert partials[-1][0] < listen_returned
+    assert phrase.finish() == "слово слово"
+
+def test_compare_reports_final_hypothesis_lead():
+    """Фінальний текст відомий ще до кінця аудіо (запас для попередньої обробки)"""
+    result = transcribe(CountingASR(), _signal().tobytes(), RATE, "uk-UA", 1024)
+    assert result["text"] == "слово слово"
+    assert result["first_partial"] < result["duration"]
+    assert result["final_lead"] > 0.5
+
+def test_english_command_does_not_wait_for_ukrainian_attempt():
+    """Англійська команда: паралельно, без другого повного запиту після uk-UA"""
+    backend = DelayedASR({
+        "uk-UA": (0.4, "опен браузер", 0.3),
+        "en-US": (0.2, "open browser", 0.93)
+    })
+    result, elapsed = _timed(MultiLanguageRecognizer(backend, ["uk-UA", "en-US"], accept_confidence=0.8))
+
+    assert result == ("open browser", "en-US")
+    assert elapsed < 0.35  # послідовно було б 0.6 с
+
+def test_confident_primary_language_cancels_slower_candidate():
+    backend = DelayedASR({
+        "uk-UA": (0.05, "яка погода", 0.95),
+        "en-US": (0.5, "jacka pogoda", 0.4),
+        "de-DE": (0.5, "jaka pogoda", 0.2)
+    })
+    recognizer = MultiLanguageRecognizer(backend, ["uk-UA", "en-US", "de-DE"], accept_confidence=0.8)
+    result, elapsed = _timed(recognizer)
+
+    assert result == ("яка погода", "uk-UA")
+    assert elapsed < 0.3
+    assert recognizer.stats['early_accepts'] == 1 and recognizer.stats['abandoned'] == 2
+
+def test_low_confidence_waits_for_all_and_prefers_primary_on_tie():
+    backend = DelayedASR({"uk-UA": (0.15, "привіт", 0.6), "en-US": (0.05, "pretty", 0.6)})
+    assert _timed(MultiLanguageRecognizer(backend, ["uk-UA", "en-US"]))[0] == ("привіт", "uk-UA")
+
+    backend = DelayedASR({"uk-UA": (0.05, "хелоу", 0.4), "en-US": (0.15, "hello", 0.7)})
+    assert _timed(MultiLanguageRecognizer(backend, ["uk-UA", "en-US"]))[0] == ("hello", "en-US")
+
+def test_service_error_for_one_language_uses_the_other():
+    backend = DelayedASR({"uk-UA": sr.RequestError("offline"), "en-US": (0.05, "hello", 0.5)})
+    assert _timed(MultiLanguageRecognizer(backend, ["uk-UA", "en-US"]))[0] == ("hello", "en-US")
+
+    backend = DelayedASR({"uk-UA": sr.RequestError("offline"), "en-US": sr.RequestError("offline")})
+    try:
+        MultiLanguageRecognizer(backend, ["uk-UA", "en-US"]).recognize(b"", RATE)
+        assert False, "очікувалась помилка сервісу"
+    except sr.RequestError:
+        pass
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування безперервного потоку аудіо та кільцевого буфера
+"""
+
+import time
+import numpy as np
+import speech_recognition as sr
+
+from voice.audio_stream import AudioStream, RingBuffer
+
+RATE = 16000
+
+def _tone(seconds, amplitude=8000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+def _silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+class SignalReader:
+    """Джерело замість мікрофона: відтворює сигнал з прискоренням speedup"""
+
+    def __init__(self, signal, speedup=4.0):
+        self.signal = signal
+        self.offset = 0
+        self.speedup = speedup
+
+    def __call__(self, frames):
+        if self.offset >= len(self.signal):
+            return b""
+        time.sleep(frames / RATE / self.speedup)
+        chunk = self.signal[self.offset:self.offset + frames]
+        self.offset += frames
+        return chunk.tobytes()
+
+def _recognizer():
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 300
+    recognizer.dynamic_energy_threshold = False
+    recognizer.pause_threshold = 0.3
+    recognizer.non_speaking_duration = 0.1
+    return recognizer
+
+def test_ring_buffer_wraps_and_reports_overwritten_range():
+    """Перезаписані семпли не повертаються, початок зсувається"""
+    buffer = RingBuffer(8)
+    buffer.write(np.arange(5, dtype=np.int16))
+    buffer.write(np.arange(5, 11, dtype=np.int16))
+
+    start, samples = buffer.read(0, 11)
+    assert start == 3 and samples.tolist() == list(range(3, 11))
+
+    start, samples = buffer.read(9, 20)
+    assert start == 9 and samples.tolist() == [9, 10]
+
+def test_preroll_recovers_speech_started_before_listen():
+    """Фраза, що почалася до виклику listen, потрапляє в запис цілком"""
+    signal = np.concatenate([_silence(0.4), _tone(0.6), _silence(1.0)])
+    stream = AudioStream(reader=SignalReader(signal))
+    assert stream.start()
+
+    # Мовлення вже триває, коли споживач починає читати
+    stream.wait_for(int(0.6 * RATE), timeout=2)
+    with stream.source(preroll=0.5) as source:
+        audio = _recognizer().listen(source, timeout=2, phrase_time_limit=2)
+    stream.stop()
+
+    samples = np.frombuffer(audio.get_raw_data(), dtype=np.int16)
+    voiced = int(np.sum(np.abs(samples) > 1000))
+    assert voiced >= int(0.6 * RATE * 0.9)
+    assert stream.stats['dropped_samples'] == 0
+
+def test_shared_cursor_loses_no_audio_between_listens():
+    """Дві фрази поспіль читаються одним курсором без втрат між викликами"""
+    signal = np.concatenate([_silence(0.2), _tone(0.5), _silence(0.6), _tone(0.5), _silence(0.8)])
+    stream = AudioStream(reader=SignalReader(signal))
+    stream.start()
+    cursor = stream.cursor()
+    recognizer = _recognizer()
+
+    phrases = []
+    for _ in range(2):
+        with stream.source(cursor=cursor) as source:
+            phrases.append(recognizer.listen(source, timeout=2, phrase_time_limit=2))
+        # Імітація розпізнавання між викликами
+        time.sleep(0.2)
+    stream.stop()
+
+    for audio in phrases:
+        samples = np.frombuffer(audio.get_raw_data(), dtype=np.int16)
+        assert int(np.sum(np.abs(samples) > 1000)) >= int(0.5 * RATE * 0.9)
+    assert stream.stats['chunks'] > 0
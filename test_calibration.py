@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування профілів калібрування мікрофона
+"""
+
+import numpy as np
+
+from benchmarks.stubs import synthesize_word
+from voice.calibration import CalibrationStore, NoiseCalibrator
+
+RATE = 16000
+
+def _noise(seconds, level=60, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * RATE)) * level).astype(np.int16)
+
+def _calibrator(tmp_path, **kwargs):
+    store = CalibrationStore(tmp_path / "calibration_profiles.json")
+    return NoiseCalibrator("mic@16000", sample_rate=RATE, store=store, **kwargs)
+
+def test_profile_is_persisted_and_reused(tmp_path):
+    calibrator = _calibrator(tmp_path)
+    assert calibrator.profile is None
+    assert calibrator.update(_noise(5.0).tobytes()) == "initialized"
+
+    restarted = _calibrator(tmp_path)
+    assert restarted.profile is not None
+    assert restarted.profile['energy_threshold'] == calibrator.profile['energy_threshold']
+    assert _calibrator(tmp_path).store.load("other@16000") is None
+
+def test_speech_in_window_does_not_inflate_noise_estimate(tmp_path):
+    calibrator = _calibrator(tmp_path)
+    quiet = calibrator.measure(_noise(5.0).tobytes())
+
+    window = _noise(5.0, seed=1)
+    for offset, word in zip((0.3, 1.6, 2.9), ("відкрий", "браузер", "погода")):
+        speech = synthesize_word(word, seed=int(offset * 10), snr_db=80, pad=0.0)
+        start = int(offset * RATE)
+        window[start:start + len(speech)] += speech
+    assert abs(calibrator.measure(window.tobytes())['noise_db'] - quiet['noise_db']) < 3
+
+def test_recalibration_only_on_sustained_drift(tmp_path):
+    changes = []
+    calibrator = _calibrator(tmp_path, on_change=changes.append)
+    calibrator.update(_noise(5.0).tobytes())
+    baseline = calibrator.profile['noise_db']
+
+    # Поодинокий гучний епізод - не дрейф
+    assert calibrator.update(_noise(5.0, level=400, seed=2).tobytes()) == "drift"
+    assert calibrator.update(_noise(5.0, seed=3).tobytes()) == "refined"
+    assert abs(calibrator.profile['noise_db'] - baseline) < 1
+
+    # Стабільно гучніший шум (напр. увімкнено вентилятор)
+    results = [calibrator.update(_noise(5.0, level=400, seed=4 + i).tobytes()) for i in range(3)]
+    assert results == ["drift", "drift", "recalibrated"]
+    assert calibrator.profile['noise_db'] > baseline + 12
+    assert len(changes) == 2 and calibrator.stats['recalibrations'] == 1
+    assert _calibrator(tmp_path).profile['noise_db'] == calibrator.profile['noise_db']
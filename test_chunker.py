@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування розбиття тексту на частини
+"""
+
+from memory.chunker import iter_chunks
+from memory.tokenizer import count_tokens
+
+def _sentences(count, start=0):
+    return " ".join(f"Речення {i} про базу знань." for i in range(start, start + count))
+
+def test_chunks_follow_sentences_paragraphs_and_overlap():
+    sentence_tokens = count_tokens("Речення 0 про базу знань.")
+    text = f"{_sentences(2)}\n\n{_sentences(30, start=2)}"
+    chunks = list(iter_chunks(text, max_tokens=sentence_tokens * 5, overlap_tokens=sentence_tokens))
+
+    assert all(count_tokens(chunk) <= sentence_tokens * 5 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    # Короткий перший абзац не відрізається окремо, але межа абзацу зберігається
+    assert chunks[0].startswith("Речення 0") and "\n\nРечення 2" in chunks[0]
+    # Сусідні частини мають спільне речення
+    for previous, chunk in zip(chunks[1:], chunks[2:]):
+        last = previous.rsplit("Речення ", 1)[1]
+        assert chunk.startswith(f"Речення {last}")
+    assert "Речення 31 про базу знань." in chunks[-1]
+
+def test_stream_is_chunked_lazily_like_whole_text():
+    text = _sentences(50) + "\n\n" + " ".join(["слово"] * 400)
+    pieces = [text[i:i + 7] for i in range(0, len(text), 7)]
+    assert list(iter_chunks(iter(pieces), 40, 10)) == list(iter_chunks(text, 40, 10))
+    # Текст без розділових знаків ділиться по словах
+    assert all(count_tokens(chunk) <= 40 for chunk in iter_chunks(text, 40, 10))
+
+    consumed = []
+
+    def pages():
+        for page in range(10 ** 6):
+            consumed.append(page)
+            yield f"Сторінка {page}. "
+
+    next(iter_chunks(pages(), 40, 10))
+    assert len(consumed) < 20
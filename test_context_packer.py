@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування збирання контексту для GPT у бюджеті токенів
+"""
+
+import numpy as np
+from memory.context_packer import ContextPacker
+from memory.tokenizer import count_tokens, truncate_to_tokens
+
+def _chunk(words, start, end):
+    return " ".join(words[start:end])
+
+def test_overlapping_chunks_are_trimmed():
+    """Перекриття сусідніх частин PDF не потрапляє в контекст двічі"""
+    words = [f"слово{i}" for i in range(300)]
+    first, second = _chunk(words, 0, 150), _chunk(words, 100, 250)
+    candidates = [
+        {'text': first, 'score': 0.9, 'vector': None},
+        {'text': second, 'score': 0.8, 'vector': None},
+        {'text': _chunk(words, 120, 140), 'score': 0.7, 'vector': None}
+    ]
+
+    context = ContextPacker().pack(np.ones(4), candidates, max_tokens=10000)
+    assert context.split() == words[:250]
+
+def test_mmr_prefers_diverse_chunks_within_budget():
+    """Майже однакові фрагменти поступаються різноманітним; бюджет не перевищується"""
+    query = np.array([1.0, 1.0, 0.0])
+    candidates = [
+        {'text': "Python це мова програмування. " * 5, 'score': 0.95, 'vector': np.array([1.0, 0.9, 0.0])},
+        {'text': "Пайтон - мова програмування. " * 5, 'score': 0.94, 'vector': np.array([1.0, 0.9, 0.0])},
+        {'text': "Бібліотеки numpy та faiss. " * 5, 'score': 0.7, 'vector': np.array([0.2, 1.0, 0.3])},
+        {'text': "Нерелевантний фрагмент.", 'score': 0.05, 'vector': np.array([0.0, 0.0, 1.0])}
+    ]
+
+    packer = ContextPacker()
+    budget = count_tokens(candidates[0]['text']) + count_tokens(candidates[2]['text']) + 5
+    context = packer.pack(query, candidates, max_tokens=budget)
+
+    assert "Python" in context and "numpy" in context
+    assert "Пайтон" not in context and "Нерелевантний" not in context
+    assert count_tokens(context) <= budget
+
+def test_truncate_to_tokens_keeps_whole_sentences():
+    """Обрізання по межі речення"""
+    text = "Перше речення тут. Друге речення трохи довше за перше. Третє."
+    truncated = truncate_to_tokens(text, count_tokens("Перше речення тут.") + 2)
+    assert truncated == "Перше речення тут."
+    assert truncate_to_tokens(text, 1000) == text
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування розмовної пам'яті з фоновим підсумовуванням
+"""
+
+import asyncio
+import time
+import pytest
+
+from config import Config
+from memory.conversation import ConversationManager
+from memory.tokenizer import count_tokens
+
+@pytest.fixture
+def learner(tmp_path, monkeypatch):
+    """JarvisLearner з окремою тимчасовою базою даних"""
+    monkeypatch.setattr(Config, "DATABASE_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(Config, "KNOWLEDGE_BASE_DIR", tmp_path)
+    from memory.learner import JarvisLearner
+    return JarvisLearner()
+
+async def slow_summarizer(previous, turns):
+    await asyncio.sleep(0.05)
+    topics = [turn['user_input'].split()[-1] for turn in turns]
+    return f"{previous} {' '.join(topics)}".strip()
+
+def _prompt_tokens(history):
+    return count_tokens(history['summary']) + sum(count_tokens(m['content']) for m in history['messages'])
+
+def test_prompt_size_stays_flat(learner):
+    """Довга розмова: промпт у межах бюджету, підсумовування не блокує відповідь"""
+    manager = ConversationManager(learner=learner, summarizer=slow_summarizer)
+    session = manager.get("voice")
+
+    async def conversation():
+        sizes = []
+        for i in range(30):
+            started = time.perf_counter()
+            await session.add_turn(f"Розкажи детальніше про тему номер {i} тема{i}", "Відповідь JARVIS " * 15)
+            assert time.perf_counter() - started < 0.05
+            sizes.append(_prompt_tokens(session.prompt_history()))
+        return sizes
+
+    sizes = asyncio.run(conversation())
+
+    manager.wait_idle(timeout=5)
+    history = session.prompt_history()
+
+    assert max(sizes) <= Config.CONVERSATION_TOKEN_BUDGET
+    assert len(history['messages']) == 2 * Config.CONVERSATION_KEEP_TURNS
+    assert "тема0" in history['summary'] and "тема25" in history['summary']
+    manager.close()
+
+def test_session_survives_restart(learner):
+    """Підсумок та останні репліки відновлюються з JarvisLearner"""
+    manager = ConversationManager(learner=learner, summarizer=slow_summarizer)
+    session = manager.get("telegram:42")
+    for i in range(6):
+        asyncio.run(session.add_turn(f"Питання тема{i}", f"Відповідь {i}"))
+    manager.wait_idle(timeout=5)
+    manager.close()
+
+    restored = ConversationManager(learner=learner).get("telegram:42")
+    assert restored.summary == session.summary
+    assert [t['user_input'] for t in restored.turns] == [t['user_input'] for t in session.turns]
+    assert ConversationManager(learner=learner).get("gui").turns == []
+
+def test_extractive_summary_when_llm_fails(learner):
+    """Без GPT підсумок - останні питання користувача в межах бюджету"""
+    async def failing_summarizer(previous, turns):
+        raise RuntimeError("LLM недоступний")
+
+    manager = ConversationManager(learner=learner, summarizer=failing_summarizer)
+    session = manager.get("gui")
+    for i in range(Config.CONVERSATION_KEEP_TURNS + 3):
+        asyncio.run(session.add_turn(f"Питання тема{i}", "Відповідь"))
+    manager.wait_idle(timeout=5)
+
+    assert "тема0" in session.summary and "тема2" in session.summary
+    assert count_tokens(session.summary) <= Config.CONVERSATION_SUMMARY_TOKENS
+    manager.close()
+
+def test_fold_keeps_recent_turns_without_ids(learner, monkeypatch):
+    """Репліки без id (запис у базу не вдався) згортаються за позицією"""
+    monkeypatch.setattr(learner, "append_conversation_turn", lambda *args: None)
+    manager = ConversationManager(learner=learner, summarizer=slow_summarizer)
+    session = manager.get("voice")
+
+    async def conversation():
+        for i in range(Config.CONVERSATION_KEEP_TURNS + 2):
+            await session.add_turn(f"Питання тема{i}", "Відповідь")
+
+    asyncio.run(conversation())
+    manager.wait_idle(timeout=5)
+
+    assert len(session.turns) == Config.CONVERSATION_KEEP_TURNS
+    assert session.turns[0]['user_input'] == "Питання тема2"
+    assert "тема1" in session.summary
+    manager.close()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування пулів потоків підсистем
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from utils.executors import Executors, MonitoredExecutor
+
+def test_busy_cpu_pool_does_not_delay_audio(monkeypatch):
+    """Завантажений пул обчислень не затримує прослуховування"""
+    monkeypatch.setattr("config.Config.EXECUTOR_WORKERS", {"audio": 1, "cpu": 2})
+    executors = Executors()
+    release = threading.Event()
+
+    async def scenario():
+        # Повільні OCR/ембедінги займають усі потоки пулу cpu і чергу
+        slow = [asyncio.ensure_future(executors.run("cpu", release.wait, 5)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        result = await executors.run("audio", lambda: "фраза")
+        elapsed = time.perf_counter() - started
+        stats = executors.get_statistics()
+        release.set()
+        await asyncio.gather(*slow)
+        return result, elapsed, stats
+
+    result, elapsed, stats = asyncio.run(scenario())
+    executors.shutdown()
+
+    assert result == "фраза" and elapsed < 0.5
+    assert stats["cpu"]["active"] == 2 and stats["cpu"]["queued"] == 4
+    assert stats["audio"]["queued"] == 0 and stats["audio"]["completed"] == 1
+
+def test_saturation_is_reported_and_counted(caplog):
+    executor = MonitoredExecutor("db", max_workers=1, queue_warning=3)
+    release = threading.Event()
+    with caplog.at_level(logging.WARNING):
+        futures = [executor.submit(release.wait, 5)]
+        while executor.active == 0:
+            time.sleep(0.001)
+        futures += [executor.submit(release.wait, 5) for _ in range(4)]
+        failed = executor.submit(lambda: 1 / 0)
+    release.set()
+    for future in futures:
+        future.result()
+    assert failed.exception() is not None
+    executor.shutdown()
+
+    stats = executor.get_statistics()
+    # Попередження одне (обмежене інтервалом), насичень - кожна подача понад поріг
+    assert sum("Пул 'db' насичений" in record.message for record in caplog.records) == 1
+    assert stats["saturations"] == 3 and stats["max_queued"] == 5
+    assert stats["completed"] == 5 and stats["failed"] == 1 and stats["queued"] == 0
+
+def test_shutdown_drains_db_and_logs_lost_failures(monkeypatch, caplog):
+    """Записи в черзі db виконуються при зупинці, помилки фонових завдань - у лозі"""
+    monkeypatch.setattr("config.Config.EXECUTOR_WORKERS", {"cpu": 1, "db": 1})
+    executors = Executors()
+    release = threading.Event()
+    written = []
+
+    executors.submit("cpu", release.wait, 5)
+    queued_cpu = executors.submit("cpu", lambda: "обчислення")
+    executors.submit("db", release.wait, 5)
+    writes = [executors.submit("db", written.append, i) for i in range(3)]
+    with caplog.at_level(logging.ERROR):
+        failed = executors.submit("db", lambda: 1 / 0)
+        threading.Timer(0.05, release.set).start()
+        executors.shutdown(wait=True)
+
+    assert queued_cpu.cancelled()
+    assert written == [0, 1, 2] and all(future.done() for future in writes)
+    assert isinstance(failed.exception(), ZeroDivisionError)
+    assert sum("у пулі 'db'" in record.message for record in caplog.records) == 1
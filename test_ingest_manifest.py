@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування інкрементального наповнення бази знань
+"""
+
+import os
+import time
+import asyncio
+import threading
+
+import numpy as np
+
+from memory.ingest_manifest import ChunkMatcher, IngestManifest
+from plugins.ingest_pipeline import IngestPipeline
+
+class FakeStore:
+    """Векторна база з інтерфейсом конвеєра наповнення"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.documents = {}
+        self.next_id = 0
+        self.embedded = []
+
+    def embed(self, texts):
+        time.sleep(self.delay)
+        self.embedded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def add_embeddings(self, texts, vectors, metadatas):
+        return self.add_documents(texts, metadatas)
+
+    def add_documents(self, texts, metadatas=None):
+        ids = []
+        for text, metadata in zip(texts, metadatas):
+            self.documents[self.next_id] = (text, metadata)
+            ids.append(self.next_id)
+            self.next_id += 1
+        return ids
+
+    def remove_documents(self, ids):
+        return sum(self.documents.pop(doc_id, None) is not None for doc_id in ids)
+
+class PagesExtractor:
+    """PDF з заданими сторінками (коротка сторінка - одна частина)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def iter_pages(self, path):
+        yield from self.pages
+
+    def extract_text(self, path):
+        return "".join(self.pages)
+
+def _ingest(pipeline, path, pages):
+    unchanged, content_hash = pipeline.manifest.check(path)
+    if unchanged:
+        return None
+    pipeline.extractor = PagesExtractor(pages)
+    return asyncio.run(pipeline.run(path, content_hash))
+
+def test_only_changed_chunks_are_embedded_and_removed_ones_deleted(tmp_path):
+    store = FakeStore()
+    pipeline = IngestPipeline(store, IngestManifest(tmp_path / "manifest.json"), None)
+    path = tmp_path / "book.pdf"
+    path.write_bytes(b"v1")
+
+    first = _ingest(pipeline, path, ["Вступ.", "Розділ 1.", "Розділ 2.", "Висновки."])
+    assert first["added"] == 4 and len(store.documents) == 4
+
+    # Той самий файл - пропуск без хешування і векторизації
+    assert _ingest(pipeline, path, ["Вступ."]) is None
+
+    # Новий час зміни, той самий вміст - теж пропуск
+    os.utime(path, (1, 1))
+    assert _ingest(pipeline, path, ["Вступ."]) is None
+
+    # Правка: один розділ змінено, висновки видалено, додано додаток
+    path.write_bytes(b"v2")
+    store.embedded.clear()
+    second = _ingest(pipeline, path, ["Вступ.", "Розділ 1 (нова редакція).", "Розділ 2.", "Додаток."])
+    assert store.embedded == ["Розділ 1 (нова редакція).", "Додаток."]
+    assert (second["added"], second["kept"], second["removed"]) == (2, 2, 2)
+    assert sorted(text for text, _ in store.documents.values()) == sorted(
+        ["Вступ.", "Розділ 1 (нова редакція).", "Розділ 2.", "Додаток."]
+    )
+
+    # Маніфест переживає перезапуск і вказує на актуальні вектори
+    reloaded = IngestManifest(tmp_path / "manifest.json")
+    assert set(reloaded.vector_ids(reloaded.get(path))) == set(store.documents)
+    assert [store.documents[chunk['vector_id']][1]['page'] for chunk in reloaded.get(path)['chunks']] == [0, 1, 2, 3]
+
+    path.unlink()
+    assert reloaded.missing() == [reloaded.key(path)]
+
+def test_duplicate_chunks_keep_separate_vectors():
+    recorded = [{"hash": "a", "vector_id": 1}, {"hash": "a", "vector_id": 2}, {"hash": "b", "vector_id": 3}]
+    matcher = ChunkMatcher(recorded)
+    assert [matcher.match(h) for h in ["a", "c", "a"]] == [1, None, 2]
+    assert matcher.removed() == [3]
+
+def test_same_file_from_two_loops_is_ingested_once(tmp_path):
+    """Спостерігач (свій потік і loop) і Telegram додають той самий файл одночасно"""
+    store = FakeStore(delay=0.1)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    pipeline = IngestPipeline(store, manifest, PagesExtractor(["Вступ.", "Розділ."]))
+    path = tmp_path / "book.pdf"
+    path.write_bytes(b"v1")
+    results = []
+
+    async def process():
+        async with manifest.locked(path):
+            unchanged, content_hash = manifest.check(path)
+            if unchanged:
+                results.append("skipped")
+                return
+            # Векторизація в пулі cpu - loop вільний
+            await pipeline.run(path, content_hash)
+            results.append("ingested")
+
+    async def second():
+        waiting = asyncio.create_task(process())
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        tick = time.perf_counter() - started
+        await waiting
+        return tick
+
+    watcher = threading.Thread(target=asyncio.run, args=(process(),))
+    watcher.start()
+    time.sleep(0.02)
+    # Поки файл зайнятий іншим потоком, event loop очікувача не блокується
+    assert asyncio.run(second()) < 0.05
+    watcher.join()
+
+    assert sorted(results) == ["ingested", "skipped"]
+    assert store.embedded == ["Вступ.", "Розділ."]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування конвеєра наповнення бази знань
+"""
+
+import time
+import asyncio
+
+import numpy as np
+import pytest
+
+from memory.ingest_manifest import IngestManifest
+from plugins.ingest_pipeline import IngestPipeline
+
+class FakeStore:
+    """Векторна база з повільною векторизацією"""
+
+    def __init__(self, delay=0.0, fail_on_batch=None):
+        self.delay = delay
+        self.fail_on_batch = fail_on_batch
+        self.documents = {}
+        self.next_id = 0
+        self.batches = []
+        self.commits = []
+
+    def embed(self, texts):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        if self.fail_on_batch == len(self.batches):
+            return None
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def add_embeddings(self, texts, vectors, metadatas):
+        assert len(vectors) == len(texts) == len(metadatas)
+        self.commits.append(len(texts))
+        return self.add_documents(texts, metadatas)
+
+    def add_documents(self, texts, metadatas):
+        ids = list(range(self.next_id, self.next_id + len(texts)))
+        self.next_id += len(texts)
+        self.documents.update(zip(ids, zip(texts, metadatas)))
+        return ids
+
+    def remove_documents(self, ids):
+        return sum(self.documents.pop(doc_id, None) is not None for doc_id in ids)
+
+class FakeExtractor:
+    def __init__(self, pages, store=None):
+        self.pages = pages
+        self.store = store
+        self.read = 0
+        self.lag = []
+
+    def iter_pages(self, path):
+        for page in self.pages:
+            self.read += 1
+            if self.store is not None:
+                self.lag.append(self.read - sum(self.store.batches))
+            yield page
+
+    def extract_text(self, path):
+        return "".join(self.pages)
+
+def _pages(count, edited=()):
+    return [
+        f"Сторінка {page} {'оновлена' if page in edited else 'перша редакція'}. Опис налаштувань асистента.\n"
+        for page in range(count)
+    ]
+
+def _pipeline(store, extractor, tmp_path, analyze=None):
+    pipeline = IngestPipeline(store, IngestManifest(tmp_path / "manifest.json"), extractor, analyze)
+    pipeline.config.INGEST_QUEUE_SIZE = 2
+    pipeline.config.INGEST_EMBED_BATCH = 4
+    pipeline.config.INGEST_INDEX_COMMIT = 8
+    return pipeline
+
+def test_stages_overlap_batch_and_ingest_incrementally(tmp_path):
+    path = tmp_path / "book.pdf"
+    path.write_bytes(b"v1")
+    store = FakeStore(delay=0.03)
+
+    async def analyze(text, source, progress):
+        await asyncio.sleep(0.3)
+        return {"summary": f"{len(text.split())} слів"}
+
+    pipeline = _pipeline(store, FakeExtractor(_pages(40), store), tmp_path, analyze)
+    started = time.perf_counter()
+    result = asyncio.run(pipeline.run(path, "hash-1"))
+    elapsed = time.perf_counter() - started
+
+    # Аналіз (0.3 с) іде паралельно з векторизацією (10 пакетів по 0.03 с)
+    assert elapsed < 0.5
+    assert (result['pages'], result['chunks'], result['added'], result['kept']) == (40, 40, 40, 0)
+    assert store.batches == [4] * 10 and store.commits == [8] * 5
+    # Зворотний тиск: читання сторінок не випереджає векторизацію більше ніж на кілька черг
+    assert max(pipeline.extractor.lag) <= 12
+    stages = result['report']['stages']
+    assert stages['embed']['items'] == 40 and stages['index']['commits'] == 5
+    assert stages['extract']['blocked'] > 0
+    assert result['report']['bottleneck'] in ("embed", "analyze")
+    analysis_ids = pipeline.manifest.get(path)['analysis_ids']
+    assert store.documents[analysis_ids[0]][1]['source'] == "pdf_gpt_analysis"
+
+    # Правка двох сторінок і скорочення документа: лише нові частини векторизуються
+    path.write_bytes(b"v2")
+    store.batches.clear()
+    pipeline.extractor = FakeExtractor(_pages(30, edited={3, 7}))
+    result = asyncio.run(pipeline.run(path, "hash-2"))
+    assert store.batches == [2]
+    assert (result['added'], result['kept'], result['removed']) == (2, 28, 12)
+    entry = pipeline.manifest.get(path)
+    assert set(pipeline.manifest.vector_ids(entry)) == set(store.documents)
+    assert store.documents[entry['chunks'][3]['vector_id']][1]['page'] == 3
+
+def test_failure_rolls_back_vectors_and_keeps_manifest(tmp_path):
+    path = tmp_path / "book.pdf"
+    path.write_bytes(b"v1")
+    store = FakeStore(delay=0.02, fail_on_batch=5)
+    pipeline = _pipeline(store, FakeExtractor(_pages(40)), tmp_path)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.run(path, "hash-1"))
+
+    # Дві групи вже були в індексі - їх прибрано
+    assert store.commits == [8, 8]
+    assert store.documents == {} and pipeline.manifest.get(path) is None
+    assert pipeline.get_statistics()['failed'] == 1
+
+    pipeline.extractor = FakeExtractor(["   \n"])
+    with pytest.raises(ValueError):
+        asyncio.run(pipeline.run(path, "hash-1"))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування фонового додавання PDF з папки бази знань
+"""
+
+import time
+import threading
+
+from plugins.kb_watcher import KnowledgeBaseWatcher
+
+class FakeProcessor:
+    """Обробник PDF, що запам'ятовує виклики"""
+
+    def __init__(self):
+        self.ingested = []
+        self.forgotten = []
+
+    async def process_pdf_file(self, path):
+        with open(path, "rb") as f:
+            self.ingested.append((path.rsplit("/", 1)[-1], f.read()))
+        return {"success": True}
+
+    async def forget_pdf(self, path):
+        self.forgotten.append(path.name)
+        return 1
+
+    async def prune_missing_pdfs(self):
+        return 0
+
+def _wait(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+def test_partial_writes_are_debounced_and_ingested_only_when_idle(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.Config.KB_WATCH_DEBOUNCE_SECONDS", 0.3)
+    monkeypatch.setattr("config.Config.KB_WATCH_POLL_SECONDS", 0.05)
+    monkeypatch.setattr("config.Config.KB_WATCH_IDLE_CHECK_SECONDS", 0.05)
+    monkeypatch.setattr("config.Config.KB_WATCH_QUEUE_SIZE", 1)
+    (tmp_path / "notes.txt").write_text("не PDF")
+    processor = FakeProcessor()
+    idle = threading.Event()
+    watcher = KnowledgeBaseWatcher(tmp_path, processor, use_inotify=False)
+    watcher.start(is_idle=idle.is_set)
+    try:
+        # Повільне копіювання: частини з паузами, коротшими за debounce
+        path = tmp_path / "manual.pdf"
+        for part in (b"%PDF-", b"part1", b"part2"):
+            with open(path, "ab") as f:
+                f.write(part)
+            time.sleep(0.15)
+        for name in ("a.pdf", "b.pdf"):
+            (tmp_path / name).write_bytes(b"%PDF-small")
+
+        # Асистент зайнятий: файли чекають у черзі (та поза нею, бо черга на 1 елемент)
+        assert _wait(lambda: watcher.stats["deferred"] > 0)
+        assert processor.ingested == [] and watcher.get_statistics()["queue_depth"] == 1
+        assert "очікує" in watcher.status_text()
+
+        idle.set()
+        assert _wait(lambda: len(processor.ingested) == 3)
+        assert sorted(processor.ingested) == [
+            ("a.pdf", b"%PDF-small"), ("b.pdf", b"%PDF-small"), ("manual.pdf", b"%PDF-part1part2")
+        ]
+
+        (tmp_path / "a.pdf").unlink()
+        assert _wait(lambda: processor.forgotten == ["a.pdf"])
+    finally:
+        watcher.stop()
+
+    stats = watcher.get_statistics()
+    assert stats["processed"] == 3 and stats["removed"] == 1 and stats["failed"] == 0
+    assert stats["mode"] == "polling" and stats["pending"] == 0
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування асинхронного LLM клієнта на локальному OpenAI-сумісному стенді
+"""
+
+import asyncio
+import time
+import pytest
+
+from benchmarks.stubs import FakeOpenAIServer
+from plugins.llm_client import LLMClient, LLMTimeoutError
+
+MESSAGES = [{"role": "user", "content": "Привіт"}]
+
+def test_chat_and_stream():
+    """Звичайна та потокова відповіді збігаються; з'єднання перевикористовується"""
+    async def scenario():
+        async with FakeOpenAIServer(latency=0.01, token_delay=0.001, reply="Перше речення. Друге.") as server:
+            client = LLMClient(api_key="test", base_url=f"{server.url}/v1")
+            full = await client.chat(MESSAGES)
+            deltas = [delta async for delta in client.stream_chat(MESSAGES)]
+            pool = client._get_client()
+            await client.aclose()
+            return full, deltas, pool
+
+    full, deltas, pool = asyncio.run(scenario())
+    assert full == "Перше речення. Друге."
+    assert len(deltas) > 1 and "".join(deltas) == full
+    assert pool.is_closed
+
+def test_timeout_and_cancellation():
+    """Таймаут запиту та скасування не чекають на повільний сервер"""
+    async def scenario():
+        async with FakeOpenAIServer(latency=1.0) as server:
+            client = LLMClient(api_key="test", base_url=f"{server.url}/v1")
+
+            with pytest.raises(LLMTimeoutError):
+                await client.chat(MESSAGES, timeout=0.1)
+
+            started = time.perf_counter()
+            task = asyncio.create_task(client.chat(MESSAGES))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            elapsed = time.perf_counter() - started
+
+            await client.aclose()
+            return elapsed
+
+    assert asyncio.run(scenario()) < 1.0
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування політики надійності LLM на стенді з інжекцією збоїв
+"""
+
+import asyncio
+import time
+import pytest
+
+from benchmarks.stubs import FaultInjectingOpenAIServer, HashingEncoder
+from memory.response_cache import ResponseCache
+from plugins import gpt_integration as gpt_module
+from plugins.llm_client import LLMClient, LLMHTTPError
+from plugins.llm_policy import ResilientLLMTransport, CircuitBreaker, CircuitOpenError, DegradedResponse
+
+MESSAGES = [{"role": "user", "content": "Привіт"}]
+REPLY = "Відповідь стенду."
+
+def _transport(server, **overrides):
+    transport = ResilientLLMTransport(LLMClient(api_key="test", base_url=f"{server.url}/v1"))
+    transport.config.LLM_RETRY_BASE_DELAY = 0.01
+    for name, value in overrides.items():
+        setattr(transport.config, name, value)
+    return transport
+
+def test_retries_honour_retry_after():
+    """5xx та 429 повторюються; Retry-After враховується, швидкість знижується"""
+    async def scenario():
+        async with FaultInjectingOpenAIServer(faults=[503, 429], retry_after="0.2", latency=0.01, reply=REPLY) as server:
+            transport = _transport(server)
+            started = time.perf_counter()
+            response = await transport.chat(MESSAGES)
+            elapsed = time.perf_counter() - started
+            await transport.aclose()
+            return response, elapsed, server.request_count, transport
+
+    response, elapsed, request_count, transport = asyncio.run(scenario())
+    assert response == REPLY
+    assert request_count == 3 and elapsed >= 0.2
+    assert transport.stats['retries'] == 2 and transport.stats['rate_limited'] == 1
+    assert transport.bucket.rate < transport.bucket.max_rate
+
+def test_circuit_breaker_fails_fast_to_fallback(monkeypatch):
+    """Відкритий circuit breaker не робить запитів; відповідь - з кешу або бази знань"""
+    cache = ResponseCache(encoder=HashingEncoder())
+    cache.config.RESPONSE_CACHE_INTENT_TTL = {"general": 0.01}
+    monkeypatch.setattr(gpt_module, "response_cache", cache)
+
+    async def scenario():
+        async with FaultInjectingOpenAIServer(fault_rate=1.0, latency=0.01) as server:
+            transport = _transport(server, LLM_MAX_RETRIES=1)
+            transport.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+            monkeypatch.setattr(gpt_module.gpt_integration, "client", transport)
+
+            with pytest.raises(LLMHTTPError):
+                await transport.chat(MESSAGES)
+            requests_when_opened = server.request_count
+
+            started = time.perf_counter()
+            with pytest.raises(CircuitOpenError):
+                await transport.chat(MESSAGES)
+            rejected_in = time.perf_counter() - started
+
+            cache.put("Що таке JARVIS?", "Персональний асистент.")
+            await asyncio.sleep(0.02)
+            stale = await gpt_module.ask_gpt("Що таке JARVIS?")
+            local = await gpt_module.ask_gpt("Що таке FAISS?", context="FAISS - бібліотека пошуку векторів.")
+
+            await transport.aclose()
+            return requests_when_opened, server.request_count, rejected_in, stale, local
+
+    requests_when_opened, request_count, rejected_in, stale, local = asyncio.run(scenario())
+    assert requests_when_opened == 2 and request_count == 2
+    assert rejected_in < 0.05
+    assert isinstance(stale, DegradedResponse) and stale == "Персональний асистент."
+    assert isinstance(local, DegradedResponse) and "бібліотека пошуку векторів" in local
+    # Відповіді без LLM не повертаються в кеш
+    assert cache.get_statistics()['entries'] == 0
+
+def test_hedged_request_bounds_tail_latency():
+    """Запит, довший за p95, дублюється; перемагає швидша відповідь"""
+    async def scenario():
+        async with FaultInjectingOpenAIServer(faults=[("slow", 1.0)], latency=0.02, reply=REPLY) as server:
+            transport = _transport(server, LLM_HEDGE_MIN_SAMPLES=5, LLM_HEDGE_MIN_DELAY=0.05)
+            transport.hedging_enabled = True
+            for _ in range(10):
+                transport.latency.record(0.05)
+
+            started = time.perf_counter()
+            response = await transport.chat(MESSAGES)
+            elapsed = time.perf_counter() - started
+            await transport.aclose()
+            return response, elapsed, transport.stats
+
+    response, elapsed, stats = asyncio.run(scenario())
+    assert response == REPLY
+    assert elapsed < 0.5
+    assert stats['hedged'] == 1 and stats['hedge_wins'] == 1
+
+def test_cancelled_probe_reopens_circuit():
+    """Скасований пробний запит не лишає breaker у half_open назавжди"""
+    async def scenario():
+        async with FaultInjectingOpenAIServer(latency=0.3, reply=REPLY) as server:
+            transport = _transport(server)
+            transport.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+            transport.breaker.record_failure()
+            await asyncio.sleep(0.06)
+
+            probe = asyncio.create_task(transport.chat(MESSAGES))
+            await asyncio.sleep(0.05)
+            assert transport.breaker.state == "half_open"
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            state_after_cancel = transport.breaker.state
+
+            # Після reset_timeout - новий пробний запит
+            await asyncio.sleep(0.06)
+            response = await transport.chat(MESSAGES)
+
+            # Непередбачена помилка пробного запиту - теж невдача
+            transport.breaker.record_failure()
+            await asyncio.sleep(0.06)
+
+            async def broken_chat(messages, **kwargs):
+                raise ValueError("некоректна відповідь")
+
+            transport.client.chat = broken_chat
+            with pytest.raises(ValueError):
+                await transport.chat(MESSAGES)
+            await transport.aclose()
+            return state_after_cancel, response, transport.breaker.state
+
+    state_after_cancel, response, final_state = asyncio.run(scenario())
+    assert state_after_cancel == "open"
+    assert response == REPLY
+    assert final_state == "open"
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування провайдерів LLM та маршрутизації між локальною і віддаленою моделлю
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.stubs import FakeOpenAIServer, HashingEncoder
+from memory.response_cache import ResponseCache
+from plugins import gpt_integration as gpt_module
+from plugins.llm_client import LLMClient
+from plugins.llm_providers import LLMProvider, LocalLlamaProvider, LLMRouter, OpenAIProvider
+
+LOCAL_REPLY = "Локальна відповідь."
+
+class FakeLlama:
+    """Замінник llama_cpp.Llama з тим самим методом create_chat_completion"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create_chat_completion(self, messages, max_tokens, temperature, stream=False):
+        self.calls.append(messages)
+        if stream:
+            return iter(
+                {"choices": [{"delta": {"content": word}}]}
+                for word in ("Локальна ", "відповідь.")
+            )
+        return {"choices": [{"message": {"content": LOCAL_REPLY}}]}
+
+def _router(server=None, backend="auto"):
+    remote = OpenAIProvider(LLMClient(api_key="test", base_url=f"{server.url}/v1")) if server else None
+    router = LLMRouter(remote=remote, local=LocalLlamaProvider(model=FakeLlama()))
+    router.config.LLM_BACKEND = backend
+    return router
+
+def test_router_prefers_local_for_short_questions():
+    """Короткі загальні питання - локально, розгорнуті та знання - віддалено"""
+    async def scenario():
+        async with FakeOpenAIServer(latency=0.01) as server:
+            router = _router(server)
+            simple = router.select("general", "Котра година в Києві?")
+            long_form = router.select("general", "Поясни детально, як працює фотосинтез")
+            knowledge = router.select("knowledge", "Що таке JARVIS?")
+            await router.remote.aclose()
+            return simple, long_form, knowledge
+
+    simple, long_form, knowledge = asyncio.run(scenario())
+    assert [p.name for p in simple] == ["local", "openai"]
+    assert [p.name for p in long_form] == ["openai", "local"]
+    assert [p.name for p in knowledge] == ["openai", "local"]
+
+    # Без API ключа все обробляє локальна модель
+    offline = _router()
+    assert [p.name for p in offline.select("knowledge", "Що таке JARVIS?")] == ["local"]
+
+def test_local_model_serves_offline(monkeypatch):
+    """Без API ключа ask_gpt відповідає локальною моделлю, у т.ч. потоково"""
+    integration = gpt_module.GPTIntegration()
+    integration.router = _router()
+    monkeypatch.setattr(gpt_module, "gpt_integration", integration)
+    monkeypatch.setattr(gpt_module, "response_cache", ResponseCache(encoder=HashingEncoder()))
+
+    async def scenario():
+        answer = await gpt_module.ask_gpt("Скажи щось", intent="search")
+        streamed = [delta async for delta in gpt_module.ask_gpt_stream("Скажи ще щось", intent="search")]
+        batch = await integration.batch_chat_completion([
+            [{"role": "user", "content": "Перше"}],
+            [{"role": "user", "content": "Друге"}]
+        ])
+        await integration.warmup()
+        return answer, streamed, batch
+
+    answer, streamed, batch = asyncio.run(scenario())
+    assert answer == LOCAL_REPLY
+    assert "".join(streamed) == LOCAL_REPLY
+    assert batch == [LOCAL_REPLY, LOCAL_REPLY]
+    assert integration.router.stats["local"] == 3
+    # Прогрів - одна генерація одного токена
+    assert len(integration.router.local.model.calls) == 5
+
+def test_remote_failure_falls_back_to_local():
+    """Помилка віддаленого API не лишає користувача без відповіді"""
+    integration = gpt_module.GPTIntegration()
+    integration.router = _router()
+    integration.client = LLMClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+
+    async def scenario():
+        response = await integration.chat_completion(
+            [{"role": "user", "content": "Поясни детально теорію відносності"}],
+            intent="general", question="Поясни детально теорію відносності"
+        )
+        await integration.client.aclose()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response == LOCAL_REPLY
+    assert integration.router.stats == {"local": 1}
+
+def test_provider_must_implement_interface():
+    """Провайдер без stream_chat не створюється"""
+    class ChatOnly(LLMProvider):
+        available = True
+
+        async def chat(self, messages, **kwargs):
+            return LOCAL_REPLY
+
+    with pytest.raises(TypeError):
+        ChatOnly()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування map-reduce аналізу PDF
+"""
+
+import json
+import asyncio
+
+from plugins.llm_policy import DegradedResponse
+from plugins.pdf_analyzer import PDFAnalyzer
+
+class FakeLLM:
+    """LLM з затримкою, що повертає аналіз номера частини"""
+
+    available = True
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.map_calls = []
+        self.reduce_calls = 0
+
+    async def chat_completion(self, messages, max_tokens=1000, intent=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+
+        content = messages[-1]["content"]
+        if content.startswith("["):
+            self.reduce_calls += 1
+            parts = json.loads(content)
+            return json.dumps({
+                "summary": " ".join(p["summary"] for p in parts),
+                "key_points": [k for p in parts for k in p["key_points"]],
+                "topics": ["документ"],
+                "actionable_items": []
+            }, ensure_ascii=False)
+
+        index = int(content.split()[1].rstrip(":"))
+        self.map_calls.append(index)
+        if index in self.failing:
+            return DegradedResponse("OpenAI API недоступний")
+        return json.dumps({"summary": f"Частина {index}.", "key_points": [f"пункт {index}"], "topics": ["документ"]})
+
+def _analyzer(llm, tmp_path):
+    analyzer = PDFAnalyzer(llm)
+    analyzer.config.PDF_ANALYSIS_CHUNK_TOKENS = 25
+    analyzer.config.PDF_ANALYSIS_CONCURRENCY = 3
+    analyzer.config.PDF_ANALYSIS_REDUCE_FANOUT = 4
+    analyzer.config.PDF_ANALYSIS_MAX_ITEMS = 100
+    analyzer.config.PDF_ANALYSIS_CHECKPOINT_DIR = tmp_path / "checkpoints"
+    return analyzer
+
+def _document(sections):
+    return " ".join(f"Розділ {i}: опис налаштувань асистента та бази знань." for i in range(sections))
+
+def test_all_chunks_are_analysed_with_bounded_concurrency(tmp_path):
+    """Аналізується весь документ, а не перші 4000 символів"""
+    llm = FakeLLM()
+    analyzer = _analyzer(llm, tmp_path)
+    text = _document(20)
+    chunks = analyzer.split_chunks(text)
+    events = []
+
+    analysis = asyncio.run(analyzer.analyze(text, progress=lambda stage, done, total: events.append((stage, done, total))))
+
+    assert len(chunks) == 20 and len(text) > 1000
+    assert sorted(llm.map_calls) == list(range(20))
+    assert llm.max_in_flight == 3
+    # 20 частин -> 5 зведень -> 2 групи (одна з одного аналізу, без запиту) -> 1
+    assert llm.reduce_calls == 5 + 1 + 1
+    assert analysis["chunks_analyzed"] == analysis["chunks_total"] == 20
+    assert analysis["key_points"] == [f"пункт {i}" for i in range(20)]
+    assert ("map", 20, 20) in events and events[-1][0] == "reduce"
+    assert not list((tmp_path / "checkpoints").glob("*.json"))
+
+def test_analysis_resumes_from_checkpoint(tmp_path):
+    """Після збою аналізуються лише частини без збереженого результату"""
+    text = _document(10)
+
+    first = FakeLLM(failing={2, 7})
+    partial = asyncio.run(_analyzer(first, tmp_path).analyze(text, source="doc.pdf"))
+    assert partial["chunks_analyzed"] == 8
+    assert len(list((tmp_path / "checkpoints").glob("*.json"))) == 1
+
+    second = FakeLLM()
+    analyzer = _analyzer(second, tmp_path)
+    complete = asyncio.run(analyzer.analyze(text, source="doc.pdf"))
+
+    assert sorted(second.map_calls) == [2, 7]
+    assert analyzer.stats['chunks_resumed'] == 8
+    assert complete["chunks_analyzed"] == 10
+    assert not list((tmp_path / "checkpoints").glob("*.json"))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування паралельного витягування тексту PDF
+"""
+
+import fitz
+
+from plugins import pdf_extractor as extractor_module
+from plugins.pdf_extractor import PDFExtractor, extract_range
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number} of the JARVIS manual")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+def test_pages_stream_in_document_order_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.Config.PDF_EXTRACT_PAGES_PER_SHARD", 4)
+    monkeypatch.setattr("config.Config.PDF_EXTRACT_PARALLEL_MIN_PAGES", 10)
+    path = _write_pdf(tmp_path / "doc.pdf", 30)
+    extractor = PDFExtractor(workers=2)
+    try:
+        pages = extractor.iter_pages(path)
+        first = next(pages)
+        rest = list(pages)
+        text = extractor.extract_text(path)
+    finally:
+        extractor.close()
+
+    assert "Page 0 " in first
+    assert [page.split()[1] for page in [first, *rest]] == [str(number) for number in range(30)]
+    assert text == "".join([first, *rest])
+    stats = extractor.get_statistics()
+    assert stats["documents"] == 2 and stats["shards"] == 16 and stats["pages"] == 60
+    assert stats["fallback_shards"] == 0 and stats["failed_shards"] == 0
+
+def test_shard_falls_back_to_pypdf2(tmp_path, monkeypatch):
+    path = _write_pdf(tmp_path / "doc.pdf", 3)
+
+    def broken_open(*args, **kwargs):
+        raise RuntimeError("пошкоджений потік сторінок")
+
+    monkeypatch.setattr(extractor_module.fitz, "open", broken_open)
+    texts, engine = extract_range(str(path), 1, 3)
+    assert engine == "pypdf2" and "Page 1" in texts[0] and "Page 2" in texts[1]
+
+    # Короткий документ - у поточному процесі, з тим самим запасним варіантом
+    extractor = PDFExtractor(workers=2)
+    assert [page.split()[1] for page in extractor.iter_pages(path)] == ["0", "1", "2"]
+    assert extractor.stats["fallback_shards"] == 1 and extractor._pool is None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування семантичного кешу відповідей GPT
+"""
+
+import time
+import asyncio
+import threading
+from benchmarks.stubs import HashingEncoder
+from memory.response_cache import ResponseCache
+
+def test_exact_and_semantic_hits():
+    """Точний збіг після нормалізації та збіг перефразованого питання"""
+    cache = ResponseCache(encoder=HashingEncoder())
+    cache.config.RESPONSE_CACHE_SIMILARITY = 0.6
+
+    assert cache.get("Що таке квантовий комп'ютер?") is None
+    cache.put("Що таке квантовий комп'ютер?", "Це комп'ютер на кубітах.")
+
+    assert cache.get("  що таке КВАНТОВИЙ комп'ютер ") == "Це комп'ютер на кубітах."
+    assert cache.get("Що таке квантовий комп'ютер, поясни") == "Це комп'ютер на кубітах."
+    assert cache.get("Як приготувати борщ?") is None
+    # Інший тип запиту не використовує чужі відповіді
+    assert cache.get("Що таке квантовий комп'ютер?", intent="knowledge") is None
+
+    stats = cache.get_statistics()
+    assert stats['exact_hits'] == 1 and stats['semantic_hits'] == 1
+    assert stats['misses'] == 3 and stats['hit_rate'] == 0.4
+
+def test_ttl_eviction_and_opt_out(monkeypatch):
+    """Прострочені записи, витіснення LRU та некешовані запити"""
+    cache = ResponseCache(encoder=HashingEncoder())
+    monkeypatch.setattr(cache.config, "RESPONSE_CACHE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(cache.config, "RESPONSE_CACHE_INTENT_TTL", {"general": 0.05})
+
+    cache.put("перше питання", "1")
+    cache.put("друге питання", "2")
+    cache.get("перше питання")
+    cache.put("третє питання", "3")
+    assert cache.get("друге питання") is None
+    assert cache.get_statistics()['evictions'] == 1
+
+    time.sleep(0.06)
+    assert cache.get("перше питання") is None
+    assert cache.get_statistics()['entries'] == 0
+
+    assert not cache.put("Яка погода сьогодні?", "Сонячно")
+    assert not cache.put("Знайди рецепт", "...", intent="search")
+    assert cache.get_statistics()['bypassed'] == 0
+    assert cache.get("Котра година зараз?") is None
+    assert cache.get_statistics()['bypassed'] == 1
+
+def test_async_lookup_encodes_off_the_event_loop():
+    """Ембеддинг питання не блокує event loop"""
+    class ThreadRecordingEncoder(HashingEncoder):
+        def __init__(self):
+            super().__init__()
+            self.threads = []
+
+        def encode(self, texts, **kwargs):
+            self.threads.append(threading.current_thread())
+            return super().encode(texts, **kwargs)
+
+    encoder = ThreadRecordingEncoder()
+    cache = ResponseCache(encoder=encoder)
+    cache.config.RESPONSE_CACHE_SIMILARITY = 0.6
+
+    async def scenario():
+        assert await cache.store("Що таке квантовий комп'ютер?", "Це комп'ютер на кубітах.")
+        return await cache.lookup("Що таке квантовий комп'ютер, поясни")
+
+    assert asyncio.run(scenario()) == "Це комп'ютер на кубітах."
+    assert len(encoder.threads) == 2
+    assert threading.main_thread() not in encoder.threads
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування розбиття потоку GPT на речення
+"""
+
+from voice.sentence_segmenter import SentenceSegmenter, split_sentences
+
+def test_sentences_from_token_stream():
+    """Речення віддаються одразу після завершення, залишок - у flush()"""
+    segmenter = SentenceSegmenter()
+    tokens = ["Прив", "іт!", " Це", " перше", " речення.", " А це", " ще", " триває"]
+
+    emitted = []
+    for token in tokens:
+        emitted.extend(segmenter.feed(token))
+
+    # "речення." завершиться лише коли надійде пробіл після крапки
+    assert emitted == ["Привіт!", "Це перше речення."]
+    assert segmenter.flush() == ["А це ще триває"]
+
+def test_abbreviations_and_numbers():
+    """Скорочення та десяткові числа не розривають речення"""
+    text = "Версія 3.5 працює швидше, т.д. і т.п. все гаразд. Кінець"
+    assert split_sentences(text) == ["Версія 3.5 працює швидше, т.д. і т.п. все гаразд.", "Кінець"]
+
+def test_paragraphs_and_long_fragments():
+    """Абзац завершує речення, задовгий фрагмент розбивається по комі"""
+    assert split_sentences("Перший рядок\nДругий рядок") == ["Перший рядок", "Другий рядок"]
+
+    long_text = "слово " * 30 + ", " + "ще " * 30
+    parts = SentenceSegmenter(max_length=100).feed(long_text)
+    assert parts and all(len(part) <= 100 for part in parts)
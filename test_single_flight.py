@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування об'єднання однакових паралельних запитів на повільних локальних стендах
+"""
+
+import asyncio
+import threading
+import pytest
+
+from benchmarks.stubs import FakeOpenAIServer, FakeWeatherServer
+from plugins.llm_client import LLMClient
+from plugins import gpt_integration as gpt_module
+from plugins.weather import WeatherPlugin
+from utils.single_flight import SingleFlight, single_flight
+
+def test_weather_requests_coalesced_across_loops():
+    """Одночасні запити погоди з різних event loop - один HTTP запит"""
+    before = single_flight.get_statistics()['coalesced']
+
+    async def scenario():
+        async with FakeWeatherServer(latency=0.3) as server:
+            plugin = WeatherPlugin()
+            plugin.api_key = "test"
+            plugin.base_url = server.weather_url
+
+            # Інший event loop, як у потоці Telegram бота
+            thread_result = []
+            thread = threading.Thread(target=lambda: thread_result.append(asyncio.run(plugin.get_weather("Львів"))))
+
+            tasks = [asyncio.create_task(plugin.get_weather("Львів")) for _ in range(4)]
+            await asyncio.sleep(0.05)
+            thread.start()
+            results = await asyncio.gather(*tasks)
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+            return results + thread_result, server.request_count
+
+    results, request_count = asyncio.run(scenario())
+    assert request_count == 1
+    assert len(results) == 5 and len(set(results)) == 1 and "Львів" in results[0]
+    assert single_flight.get_statistics()['coalesced'] - before == 4
+
+def test_gpt_answer_and_stream_share_request(monkeypatch):
+    """ask_gpt та ask_gpt_stream з однаковим питанням - один запит до LLM"""
+    monkeypatch.setattr(gpt_module.response_cache.config, "RESPONSE_CACHE_ENABLED", False)
+
+    async def scenario():
+        async with FakeOpenAIServer(latency=0.3, token_delay=0.01, reply="Все працює. Дякую.") as server:
+            client = LLMClient(api_key="test", base_url=f"{server.url}/v1")
+            monkeypatch.setattr(gpt_module.gpt_integration, "client", client)
+
+            async def collect_stream():
+                return [delta async for delta in gpt_module.ask_gpt_stream("Як справи?")]
+
+            stream_task = asyncio.create_task(collect_stream())
+            await asyncio.sleep(0.05)
+            answers = await asyncio.gather(gpt_module.ask_gpt("Як справи?"), gpt_module.ask_gpt("як справи"))
+            deltas = await stream_task
+            await client.aclose()
+            return deltas, answers, server.request_count
+
+    deltas, answers, request_count = asyncio.run(scenario())
+    assert request_count == 1
+    assert len(deltas) > 1 and "".join(deltas) == "Все працює. Дякую."
+    assert answers == ["Все працює. Дякую.", "Все працює. Дякую."]
+
+def test_cancelled_leader_does_not_fail_followers():
+    """Скасування першого виклику - очікувачі повторюють запит самі"""
+    flight = SingleFlight()
+    calls = []
+
+    async def slow_request():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return len(calls)
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do(("test",), slow_request))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do(("test",), slow_request))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == 2
+    stats = flight.get_statistics()
+    assert stats['executions'] == 2 and stats['in_flight'] == 0
+
+def test_cancelled_follower_leaves_shared_request_running():
+    """Скасування очікувача не зупиняє запит лідера"""
+    flight = SingleFlight()
+
+    async def slow_request():
+        await asyncio.sleep(0.1)
+        return "відповідь"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do(("test",), slow_request))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do(("test",), slow_request))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(scenario()) == "відповідь"
+    assert flight.get_statistics()['executions'] == 1
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування потоку озвучування: черга з пріоритетами, переривання, час фраз
+"""
+
+import asyncio
+import threading
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.stubs import NullTTSEngine, write_wav
+from voice.speaker import VoiceSpeaker
+from voice.tts_cache import TTSCache
+from voice.tts_worker import PRIORITY_LOW, PRIORITY_URGENT
+
+class ThreadRecordingEngine(NullTTSEngine):
+    """Беззвучний рушій, що запам'ятовує потоки викликів"""
+
+    def __init__(self, seconds_per_char=0.0):
+        super().__init__(seconds_per_char)
+        self.threads = set()
+
+    def say(self, text):
+        self.threads.add(threading.get_ident())
+        super().say(text)
+
+    def runAndWait(self):
+        self.threads.add(threading.get_ident())
+        super().runAndWait()
+
+    def setProperty(self, name, value):
+        self.threads.add(threading.get_ident())
+        super().setProperty(name, value)
+
+def test_engine_is_driven_by_one_thread_in_priority_order():
+    engine = ThreadRecordingEngine(seconds_per_char=0.005)
+    speaker = VoiceSpeaker(engine=engine)
+
+    async def scenario():
+        first = speaker.worker.speak("довга перша відповідь")
+        await asyncio.sleep(0.02)
+        # Поки звучить перша фраза: фонова, звичайна і термінова
+        await asyncio.gather(
+            speaker.speak("у режимі очікування", priority=PRIORITY_LOW),
+            speaker.speak("друга відповідь"),
+            speaker.speak("підтвердіть команду", priority=PRIORITY_URGENT),
+            asyncio.to_thread(speaker.set_voice_properties, rate=180)
+        )
+        return first
+
+    first = asyncio.run(scenario())
+    speaker.close()
+
+    assert [item["text"] for item in engine.spoken] == [
+        "довга перша відповідь", "підтвердіть команду", "друга відповідь", "у режимі очікування"
+    ]
+    assert engine.threads == {speaker.worker._thread.ident}
+    assert engine.properties["rate"] == 180
+
+    timings = first.timings
+    assert timings["playback"] > 0.08 and not timings["interrupted"]
+    stats = speaker.get_statistics()
+    assert stats["utterances"] == 4 and stats["mean_playback_ms"] > 0
+
+def test_interrupt_cuts_current_sentence_and_drops_queue():
+    engine = NullTTSEngine(seconds_per_char=0.01)
+    speaker = VoiceSpeaker(engine=engine)
+
+    async def scenario():
+        stream = speaker.start_stream()
+        for sentence in ["перше довге речення відповіді на запитання", "друге речення", "третє речення"]:
+            await stream.feed(sentence)
+        await asyncio.sleep(0.1)
+        assert speaker.is_speaking
+        started = time.perf_counter()
+        assert speaker.interrupt()
+        await stream.finish()
+        elapsed = time.perf_counter() - started
+
+        await stream.feed("четверте речення")  # після переривання потік нічого не додає
+        assert await speaker.speak("нова відповідь")
+        return stream, elapsed
+
+    stream, elapsed = asyncio.run(scenario())
+    speaker.close()
+
+    assert elapsed < 0.15  # без переривання - ще ~0.5 с
+    assert stream.interrupted and stream.time_to_first_audio is not None
+    assert [(item["text"], item["completed"]) for item in engine.spoken] == [
+        ("перше довге речення відповіді на запитання", False), ("нова відповідь", True)
+    ]
+    stats = speaker.get_statistics()
+    assert stats["interrupted"] == 1 and stats["dropped"] == 2
+
+class FakePlayer:
+    """Відтворення WAV без звукового пристрою"""
+
+    available = True
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, path, on_start=None, should_stop=None):
+        on_start()
+        with wave.open(str(path), "rb") as wav:
+            self.played.append(wav.getnframes())
+        return True
+
+    def close(self):
+        pass
+
+def test_fixed_phrases_play_from_cache_and_frequent_answers_are_cached(tmp_path):
+    engine = NullTTSEngine(seconds_per_char=0.002)
+    player = FakePlayer()
+    cache = TTSCache(tmp_path)
+    speaker = VoiceSpeaker(engine=engine, cache=cache, player=player)
+    speaker.prerender(["Переходжу в режим очікування."])
+    speaker.worker.wait_idle(5)
+    assert "Переходжу в режим очікування." in engine.saved and "Гаразд, виконано." in engine.saved
+
+    async def scenario():
+        await speaker.speak("Переходжу в режим очікування.")
+        for _ in range(3):
+            await speaker.speak("Сьогодні сонячно.")
+            speaker.worker.wait_idle(5)
+        return speaker.get_statistics()
+
+    stats = asyncio.run(scenario())
+    # Фіксована фраза і третій повтор відповіді - з кешу, без синтезу
+    assert [item["text"] for item in engine.spoken] == ["Сьогодні сонячно.", "Сьогодні сонячно."]
+    assert len(player.played) == 2 and stats["cached_playbacks"] == 2
+    assert stats["last"]["cached"] and stats["last"]["synthesis"] < 0.01
+
+    # Інший голос - інший ключ: фіксовані фрази рендеряться заново
+    rendered = len(engine.saved)
+    speaker.set_voice_properties(rate=200)
+    speaker.worker.wait_idle(5)
+    speaker.close()
+    assert len(engine.saved) > rendered
+    assert TTSCache(tmp_path).entries.keys() == cache.entries.keys()
+
+def test_cache_evicts_least_recently_used_dynamic_phrases(tmp_path):
+    cache = TTSCache(tmp_path, max_bytes=3 * 16_044)
+
+    def add(text, pinned=False):
+        key = cache.key("voice", 150, 0.8, text)
+        write_wav(tmp_path / "rendered.wav", np.zeros(8000))  # 16 044 байти
+        assert cache.add(key, text, tmp_path / "rendered.wav", pinned)
+        return key
+
+    fixed = add("Переходжу в режим очікування.", pinned=True)
+    old = add("перша відповідь")
+    recent = add("друга відповідь")
+    time.sleep(0.01)
+    assert cache.lookup(old) is not None  # стара відповідь знову знадобилась
+    add("третя відповідь")
+
+    assert set(cache.entries) == {fixed, old, cache.key("voice", 150, 0.8, "третя відповідь")}
+    assert not cache.path(recent).exists() and cache.stats["evictions"] == 1
+    assert cache.key("voice", 180, 0.8, "перша відповідь") != old
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування VAD та визначення кінця фрази
+"""
+
+import threading
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+from benchmarks.stubs import synthesize_word
+from config import Config
+from voice.audio_stream import AudioStream
+from voice.vad import EnergyVAD, Endpointer
+
+RATE = 16000
+
+def _noise(seconds, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * RATE)) * 60).astype(np.int16)
+
+def _endpointer():
+    endpointer = Endpointer(sample_rate=RATE, vad=EnergyVAD(RATE))
+    endpointer.calibrate(_noise(0.5, seed=99).tobytes())
+    return endpointer
+
+def _listen(endpointer, signal, **kwargs):
+    chunks = iter(signal[i:i + 1024].tobytes() for i in range(0, len(signal), 1024))
+    stream = AudioStream(reader=lambda frames: next(chunks, b""))
+    cursor = stream.cursor()
+    stream.start()
+    try:
+        pcm = endpointer.listen(cursor, **kwargs)
+    finally:
+        stream.stop()
+    return pcm, cursor.position / RATE
+
+def test_long_command_with_pauses_is_emitted_right_after_speech():
+    """Довга команда з паузами між словами не обрізається і завершується без 0.8 с тиші"""
+    words = []
+    for index, word in enumerate(["розкажи", "про", "погоду", "завтра", "у", "києві", "будь", "ласка"]):
+        words.append(synthesize_word(word, seed=index, pad=0.0, snr_db=80))
+        words.append(np.zeros(int(0.3 * RATE), dtype=np.int16))
+    speech = np.concatenate(words[:-1])
+    signal = np.concatenate([_noise(0.6), speech + _noise(len(speech) / RATE, seed=1), _noise(3.0, seed=2)])
+    speech_end = 0.6 + len(speech) / RATE
+    assert speech_end - 0.6 > Config.SPEECH_PHRASE_TIMEOUT
+
+    endpointer = _endpointer()
+    pcm, emitted = _listen(endpointer, signal, timeout=5)
+
+    assert speech_end <= emitted < speech_end + Config.VAD_MAX_TRAILING_SILENCE + 0.1
+    assert len(pcm) / 2 / RATE >= speech_end - 0.6
+    assert endpointer.stats['utterances'] == 1 and endpointer.stats['max_length_cuts'] == 0
+
+def test_noise_only_times_out():
+    with pytest.raises(sr.WaitTimeoutError):
+        _listen(_endpointer(), _noise(3.0, seed=3), timeout=1.0)
+
+def test_trailing_silence_adapts_to_length_and_pauses():
+    endpointer = _endpointer()
+    short = endpointer.trailing_silence(0.3, 0.0)
+    long = endpointer.trailing_silence(3.0, 0.0)
+    assert short < long <= Config.VAD_MAX_TRAILING_SILENCE
+    assert endpointer.trailing_silence(0.3, 0.35) > short
+
+def _stream(signal):
+    chunks = iter(signal[i:i + 1024].tobytes() for i in range(0, len(signal), 1024))
+    stream = AudioStream(reader=lambda frames: next(chunks, b""))
+    cursor = stream.cursor()
+    stream.start()
+    return stream, cursor
+
+def test_wait_for_speech_detects_barge_in_and_honours_stop():
+    speech = synthesize_word("стоп", seed=7, pad=0.0, snr_db=80)
+    signal = np.concatenate([_noise(0.8), speech + _noise(len(speech) / RATE, seed=4), _noise(1.0, seed=5)])
+    stream, cursor = _stream(signal)
+    endpointer = _endpointer()
+    try:
+        onset = endpointer.wait_for_speech(cursor, min_seconds=0.15)
+    finally:
+        stream.stop()
+    assert abs(onset / RATE - 0.8) < 0.1
+    assert endpointer.stats['barge_ins'] == 1
+
+    stop = threading.Event()
+    stop.set()
+    assert endpointer.wait_for_speech(cursor, min_seconds=0.15, stop=stop) is None
+
+def test_echo_of_own_speech_does_not_barge_in_but_louder_user_does():
+    """Луна озвучування (тихіша за користувача біля мікрофона) не перериває відповідь"""
+    words = ["сьогодні", "сонячно", "і", "тепло", "до", "двадцяти", "градусів"]
+    echo = np.concatenate([synthesize_word(word, seed=20 + i, pad=0.05, snr_db=80, gain=0.15)
+                           for i, word in enumerate(words)])
+    echo_seconds = len(echo) / RATE
+    user = synthesize_word("почекай", seed=8, pad=0.0, snr_db=80, gain=0.9)
+
+    # Лише луна: без EchoGate вона сприймається як мовлення
+    assert _endpointer().wait_for_speech(_stream(echo + _noise(echo_seconds, seed=6))[1], 0.3) is not None
+    stream, cursor = _stream(np.concatenate([echo + _noise(echo_seconds, seed=6), _noise(0.5, seed=9)]))
+    playing = lambda: cursor.position / RATE < echo_seconds
+    assert _endpointer().wait_for_speech(cursor, 0.3, playing=playing) is None
+    stream.stop()
+
+    # Користувач говорить поверх луни
+    mixed = echo.astype(np.int32)
+    start = int(1.2 * RATE)
+    mixed[start:start + len(user)] += user
+    signal = np.concatenate([np.clip(mixed, -32768, 32767).astype(np.int16) + _noise(echo_seconds, seed=6),
+                             _noise(0.5, seed=9)])
+    stream, cursor = _stream(signal)
+    onset = _endpointer().wait_for_speech(cursor, 0.3, playing=lambda: cursor.position / RATE < echo_seconds)
+    stream.stop()
+    assert onset is not None and abs(onset / RATE - 1.2) < 0.15
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тестування локального детектора активаційного слова
+"""
+
+import numpy as np
+
+from benchmarks.stubs import synthesize_word
+from voice.audio_stream import AudioStream
+from voice.wake_word import WakeWordDetector
+
+RATE = 16000
+
+def _detector(tmp_path):
+    detector = WakeWordDetector(templates_dir=tmp_path / "wake_word", sample_rate=RATE)
+    for i, (f0, shift) in enumerate([(120, 1.0), (180, 1.08), (150, 0.95)]):
+        detector.enroll(synthesize_word("джарвіс", seed=100 + i, f0=f0, formant_shift=shift).tobytes())
+    return detector
+
+def _noise(seconds, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * RATE)) * 60).astype(np.int16)
+
+def _feed(detector, samples):
+    hits = []
+    for start in range(0, len(samples), 1024):
+        distance = detector.process(samples[start:start + 1024].tobytes())
+        if distance is not None:
+            hits.append(start)
+    return hits
+
+def test_detects_keyword_and_ignores_other_words(tmp_path):
+    """Спрацювання на "Джарвіс" іншого мовця, але не на схожих словах"""
+    detector = _detector(tmp_path)
+    assert len(list((tmp_path / "wake_word").glob("*.wav"))) == 3
+
+    keyword = synthesize_word("джарвіс", seed=5, f0=200, rate=1.1, formant_shift=1.04, snr_db=20)
+    assert len(_feed(detector, np.concatenate([_noise(1.0), keyword, _noise(0.5)]))) == 1
+
+    for word in ("джерело", "гарвард", "марс"):
+        detector.reset()
+        other = synthesize_word(word, seed=9, f0=140, snr_db=20)
+        assert _feed(detector, np.concatenate([_noise(1.0), other, _noise(0.5)])) == []
+
+def test_silence_is_gated_without_dtw(tmp_path):
+    """Фоновий шум не доходить до DTW (мінімальне навантаження в очікуванні)"""
+    detector = _detector(tmp_path)
+    assert _feed(detector, _noise(5.0, seed=1)) == []
+    assert detector.stats['dtw_checks'] == 0 and detector.stats['gated_checks'] > 0
+
+def test_listen_reads_from_stream_cursor(tmp_path):
+    """Детектор читає потік мікрофона через курсор"""
+    detector = _detector(tmp_path)
+    signal = np.concatenate([_noise(1.0), synthesize_word("джарвіс", seed=3, f0=110), _noise(1.0)])
+    chunks = iter(signal[i:i + 1024].tobytes() for i in range(0, len(signal), 1024))
+
+    stream = AudioStream(reader=lambda frames: next(chunks, b""))
+    cursor = stream.cursor()
+    stream.start()
+    distance = detector.listen(cursor, timeout=5)
+    stream.stop()
+
+    assert distance is not None and distance <= detector.config.WAKE_WORD_THRESHOLD
+    assert cursor.position < len(signal)
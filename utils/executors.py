@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Іменовані пули потоків для підсистем JARVIS
+
+Замість спільного пулу за замовчуванням (run_in_executor(None)) кожна
+підсистема має власний пул розміру з Config.EXECUTOR_WORKERS:
+
+- audio - читання мікрофона, VAD, розпізнавання
+- llm   - блокуючі виклики LLM (локальна модель llama.cpp)
+- cpu   - обчислення: ембедінги, пошук у векторній базі, OCR, PDF
+- db    - запис у SQLite та векторну базу (один потік - записи по черзі)
+
+Тож повільна відповідь LLM чи довгий OCR не забирають потоки, на які чекає
+мікрофон. Для кожного пулу ведуться глибина черги, зайняті потоки та час
+очікування; якщо в черзі накопичується EXECUTOR_QUEUE_WARNING завдань, у
+лог пишеться попередження про насичення.
+
+Озвучування тут не має пулу: рушієм TTS володіє окремий потік
+(voice.tts_worker), глибина його черги - у статистиці озвучування.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import functools
+import concurrent.futures
+from config import Config
+
+class MonitoredExecutor(concurrent.futures.ThreadPoolExecutor):
+    """
+    Пул потоків з метриками черги
+
+    Args:
+        name (str): Назва підсистеми (також префікс імен потоків)
+        max_workers (int): Кількість потоків
+        queue_warning (int): Глибина черги, з якої пул вважається насиченим
+    """
+
+    def __init__(self, name, max_workers, queue_warning=None):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_warning = queue_warning or Config.EXECUTOR_QUEUE_WARNING
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._last_warning = 0.0
+        self._total_wait = 0.0
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'max_queued': 0,
+            'saturations': 0
+        }
+
+    def submit(self, fn, /, *args, **kwargs):
+        submitted_at = time.perf_counter()
+        with self._stats_lock:
+            self.stats['submitted'] += 1
+            self._queued += 1
+            queued = self._queued
+            self.stats['max_queued'] = max(self.stats['max_queued'], queued)
+            saturated = queued >= self.queue_warning
+            if saturated:
+                self.stats['saturations'] += 1
+                warn = submitted_at - self._last_warning >= Config.EXECUTOR_WARNING_INTERVAL
+                if warn:
+                    self._last_warning = submitted_at
+        if saturated and warn:
+            logging.warning(
+                f"Пул '{self.name}' насичений: {queued} завдань у черзі, "
+                f"{self._active}/{self.max_workers} потоків зайнято"
+            )
+
+        @functools.wraps(fn)
+        def run():
+            with self._stats_lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += time.perf_counter() - submitted_at
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+
+        future = super().submit(run)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self._stats_lock:
+            if future.cancelled():
+                # Скасовано в черзі: run() так і не виконався
+                self._queued -= 1
+            elif future.exception() is not None:
+                self.stats['failed'] += 1
+            else:
+                self.stats['completed'] += 1
+
+    @property
+    def queued(self):
+        """Завдання, що чекають на вільний потік"""
+        return self._queued
+
+    @property
+    def active(self):
+        """Завдання, що виконуються"""
+        return self._active
+
+    def get_statistics(self):
+        with self._stats_lock:
+            started = self.stats['submitted'] - self._queued
+            return {
+                **self.stats,
+                'workers': self.max_workers,
+                'queued': self._queued,
+                'active': self._active,
+                'mean_wait_ms': round(1000 * self._total_wait / started, 1) if started else None
+            }
+
+class Executors:
+    """Реєстр пулів підсистем (створюються при першому використанні)"""
+
+    # Пули, черга яких при зупинці виконується до кінця (записи не губляться)
+    DRAINED = ("db",)
+
+    def __init__(self):
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Пул підсистеми
+
+        Args:
+            name (str): audio, llm, cpu або db (див. Config.EXECUTOR_WORKERS)
+
+        Returns:
+            MonitoredExecutor: Пул
+        """
+        with self._lock:
+            executor = self._executors.get(name)
+            if executor is None:
+                if name not in Config.EXECUTOR_WORKERS:
+                    raise KeyError(f"Невідомий пул: {name}")
+                executor = MonitoredExecutor(name, Config.EXECUTOR_WORKERS[name])
+                self._executors[name] = executor
+            return executor
+
+    def submit(self, name, func, *args):
+        """
+        Запуск func(*args) у пулі підсистеми без очікування
+
+        Результат такого завдання часто ніхто не читає, тому його помилка
+        пишеться в лог.
+
+        Returns:
+            concurrent.futures.Future: Результат завдання
+        """
+        future = self.get(name).submit(func, *args)
+        future.add_done_callback(functools.partial(self._log_failure, name, func))
+        return future
+
+    @staticmethod
+    def _log_failure(name, func, future):
+        if not future.cancelled() and future.exception() is not None:
+            task = getattr(func, '__qualname__', repr(func))
+            logging.error(f"Помилка завдання {task} у пулі '{name}': {future.exception()}")
+
+    async def run(self, name, func, *args):
+        """Виконання func(*args) у пулі підсистеми з поточного event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.get(name), func, *args)
+
+    def get_statistics(self):
+        with self._lock:
+            executors = dict(self._executors)
+        return {name: executor.get_statistics() for name, executor in executors.items()}
+
+    def shutdown(self, wait=True):
+        """
+        Зупинка всіх пулів
+
+        Завдання в черзі пулів DRAINED (записи в базу) виконуються до кінця,
+        у решти пулів - скасовуються. Пули DRAINED зупиняються останніми:
+        завдання інших пулів, що ще виконуються, можуть додати в них записи.
+        """
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for name in sorted(executors, key=lambda name: name in self.DRAINED):
+            executors[name].shutdown(wait=wait, cancel_futures=name not in self.DRAINED)
+
+# Глобальний екземпляр
+executors = Executors()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Об'єднання однакових паралельних запитів (single-flight) для JARVIS
+
+Поки запит з певним ключем виконується, інші виклики з тим самим ключем
+не роблять власного запиту, а чекають на результат першого. Працює між
+різними event loop (головний цикл, потік Telegram бота, потоки GUI).
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+
+class SingleFlight:
+    """Реєстр запитів, що виконуються, з метриками об'єднаних викликів"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0
+        }
+        self.coalesced_by_namespace = {}
+
+    async def do(self, key, factory):
+        """
+        Виконання запиту або приєднання до вже запущеного
+
+        Args:
+            key (tuple): Ключ запиту; перший елемент - простір імен (gpt, weather, ...)
+            factory: Функція без аргументів, що повертає корутину запиту
+
+        Returns:
+            Результат запиту (спільний для всіх викликів з цим ключем)
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = concurrent.futures.Future()
+                    self._flights[key] = flight
+                    self.stats['executions'] += 1
+                else:
+                    self.stats['coalesced'] += 1
+                    namespace = key[0] if isinstance(key, tuple) else key
+                    self.coalesced_by_namespace[namespace] = self.coalesced_by_namespace.get(namespace, 0) + 1
+
+            if leader:
+                return await self._lead(key, flight, factory)
+
+            # asyncio.wait не скасовує спільний запит і не передає його скасування:
+            # CancelledError тут - лише скасування цього виклику
+            await asyncio.wait({asyncio.wrap_future(flight)})
+            if not flight.cancelled():
+                return flight.result()
+            # Скасовано запит лідера, а не цей виклик - повторюємо спробу
+            logging.info(f"Спільний запит {key!r} скасовано, повторна спроба")
+
+    async def _lead(self, key, flight, factory):
+        """Виконання запиту лідером та передача результату очікувачам"""
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def in_flight(self, key):
+        """Чи виконується зараз запит з цим ключем"""
+        with self._lock:
+            return key in self._flights
+
+    def get_statistics(self):
+        """Статистика об'єднання запитів"""
+        with self._lock:
+            return {
+                **self.stats,
+                'in_flight': len(self._flights),
+                'coalesced_by_namespace': dict(self.coalesced_by_namespace)
+            }
+
+# Глобальний екземпляр
+single_flight = SingleFlight()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Рушії розпізнавання мовлення для JARVIS
+
+- GoogleASR - хмарне розпізнавання (speech_recognition, recognize_google);
+  результат лише після завершення фрази
+- VoskASR - локальне потокове розпізнавання (Vosk/Kaldi на CPU): часткові
+  гіпотези з'являються, поки користувач ще говорить
+
+Рушій обирається через Config.ASR_BACKEND (create_asr_backend).
+MultiLanguageRecognizer розпізнає фразу всіма мовами Config.ASR_LANGUAGES
+одночасно і обирає результат за впевненістю.
+"""
+
+import abc
+import json
+import logging
+import threading
+import concurrent.futures
+from pathlib import Path
+import speech_recognition as sr
+from config import Config
+
+try:
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+class RecognitionStream(abc.ABC):
+    """
+    Розпізнавання однієї фрази по мірі надходження аудіо
+
+    Args:
+        on_partial: Функція (text), що викликається при зміні часткової гіпотези
+    """
+
+    def __init__(self, on_partial=None):
+        self.on_partial = on_partial
+        self.partial = ""
+        self.partials = 0
+        self.confidence = 0.0  # впевненість фінального тексту (після finish)
+
+    @abc.abstractmethod
+    def accept(self, pcm):
+        """Обробка фрагмента PCM16; повертає поточну гіпотезу або None"""
+
+    def feed(self, pcm):
+        """Фрагмент аудіо з мікрофона (виклик з потоку прослуховування)"""
+        hypothesis = self.accept(pcm)
+        if hypothesis and hypothesis != self.partial:
+            self.partial = hypothesis
+            self.partials += 1
+            if self.on_partial:
+                self.on_partial(hypothesis)
+
+    @abc.abstractmethod
+    def finish(self):
+        """Фінальний текст фрази (None, якщо мовлення не розпізнано)"""
+
+class BufferedStream(RecognitionStream):
+    """Накопичення фрази для рушіїв без потокового режиму"""
+
+    def __init__(self, backend, sample_rate, language, on_partial=None):
+        super().__init__(on_partial)
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.language = language
+        self.chunks = []
+
+    def accept(self, pcm):
+        self.chunks.append(pcm)
+        return None
+
+    def finish(self):
+        text, self.confidence = self.backend.recognize_scored(b"".join(self.chunks), self.sample_rate, self.language)
+        return text
+
+class VoskStream(RecognitionStream):
+    """Потокове розпізнавання фрази через KaldiRecognizer"""
+
+    def __init__(self, backend, recognizer, on_partial=None):
+        super().__init__(on_partial)
+        self.backend = backend
+        self.recognizer = recognizer
+        self.recognizer.SetWords(True)
+        self.segments = []  # завершені сегменти (Vosk ділить фразу на паузах)
+        self.word_confidences = []
+
+    def _segment(self, result):
+        result = json.loads(result)
+        if result.get("text"):
+            self.segments.append(result["text"])
+            self.word_confidences.extend(word.get("conf", 0.0) for word in result.get("result", []))
+
+    def accept(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            self._segment(self.recognizer.Result())
+            return " ".join(self.segments)
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.segments + ([partial] if partial else []))
+
+    def finish(self):
+        self._segment(self.recognizer.FinalResult())
+        if self.word_confidences:
+            self.confidence = sum(self.word_confidences) / len(self.word_confidences)
+        return self.backend._record(" ".join(self.segments) or None)
+
+class ASRBackend(abc.ABC):
+    """Базовий інтерфейс рушія розпізнавання"""
+
+    name = "base"
+    streaming = False  # чи дає часткові гіпотези під час мовлення
+
+    def __init__(self):
+        self.stats = {
+            'recognitions': 0,
+            'unrecognized': 0
+        }
+
+    @property
+    @abc.abstractmethod
+    def available(self):
+        """Чи готовий рушій (бібліотека, модель, мережа)"""
+
+    def supports(self, language):
+        return self.available
+
+    def recognize(self, pcm, sample_rate, language):
+        """
+        Розпізнавання записаної фрази
+
+        Args:
+            pcm (bytes): Аудіо PCM16 моно
+            sample_rate (int): Частота дискретизації
+            language (str): Мова (uk-UA, en-US)
+
+        Returns:
+            str: Текст або None, якщо мовлення не розпізнано
+
+        Raises:
+            sr.RequestError: Сервіс розпізнавання недоступний
+        """
+        return self.recognize_scored(pcm, sample_rate, language)[0]
+
+    @abc.abstractmethod
+    def recognize_scored(self, pcm, sample_rate, language):
+        """
+        Розпізнавання з оцінкою впевненості
+
+        Returns:
+            tuple: (текст або None, впевненість 0..1)
+        """
+
+    def start_stream(self, sample_rate, language, on_partial=None):
+        """Потокове розпізнавання фрази (RecognitionStream)"""
+        return BufferedStream(self, sample_rate, language, on_partial)
+
+    def warmup(self):
+        """Підготовка до першої фрази (завантаження моделі)"""
+
+    def _record(self, text):
+        if text:
+            self.stats['recognitions'] += 1
+        else:
+            self.stats['unrecognized'] += 1
+        return text
+
+    def get_statistics(self):
+        return {
+            **self.stats,
+            'backend': self.name,
+            'streaming': self.streaming
+        }
+
+class GoogleASR(ASRBackend):
+    """
+    Хмарне розпізнавання Google Web Speech API
+
+    Args:
+        recognizer (sr.Recognizer): Розпізнавач (спільний зі слухачем)
+    """
+
+    name = "google"
+
+    def __init__(self, recognizer=None):
+        super().__init__()
+        self.recognizer = recognizer or sr.Recognizer()
+
+    @property
+    def available(self):
+        return True
+
+    def recognize_scored(self, pcm, sample_rate, language):
+        audio = sr.AudioData(pcm, sample_rate, 2)
+        # show_all - сира відповідь з впевненістю (порожній список, якщо мовлення немає)
+        response = self.recognizer.recognize_google(audio, language=language, show_all=True)
+        alternatives = response.get("alternative") if isinstance(response, dict) else None
+        if not alternatives:
+            return self._record(None), 0.0
+        best = alternatives[0]
+        return self._record(best["transcript"]), best.get("confidence", 0.0)
+
+class VoskASR(ASRBackend):
+    """
+    Локальне потокове розпізнавання (Vosk/Kaldi, CPU)
+
+    Args:
+        model_paths (dict): Мова -> директорія моделі (Config.VOSK_MODEL_PATHS)
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_paths=None):
+        super().__init__()
+        paths = model_paths if model_paths is not None else Config.VOSK_MODEL_PATHS
+        self.model_paths = {language: Path(path) for language, path in paths.items()}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return self.supports(Config.SPEECH_LANGUAGE)
+
+    def supports(self, language):
+        path = self.model_paths.get(language)
+        return VOSK_AVAILABLE and path is not None and path.exists()
+
+    def _model(self, language):
+        """Модель мови (завантажується один раз)"""
+        with self._lock:
+            if language not in self._models:
+                SetLogLevel(-1)
+                logging.info(f"Завантаження моделі Vosk ({language}): {self.model_paths[language]}")
+                self._models[language] = Model(str(self.model_paths[language]))
+            return self._models[language]
+
+    def warmup(self):
+        try:
+            self._model(Config.SPEECH_LANGUAGE)
+        except Exception as e:
+            logging.error(f"Помилка завантаження моделі Vosk: {e}")
+
+    def recognize_scored(self, pcm, sample_rate, language):
+        if not self.supports(language):
+            return None, 0.0
+        stream = self.start_stream(sample_rate, language)
+        stream.feed(pcm)
+        return stream.finish(), stream.confidence
+
+    def start_stream(self, sample_rate, language, on_partial=None):
+        return VoskStream(self, KaldiRecognizer(self._model(language), sample_rate), on_partial)
+
+def create_asr_backend(name=None, recognizer=None):
+    """
+    Рушій розпізнавання за назвою (Config.ASR_BACKEND)
+
+    auto - Vosk, якщо встановлено пакет і модель основної мови, інакше Google.
+    """
+    name = (name or Config.ASR_BACKEND).lower()
+
+    if name in ("auto", "vosk"):
+        vosk = VoskASR()
+        if vosk.available:
+            return vosk
+        if name == "vosk":
+            logging.warning("Vosk недоступний (pip install vosk, модель у VOSK_MODEL_PATHS) - "
+                            "використовується Google")
+    elif name != "google":
+        logging.warning(f"Невідомий рушій розпізнавання '{name}' - використовується Google")
+
+    return GoogleASR(recognizer)
+
+class MultiLanguageStream:
+    """
+    Потокове розпізнавання фрази кількома мовами одночасно
+
+    Аудіо подається в потік кожної мови; часткові гіпотези - лише основної.
+    """
+
+    def __init__(self, selector, streams):
+        self.selector = selector
+        self.streams = streams  # мова -> RecognitionStream
+
+    def feed(self, pcm):
+        for stream in self.streams.values():
+            stream.feed(pcm)
+
+    def finish(self):
+        """
+        Returns:
+            tuple: (текст або None, мова)
+        """
+        return self.selector.select({
+            language: (lambda stream=stream: (stream.finish(), stream.confidence))
+            for language, stream in self.streams.items()
+        })
+
+class MultiLanguageRecognizer:
+    """
+    Розпізнавання фрази всіма мовами паралельно з вибором за впевненістю
+
+    Замість послідовного uk-UA -> en-US (англійська команда чекала два
+    повні запити) усі мови розпізнаються одночасно. Перший результат з
+    впевненістю не нижче accept_confidence приймається одразу, решта
+    запитів скасовується (ще не розпочаті) або ігнорується; інакше
+    обирається найвпевненіший результат, за рівності - мова, що раніше
+    у списку.
+
+    Args:
+        backend (ASRBackend): Рушій розпізнавання
+        languages (list): Мови в порядку пріоритету (Config.ASR_LANGUAGES)
+        accept_confidence (float): Поріг дострокового прийняття результату
+    """
+
+    def __init__(self, backend, languages=None, accept_confidence=None):
+        self.backend = backend
+        candidates = languages or Config.ASR_LANGUAGES
+        self.languages = [language for language in candidates if backend.supports(language)] or candidates[:1]
+        self.accept_confidence = (
+            accept_confidence if accept_confidence is not None else Config.ASR_LANGUAGE_ACCEPT_CONFIDENCE
+        )
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(self.languages), thread_name_prefix="asr-language"
+        )
+
+        self.stats = {
+            'phrases': 0,
+            'early_accepts': 0,
+            'abandoned': 0,
+            'by_language': {}
+        }
+
+    def recognize(self, pcm, sample_rate):
+        """
+        Розпізнавання записаної фрази всіма мовами
+
+        Returns:
+            tuple: (текст або None, мова)
+
+        Raises:
+            sr.RequestError: Сервіс недоступний для всіх мов
+        """
+        return self.select({
+            language: (lambda language=language: self.backend.recognize_scored(pcm, sample_rate, language))
+            for language in self.languages
+        })
+
+    def start_stream(self, sample_rate, on_partial=None):
+        """Потокове розпізнавання фрази всіма мовами (MultiLanguageStream)"""
+        streams = {}
+        for index, language in enumerate(self.languages):
+            streams[language] = self.backend.start_stream(sample_rate, language, on_partial if index == 0 else None)
+        return MultiLanguageStream(self, streams)
+
+    def select(self, tasks):
+        """
+        Паралельне виконання завдань розпізнавання і вибір результату
+
+        Args:
+            tasks (dict): Мова -> функція, що повертає (текст, впевненість)
+        """
+        self.stats['phrases'] += 1
+        futures = {self.executor.submit(task): language for language, task in tasks.items()}
+        priority = {language: index for index, language in enumerate(tasks)}
+        results = {}
+        errors = []
+
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                language = futures[future]
+                try:
+                    text, confidence = future.result()
+                except sr.RequestError as e:
+                    errors.append(e)
+                    continue
+                except Exception as e:
+                    logging.error(f"Помилка розпізнавання ({language}): {e}")
+                    continue
+                if text:
+                    results[language] = (text, confidence)
+
+            best = self._best(results, priority)
+            if pending and best and results[best][1] >= self.accept_confidence:
+                self.stats['early_accepts'] += 1
+                for future in pending:
+                    future.cancel()
+                    self.stats['abandoned'] += 1
+                logging.info(f"Мову {best} прийнято достроково (впевненість {results[best][1]:.2f})")
+                return self._chosen(results, best)
+
+        best = self._best(results, priority)
+        if best:
+            return self._chosen(results, best)
+        if errors and len(errors) == len(futures):
+            raise errors[0]
+        return None, None
+
+    @staticmethod
+    def _best(results, priority):
+        if not results:
+            return None
+        return max(results, key=lambda language: (results[language][1], -priority[language]))
+
+    def _chosen(self, results, language):
+        self.stats['by_language'][language] = self.stats['by_language'].get(language, 0) + 1
+        return results[language][0], language
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_statistics(self):
+        return {
+            **self.stats,
+            'languages': self.languages,
+            'backend': self.backend.get_statistics()
+        }
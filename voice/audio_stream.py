@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Безперервний потік аудіо з мікрофона для JARVIS
+
+Мікрофон відкривається один раз; окремий потік захоплення постійно пише
+семпли в кільцевий буфер. Споживачі (активаційна фраза, розпізнавання
+команди) читають вікна з буфера через власні курсори - у т.ч. аудіо,
+записане до моменту запуску (pre-roll), тож мовлення на межі викликів
+не втрачається.
+"""
+
+import time
+import logging
+import threading
+import numpy as np
+import speech_recognition as sr
+from config import Config
+
+class RingBuffer:
+    """
+    Кільцевий буфер 16-бітних семплів з одним записувачем
+
+    Записувач спершу резервує діапазон (self.reserved), копіює семпли і
+    лише потім публікує нову позицію (self.written), тому читачі не
+    блокують запис: вони перевіряють, чи прочитаний діапазон не було
+    перезаписано під час копіювання.
+
+    Args:
+        capacity (int): Місткість у семплах
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # абсолютна кількість записаних семплів
+        self.reserved = 0  # позиція, до якої триває запис
+
+    def write(self, samples):
+        """Запис семплів (лише з потоку захоплення)"""
+        end = self.written + len(samples)
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        self.reserved = end
+
+        start = (end - count) % self.capacity
+        first = min(count, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:count - first] = samples[first:]
+        self.written = end
+
+    @property
+    def oldest(self):
+        """Найстаріша позиція, яку ще не перезаписано"""
+        return max(0, self.reserved - self.capacity)
+
+    def read(self, start, end):
+        """
+        Семпли з абсолютного діапазону [start, end)
+
+        Returns:
+            tuple: (позиція фактичного початку, np.ndarray) - початок зсувається
+                вперед, якщо частину діапазону вже перезаписано
+        """
+        end = min(end, self.written)
+        start = max(start, self.oldest)
+        if start >= end:
+            return end, np.empty(0, dtype=np.int16)
+
+        indices = np.arange(start, end) % self.capacity
+        samples = self.data[indices]
+
+        # Записувач міг обігнати читача під час копіювання
+        overwritten = self.oldest - start
+        if overwritten > 0:
+            return start + overwritten, samples[overwritten:]
+        return start, samples
+
+class StreamCursor:
+    """
+    Позиція споживача в потоці
+
+    Args:
+        stream (AudioStream): Потік
+        position (int): Абсолютна позиція початку читання
+    """
+
+    def __init__(self, stream, position):
+        self.stream = stream
+        self.position = position
+        self.dropped = 0  # семплів, перезаписаних до прочитання
+
+    def read(self, frames, timeout=None):
+        """
+        Наступні frames семплів (блокує до їх надходження)
+
+        Returns:
+            bytes: PCM16 аудіо; коротше або порожнє, якщо потік зупинено або таймаут
+        """
+        target = self.position + frames
+        self.stream.wait_for(target, timeout)
+        start, samples = self.stream.buffer.read(self.position, target)
+        if start > self.position:
+            self.dropped += start - self.position
+            self.stream.stats['dropped_samples'] += start - self.position
+        self.position = start + len(samples)
+        return samples.tobytes()
+
+    def skip_to_live(self):
+        """Перехід до поточного моменту (пропуск накопиченого аудіо)"""
+        self.position = self.stream.position
+
+class _CursorReader:
+    """Об'єкт stream для speech_recognition (метод read)"""
+
+    def __init__(self, cursor, timeout, tap=None):
+        self.cursor = cursor
+        self.timeout = timeout
+        self.tap = tap
+
+    def read(self, size):
+        data = self.cursor.read(size, self.timeout)
+        if data and self.tap:
+            self.tap(data)
+        return data
+
+class StreamSource(sr.AudioSource):
+    """
+    Джерело аудіо для sr.Recognizer на основі курсора потоку
+
+    Args:
+        stream (AudioStream): Потік
+        cursor (StreamCursor): Курсор (читання продовжується з його позиції)
+        tap: Функція (bytes), що отримує кожен прочитаний фрагмент
+            (напр. потокове розпізнавання під час запису фрази)
+    """
+
+    def __init__(self, stream, cursor, tap=None):
+        self.SAMPLE_RATE = stream.sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = stream.chunk_frames
+        self.cursor = cursor
+        self.tap = tap
+        self.stream = None
+        self._timeout = stream.read_timeout
+
+    def __enter__(self):
+        self.stream = _CursorReader(self.cursor, self._timeout, self.tap)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+class AudioStream:
+    """
+    Потік захоплення аудіо з кільцевим буфером
+
+    Args:
+        device_index (int): Індекс мікрофона (None - за замовчуванням)
+        reader: Функція (frames) -> bytes PCM16 замість мікрофона (для тестів і стендів)
+    """
+
+    def __init__(self, device_index=None, reader=None):
+        self.config = Config()
+        self.device_index = device_index
+        self.sample_rate = self.config.AUDIO_SAMPLE_RATE
+        self.chunk_frames = self.config.AUDIO_CHUNK_FRAMES
+        self.read_timeout = self.config.AUDIO_READ_TIMEOUT
+        self.buffer = RingBuffer(int(self.config.AUDIO_BUFFER_SECONDS * self.sample_rate))
+        self._reader = reader
+        self._thread = None
+        self._running = threading.Event()
+        self._ready = threading.Event()
+        self._data_available = threading.Condition()
+        self.error = None
+
+        self.stats = {
+            'chunks': 0,
+            'dropped_samples': 0,
+            'restarts': 0
+        }
+
+    @property
+    def running(self):
+        return self._running.is_set() and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def position(self):
+        """Абсолютна позиція останнього записаного семпла"""
+        return self.buffer.written
+
+    def seconds_to_samples(self, seconds):
+        return int(seconds * self.sample_rate)
+
+    def start(self, timeout=5.0):
+        """
+        Запуск потоку захоплення
+
+        Returns:
+            bool: Чи відкрито джерело аудіо
+        """
+        if self.running:
+            return True
+
+        self.error = None
+        self._ready.clear()
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture, name="audio-capture", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self.error is None and self.running
+
+    def stop(self):
+        """Зупинка захоплення (читачі отримують залишок даних)"""
+        self._running.clear()
+        with self._data_available:
+            self._data_available.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _capture(self):
+        """Цикл захоплення: джерело відкривається один раз на весь час роботи"""
+        try:
+            if self._reader:
+                self._ready.set()
+                self._capture_loop(self._reader)
+                return
+
+            with sr.Microphone(
+                device_index=self.device_index,
+                sample_rate=self.sample_rate,
+                chunk_size=self.chunk_frames
+            ) as microphone:
+                logging.info("Потік мікрофона відкрито")
+                self._ready.set()
+                self._capture_loop(microphone.stream.read)
+
+        except Exception as e:
+            self.error = e
+            logging.error(f"Помилка потоку мікрофона: {e}")
+        finally:
+            self._running.clear()
+            self._ready.set()
+            with self._data_available:
+                self._data_available.notify_all()
+
+    def _capture_loop(self, read):
+        while self._running.is_set():
+            data = read(self.chunk_frames)
+            if not data:
+                break
+            self.buffer.write(np.frombuffer(data, dtype=np.int16))
+            self.stats['chunks'] += 1
+            with self._data_available:
+                self._data_available.notify_all()
+
+    def ensure_running(self):
+        """Перезапуск захоплення, якщо потік зупинився (від'єднано пристрій тощо)"""
+        if self.running:
+            return True
+        if self._thread is not None:
+            self.stats['restarts'] += 1
+            logging.warning("Перезапуск потоку мікрофона")
+        return self.start()
+
+    def wait_for(self, position, timeout=None):
+        """
+        Очікування, доки буфер не дійде до позиції
+
+        Returns:
+            bool: Чи доступні дані до позиції
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._data_available:
+            while self.buffer.written < position:
+                if not self.running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._data_available.wait(remaining)
+        return True
+
+    def cursor(self, preroll=0.0):
+        """
+        Новий курсор читання
+
+        Args:
+            preroll (float): Скільки секунд аудіо до поточного моменту включити
+        """
+        position = max(self.buffer.oldest, self.position - self.seconds_to_samples(preroll))
+        return StreamCursor(self, position)
+
+    def source(self, cursor=None, preroll=0.0, tap=None):
+        """Джерело для sr.Recognizer (listen, adjust_for_ambient_noise)"""
+        return StreamSource(self, cursor or self.cursor(preroll), tap)
+
+    def window(self, seconds, end=None):
+        """
+        Останні seconds секунд аудіо (до позиції end)
+
+        Returns:
+            bytes: PCM16 аудіо
+        """
+        end = self.position if end is None else end
+        _, samples = self.buffer.read(end - self.seconds_to_samples(seconds), end)
+        return samples.tobytes()
+
+    def get_statistics(self):
+        """Статистика потоку"""
+        return {
+            **self.stats,
+            'running': self.running,
+            'buffered_seconds': round((self.position - self.buffer.oldest) / self.sample_rate, 2)
+        }
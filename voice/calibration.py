@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Профілі калібрування мікрофона для JARVIS
+
+Замість обов'язкових 2 секунд тиші (adjust_for_ambient_noise) при кожному
+запуску рівень і спектр шуму кожного пристрою зберігаються у
+CALIBRATION_PROFILES_FILE і застосовуються одразу. Фоновий потік
+періодично бере вікно з потоку мікрофона, виділяє в ньому кадри без
+мовлення і плавно уточнює профіль; повне перекалібрування відбувається
+лише тоді, коли шум стабільно відрізняється від профілю (дрейф) кілька
+вікон поспіль.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+from config import Config
+
+FRAME_SECONDS = 0.03
+
+def frame_features(samples, sample_rate, bands):
+    """
+    Енергія (дБ) і спектр у смугах (дБ) кожного кадру
+
+    Returns:
+        tuple: (np.ndarray енергій, np.ndarray [кадри, смуги])
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    count = len(samples) // frame
+    if count == 0:
+        return np.empty(0), np.empty((0, bands))
+
+    frames = samples[:count * frame].astype(np.float64).reshape(count, frame)
+    energy = 10 * np.log10((frames ** 2).mean(axis=1) + 1e-9)
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1)) ** 2
+    edges = np.linspace(0, power.shape[1], bands + 1).astype(int)
+    spectrum = np.stack([power[:, a:b].mean(axis=1) for a, b in zip(edges[:-1], edges[1:])], axis=1)
+    return energy, 10 * np.log10(spectrum + 1e-9)
+
+class CalibrationStore:
+    """
+    Збережені профілі пристроїв (JSON)
+
+    Args:
+        path (Path): Файл профілів (за замовчуванням Config.CALIBRATION_PROFILES_FILE)
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or Config.CALIBRATION_PROFILES_FILE)
+        self._lock = threading.Lock()
+
+    def _read(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Помилка читання профілів калібрування: {e}")
+            return {}
+
+    def load(self, device):
+        return self._read().get(device)
+
+    def save(self, device, profile):
+        """Атомарне збереження профілю пристрою"""
+        with self._lock:
+            try:
+                profiles = self._read()
+                profiles[device] = profile
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(profiles, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logging.error(f"Помилка збереження профілю калібрування: {e}")
+
+class NoiseCalibrator:
+    """
+    Профіль шуму пристрою з фоновим уточненням
+
+    Args:
+        device (str): Ключ пристрою (назва мікрофона і частота)
+        sample_rate (int): Частота дискретизації потоку
+        store (CalibrationStore): Сховище профілів
+        on_change: Функція (profile), що викликається при появі нового профілю
+            (перше калібрування або перекалібрування після дрейфу)
+    """
+
+    def __init__(self, device, sample_rate=None, store=None, on_change=None):
+        self.config = Config()
+        self.device = device
+        self.sample_rate = sample_rate or self.config.AUDIO_SAMPLE_RATE
+        self.store = store or CalibrationStore()
+        self.on_change = on_change
+        self.profile = self.store.load(device)
+        self._drift = []  # вимірювання вікон поспіль, що відрізняються від профілю
+        self._last_save = time.monotonic()
+        self._dirty = False
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.stats = {
+            'windows': 0,
+            'refinements': 0,
+            'recalibrations': 0,
+            'skipped_windows': 0
+        }
+
+    @staticmethod
+    def energy_threshold(profile):
+        """Поріг енергії для sr.Recognizer (RMS шуму з запасом, як adjust_for_ambient_noise)"""
+        return 10 ** (profile['noise_db'] / 20) * Config.CALIBRATION_ENERGY_RATIO
+
+    def measure(self, pcm_bytes):
+        """
+        Рівень і спектр шуму за кадрами вікна без мовлення
+
+        Кадрами без мовлення вважаються найтихіші (до 10-го перцентиля
+        енергії + CALIBRATION_QUIET_MARGIN_DB), тож паузи між словами
+        дають оцінку шуму навіть у вікні з мовленням.
+
+        Returns:
+            dict: {'noise_db', 'spectrum', 'frames'} або None
+        """
+        samples = np.frombuffer(pcm_bytes, dtype=np.int16)
+        energy, spectrum = frame_features(samples, self.sample_rate, self.config.CALIBRATION_BANDS)
+        if len(energy) < self.config.CALIBRATION_MIN_FRAMES:
+            return None
+
+        quiet = energy <= np.percentile(energy, 10) + self.config.CALIBRATION_QUIET_MARGIN_DB
+        return {
+            'noise_db': float(np.median(energy[quiet])),
+            'spectrum': spectrum[quiet].mean(axis=0).tolist(),
+            'frames': int(quiet.sum())
+        }
+
+    def _distance(self, measurement):
+        """Відхилення від профілю: рівень і середня різниця спектра (дБ)"""
+        level = abs(measurement['noise_db'] - self.profile['noise_db'])
+        shape = float(np.mean(np.abs(np.subtract(measurement['spectrum'], self.profile['spectrum']))))
+        return level, shape
+
+    def _set_profile(self, measurement):
+        self.profile = {
+            'noise_db': measurement['noise_db'],
+            'spectrum': measurement['spectrum'],
+            'energy_threshold': self.energy_threshold(measurement),
+            'updated_at': time.time()
+        }
+        self.store.save(self.device, self.profile)
+        self._last_save = time.monotonic()
+        self._dirty = False
+        if self.on_change:
+            self.on_change(self.profile)
+
+    def update(self, pcm_bytes):
+        """
+        Уточнення профілю за вікном аудіо
+
+        Returns:
+            str: initialized, refined, drift, recalibrated або skipped
+        """
+        self.stats['windows'] += 1
+        measurement = self.measure(pcm_bytes)
+        if measurement is None:
+            self.stats['skipped_windows'] += 1
+            return "skipped"
+
+        if self.profile is None:
+            logging.info(f"Профіль шуму створено: {measurement['noise_db']:.1f} дБ")
+            self._set_profile(measurement)
+            return "initialized"
+
+        level, shape = self._distance(measurement)
+        if level >= self.config.CALIBRATION_DRIFT_DB or shape >= self.config.CALIBRATION_DRIFT_DB:
+            self._drift.append(measurement)
+            if len(self._drift) < self.config.CALIBRATION_DRIFT_WINDOWS:
+                return "drift"
+
+            # Шум стабільно змінився - новий профіль за вікнами дрейфу
+            recent = self._drift
+            self._drift = []
+            self.stats['recalibrations'] += 1
+            logging.info(f"Дрейф шуму ({level:.1f} дБ, спектр {shape:.1f} дБ) - перекалібрування")
+            self._set_profile({
+                'noise_db': float(np.median([item['noise_db'] for item in recent])),
+                'spectrum': np.mean([item['spectrum'] for item in recent], axis=0).tolist()
+            })
+            return "recalibrated"
+
+        # Звичайне вікно: плавне уточнення без перекалібрування
+        self._drift = []
+        alpha = self.config.CALIBRATION_SMOOTHING
+        self.profile['noise_db'] += alpha * (measurement['noise_db'] - self.profile['noise_db'])
+        self.profile['spectrum'] = (
+            np.asarray(self.profile['spectrum']) * (1 - alpha) + np.asarray(measurement['spectrum']) * alpha
+        ).tolist()
+        self.profile['energy_threshold'] = self.energy_threshold(self.profile)
+        self.profile['updated_at'] = time.time()
+        self.stats['refinements'] += 1
+        self._dirty = True
+
+        if time.monotonic() - self._last_save >= self.config.CALIBRATION_SAVE_INTERVAL:
+            self.save()
+        return "refined"
+
+    def save(self):
+        """Збереження уточненого профілю"""
+        if self.profile is not None and self._dirty:
+            self.store.save(self.device, self.profile)
+            self._last_save = time.monotonic()
+            self._dirty = False
+
+    def start(self, audio_stream):
+        """Фонове уточнення з потоку мікрофона"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(audio_stream,), name="noise-calibration", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, audio_stream):
+        interval = self.config.CALIBRATION_REFRESH_SECONDS
+        # Без профілю перше вікно береться якомога раніше
+        delay = self.config.CALIBRATION_INITIAL_SECONDS if self.profile is None else interval
+        while not self._stop.wait(delay):
+            delay = interval
+            try:
+                if audio_stream.running:
+                    self.update(audio_stream.window(interval))
+            except Exception as e:
+                logging.error(f"Помилка фонового калібрування: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        self.save()
+
+    def get_statistics(self):
+        return {
+            **self.stats,
+            'device': self.device,
+            'noise_db': None if self.profile is None else round(self.profile['noise_db'], 1),
+            'energy_threshold': None if self.profile is None else round(self.profile['energy_threshold'], 1)
+        }
@@ -8,6 +8,12 @@ import speech_recognition as sr
 import asyncio
 import logging
 from config import Config
+from voice.asr import MultiLanguageRecognizer, create_asr_backend
+from voice.audio_stream import AudioStream, StreamCursor
+from voice.calibration import NoiseCalibrator
+from voice.vad import Endpointer
+from voice.wake_word import WakeWordDetector
+from utils.executors import executors
 
 class VoiceListener:
     def __init__(self):
@@ -19,10 +25,35 @@ class VoiceListener:
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.pause_threshold = 0.8
         
+        # Рушій розпізнавання (Config.ASR_BACKEND); локальна модель завантажується одразу
+        self.asr = create_asr_backend(recognizer=self.recognizer)
+        self.asr.warmup()
+        self.languages = MultiLanguageRecognizer(self.asr)
+        logging.info(f"Рушій розпізнавання мовлення: {self.asr.name}, мови: {', '.join(self.languages.languages)}")
+        
         # Вибір мікрофона
         self._setup_microphone()
         
-        # Калібрування мікрофона
+        # Безперервний потік з мікрофона; курсор активації читає його без пропусків
+        self.audio_stream = AudioStream(device_index=self.microphone_index)
+        self.audio_stream.start()
+        self._activation_cursor = None
+        # Курсор наступної команди, підготовлений під час відповіді
+        # (з моменту, коли користувач перебив, або з кінця озвучування)
+        self._command_cursor = None
+        
+        # Кінець фрази визначає VAD на потоці, а не пауза sr.Recognizer
+        self.endpointer = Endpointer(sample_rate=self.audio_stream.sample_rate)
+        # Окремий VAD для переривання озвучування (власний рівень шуму з луною динаміків)
+        self.barge_in = Endpointer(sample_rate=self.audio_stream.sample_rate)
+        
+        # Локальний детектор активаційного слова (якщо записано шаблони)
+        self.wake_word = WakeWordDetector(sample_rate=self.audio_stream.sample_rate)
+        if self.config.WAKE_WORD_ENABLED and not self.wake_word.enrolled:
+            logging.warning("Шаблони активаційного слова не записано (python -m voice.wake_word) - "
+                            "активація через хмарне розпізнавання")
+        
+        # Калібрування: збережений профіль пристрою, уточнення у фоні
         self._calibrate_microphone()
         
         logging.info("VoiceListener ініціалізовано")
@@ -39,80 +70,117 @@ class VoiceListener:
             
             # Використовувати мікрофон за замовчуванням
             self.microphone_index = getattr(self.config, 'MICROPHONE_INDEX', None)
+            if self.microphone_index is not None and self.microphone_index < len(mic_list):
+                self.microphone_name = mic_list[self.microphone_index]
+            else:
+                self.microphone_name = "default"
             
         except Exception as e:
             logging.error(f"Помилка налаштування мікрофона: {e}")
             self.microphone_index = None
+            self.microphone_name = "default"
     
     def _calibrate_microphone(self):
-        """Калібрування мікрофона для зменшення шуму"""
+        """
+        Калібрування мікрофона для зменшення шуму
+        
+        Профіль пристрою з попередніх запусків застосовується одразу (без
+        очікування тиші); без профілю перше калібрування відбувається у
+        фоні з потоку мікрофона. Далі профіль уточнюється за кадрами без
+        мовлення і перекалібровується лише при дрейфі шуму.
+        """
         try:
-            with sr.Microphone(device_index=self.microphone_index) as source:
-                print("Калібрування мікрофона... Будьте тихо.")
-                self.recognizer.adjust_for_ambient_noise(source, duration=2)
-                print("Калібрування завершено.")
-                logging.info("Мікрофон відкалібровано")
+            device = f"{self.microphone_name}@{self.audio_stream.sample_rate}"
+            self.calibrator = NoiseCalibrator(
+                device,
+                sample_rate=self.audio_stream.sample_rate,
+                on_change=self._apply_calibration
+            )
+            if self.calibrator.profile:
+                self._apply_calibration(self.calibrator.profile)
+                logging.info(f"Застосовано профіль калібрування мікрофона ({device})")
+            else:
+                logging.info(f"Профілю калібрування для {device} немає - калібрування у фоні")
+            self.calibrator.start(self.audio_stream)
         except Exception as e:
             logging.error(f"Помилка калібрування мікрофона: {e}")
     
-    async def listen(self, timeout=None):
+    def _apply_calibration(self, profile):
+        """Застосування профілю шуму до розпізнавача і VAD"""
+        self.recognizer.energy_threshold = profile['energy_threshold']
+        self.endpointer.set_noise_floor(profile['noise_db'])
+        self.barge_in.set_noise_floor(profile['noise_db'])
+        logging.info(f"Калібрування: шум {profile['noise_db']:.1f} дБ, поріг енергії {profile['energy_threshold']:.0f}")
+    
+    async def listen(self, timeout=None, on_partial=None):
         """
         Асинхронне прослуховування голосової команди
         
         Args:
             timeout: Максимальний час очікування (секунди)
+            on_partial: Функція (text) для часткових гіпотез під час мовлення
+                (лише потокові рушії; викликається в циклі подій)
             
         Returns:
             str: Розпізнаний текст або None
         """
         try:
-            # Запуск в окремому потоці для асинхронності
+            # Запуск у пулі аудіо (не конкурує з LLM, OCR і записами в БД)
             loop = asyncio.get_event_loop()
-            text = await loop.run_in_executor(None, self._listen_sync, timeout)
+            
+            callback = (lambda text: loop.call_soon_threadsafe(on_partial, text)) if on_partial else None
+            
+            text = await loop.run_in_executor(executors.get("audio"), self._listen_sync, timeout, callback)
             return text
             
         except Exception as e:
             logging.error(f"Помилка при прослуховуванні: {e}")
             return None
     
-    def _listen_sync(self, timeout=None):
+    def _listen_sync(self, timeout=None, on_partial=None):
         """Синхронне прослуховування"""
         try:
-            with sr.Microphone(device_index=self.microphone_index) as source:
-                print("Слухаю...")
-                logging.info("Розпочато прослуховування")
-                
-                # Запис аудіо
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout or self.config.SPEECH_TIMEOUT,
-                    phrase_time_limit=self.config.SPEECH_PHRASE_TIMEOUT
-                )
-                
-                print("Розпізнаю мовлення...")
-                logging.info("Розпочато розпізнавання мовлення")
-                
-                # Спроба розпізнавання українською
-                try:
-                    text = self.recognizer.recognize_google(
-                        audio, 
-                        language=self.config.SPEECH_LANGUAGE
-                    )
-                    print(f"Розпізнано (UA): {text}")
-                    logging.info(f"Успішно розпізнано українською: {text}")
-                    return text
-                    
-                except sr.UnknownValueError:
-                    # Спроба розпізнавання англійською
-                    try:
-                        text = self.recognizer.recognize_google(audio, language="en-US")
-                        print(f"Розпізнано (EN): {text}")
-                        logging.info(f"Успішно розпізнано англійською: {text}")
-                        return text
-                    except sr.UnknownValueError:
-                        print("Не вдалося розпізнати мовлення")
-                        logging.warning("Мовлення не розпізнано")
-                        return None
+            self.audio_stream.ensure_running()
+            # Курсор команди - нове прослуховування, активаційний курсор більше не потрібен
+            self._activation_cursor = None
+            self.wake_word.reset()
+            cursor, self._command_cursor = self._command_cursor, None
+            if cursor is None:
+                cursor = self.audio_stream.cursor(preroll=self.config.AUDIO_PREROLL_SECONDS)
+            
+            # Потоковий рушій розпізнає фразу під час запису (усіма мовами одночасно)
+            phrase = None
+            if self.asr.streaming:
+                phrase = self.languages.start_stream(self.audio_stream.sample_rate, on_partial)
+            
+            print("Слухаю...")
+            logging.info("Розпочато прослуховування")
+            
+            # Запис фрази: завершується, щойно VAD фіксує кінець мовлення
+            pcm = self.endpointer.listen(
+                cursor,
+                timeout=timeout or self.config.SPEECH_TIMEOUT,
+                on_audio=phrase.feed if phrase else None
+            )
+            audio = sr.AudioData(pcm, self.audio_stream.sample_rate, 2)
+            
+            print("Розпізнаю мовлення...")
+            logging.info("Розпочато розпізнавання мовлення")
+            
+            # Паралельне розпізнавання всіма мовами, вибір за впевненістю
+            if phrase:
+                text, language = phrase.finish()
+            else:
+                text, language = self.languages.recognize(audio.get_raw_data(), audio.sample_rate)
+            
+            if text:
+                print(f"Розпізнано ({language}): {text}")
+                logging.info(f"Успішно розпізнано ({language}): {text}")
+                return text
+            
+            print("Не вдалося розпізнати мовлення")
+            logging.warning("Мовлення не розпізнано")
+            return None
                         
         except sr.WaitTimeoutError:
             print("Таймаут очікування")
@@ -127,6 +195,54 @@ class VoiceListener:
             print(f"Помилка: {e}")
             return None
     
+    async def wait_for_speech(self, stop, playing=None):
+        """
+        Очікування мовлення користувача під час озвучування
+        
+        Args:
+            stop (threading.Event): Припинення очікування (озвучування завершилось)
+            playing: Функція без аргументів - чи звучить озвучування
+                (луна динаміків відсіюється, voice.vad.EchoGate)
+            
+        Returns:
+            bool: True, якщо користувач заговорив; наступна команда
+                слухається з початку його мовлення
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(executors.get("audio"), self._wait_for_speech_sync, stop, playing)
+        except Exception as e:
+            logging.error(f"Помилка очікування переривання: {e}")
+            return False
+    
+    def _wait_for_speech_sync(self, stop, playing=None):
+        """Синхронне очікування мовлення з поточного моменту потоку"""
+        self.audio_stream.ensure_running()
+        onset = self.barge_in.wait_for_speech(
+            self.audio_stream.cursor(),
+            self.config.TTS_BARGE_IN_MIN_SPEECH,
+            stop,
+            playing
+        )
+        if onset is None:
+            return False
+        
+        preroll = self.audio_stream.seconds_to_samples(self.config.AUDIO_PREROLL_SECONDS)
+        self._command_cursor = StreamCursor(self.audio_stream, max(self.audio_stream.buffer.oldest, onset - preroll))
+        return True
+    
+    def arm_follow_up(self):
+        """
+        Підготовка курсора уточнюючої команди після озвучування
+        
+        Аудіо з кінця відповіді (без короткого відлуння динаміків) не
+        втрачається, навіть якщо користувач заговорив одразу.
+        """
+        if self._command_cursor is None:
+            tail = self.audio_stream.seconds_to_samples(self.config.TTS_ECHO_TAIL_SECONDS)
+            self._command_cursor = StreamCursor(self.audio_stream, self.audio_stream.position + tail)
+    
+    
     async def listen_for_activation(self):
         """
         Спеціальне прослуховування для активаційної фрази
@@ -134,7 +250,7 @@ class VoiceListener:
         """
         try:
             loop = asyncio.get_event_loop()
-            text = await loop.run_in_executor(None, self._listen_for_activation_sync)
+            text = await loop.run_in_executor(executors.get("audio"), self._listen_for_activation_sync)
             return text
         except Exception as e:
             logging.error(f"Помилка при прослуховуванні активації: {e}")
@@ -143,21 +259,26 @@ class VoiceListener:
     def _listen_for_activation_sync(self):
         """Синхронне прослуховування активації"""
         try:
-            with sr.Microphone(device_index=self.microphone_index) as source:
-                # Більш тривале очікування для активації
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=1,  # Коротший таймаут
-                    phrase_time_limit=3  # Довша фраза
-                )
-                
-                # Розпізнавання тільки українською для активації
-                try:
-                    text = self.recognizer.recognize_google(audio, language="uk-UA")
-                    logging.info(f"Активаційна фраза: {text}")
-                    return text
-                except sr.UnknownValueError:
-                    return None
+            self.audio_stream.ensure_running()
+            # Продовження з місця попереднього виклику: аудіо між викликами не втрачається
+            self._command_cursor = None
+            if self._activation_cursor is None:
+                self._activation_cursor = self.audio_stream.cursor(preroll=self.config.AUDIO_PREROLL_SECONDS)
+            if self.config.WAKE_WORD_ENABLED and self.wake_word.enrolled:
+                return self._detect_wake_word()
+            
+            # Коротший таймаут і коротка фраза для активації
+            pcm = self.endpointer.listen(
+                self._activation_cursor,
+                timeout=1,
+                max_seconds=self.config.SPEECH_PHRASE_TIMEOUT
+            )
+            
+            # Розпізнавання тільки українською для активації
+            text = self.asr.recognize(pcm, self.audio_stream.sample_rate, "uk-UA")
+            if text:
+                logging.info(f"Активаційна фраза: {text}")
+            return text
                     
         except sr.WaitTimeoutError:
             return None
@@ -165,16 +286,40 @@ class VoiceListener:
             logging.error(f"Помилка активації: {e}")
             return None
     
+    def _detect_wake_word(self):
+        """Локальне виявлення слова; хмарне розпізнавання - лише після спрацювання"""
+        if self.wake_word.listen(self._activation_cursor, timeout=1) is None:
+            return None
+        
+        if not self.config.WAKE_WORD_VERIFY:
+            return self.config.WAKE_WORD
+        
+        # Підтвердження: фраза до моменту спрацювання
+        audio = self.audio_stream.window(self.config.WAKE_WORD_VERIFY_SECONDS, end=self._activation_cursor.position)
+        try:
+            text = self.asr.recognize(audio, self.audio_stream.sample_rate, "uk-UA")
+            if text:
+                logging.info(f"Активаційна фраза: {text}")
+            return text
+        except sr.RequestError as e:
+            # Без мережі довіряємо локальному детектору
+            logging.warning(f"Підтвердження активації недоступне: {e}")
+            return self.config.WAKE_WORD
+    
     def is_listening_available(self):
         """Перевірка доступності мікрофона"""
         try:
-            with sr.Microphone(device_index=self.microphone_index) as source:
-                pass
-            return True
+            return self.audio_stream.ensure_running()
         except Exception as e:
             logging.error(f"Мікрофон недоступний: {e}")
             return False
     
+    def close(self):
+        """Зупинка потоку мікрофона та розпізнавання"""
+        self.calibrator.stop()
+        self.audio_stream.stop()
+        self.languages.close()
+    
     def get_microphone_info(self):
         """Отримання інформації про мікрофон"""
         try:
@@ -182,7 +327,13 @@ class VoiceListener:
             return {
                 "available_microphones": mic_list,
                 "current_device_index": self.microphone_index,
-                "total_devices": len(mic_list)
+                "total_devices": len(mic_list),
+                "stream": self.audio_stream.get_statistics(),
+                "wake_word": self.wake_word.get_statistics(),
+                "endpointer": self.endpointer.get_statistics(),
+                "barge_in": self.barge_in.get_statistics(),
+                "calibration": self.calibrator.get_statistics(),
+                "asr": self.languages.get_statistics()
             }
         except Exception as e:
             logging.error(f"Помилка отримання інформації про мікрофон: {e}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розбиття потоку тексту на речення для потокового озвучування
+"""
+
+import re
+
+# Скорочення, після яких крапка не завершує речення
+ABBREVIATIONS = {
+    "т.д", "т.п", "напр", "див", "стор", "рис", "табл", "р", "рр", "ст",
+    "вул", "м", "тис", "млн", "млрд", "грн", "e.g", "i.e", "etc", "mr", "mrs", "dr", "vs"
+}
+
+SENTENCE_END = re.compile(r'([.!?…]+["»)\]]*)(\s+)')
+SOFT_BREAK = re.compile(r'[,;:—–-]\s+')
+
+class SentenceSegmenter:
+    """
+    Накопичує фрагменти тексту (токени GPT) і віддає завершені речення
+
+    Args:
+        max_length (int): Максимальна довжина фрагмента без межі речення;
+            довші фрагменти розбиваються по комі або пробілу, щоб не
+            затримувати початок озвучування
+    """
+
+    def __init__(self, max_length=250):
+        self.max_length = max_length
+        self.buffer = ""
+
+    def feed(self, delta):
+        """
+        Додавання фрагмента тексту
+
+        Returns:
+            list: Речення, що завершилися з цим фрагментом
+        """
+        if not delta:
+            return []
+
+        self.buffer += delta
+        sentences = []
+
+        while True:
+            sentence = self._pop_sentence()
+            if sentence is None:
+                break
+            sentences.append(sentence)
+
+        return sentences
+
+    def flush(self):
+        """Віддача залишку буфера в кінці потоку"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+    def _pop_sentence(self):
+        """Виділення першого завершеного речення з буфера"""
+        # Абзац завжди завершує речення
+        paragraph = self.buffer.find("\n")
+        search_end = paragraph if paragraph != -1 else len(self.buffer)
+
+        for match in SENTENCE_END.finditer(self.buffer, 0, search_end + 1):
+            if self._is_abbreviation(match.start()):
+                continue
+            return self._cut(match.end())
+
+        if paragraph != -1:
+            return self._cut(paragraph + 1) or self._pop_sentence()
+
+        if len(self.buffer) > self.max_length:
+            return self._cut(self._soft_break_position())
+
+        return None
+
+    def _is_abbreviation(self, dot_position):
+        """Перевірка, чи крапка належить скороченню (напр., "т.д.")"""
+        if self.buffer[dot_position] != ".":
+            return False
+        word = self.buffer[:dot_position].split()[-1:] or [""]
+        return word[0].lower().rstrip(".") in ABBREVIATIONS
+
+    def _soft_break_position(self):
+        """Позиція для розбиття задовгого фрагмента"""
+        window = self.buffer[:self.max_length]
+        breaks = list(SOFT_BREAK.finditer(window))
+        if breaks:
+            return breaks[-1].end()
+        space = window.rfind(" ")
+        return space + 1 if space > 0 else self.max_length
+
+    def _cut(self, position):
+        sentence = self.buffer[:position].strip()
+        self.buffer = self.buffer[position:]
+        return sentence
+
+def split_sentences(text):
+    """Розбиття готового тексту на речення"""
+    segmenter = SentenceSegmenter()
+    return segmenter.feed(text) + segmenter.flush()
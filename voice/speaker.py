@@ -7,13 +7,116 @@
 import pyttsx3
 import asyncio
 import logging
+import time
 from config import Config
+from voice.tts_cache import TTSCache, WavPlayer
+from voice.tts_worker import PRIORITY_NORMAL, TTSWorker
+
+class SpeechStream:
+    """
+    Потокове озвучування: речення озвучуються по мірі надходження,
+    поки решта відповіді ще генерується
+    """
+    
+    def __init__(self, speaker):
+        self.speaker = speaker
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.sentences = 0
+        self.generation = speaker.worker.generation
+        self._utterances = []
+        self._finished = False
+    
+    @property
+    def has_output(self):
+        """Чи було передано хоча б одне речення"""
+        return self.sentences > 0
+    
+    @property
+    def interrupted(self):
+        """Чи було озвучування перервано після початку потоку"""
+        return self.generation != self.speaker.worker.generation
+    
+    @property
+    def time_to_first_audio(self):
+        """Час від початку потоку до початку озвучування (секунди)"""
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
+    
+    async def feed(self, text):
+        """Додавання речення до черги озвучування"""
+        if text and text.strip() and not self._finished and not self.interrupted:
+            self.sentences += 1
+            print(f"JARVIS: {text.strip()}")
+            self._utterances.append(self.speaker.worker.speak(text.strip(), on_start=self._on_audio))
+    
+    def _on_audio(self, utterance):
+        """Початок звучання речення (викликається в потоці озвучування)"""
+        if self.first_audio_at is None:
+            self.first_audio_at = utterance.audio_at
+            self.speaker.last_time_to_first_audio = self.time_to_first_audio
+            logging.info(f"Час до першого звуку: {self.time_to_first_audio:.3f} с")
+    
+    async def finish(self):
+        """Очікування завершення озвучування всіх речень"""
+        self._finished = True
+        try:
+            for utterance in self._utterances:
+                await asyncio.wrap_future(utterance.future)
+        except Exception as e:
+            logging.error(f"Помилка потокового озвучування: {e}")
+        return self.time_to_first_audio
 
 class VoiceSpeaker:
-    def __init__(self):
-        self.engine = pyttsx3.init()
+    # Пули персоналізованих відповідей (кешуються разом з фіксованими фразами)
+    PERSONALIZED_RESPONSES = {
+        'greeting': [
+            "Слухаю тебе, Олександре.",
+            "Так, я тут. Що потрібно зробити?",
+            "Готова допомогти. Яка команда?",
+            "Вітаю! Чим можу бути корисною?"
+        ],
+        'success': [
+            "Гаразд, виконано.",
+            "Завдання виконано успішно.",
+            "Готово! Що ще потрібно?",
+            "Зроблено. Чим ще допомогти?"
+        ],
+        'error': [
+            "Вибачте, виникла помилка.",
+            "Щось пішло не так. Спробуємо ще раз?",
+            "Не вдалося виконати команду.",
+            "Помилка виконання. Потрібна допомога?"
+        ],
+        'learning': [
+            "Цікаво! Запам'ятовую це.",
+            "Додаю до своїх знань.",
+            "Вивчила! Тепер знаю, як це робити.",
+            "Дякую за навчання. Стала розумнішою!"
+        ]
+    }
+    
+    def __init__(self, engine=None, cache=None, player=None):
         self.config = Config()
-        self._setup_voice()
+        self.last_time_to_first_audio = None
+        self.fixed_phrases = []
+        
+        # Кеш фраз за замовчуванням - лише для системного рушія; з переданим
+        # рушієм (бенчмарки, тести) кеш використовується, тільки якщо його передано
+        if cache is None and engine is None and self.config.TTS_CACHE_ENABLED:
+            cache = TTSCache()
+        if cache is not None:
+            player = player or WavPlayer()
+            if not player.available:
+                logging.warning("PyAudio недоступний - кеш озвучування вимкнено")
+                cache = None
+        
+        # Рушієм володіє один потік озвучування (pyttsx3 не можна викликати
+        # з довільних потоків); рушій можна передати ззовні (напр. беззвучний для бенчмарків)
+        self.worker = TTSWorker(lambda: engine or pyttsx3.init(), cache=cache, player=player)
+        self.engine = self.worker.engine
+        self.worker.call(self._setup_voice)
         
         logging.info("VoiceSpeaker ініціалізовано")
     
@@ -50,33 +153,70 @@ class VoiceSpeaker:
         except Exception as e:
             logging.error(f"Помилка налаштування голосу: {e}")
     
-    async def speak(self, text):
+    async def speak(self, text, priority=PRIORITY_NORMAL):
         """
         Асинхронне озвучування тексту
         
         Args:
             text (str): Текст для озвучування
+            priority (int): Пріоритет у черзі (voice.tts_worker.PRIORITY_*)
+            
+        Returns:
+            bool: True, якщо фразу озвучено повністю (False - перервано)
         """
         if not text:
-            return
+            return False
             
         try:
             print(f"JARVIS: {text}")
             
-            # Запуск в окремому потоці для асинхронності
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self._speak_sync, text)
+            # Фраза озвучується потоком рушія; очікування не блокує цикл подій
+            utterance = self.worker.speak(text, priority)
+            await asyncio.wrap_future(utterance.future)
+            return not utterance.interrupted
             
         except Exception as e:
             logging.error(f"Помилка при озвучуванні: {e}")
+            return False
     
-    def _speak_sync(self, text):
-        """Синхронне озвучування"""
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            logging.error(f"Помилка синхронного озвучування: {e}")
+    def start_stream(self):
+        """
+        Початок потокового озвучування
+        
+        Returns:
+            SpeechStream: Потік, у який передаються речення через feed()
+        """
+        return SpeechStream(self)
+    
+    def prerender(self, phrases):
+        """
+        Фонове кешування фіксованих фраз (разом з пулами персоналізованих
+        відповідей): надалі вони відтворюються без синтезу
+        """
+        pools = [phrase for pool in self.PERSONALIZED_RESPONSES.values() for phrase in pool]
+        self.fixed_phrases = list(dict.fromkeys(list(phrases) + pools))
+        self.worker.prerender(self.fixed_phrases)
+    
+    def interrupt(self):
+        """
+        Переривання мовлення (користувач заговорив або сказав "стоп")
+        
+        Returns:
+            bool: Чи звучала фраза в момент переривання
+        """
+        return self.worker.interrupt()
+    
+    @property
+    def is_speaking(self):
+        return self.worker.speaking
+    
+    def close(self):
+        """Завершення потоку озвучування"""
+        self.worker.close()
+    
+    def get_statistics(self):
+        """Час черги, синтезу і відтворення фраз"""
+        return self.worker.get_statistics()
     
     def set_voice_properties(self, rate=None, volume=None):
         """
@@ -86,6 +226,9 @@ class VoiceSpeaker:
             rate (int): Швидкість мовлення (слів за хвилину)
             volume (float): Гучність (0.0 - 1.0)
         """
+        self.worker.call(self._set_voice_properties, rate, volume)
+    
+    def _set_voice_properties(self, rate, volume):
         try:
             if rate is not None:
                 self.engine.setProperty('rate', rate)
@@ -94,12 +237,19 @@ class VoiceSpeaker:
             if volume is not None:
                 self.engine.setProperty('volume', volume)
                 logging.info(f"Гучність змінено на: {volume}")
+            
+            # Ключ кешу залежить від голосу - фіксовані фрази рендеряться заново
+            if self.fixed_phrases:
+                self.worker.prerender(self.fixed_phrases)
                 
         except Exception as e:
             logging.error(f"Помилка зміни властивостей голосу: {e}")
     
     def get_available_voices(self):
         """Отримання списку доступних голосів"""
+        return self.worker.call(self._get_available_voices)
+    
+    def _get_available_voices(self):
         try:
             voices = self.engine.getProperty('voices')
             voice_info = []
@@ -133,35 +283,8 @@ class VoiceSpeaker:
 
     def get_personalized_response(self, response_type):
         """Отримання персоналізованих відповідей"""
-        responses = {
-            'greeting': [
-                "Слухаю тебе, Олександре.",
-                "Так, я тут. Що потрібно зробити?",
-                "Готова допомогти. Яка команда?",
-                "Вітаю! Чим можу бути корисною?"
-            ],
-            'success': [
-                "Гаразд, виконано.",
-                "Завдання виконано успішно.",
-                "Готово! Що ще потрібно?",
-                "Зроблено. Чим ще допомогти?"
-            ],
-            'error': [
-                "Вибачте, виникла помилка.",
-                "Щось пішло не так. Спробуємо ще раз?",
-                "Не вдалося виконати команду.",
-                "Помилка виконання. Потрібна допомога?"
-            ],
-            'learning': [
-                "Цікаво! Запам'ятовую це.",
-                "Додаю до своїх знань.",
-                "Вивчила! Тепер знаю, як це робити.",
-                "Дякую за навчання. Стала розумнішою!"
-            ]
-        }
-        
         import random
-        return random.choice(responses.get(response_type, ["Зрозуміло."]))
+        return random.choice(self.PERSONALIZED_RESPONSES.get(response_type, ["Зрозуміло."]))
 
 # Тестування модуля
 if __name__ == "__main__":
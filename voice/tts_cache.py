@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кеш озвучених фраз для JARVIS
+
+Фіксовані фрази (привітання, підтвердження, повідомлення) і відповіді,
+що повторюються, потік озвучування у фоні рендерить рушієм у WAV
+(engine.save_to_file), а далі відтворює їх напряму, без синтезу. Ключ -
+(голос, швидкість, гучність, текст), тож після зміни голосу старі записи
+не використовуються. Фіксовані фрази закріплені; динамічні витісняються
+за давністю використання (LRU), коли кеш перевищує TTS_CACHE_MAX_MB.
+"""
+
+import os
+import json
+import time
+import wave
+import hashlib
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from config import Config
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+class TTSCache:
+    """
+    WAV файли фраз на диску з індексом
+
+    Args:
+        directory (Path): Директорія кешу (за замовчуванням Config.TTS_CACHE_DIR)
+        max_bytes (int): Найбільший розмір динамічних і закріплених записів
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.config = Config()
+        self.directory = Path(directory or self.config.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes or int(self.config.TTS_CACHE_MAX_MB * 1024 * 1024)
+        self.index_path = self.directory / "index.json"
+        self._lock = threading.Lock()
+        self._repeats = Counter()  # ключ -> скільки разів синтезовано рушієм
+        self._failed = set()       # ключі, які рушій не зміг зберегти у WAV
+        self.entries = self._load_index()  # ключ -> {'text', 'size', 'last_used', 'pinned'}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'renders': 0,
+            'render_errors': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def key(voice, rate, volume, text):
+        raw = json.dumps([voice, rate, volume, text], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return self.directory / f"{key}.wav"
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return {key: entry for key, entry in entries.items() if self.path(key).exists()}
+        except Exception as e:
+            logging.error(f"Помилка читання індексу кешу озвучування: {e}")
+            return {}
+
+    def save(self):
+        """Атомарне збереження індексу"""
+        with self._lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                temp_path = self.index_path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.index_path)
+            except Exception as e:
+                logging.error(f"Помилка збереження індексу кешу озвучування: {e}")
+
+    def lookup(self, key):
+        """
+        Шлях до WAV фрази
+
+        Returns:
+            Path: Файл або None, якщо фразу не кешовано
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and not self.path(key).exists():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            entry['last_used'] = time.time()
+            self.stats['hits'] += 1
+            return self.path(key)
+
+    def should_render(self, key, text):
+        """Чи кешувати фразу, синтезовану рушієм (повторюється і коротка)"""
+        if key in self.entries or key in self._failed:
+            return False
+        if len(text) > self.config.TTS_CACHE_MAX_TEXT_CHARS:
+            return False
+        self._repeats[key] += 1
+        return self._repeats[key] >= self.config.TTS_CACHE_MIN_REPEATS
+
+    def pin(self, keys):
+        """Закріплення фіксованих фраз (не витісняються); решта - динамічні"""
+        keys = set(keys)
+        with self._lock:
+            for key, entry in self.entries.items():
+                entry['pinned'] = key in keys
+
+    def add(self, key, text, rendered_path, pinned=False):
+        """
+        Додавання відрендереного файлу
+
+        Returns:
+            bool: True, якщо файл - коректний WAV і додано до кешу
+        """
+        rendered_path = Path(rendered_path)
+        try:
+            with wave.open(str(rendered_path), 'rb') as wav:
+                if wav.getnframes() == 0:
+                    raise ValueError("порожній запис")
+            os.replace(rendered_path, self.path(key))
+        except Exception as e:
+            # Напр. рушій зберіг не WAV - фраза і далі синтезується
+            self.stats['render_errors'] += 1
+            self._failed.add(key)
+            logging.warning(f"Не вдалося кешувати фразу '{text[:40]}': {e}")
+            rendered_path.unlink(missing_ok=True)
+            return False
+
+        with self._lock:
+            self.entries[key] = {
+                'text': text,
+                'size': self.path(key).stat().st_size,
+                'last_used': time.time(),
+                'pinned': pinned
+            }
+            self.stats['renders'] += 1
+            self._repeats.pop(key, None)
+            self._evict()
+        self.save()
+        return True
+
+    def _evict(self):
+        """Витіснення динамічних записів, що найдовше не використовувались"""
+        total = sum(entry['size'] for entry in self.entries.values())
+        dynamic = sorted(
+            (key for key, entry in self.entries.items() if not entry.get('pinned')),
+            key=lambda key: self.entries[key]['last_used']
+        )
+        for key in dynamic:
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(key)['size']
+            self.path(key).unlink(missing_ok=True)
+            self.stats['evictions'] += 1
+
+    def get_statistics(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'pinned': sum(1 for entry in self.entries.values() if entry.get('pinned')),
+                'size_kb': round(sum(entry['size'] for entry in self.entries.values()) / 1024, 1)
+            }
+
+class WavPlayer:
+    """
+    Відтворення WAV через PyAudio
+
+    Файл подається фрагментами, тож відтворення переривається між ними.
+    Усі виклики - з потоку озвучування.
+    """
+
+    CHUNK_FRAMES = 1024
+
+    def __init__(self):
+        self._audio = None
+
+    @property
+    def available(self):
+        return PYAUDIO_AVAILABLE
+
+    def play(self, path, on_start=None, should_stop=None):
+        """
+        Returns:
+            bool: True, якщо файл відтворено повністю
+        """
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+
+        with wave.open(str(path), 'rb') as wav:
+            stream = self._audio.open(
+                format=self._audio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True
+            )
+            try:
+                if on_start:
+                    on_start()
+                while True:
+                    if should_stop and should_stop():
+                        return False
+                    data = wav.readframes(self.CHUNK_FRAMES)
+                    if not data:
+                        return True
+                    stream.write(data)
+            finally:
+                stream.stop_stream()
+                stream.close()
+
+    def close(self):
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потік озвучування для JARVIS
+
+Рушій pyttsx3 не можна викликати з довільних потоків пулу, тому ним
+володіє один довгоживучий потік: він створює рушій, налаштовує його і
+озвучує фрази з черги з пріоритетами (термінові фрази - раніше за
+звичайні). interrupt() обриває поточну фразу (через stop() у зворотному
+виклику рушія, тобто в потоці-власнику) і відкидає всі фрази, додані до
+переривання. Для кожної фрази фіксуються очікування в черзі, синтез (до
+початку звучання) і відтворення.
+
+З кешем (voice.tts_cache) фрази, що вже є у WAV, відтворюються напряму, а
+рендеринг нових записів виконується цим же потоком з найнижчим
+пріоритетом - між фразами, не затримуючи їх.
+"""
+
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+PRIORITY_URGENT = 0    # підтвердження, попередження
+PRIORITY_NORMAL = 5    # відповіді
+PRIORITY_LOW = 10      # фонові повідомлення
+_PRIORITY_CONTROL = -1 # виклики рушія (налаштування голосу)
+_PRIORITY_RENDER = 100 # рендеринг кешу у фоні
+_PRIORITY_CLOSE = float("inf")
+
+class Utterance:
+    """
+    Фраза в черзі озвучування
+
+    Args:
+        text (str): Текст
+        priority (int): Пріоритет (менше - раніше)
+        generation (int): Покоління переривань, у якому фразу додано
+        on_start: Функція (utterance), що викликається на початку звучання
+    """
+
+    def __init__(self, text, priority, generation, on_start=None):
+        self.text = text
+        self.priority = priority
+        self.generation = generation
+        self.on_start = on_start
+        self.future = Future()  # результат - сама фраза
+        self.queued_at = time.perf_counter()
+        self.started_at = None   # взято в роботу
+        self.audio_at = None     # початок звучання
+        self.finished_at = None
+        self.interrupted = False
+        self.cached = False      # відтворено з кешу без синтезу
+
+    @property
+    def timings(self):
+        """Очікування, синтез і відтворення (секунди)"""
+        if self.started_at is None:
+            return {'queue_wait': None, 'synthesis': None, 'playback': None,
+                    'interrupted': self.interrupted, 'cached': False}
+        audio_at = self.audio_at or self.started_at
+        return {
+            'queue_wait': self.started_at - self.queued_at,
+            'synthesis': audio_at - self.started_at,
+            'playback': (self.finished_at or audio_at) - audio_at,
+            'interrupted': self.interrupted,
+            'cached': self.cached
+        }
+
+class _Call:
+    """Виклик функції в потоці рушія"""
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.future = Future()
+
+class TTSWorker:
+    """
+    Єдиний потік, що володіє рушієм синтезу мовлення
+
+    Args:
+        engine_factory: Функція без аргументів, що створює рушій з
+            інтерфейсом pyttsx3 (викликається в потоці озвучування)
+        cache (TTSCache): Кеш WAV фраз (None - без кешу)
+        player (WavPlayer): Відтворення кешованих WAV
+    """
+
+    def __init__(self, engine_factory, cache=None, player=None):
+        self.engine = None
+        self.cache = cache
+        self.player = player
+        self._callbacks = False
+        self.generation = 0
+        self.current = None
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stop_requested = False
+        self._recent = deque(maxlen=100)
+        self._init_error = None
+        self._closed = False
+        self._ready = threading.Event()
+
+        self.stats = {
+            'utterances': 0,
+            'interrupted': 0,
+            'dropped': 0,
+            'interrupts': 0,
+            'errors': 0,
+            'cached_playbacks': 0
+        }
+
+        self._thread = threading.Thread(target=self._run, args=(engine_factory,), name="tts-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._init_error is not None:
+            raise self._init_error
+
+    def _put(self, priority, item):
+        self._queue.put((priority, next(self._sequence), item))
+
+    def speak(self, text, priority=PRIORITY_NORMAL, on_start=None):
+        """
+        Додавання фрази до черги
+
+        Returns:
+            Utterance: Фраза; utterance.future завершується після озвучування
+                або переривання
+        """
+        utterance = Utterance(text, priority, self.generation, on_start)
+        if self._closed:
+            # Потік завершено - фраза не буде озвучена
+            utterance.interrupted = True
+            self.stats['dropped'] += 1
+            utterance.future.set_result(utterance)
+            return utterance
+        self._put(priority, utterance)
+        return utterance
+
+    def call(self, func, *args):
+        """Виконання func(*args) у потоці рушія (перед фразами в черзі)"""
+        if threading.current_thread() is self._thread:
+            return func(*args)
+        call = _Call(func, args)
+        self._put(_PRIORITY_CONTROL, call)
+        return call.future.result()
+
+    def prerender(self, texts):
+        """Фоновий рендеринг фіксованих фраз (закріплюються в кеші)"""
+        if self.cache is not None and not self._closed:
+            self._put(_PRIORITY_RENDER, _Call(self._prerender, (list(texts),)))
+
+    def wait_idle(self, timeout=None):
+        """Очікування порожньої черги (включно з фоновим рендерингом)"""
+        while True:
+            call = _Call(lambda: None, ())
+            self._put(_PRIORITY_RENDER, call)
+            call.future.result(timeout)
+            if self._queue.empty():
+                return
+
+    @property
+    def speaking(self):
+        return self.current is not None
+
+    def interrupt(self):
+        """
+        Переривання поточної фрази і відкидання черги
+
+        Returns:
+            bool: Чи звучала фраза в момент переривання
+        """
+        with self._lock:
+            self.generation += 1
+            self.stats['interrupts'] += 1
+            current = self.current
+            if current is not None:
+                self._stop_requested = True
+        if current is not None:
+            logging.info(f"Озвучування перервано: {current.text[:40]}")
+        return current is not None
+
+    def _run(self, engine_factory):
+        try:
+            self.engine = engine_factory()
+            # Переривання - stop() зі зворотного виклику, тобто в потоці рушія
+            self._callbacks = hasattr(self.engine, "connect")
+            if self._callbacks:
+                self.engine.connect('started-utterance', self._on_utterance_started)
+                self.engine.connect('started-word', self._on_word)
+        except Exception as e:
+            self._init_error = e
+            return
+        finally:
+            self._ready.set()
+
+        while True:
+            _, _, item = self._queue.get()
+            if item is None:
+                break
+            if isinstance(item, _Call):
+                try:
+                    item.future.set_result(item.func(*item.args))
+                except Exception as e:
+                    item.future.set_exception(e)
+                continue
+            self._speak(item)
+
+        if self.player is not None:
+            self.player.close()
+        if self.cache is not None:
+            self.cache.save()
+
+    def _speak(self, utterance):
+        with self._lock:
+            stale = utterance.generation != self.generation
+            if not stale:
+                self.current = utterance
+                self._stop_requested = False
+        if stale:
+            # Додано до переривання - не озвучується
+            utterance.interrupted = True
+            self.stats['dropped'] += 1
+            utterance.future.set_result(utterance)
+            return
+        utterance.started_at = time.perf_counter()
+        key = self._cache_key(utterance.text) if self.cache is not None else None
+        path = self.cache.lookup(key) if key else None
+        try:
+            if path is not None:
+                self._play_cached(utterance, path)
+            else:
+                self._synthesize(utterance)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"Помилка озвучування: {e}")
+        finally:
+            utterance.finished_at = time.perf_counter()
+            if utterance.audio_at is None:
+                self._audio_started(utterance, utterance.started_at)
+            with self._lock:
+                utterance.interrupted = self._stop_requested
+                self.current = None
+                self._stop_requested = False
+            self._record(utterance)
+            utterance.future.set_result(utterance)
+
+        # Синтезована фраза повторюється - рендеримо її для наступних разів
+        if key and path is None and not utterance.interrupted and self.cache.should_render(key, utterance.text):
+            self._put(_PRIORITY_RENDER, _Call(self._render, (utterance.text,)))
+
+    def _synthesize(self, utterance):
+        if not self._callbacks:
+            # Рушій без зворотних викликів: початок звучання невідомий
+            self._audio_started(utterance, utterance.started_at)
+        self.engine.say(utterance.text)
+        self.engine.runAndWait()
+
+    def _play_cached(self, utterance, path):
+        try:
+            self.player.play(
+                path,
+                on_start=lambda: self._audio_started(utterance, time.perf_counter()),
+                should_stop=lambda: self._stop_requested
+            )
+            utterance.cached = True
+            self.stats['cached_playbacks'] += 1
+        except Exception as e:
+            logging.error(f"Помилка відтворення кешованої фрази: {e}")
+            if utterance.audio_at is None:
+                self._synthesize(utterance)
+
+    def _cache_key(self, text):
+        """Ключ кешу з поточних налаштувань голосу"""
+        engine = self.engine
+        return self.cache.key(engine.getProperty('voice'), engine.getProperty('rate'),
+                              engine.getProperty('volume'), text)
+
+    def _prerender(self, texts):
+        keys = {self._cache_key(text): text for text in texts}
+        self.cache.pin(keys)
+        for key, text in keys.items():
+            if key not in self.cache.entries:
+                self._put(_PRIORITY_RENDER, _Call(self._render, (text, True)))
+
+    def _render(self, text, pinned=False):
+        """Збереження фрази у WAV кешу (рушієм, без відтворення)"""
+        if self._closed:
+            return
+        key = self._cache_key(text)
+        if key in self.cache.entries:
+            return
+        rendered_path = self.cache.path(key).with_suffix(".render.wav")
+        try:
+            self.cache.directory.mkdir(parents=True, exist_ok=True)
+            self.engine.save_to_file(text, str(rendered_path))
+            self.engine.runAndWait()
+        except Exception as e:
+            self.cache.stats['render_errors'] += 1
+            logging.error(f"Помилка рендерингу фрази: {e}")
+            return
+        self.cache.add(key, text, rendered_path, pinned)
+
+    def _on_utterance_started(self, name):
+        utterance = self.current
+        if utterance is not None and utterance.audio_at is None:
+            self._audio_started(utterance, time.perf_counter())
+
+    def _audio_started(self, utterance, moment):
+        utterance.audio_at = moment
+        if utterance.on_start:
+            try:
+                utterance.on_start(utterance)
+            except Exception as e:
+                logging.error(f"Помилка обробника початку озвучування: {e}")
+
+    def _on_word(self, name, location, length):
+        if self._stop_requested:
+            self.engine.stop()
+
+    def _record(self, utterance):
+        timings = utterance.timings
+        self._recent.append(timings)
+        self.stats['utterances'] += 1
+        if utterance.interrupted:
+            self.stats['interrupted'] += 1
+        logging.info(
+            f"Озвучування: черга {timings['queue_wait'] * 1000:.0f} мс, синтез {timings['synthesis'] * 1000:.0f} мс, "
+            f"відтворення {timings['playback'] * 1000:.0f} мс{' (кеш)' if utterance.cached else ''}"
+            f"{' (перервано)' if utterance.interrupted else ''}"
+        )
+
+    def close(self, timeout=10):
+        """Завершення потоку після озвучування черги"""
+        if self._thread.is_alive() and not self._closed:
+            self._closed = True
+            self._put(_PRIORITY_CLOSE, None)
+            self._thread.join(timeout=timeout)
+
+    def get_statistics(self):
+        def mean_ms(key):
+            if not self._recent:
+                return None
+            return round(1000 * sum(item[key] for item in self._recent) / len(self._recent), 1)
+
+        return {
+            **self.stats,
+            'cache': self.cache.get_statistics() if self.cache is not None else None,
+            'queued': self._queue.qsize(),
+            'mean_queue_wait_ms': mean_ms('queue_wait'),
+            'mean_synthesis_ms': mean_ms('synthesis'),
+            'mean_playback_ms': mean_ms('playback'),
+            'last': self._recent[-1] if self._recent else None
+        }
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Виявлення мовлення (VAD) і кінця фрази для JARVIS
+
+Замість енергетичного порогу sr.Recognizer з фіксованою паузою 0.8 с і
+обмеженням фрази 3 с потік мікрофона розбивається на кадри по
+VAD_FRAME_MS, кожен кадр класифікується VAD (WebRTC, якщо встановлено
+webrtcvad, інакше енергетичний детектор з адаптивним рівнем шуму), а
+Endpointer віддає фразу одразу після завершення мовлення.
+
+Поріг тиші після мовлення адаптивний: короткі команди ("стоп") завершуються
+через VAD_MIN_TRAILING_SILENCE, довші фрази - з більшим запасом (до
+VAD_MAX_TRAILING_SILENCE), а якщо мовець уже робив паузи всередині фрази,
+поріг не менший за найдовшу з них з запасом VAD_PAUSE_MARGIN.
+
+Під час озвучування відповіді мікрофон чує динаміки; EchoGate відсіює
+луну для переривання (barge-in), пропускаючи лише мовлення, гучніше за
+виміряний рівень луни.
+"""
+
+import logging
+import numpy as np
+from collections import deque
+import speech_recognition as sr
+from config import Config
+
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+def frame_energy(frame):
+    """Енергія кадру (дБ відносно 1 одиниці PCM16)"""
+    samples = frame.astype(np.float64)
+    return 10 * np.log10(np.mean(samples * samples) + 1e-9)
+
+class EnergyVAD:
+    """
+    Енергетичний VAD з адаптивним рівнем шуму
+
+    Поріг з гістерезисом: мовлення починається з перевищення шуму на
+    VAD_ENERGY_THRESHOLD_DB, а триває, доки кадр гучніший за шум хоча б на
+    VAD_ENERGY_HOLD_DB (слабкі приголосні не розривають фразу).
+
+    Args:
+        sample_rate (int): Частота дискретизації
+    """
+
+    name = "energy"
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.threshold_db = Config.VAD_ENERGY_THRESHOLD_DB
+        self.hold_db = Config.VAD_ENERGY_HOLD_DB
+        self.min_energy_db = Config.VAD_MIN_ENERGY_DB
+        self.noise_floor = None
+        self.active = False
+
+    def energy(self, frame):
+        return frame_energy(frame)
+
+    def update_noise_floor(self, energy, speech):
+        """Рівень шуму: швидко вниз, повільно вгору (під час мовлення - ще повільніше)"""
+        if self.noise_floor is None or energy < self.noise_floor:
+            self.noise_floor = energy
+        else:
+            self.noise_floor += (0.001 if speech else 0.05) * (energy - self.noise_floor)
+
+    def is_speech(self, frame):
+        energy = self.energy(frame)
+        threshold = self.hold_db if self.active else self.threshold_db
+        speech = (
+            self.noise_floor is not None
+            and energy > self.noise_floor + threshold
+            and energy > self.min_energy_db
+        )
+        self.active = speech
+        self.update_noise_floor(energy, speech)
+        return speech
+
+class WebRTCVAD:
+    """
+    VAD з WebRTC (GMM класифікатор, кадри 10/20/30 мс)
+
+    Args:
+        sample_rate (int): Частота дискретизації (8/16/32/48 кГц)
+    """
+
+    name = "webrtc"
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.vad = webrtcvad.Vad(Config.VAD_AGGRESSIVENESS)
+        self.noise_floor = None
+
+    def is_speech(self, frame):
+        return self.vad.is_speech(frame.tobytes(), self.sample_rate)
+
+class EchoGate:
+    """
+    Відсіювання луни озвучування
+
+    Поки звучить відповідь, рівень луни - 90-й перцентиль енергії кадрів
+    відтворення за останні TTS_ECHO_WINDOW_SECONDS (кадри, визнані
+    мовленням користувача, до оцінки не входять). Кадр під час відтворення
+    може бути мовленням користувача, лише якщо він гучніший за луну на
+    TTS_ECHO_MARGIN_DB (далі, як у EnergyVAD, досить VAD_ENERGY_HOLD_DB,
+    щоб приголосні не розривали фразу); перші TTS_ECHO_WARMUP_SECONDS
+    відтворення рівень луни лише вимірюється. Поза відтворенням кадри не
+    відсіюються.
+
+    Args:
+        frame_seconds (float): Тривалість кадру
+    """
+
+    def __init__(self, frame_seconds):
+        self.margin_db = Config.TTS_ECHO_MARGIN_DB
+        self.hold_db = Config.VAD_ENERGY_HOLD_DB
+        self.warmup_frames = int(Config.TTS_ECHO_WARMUP_SECONDS / frame_seconds)
+        self.levels = deque(maxlen=max(1, int(Config.TTS_ECHO_WINDOW_SECONDS / frame_seconds)))
+        self.playing_frames = 0
+        self.active = False
+
+    @property
+    def echo_level(self):
+        return float(np.percentile(self.levels, 90)) if self.levels else None
+
+    def allows(self, energy, playing):
+        """Чи може кадр з енергією energy (дБ) бути мовленням користувача"""
+        if not playing:
+            self.active = False
+            return True
+        self.playing_frames += 1
+        level = self.echo_level
+        margin = self.hold_db if self.active else self.margin_db
+        self.active = self.playing_frames > self.warmup_frames and level is not None and energy > level + margin
+        if not self.active:
+            self.levels.append(energy)
+        return self.active
+
+def create_vad(sample_rate, name=None):
+    """VAD за назвою (Config.VAD_BACKEND: auto, webrtc, energy)"""
+    name = (name or Config.VAD_BACKEND).lower()
+    if name in ("auto", "webrtc"):
+        if WEBRTCVAD_AVAILABLE and sample_rate in (8000, 16000, 32000, 48000):
+            return WebRTCVAD(sample_rate)
+        if name == "webrtc":
+            logging.warning("webrtcvad недоступний - використовується енергетичний VAD")
+    return EnergyVAD(sample_rate)
+
+class Endpointer:
+    """
+    Виділення фрази з потоку мікрофона
+
+    Args:
+        sample_rate (int): Частота дискретизації потоку
+        vad: Детектор мовлення (за замовчуванням create_vad)
+    """
+
+    def __init__(self, sample_rate=None, vad=None):
+        self.config = Config()
+        self.sample_rate = sample_rate or self.config.AUDIO_SAMPLE_RATE
+        self.vad = vad or create_vad(self.sample_rate)
+        self.frame_samples = int(self.sample_rate * self.config.VAD_FRAME_MS / 1000)
+        self.frame_seconds = self.frame_samples / self.sample_rate
+
+        self.stats = {
+            'utterances': 0,
+            'timeouts': 0,
+            'max_length_cuts': 0,
+            'barge_ins': 0,
+            'last_trailing_silence': None
+        }
+
+    def calibrate(self, pcm_bytes):
+        """Оцінка рівня шуму за аудіо без мовлення (для енергетичного VAD)"""
+        if not hasattr(self.vad, "update_noise_floor"):
+            return
+        samples = np.frombuffer(pcm_bytes, dtype=np.int16)
+        for start in range(0, len(samples) - self.frame_samples + 1, self.frame_samples):
+            self.vad.update_noise_floor(self.vad.energy(samples[start:start + self.frame_samples]), False)
+
+    def set_noise_floor(self, noise_db):
+        """Рівень шуму з профілю калібрування"""
+        if hasattr(self.vad, "update_noise_floor"):
+            self.vad.noise_floor = noise_db
+
+    def trailing_silence(self, speech_seconds, longest_pause):
+        """Тиша, після якої фраза вважається завершеною"""
+        low = self.config.VAD_MIN_TRAILING_SILENCE
+        high = self.config.VAD_MAX_TRAILING_SILENCE
+        progress = min(1.0, speech_seconds / self.config.VAD_ADAPT_SECONDS)
+        silence = max(low + (high - low) * progress, self.config.VAD_PAUSE_MARGIN * longest_pause)
+        return min(high, silence)
+
+    def listen(self, cursor, timeout=None, max_seconds=None, on_audio=None):
+        """
+        Читання потоку до завершення фрази
+
+        Args:
+            cursor (StreamCursor): Курсор потоку мікрофона
+            timeout (float): Очікування початку мовлення (секунди аудіо)
+            max_seconds (float): Найдовша фраза (Config.VAD_MAX_UTTERANCE_SECONDS)
+            on_audio: Функція (bytes) для кожного прочитаного фрагмента
+                (потокове розпізнавання під час мовлення)
+
+        Returns:
+            bytes: PCM16 аудіо фрази (з невеликим запасом до і після)
+
+        Raises:
+            sr.WaitTimeoutError: Мовлення не почалося за timeout
+        """
+        max_seconds = max_seconds or self.config.VAD_MAX_UTTERANCE_SECONDS
+        start_frames = self.config.VAD_START_FRAMES
+        padding_frames = int(self.config.VAD_PADDING_SECONDS / self.frame_seconds)
+        wait_frames = None if timeout is None else int(timeout / self.frame_seconds)
+
+        recent = deque(maxlen=start_frames)  # ознаки мовлення останніх кадрів
+        frames = deque(maxlen=padding_frames + start_frames)  # аудіо до початку фрази
+        utterance = None
+        pending = np.empty(0, dtype=np.int16)
+        waited = speech_frames = silence_frames = longest_pause = 0
+        last_voiced = 0
+
+        while True:
+            data = cursor.read(cursor.stream.chunk_frames, cursor.stream.read_timeout)
+            if not data:
+                break
+            if on_audio:
+                on_audio(data)
+
+            pending = np.concatenate([pending, np.frombuffer(data, dtype=np.int16)])
+            count = len(pending) // self.frame_samples
+            for index in range(count):
+                frame = pending[index * self.frame_samples:(index + 1) * self.frame_samples]
+                speech = self.vad.is_speech(frame)
+
+                if utterance is None:
+                    recent.append(speech)
+                    frames.append(frame)
+                    waited += 1
+                    # Початок: майже всі останні кадри - мовлення
+                    if len(recent) == start_frames and sum(recent) >= start_frames - 1:
+                        utterance = list(frames)
+                        speech_frames = sum(recent)
+                        last_voiced = len(utterance)
+                    elif wait_frames is not None and waited >= wait_frames:
+                        self.stats['timeouts'] += 1
+                        raise sr.WaitTimeoutError("Мовлення не розпочалося")
+                    continue
+
+                utterance.append(frame)
+                if speech:
+                    longest_pause = max(longest_pause, silence_frames * self.frame_seconds)
+                    silence_frames = 0
+                    speech_frames += 1
+                    last_voiced = len(utterance)
+                else:
+                    silence_frames += 1
+
+                trailing = self.trailing_silence(speech_frames * self.frame_seconds, longest_pause)
+                if silence_frames * self.frame_seconds >= trailing:
+                    self.stats['last_trailing_silence'] = round(trailing, 3)
+                    return self._emit(utterance, last_voiced, padding_frames)
+                if len(utterance) * self.frame_seconds >= max_seconds:
+                    self.stats['max_length_cuts'] += 1
+                    return self._emit(utterance, len(utterance), padding_frames)
+
+            pending = pending[count * self.frame_samples:]
+
+        # Потік зупинено: віддаємо почату фразу
+        if utterance is None:
+            self.stats['timeouts'] += 1
+            raise sr.WaitTimeoutError("Потік аудіо завершився без мовлення")
+        return self._emit(utterance, last_voiced, padding_frames)
+
+    def wait_for_speech(self, cursor, min_seconds, stop=None, playing=None):
+        """
+        Очікування початку мовлення (переривання озвучування)
+
+        Args:
+            cursor (StreamCursor): Курсор потоку мікрофона
+            min_seconds (float): Тривалість безперервного мовлення
+            stop (threading.Event): Припинення очікування
+            playing: Функція без аргументів - чи звучить зараз озвучування
+                (кадри під час відтворення проходять через EchoGate)
+
+        Returns:
+            int: Позиція початку мовлення в потоці (семпли) або None, якщо
+                очікування припинено чи потік завершився
+        """
+        needed = max(1, int(min_seconds / self.frame_seconds))
+        gate = EchoGate(self.frame_seconds) if playing else None
+        pending = np.empty(0, dtype=np.int16)
+        voiced = 0
+
+        while not (stop and stop.is_set()):
+            data = cursor.read(cursor.stream.chunk_frames, cursor.stream.read_timeout)
+            if not data:
+                if not cursor.stream.running:
+                    break
+                continue
+
+            pending = np.concatenate([pending, np.frombuffer(data, dtype=np.int16)])
+            base = cursor.position - len(pending)  # позиція першого семпла pending
+            count = len(pending) // self.frame_samples
+            for index in range(count):
+                frame = pending[index * self.frame_samples:(index + 1) * self.frame_samples]
+                speech = self.vad.is_speech(frame)
+                if gate is not None:
+                    speech = gate.allows(frame_energy(frame), playing()) and speech
+                voiced = voiced + 1 if speech else 0
+                if voiced >= needed:
+                    self.stats['barge_ins'] += 1
+                    return base + (index + 1 - voiced) * self.frame_samples
+            pending = pending[count * self.frame_samples:]
+        return None
+
+    def _emit(self, utterance, last_voiced, padding_frames):
+        self.stats['utterances'] += 1
+        end = min(len(utterance), last_voiced + padding_frames)
+        return np.concatenate(utterance[:end]).tobytes()
+
+    def get_statistics(self):
+        noise_floor = getattr(self.vad, "noise_floor", None)
+        return {
+            **self.stats,
+            'vad': self.vad.name,
+            'noise_floor_db': None if noise_floor is None else round(noise_floor, 1)
+        }
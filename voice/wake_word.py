@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальне виявлення активаційного слова ("Джарвіс") для JARVIS
+
+Потокові MFCC ознаки з аудіо мікрофона порівнюються з записаними
+зразками слова (шаблонами) через subsequence DTW. Енергетичний поріг
+над рівнем шуму пропускає тишу без обчислення DTW, тому в режимі
+очікування навантаження на CPU мінімальне. Хмарне розпізнавання
+запускається лише після спрацювання детектора.
+"""
+
+import time
+import wave
+import logging
+import numpy as np
+from collections import deque
+from pathlib import Path
+from config import Config
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+FFT_SIZE = 512
+MEL_FILTERS = 26
+CEPSTRA = 13
+
+def _mel(frequency):
+    return 2595.0 * np.log10(1.0 + frequency / 700.0)
+
+def _mel_to_hz(mel):
+    return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+def _mel_filterbank(sample_rate):
+    """Трикутні фільтри в шкалі мел (MEL_FILTERS x FFT_SIZE/2+1)"""
+    points = _mel_to_hz(np.linspace(_mel(100.0), _mel(min(7000.0, sample_rate / 2)), MEL_FILTERS + 2))
+    bins = np.floor((FFT_SIZE + 1) * points / sample_rate).astype(int)
+    filters = np.zeros((MEL_FILTERS, FFT_SIZE // 2 + 1))
+    for m in range(1, MEL_FILTERS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+def _dct_matrix():
+    """DCT-II для перших CEPSTRA коефіцієнтів"""
+    n = np.arange(MEL_FILTERS)
+    k = np.arange(CEPSTRA)[:, None]
+    return np.cos(np.pi * k * (2 * n + 1) / (2 * MEL_FILTERS))
+
+class MFCCExtractor:
+    """
+    Потокове обчислення MFCC (кадри 25 мс, крок 10 мс)
+
+    Args:
+        sample_rate (int): Частота дискретизації
+    """
+
+    def __init__(self, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.frame_length = int(FRAME_SECONDS * sample_rate)
+        self.hop_length = int(HOP_SECONDS * sample_rate)
+        self.window = np.hamming(self.frame_length)
+        self.filterbank = _mel_filterbank(sample_rate)
+        self.dct = _dct_matrix()
+        self._pending = np.empty(0, dtype=np.float32)
+
+    def reset(self):
+        self._pending = np.empty(0, dtype=np.float32)
+
+    def process(self, samples):
+        """
+        Ознаки нових повних кадрів
+
+        Args:
+            samples (np.ndarray): PCM16 семпли
+
+        Returns:
+            tuple: (MFCC без c0: кадри x (CEPSTRA-1), енергія кадрів у дБ)
+        """
+        signal = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        count = 0 if len(signal) < self.frame_length else 1 + (len(signal) - self.frame_length) // self.hop_length
+        if count == 0:
+            self._pending = signal
+            return np.empty((0, CEPSTRA - 1)), np.empty(0)
+
+        indices = np.arange(self.frame_length)[None, :] + self.hop_length * np.arange(count)[:, None]
+        frames = signal[indices]
+        self._pending = signal[count * self.hop_length:]
+
+        # Енергія - до передспотворення (інакше тихий шум переважає голос)
+        energy = 10 * np.log10(np.maximum(np.mean(frames ** 2, axis=1), 1e-10))
+        frames = np.concatenate([frames[:, :1], frames[:, 1:] - 0.97 * frames[:, :-1]], axis=1) * self.window
+        power = np.abs(np.fft.rfft(frames, FFT_SIZE)) ** 2 / FFT_SIZE
+        mel = np.log(np.maximum(power @ self.filterbank.T, 1e-10))
+        cepstra = mel @ self.dct.T
+        return cepstra[:, 1:], energy
+
+def normalize_features(cepstra, energy, margin_db=25.0):
+    """
+    Нормалізація середнього та дисперсії (CMVN) за озвученими кадрами
+
+    Кадри з енергією нижче максимуму на margin_db (тиша, паузи) не
+    впливають на статистику, тому шаблон і вікно потоку порівнянні.
+    """
+    voiced = energy > energy.max() - margin_db
+    mean = cepstra[voiced].mean(axis=0)
+    std = cepstra[voiced].std(axis=0) + 1e-6
+    return (cepstra - mean) / std
+
+def subsequence_dtw(cost):
+    """
+    Subsequence DTW з нахилом шляху від 1/2 до 2
+
+    Кожен кадр шаблону входить у шлях рівно один раз, тому сума ділиться
+    на довжину шаблону. Рядки обчислюються векторно (залежність лише від
+    двох попередніх рядків).
+
+    Args:
+        cost (np.ndarray): Відстані кадрів шаблону (рядки) до кадрів вікна (стовпці)
+
+    Returns:
+        np.ndarray: Нормалізована відстань найкращого шляху, що закінчується в кожному стовпці
+    """
+    rows, columns = cost.shape
+    previous2 = None
+    previous = cost[0].copy()
+    for i in range(1, rows):
+        best = np.full(columns, np.inf)
+        best[1:] = previous[:-1]
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        if previous2 is not None:
+            best[1:] = np.minimum(best[1:], previous2[:-1] + cost[i - 1, 1:])
+        previous2, previous = previous, cost[i] + best
+    return previous / rows
+
+class WakeWordDetector:
+    """
+    Детектор активаційного слова за шаблонами
+
+    Args:
+        templates_dir (Path): WAV зразки слова (за замовчуванням Config.WAKE_WORD_TEMPLATES_DIR)
+        sample_rate (int): Частота дискретизації потоку
+    """
+
+    def __init__(self, templates_dir=None, sample_rate=None):
+        self.config = Config()
+        self.sample_rate = sample_rate or self.config.AUDIO_SAMPLE_RATE
+        self.templates_dir = Path(templates_dir or self.config.WAKE_WORD_TEMPLATES_DIR)
+        self.extractor = MFCCExtractor(self.sample_rate)
+        self.templates = []
+        self._features = deque()
+        self._energy = deque()
+        self._frames_since_check = 0
+        self._refractory_frames = 0
+        self.noise_floor = None
+        self.frames_processed = 0
+
+        self.stats = {
+            'frames': 0,
+            'dtw_checks': 0,
+            'gated_checks': 0,
+            'hits': 0
+        }
+
+        self.load_templates()
+
+    @property
+    def enrolled(self):
+        return bool(self.templates)
+
+    def features(self, samples):
+        """Нормалізовані MFCC ознаки окремого запису без тиші на краях"""
+        cepstra, energy = MFCCExtractor(self.sample_rate).process(samples)
+        if len(energy) == 0:
+            return cepstra
+        voiced = np.nonzero(energy > energy.max() - 25.0)[0]
+        span = slice(voiced[0], voiced[-1] + 1)
+        return normalize_features(cepstra[span], energy[span])
+
+    def add_template(self, samples):
+        """Додавання шаблону з PCM16 семплів"""
+        template = self.features(samples)
+        if len(template) >= 10:
+            self.templates.append(template)
+        return template
+
+    def load_templates(self):
+        """Завантаження шаблонів з WAV файлів"""
+        self.templates = []
+        if not self.templates_dir.exists():
+            return 0
+
+        for path in sorted(self.templates_dir.glob("*.wav")):
+            try:
+                with wave.open(str(path), "rb") as wav:
+                    if wav.getframerate() != self.sample_rate or wav.getsampwidth() != 2:
+                        logging.warning(f"Шаблон активаційного слова пропущено (формат): {path.name}")
+                        continue
+                    samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+                self.add_template(samples)
+            except Exception as e:
+                logging.error(f"Помилка завантаження шаблону {path.name}: {e}")
+
+        if self.templates:
+            logging.info(f"Активаційне слово: {len(self.templates)} шаблонів")
+        return len(self.templates)
+
+    def enroll(self, pcm_bytes):
+        """
+        Збереження нового зразка слова
+
+        Args:
+            pcm_bytes (bytes): PCM16 аудіо з вимовою слова
+
+        Returns:
+            Path: Файл шаблону
+        """
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        path = self.templates_dir / f"template_{int(time.time() * 1000)}.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm_bytes)
+        self.add_template(np.frombuffer(pcm_bytes, dtype=np.int16))
+        return path
+
+    def reset(self):
+        """Очищення потокового стану (після спрацювання або паузи)"""
+        self.extractor.reset()
+        self._features.clear()
+        self._energy.clear()
+        self._frames_since_check = 0
+
+    @property
+    def _window_frames(self):
+        return int(max(len(t) for t in self.templates) * 1.6)
+
+    def _update_noise_floor(self, energy):
+        """Рівень шуму: швидко вниз, повільно вгору"""
+        for value in energy:
+            if self.noise_floor is None or value < self.noise_floor:
+                self.noise_floor = value
+            else:
+                self.noise_floor += 0.002 * (value - self.noise_floor)
+
+    def score(self):
+        """Найменша відстань поточного вікна до шаблонів (None - вікно відсічено як тиша)"""
+        energy = np.fromiter(self._energy, dtype=float)
+        if energy.max() < self.noise_floor + self.config.WAKE_WORD_MIN_SNR_DB:
+            self.stats['gated_checks'] += 1
+            return None
+
+        self.stats['dtw_checks'] += 1
+        window = normalize_features(np.asarray(self._features), energy)
+        best = np.inf
+        for template in self.templates:
+            if len(window) < len(template) // 2:
+                continue
+            cost = np.sqrt(((template[:, None, :] - window[None, :, :]) ** 2).sum(axis=2))
+            best = min(best, float(subsequence_dtw(cost).min()))
+        return best
+
+    def process(self, pcm_bytes):
+        """
+        Обробка нового фрагмента аудіо
+
+        Returns:
+            float: Відстань при спрацюванні, інакше None
+        """
+        if not self.templates:
+            return None
+
+        cepstra, energy = self.extractor.process(np.frombuffer(pcm_bytes, dtype=np.int16))
+        if not len(energy):
+            return None
+
+        self.stats['frames'] += len(energy)
+        self.frames_processed += len(energy)
+        self._update_noise_floor(energy)
+
+        window = self._window_frames
+        self._features.extend(cepstra)
+        self._energy.extend(energy)
+        while len(self._features) > window:
+            self._features.popleft()
+            self._energy.popleft()
+
+        if self._refractory_frames > 0:
+            self._refractory_frames -= len(energy)
+            return None
+
+        self._frames_since_check += len(energy)
+        if self._frames_since_check < int(self.config.WAKE_WORD_CHECK_INTERVAL / HOP_SECONDS):
+            return None
+        self._frames_since_check = 0
+
+        distance = self.score()
+        if distance is None or distance > self.config.WAKE_WORD_THRESHOLD:
+            return None
+
+        self.stats['hits'] += 1
+        self._refractory_frames = int(self.config.WAKE_WORD_REFRACTORY / HOP_SECONDS)
+        self._features.clear()
+        self._energy.clear()
+        logging.info(f"Активаційне слово виявлено локально (відстань {distance:.2f})")
+        return distance
+
+    def listen(self, cursor, timeout=None):
+        """
+        Читання потоку до спрацювання або таймауту
+
+        Args:
+            cursor (StreamCursor): Курсор потоку мікрофона
+            timeout (float): Час очікування (секунди аудіо)
+
+        Returns:
+            float: Відстань при спрацюванні, інакше None
+        """
+        chunk = cursor.stream.chunk_frames
+        budget = None if timeout is None else int(timeout * self.sample_rate)
+        consumed = 0
+
+        while budget is None or consumed < budget:
+            data = cursor.read(chunk, cursor.stream.read_timeout)
+            if not data:
+                return None
+            consumed += len(data) // 2
+            distance = self.process(data)
+            if distance is not None:
+                return distance
+        return None
+
+    def get_statistics(self):
+        """Статистика детектора"""
+        return {
+            **self.stats,
+            'templates': len(self.templates),
+            'noise_floor_db': None if self.noise_floor is None else round(self.noise_floor, 1)
+        }
+
+# Запис шаблонів: python -m voice.wake_word
+if __name__ == "__main__":
+    import speech_recognition as sr
+    from voice.audio_stream import AudioStream
+
+    stream = AudioStream(device_index=Config.MICROPHONE_INDEX)
+    if not stream.start():
+        print("ПОМИЛКА: Мікрофон недоступний!")
+        raise SystemExit(1)
+
+    detector = WakeWordDetector()
+    recognizer = sr.Recognizer()
+    with stream.source() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+
+    for attempt in range(Config.WAKE_WORD_ENROLL_SAMPLES):
+        print(f"[{attempt + 1}/{Config.WAKE_WORD_ENROLL_SAMPLES}] Скажіть \"Джарвіс\"...")
+        with stream.source() as source:
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=2)
+        print(f"Збережено: {detector.enroll(audio.get_raw_data())}")
+
+    stream.stop()